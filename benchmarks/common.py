@@ -0,0 +1,222 @@
+"""
+Code shared by the benchmarks
+
+Measuring, argument parsing, and reporting results happen here, so that
+all benchmarks measure the same way and report their results through
+the same code path: printed as a table, optionally written as JSON, and
+optionally compared to the results of an earlier run (of the same
+benchmark).
+
+Results map the name of a run (e.g. a configuration) to its metrics.
+Metric names end in their unit.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.client import HTTPConnection
+import json
+from pathlib import Path
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable
+from wsgiref.simple_server import WSGIRequestHandler
+
+
+CHANNEL_NAME = '#benchmark'
+PAYLOAD = {'channel': CHANNEL_NAME, 'text': 'Build #1234 succeeded.'}
+BODY = json.dumps(PAYLOAD).encode()
+HEADERS = {'Content-Type': 'application/json'}
+
+# Number of times to repeat a microbenchmark, keeping the fastest run
+REPEATS = 5
+
+
+Metrics = dict[str, float]
+Results = dict[str, Metrics]
+
+
+# arguments
+
+
+def create_arg_parser() -> ArgumentParser:
+    """Return a parser for the arguments all benchmarks accept."""
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--output', type=Path, help='file to write results to (as JSON)'
+    )
+    parser.add_argument(
+        '--compare',
+        type=Path,
+        metavar='BASELINE',
+        help='file with earlier results to compare the results to',
+    )
+    return parser
+
+
+def disable_access_log() -> None:
+    """Do not write an access log line per request to STDERR."""
+    WSGIRequestHandler.log_message = lambda *args: None
+
+
+# measuring
+
+
+@dataclass
+class Timing:
+    """Wall clock and CPU time spent in a block."""
+
+    elapsed_seconds: float = 0.0
+    # Includes the time spent by all threads of the process.
+    cpu_seconds: float = 0.0
+
+
+@contextmanager
+def measure() -> Iterator[Timing]:
+    """Measure the time spent in the block."""
+    timing = Timing()
+
+    cpu_started = get_cpu_seconds()
+    started = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.elapsed_seconds = time.perf_counter() - started
+        timing.cpu_seconds = get_cpu_seconds() - cpu_started
+
+
+def measure_per_call(func: Callable[[], Any], iterations: int) -> float:
+    """Call the function repeatedly, return the mean duration (in
+    seconds) per call of the fastest run.
+    """
+    durations = []
+    for _ in range(REPEATS):
+        with measure() as timing:
+            for _ in range(iterations):
+                func()
+        durations.append(timing.elapsed_seconds / iterations)
+
+    return min(durations)
+
+
+def get_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def get_max_rss_mib() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kibibytes elsewhere.
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return max_rss / divisor
+
+
+def post_message(conn: HTTPConnection) -> float:
+    """Send a message over the connection, return the latency in
+    seconds.
+    """
+    started = time.perf_counter()
+    conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+    return time.perf_counter() - started
+
+
+def summarize_latencies(latencies: list[float]) -> Metrics:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'latency_mean_ms': statistics.mean(latencies) * 1000,
+        'latency_p50_ms': quantiles[49] * 1000,
+        'latency_p99_ms': quantiles[98] * 1000,
+    }
+
+
+# reporting
+
+
+def report(args: Namespace, results: Results, *, label: str) -> None:
+    """Print the results, write them to the output file (if given), and
+    compare them to the baseline (if given).
+
+    The label names what distinguishes the runs.
+    """
+    data = {'meta': get_meta(), 'results': results}
+
+    print_results(results, label)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(data, indent=2) + '\n')
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        print()
+        print_comparison(baseline, data, label)
+
+
+def get_meta() -> dict[str, Any]:
+    return {
+        'commit': _get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _get_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
+
+
+def print_results(results: Results, label: str) -> None:
+    print(f'{label:<18} {"metric":<24} {"value":>12}')
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            print(f'{name:<18} {metric:<24} {_format_value(value):>12}')
+
+
+def print_comparison(
+    baseline: dict[str, Any], data: dict[str, Any], label: str
+) -> None:
+    print(
+        f'{label:<18} {"metric":<24} '
+        f'{"baseline":>12} {"current":>12} {"change":>8}'
+    )
+    for name, metrics in data['results'].items():
+        baseline_metrics = baseline['results'].get(name, {})
+        for metric, value in metrics.items():
+            baseline_value = baseline_metrics.get(metric)
+            if baseline_value:
+                change = f'{(value - baseline_value) / baseline_value:+.1%}'
+                baseline_str = _format_value(baseline_value)
+            else:
+                change = baseline_str = '-'
+            print(
+                f'{name:<18} {metric:<24} '
+                f'{baseline_str:>12} {_format_value(value):>12} {change:>8}'
+            )
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+
+    return f'{value:.3f}'
@@ -0,0 +1,89 @@
+"""
+Benchmark for HTTP keep-alive
+
+Send messages one after another, once opening a new connection for
+every message and once reusing a single persistent connection. Report
+the latency per message for both.
+
+Usage::
+
+    $ python benchmarks/http_keep_alive.py --requests 1000
+    $ python benchmarks/http_keep_alive.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from http.client import HTTPConnection
+from threading import Thread
+
+from weitersager.config import HttpConfig
+from weitersager.http import create_server
+
+from common import (
+    create_arg_parser,
+    disable_access_log,
+    Metrics,
+    post_message,
+    report,
+    summarize_latencies,
+)
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--requests', type=int, default=1000)
+    return parser.parse_args()
+
+
+def run(keep_alive: bool, request_count: int) -> Metrics:
+    config = HttpConfig(
+        '127.0.0.1',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        workers=2,
+        keep_alive_timeout=5.0 if keep_alive else None,
+        keep_alive_max_requests=request_count + 1,
+    )
+    server = create_server(config)
+    server_thread = Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    host, port = server.server_address
+
+    latencies = []
+    conn = HTTPConnection(host, port)
+    for _ in range(request_count):
+        if keep_alive:
+            latencies.append(post_message(conn))
+        else:
+            # Include the time to connect.
+            conn = HTTPConnection(host, port)
+            latencies.append(post_message(conn))
+            conn.close()
+    conn.close()
+
+    server.shutdown()
+    server.server_close()
+
+    return summarize_latencies(latencies)
+
+
+def main() -> None:
+    args = parse_args()
+
+    disable_access_log()
+
+    results = {
+        'no': run(False, args.requests),
+        'yes': run(True, args.requests),
+    }
+
+    report(args, results, label='keep-alive')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Load test for the HTTP receiver
+
+Start receivers with different numbers of workers and have a number of
+concurrent clients send messages to them, some of which are slow to
+send their requests. Report requests per second and latency
+percentiles for every configuration.
+
+Usage::
+
+    $ python benchmarks/http_load.py --clients 16 --requests 100 --workers 1 8
+    $ python benchmarks/http_load.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from http.client import HTTPConnection
+from threading import Thread
+import time
+
+from weitersager.config import HttpConfig
+from weitersager.http import create_server
+
+from common import (
+    BODY,
+    create_arg_parser,
+    disable_access_log,
+    HEADERS,
+    measure,
+    Metrics,
+    report,
+    summarize_latencies,
+)
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument(
+        '--slow-clients',
+        type=int,
+        default=1,
+        help='number of clients that trickle their requests',
+    )
+    parser.add_argument(
+        '--slow-delay',
+        type=float,
+        default=0.05,
+        help='seconds a slow client pauses while sending a request',
+    )
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    return parser.parse_args()
+
+
+def send_request(host: str, port: int, slow_delay: float) -> float:
+    """Send a message, return the latency in seconds."""
+    started = time.perf_counter()
+
+    conn = HTTPConnection(host, port)
+    conn.putrequest('POST', '/')
+    for name, value in HEADERS.items():
+        conn.putheader(name, value)
+    conn.putheader('Content-Length', str(len(BODY)))
+    conn.endheaders()
+    if slow_delay:
+        time.sleep(slow_delay)
+    conn.send(BODY)
+
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+
+    return time.perf_counter() - started
+
+
+def run_client(
+    host: str,
+    port: int,
+    request_count: int,
+    slow_delay: float,
+    latencies: list[float],
+) -> None:
+    for _ in range(request_count):
+        latencies.append(send_request(host, port, slow_delay))
+
+
+def run(workers: int, args: Namespace) -> Metrics:
+    config = HttpConfig(
+        '127.0.0.1',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        workers=workers,
+    )
+    server = create_server(config)
+    server_thread = Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    host, port = server.server_address
+
+    latencies: list[float] = []
+    clients = []
+    for i in range(args.clients):
+        slow_delay = args.slow_delay if i < args.slow_clients else 0.0
+        client = Thread(
+            target=run_client,
+            args=(host, port, args.requests, slow_delay, latencies),
+        )
+        clients.append(client)
+
+    with measure() as timing:
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+
+    server.shutdown()
+    server.server_close()
+
+    return {
+        'requests': len(latencies),
+        'requests_per_second': len(latencies) / timing.elapsed_seconds,
+        **summarize_latencies(latencies),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+
+    disable_access_log()
+
+    results = {str(workers): run(workers, args) for workers in args.workers}
+
+    report(args, results, label='workers')
+
+
+if __name__ == '__main__':
+    main()
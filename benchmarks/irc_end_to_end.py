@@ -0,0 +1,171 @@
+"""
+Benchmark of the whole path from HTTP to IRC
+
+Run the HTTP receiver, the queue processor, and an IRC announcer that is
+connected to an in-process fake IRC server. Have a number of concurrent
+clients send messages over persistent connections, and report the lines
+per second the IRC server has received (from the first request until
+the last line has arrived) as well as request latency percentiles.
+
+Usage::
+
+    $ python benchmarks/irc_end_to_end.py --clients 8 --requests 250
+    $ python benchmarks/irc_end_to_end.py --rate-limit 100
+    $ python benchmarks/irc_end_to_end.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from http.client import HTTPConnection
+import logging
+from pathlib import Path
+from queue import Empty
+import sys
+from threading import Event, Thread
+
+from weitersager.config import (
+    Config,
+    HttpConfig,
+    IrcChannel,
+    IrcConfig,
+    IrcServer,
+)
+from weitersager.http import create_server
+from weitersager.processor import Processor
+
+from common import (
+    CHANNEL_NAME,
+    create_arg_parser,
+    disable_access_log,
+    measure,
+    post_message,
+    report,
+    summarize_latencies,
+)
+
+
+# The fake IRC server is part of the tests, not of the package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tests.fake_ircd import FakeIrcServer  # noqa: E402
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=250)
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        help='messages per second to send to the IRC server at most',
+    )
+    parser.add_argument('--timeout', type=float, default=120.0)
+    return parser.parse_args()
+
+
+def create_config(
+    ircd: FakeIrcServer,
+    clients: int,
+    request_count: int,
+    rate_limit: float | None,
+) -> Config:
+    http_config = HttpConfig(
+        '127.0.0.1',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        workers=max(2, clients),
+        keep_alive_timeout=5.0,
+        keep_alive_max_requests=request_count + 1,
+    )
+
+    host, port = ircd.server_address
+    irc_config = IrcConfig(
+        server=IrcServer(host, port, rate_limit=rate_limit),
+        nickname='Weitersager',
+        realname='Weitersager',
+        commands=[],
+        channels={IrcChannel(CHANNEL_NAME)},
+    )
+
+    return Config(log_level='warning', http=http_config, irc=irc_config)
+
+
+def main() -> None:
+    args = parse_args()
+
+    logging.disable(logging.WARNING)
+    disable_access_log()
+
+    expected = args.clients * args.requests
+
+    with FakeIrcServer() as ircd:
+        config = create_config(
+            ircd, args.clients, args.requests, args.rate_limit
+        )
+
+        processor = Processor(config)
+        processor.announcer.start()
+        if not processor.announcer.wait_until_connected(10):
+            sys.exit('Could not connect to the IRC server.')
+
+        server = create_server(config.http)
+        Thread(target=server.serve_forever, daemon=True).start()
+
+        done = Event()
+
+        def process() -> None:
+            while not done.is_set():
+                try:
+                    processor.process_queue(timeout_seconds=0.1)
+                except Empty:
+                    pass
+
+        Thread(target=process, daemon=True).start()
+
+        latencies: list[float] = []
+
+        def client() -> None:
+            conn = HTTPConnection(*server.server_address)
+            for _ in range(args.requests):
+                latencies.append(post_message(conn))
+            conn.close()
+
+        threads = [Thread(target=client) for _ in range(args.clients)]
+
+        with measure() as timing:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            delivered = ircd.wait_for_privmsgs(expected, args.timeout)
+
+        done.set()
+        server.shutdown()
+        server.server_close()
+        processor.announcer.shutdown()
+
+    if not delivered:
+        sys.exit(
+            f'Only {ircd.privmsg_count} of {expected} lines arrived '
+            f'within {args.timeout:.0f} seconds.'
+        )
+
+    rate_limit = f'{args.rate_limit:g}' if args.rate_limit else 'none'
+    results = {
+        rate_limit: {
+            'lines': expected,
+            'elapsed_seconds': timing.elapsed_seconds,
+            'lines_per_second': expected / timing.elapsed_seconds,
+            **summarize_latencies(latencies),
+            'reconnects': ircd.connection_count - 1,
+        },
+    }
+
+    report(args, results, label='rate limit')
+
+
+if __name__ == '__main__':
+    main()
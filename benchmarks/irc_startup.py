@@ -0,0 +1,100 @@
+"""
+Benchmark of the time until messages can be announced after starting
+
+Connect an IRC announcer to an in-process fake IRC server and have it
+join a number of channels, with a send rate limit in force. Report the
+time from starting until all channels have been joined, with channels
+joined one per `JOIN` line (as the server advertises `TARGMAX=JOIN:1`),
+batched into as few lines as the line length allows, and not at all
+(as when joining channels on demand).
+
+Usage::
+
+    $ python benchmarks/irc_startup.py --channels 200 --rate-limit 20
+    $ python benchmarks/irc_startup.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+import logging
+from pathlib import Path
+import sys
+
+from weitersager.config import IrcChannel, IrcServer
+from weitersager.irc import IrcAnnouncer
+
+from common import create_arg_parser, measure, Metrics, report
+
+
+# The fake IRC server is part of the tests, not of the package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tests.fake_ircd import FakeIrcServer  # noqa: E402
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--channels', type=int, default=200)
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=20.0,
+        help='lines per second to send to the IRC server at most',
+    )
+    parser.add_argument('--timeout', type=float, default=600.0)
+    return parser.parse_args()
+
+
+def run(
+    channels: set[IrcChannel],
+    rate_limit: float,
+    isupport: list[str],
+    timeout: float,
+) -> Metrics:
+    """Measure the time until ready and count the `JOIN` lines."""
+    with FakeIrcServer(isupport=isupport) as ircd:
+        server = IrcServer(*ircd.server_address, rate_limit=rate_limit)
+        announcer = IrcAnnouncer(server, 'Bot', 'Bot', [], channels)
+
+        with measure() as timing:
+            announcer.start()
+            connected = announcer.wait_until_connected(timeout)
+
+        join_lines = [line for line in ircd.lines if line.startswith('JOIN ')]
+
+    announcer.shutdown()
+
+    if not connected:
+        sys.exit(f'Channels not joined within {timeout:.0f} seconds.')
+
+    return {
+        'join_lines': len(join_lines),
+        'ready_seconds': timing.elapsed_seconds,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+
+    logging.disable(logging.WARNING)
+
+    channels = {IrcChannel(f'#channel{i:04d}') for i in range(args.channels)}
+
+    modes = [
+        ('one per line', channels, ['TARGMAX=JOIN:1']),
+        ('batched', channels, []),
+        ('on demand', set(), []),
+    ]
+
+    results = {
+        name: run(channels_to_join, args.rate_limit, isupport, args.timeout)
+        for name, channels_to_join, isupport in modes
+    }
+
+    report(args, results, label='joins')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for the message journal
+
+Have a number of threads append messages to the journal concurrently,
+each waiting for its message to become durable, like HTTP workers do.
+Report durable appends per second. Concurrent appends share `fsync`
+calls (group commit), so throughput grows with the number of threads.
+
+Usage::
+
+    $ python benchmarks/journal_appends.py --threads 1 4 16 --path /var/tmp
+    $ python benchmarks/journal_appends.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+from weitersager.journal import Journal
+
+from common import CHANNEL_NAME, create_arg_parser, measure, PAYLOAD, report
+
+
+RECORD = json.dumps([CHANNEL_NAME, PAYLOAD['text']]).encode()
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--appends', type=int, default=2000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument(
+        '--path',
+        type=Path,
+        help='directory to create temporary journals in (choose one on '
+        'the disk to measure)',
+    )
+    return parser.parse_args()
+
+
+def run(path: Path, thread_count: int, append_count: int) -> float:
+    journal = Journal(path)
+
+    def append():
+        for _ in range(append_count // thread_count):
+            journal.append(RECORD)
+            journal.sync()
+
+    threads = [Thread(target=append) for _ in range(thread_count)]
+
+    with measure() as timing:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    journal.close()
+
+    return append_count / timing.elapsed_seconds
+
+
+def main() -> None:
+    args = parse_args()
+
+    results = {}
+    for thread_count in args.threads:
+        with TemporaryDirectory(dir=args.path) as tmp_dir:
+            appends_per_second = run(Path(tmp_dir), thread_count, args.appends)
+        results[str(thread_count)] = {'appends_per_second': appends_per_second}
+
+    report(args, results, label='threads')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of logging per-message events
+
+Log a number of per-message records, as the queue processor does, and
+report the time the logging thread spends per record with:
+
+- a stream handler that writes synchronously,
+- a queue handler that hands records over to a background thread,
+- a queue handler, with only a sample of records being logged.
+
+The stream is slowed down by a delay per write to simulate a slow
+consumer of STDERR (e.g. a Docker log driver).
+
+Usage::
+
+    $ python benchmarks/logging_handlers.py --records 10000 --write-delay 50
+    $ python benchmarks/logging_handlers.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import atexit
+from argparse import Namespace
+import logging
+import time
+
+from weitersager.config import LogConfig
+from weitersager.log import configure_logging, get_message_logger
+
+from common import CHANNEL_NAME, create_arg_parser, measure, Metrics, report
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--records', type=int, default=10_000)
+    parser.add_argument(
+        '--write-delay',
+        type=float,
+        default=50.0,
+        help='microseconds each write to the stream takes',
+    )
+    return parser.parse_args()
+
+
+class SlowStream:
+    """A stream that takes a while for each write."""
+
+    def __init__(self, delay_seconds: float) -> None:
+        self.delay_seconds = delay_seconds
+        self.write_count = 0
+
+    def write(self, s: str) -> None:
+        # Like a blocking write, release the GIL while waiting.
+        time.sleep(self.delay_seconds)
+        self.write_count += 1
+
+    def flush(self) -> None:
+        pass
+
+
+def run(config: LogConfig, record_count: int, delay_seconds: float) -> Metrics:
+    """Measure the time spent logging and the time until all records
+    have been written, and count the records written.
+    """
+    stream = SlowStream(delay_seconds)
+    listener = configure_logging('DEBUG', config, stream=stream)
+    message_logger = get_message_logger()
+
+    with measure() as written_timing:
+        with measure() as logged_timing:
+            for i in range(record_count):
+                message_logger.debug(
+                    'Received message from %s for channel %s with text "%s".',
+                    '127.0.0.1',
+                    CHANNEL_NAME,
+                    f'Build #{i} succeeded.',
+                )
+
+        if listener is not None:
+            atexit.unregister(listener.stop)
+            listener.stop()
+
+    reset_loggers()
+
+    return {
+        'us_per_record': (
+            logged_timing.elapsed_seconds / record_count * 1_000_000
+        ),
+        'records_written': stream.write_count,
+        'total_seconds': written_timing.elapsed_seconds,
+    }
+
+
+def reset_loggers() -> None:
+    logging.getLogger('weitersager').handlers.clear()
+    get_message_logger().filters.clear()
+
+
+def main() -> None:
+    args = parse_args()
+    delay_seconds = args.write_delay / 1_000_000
+
+    configs = [
+        ('stream', LogConfig()),
+        ('queue', LogConfig(queue=True)),
+        ('queue, 1% sample', LogConfig(queue=True, message_sample_rate=0.01)),
+    ]
+
+    results = {
+        name: run(config, args.records, delay_seconds)
+        for name, config in configs
+    }
+
+    report(args, results, label='handler')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark of the threaded and the asyncio runtime
+
+Run the HTTP receiver and the queue processor of either runtime (with
+IRC dummy mode, so messages are only counted) and have a number of
+concurrent clients send messages over persistent connections. Report
+messages per second (from the first request until the last message has
+been announced) and request latency percentiles for both runtimes.
+
+Usage::
+
+    $ python benchmarks/runtimes.py --clients 16 --requests 500
+    $ python benchmarks/runtimes.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import asyncio
+from argparse import Namespace
+from http.client import HTTPConnection
+import logging
+from queue import Empty
+from threading import Event, Thread
+
+from weitersager.config import Config, HttpConfig, IrcChannel, IrcConfig
+from weitersager.http import create_server
+from weitersager.http_aio import create_async_server
+from weitersager.processor import Processor
+from weitersager.processor_aio import AsyncProcessor
+from weitersager.signals import irc_channel_joined, message_received
+
+from common import (
+    CHANNEL_NAME,
+    create_arg_parser,
+    disable_access_log,
+    measure,
+    Metrics,
+    post_message,
+    report,
+    summarize_latencies,
+)
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500)
+    return parser.parse_args()
+
+
+def create_config(runtime: str, clients: int, request_count: int) -> Config:
+    http_config = HttpConfig(
+        '127.0.0.1',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        workers=clients,
+        keep_alive_timeout=5.0,
+        keep_alive_max_requests=request_count + 1,
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Weitersager',
+        realname='Weitersager',
+        commands=[],
+        channels={IrcChannel(CHANNEL_NAME)},
+    )
+
+    return Config(
+        log_level='warning', http=http_config, irc=irc_config, runtime=runtime
+    )
+
+
+class Counter:
+    """Count announced messages, signal when all have been announced."""
+
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.count = 0
+        self.done = Event()
+
+    def announce(self, channel_name: str, text: str) -> None:
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+
+def run_threaded(clients: int, request_count: int) -> Metrics:
+    config = create_config('threaded', clients, request_count)
+    counter = Counter(clients * request_count)
+
+    processor = Processor(config)
+    processor.announcer.announce = counter.announce
+    processor.announcer.start()
+
+    server = create_server(config.http)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    def process() -> None:
+        while not counter.done.is_set():
+            try:
+                processor.process_queue(timeout_seconds=0.1)
+            except Empty:
+                pass
+
+    Thread(target=process, daemon=True).start()
+
+    result = send(server.server_address, clients, request_count, counter)
+
+    server.shutdown()
+    server.server_close()
+    disconnect(processor)
+
+    return result
+
+
+def run_asyncio(clients: int, request_count: int) -> Metrics:
+    config = create_config('asyncio', clients, request_count)
+    counter = Counter(clients * request_count)
+    started = Event()
+    loop = asyncio.new_event_loop()
+
+    async def serve() -> None:
+        nonlocal processor, server
+
+        processor = AsyncProcessor(config)
+        processor.announcer.announce = counter.announce
+        processor.announcer.start()
+
+        server = create_async_server(config.http)
+        await server.start()
+        started.set()
+
+        while not counter.done.is_set():
+            await processor.process_queue_async()
+
+        await server.close()
+
+    processor = server = None
+    thread = Thread(target=loop.run_until_complete, args=(serve(),))
+    thread.start()
+    started.wait()
+
+    result = send(server.server_address, clients, request_count, counter)
+
+    thread.join()
+    loop.close()
+    disconnect(processor)
+
+    return result
+
+
+def send(
+    server_address, clients: int, request_count: int, counter: Counter
+) -> Metrics:
+    latencies: list[float] = []
+
+    def client() -> None:
+        conn = HTTPConnection(*server_address)
+        for _ in range(request_count):
+            latencies.append(post_message(conn))
+        conn.close()
+
+    threads = [Thread(target=client) for _ in range(clients)]
+
+    with measure() as timing:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.done.wait()
+
+    return {
+        'messages_per_second': counter.expected / timing.elapsed_seconds,
+        **summarize_latencies(latencies),
+    }
+
+
+def disconnect(processor: Processor) -> None:
+    """Keep this processor from receiving the next run's messages."""
+    irc_channel_joined.disconnect(processor.enable_channel)
+    message_received.disconnect(processor.handle_message)
+
+
+def main() -> None:
+    args = parse_args()
+
+    logging.disable(logging.WARNING)
+    disable_access_log()
+
+    results = {
+        'threaded': run_threaded(args.clients, args.requests),
+        'asyncio': run_asyncio(args.clients, args.requests),
+    }
+
+    report(args, results, label='runtime')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite
+
+Run a set of benchmarks and report their results, optionally as JSON,
+to compare them across commits:
+
+- ``http_end_to_end``: concurrent clients send messages over persistent
+  connections to the HTTP receiver, which passes them on to the queue
+  processor (in IRC dummy mode). Reports requests per second, latency
+  percentiles, CPU time, and peak resident set size.
+- ``dispatch_request``: the WSGI application handles a valid request
+  (routing, parsing, validation, passing the message on).
+- ``get_payload``: the JSON payload is parsed from a request.
+- ``extract_values``: values are extracted from a parsed payload.
+
+Usage::
+
+    $ python benchmarks/suite.py --output before.json
+    $ git switch my-branch
+    $ python benchmarks/suite.py --output after.json --compare before.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from http.client import HTTPConnection
+from io import BytesIO
+import logging
+from queue import Empty
+from threading import Event, Thread
+from typing import Any, Callable
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from weitersager.config import Config, HttpConfig, IrcChannel, IrcConfig
+from weitersager.http import (
+    _extract_values,
+    _get_payload,
+    create_app,
+    create_server,
+)
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined, message_received
+
+from common import (
+    BODY,
+    CHANNEL_NAME,
+    create_arg_parser,
+    disable_access_log,
+    get_max_rss_mib,
+    measure,
+    measure_per_call,
+    Metrics,
+    PAYLOAD,
+    post_message,
+    report,
+    summarize_latencies,
+)
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=250)
+    parser.add_argument('--iterations', type=int, default=10_000)
+    return parser.parse_args()
+
+
+# end to end
+
+
+def run_http_end_to_end(clients: int, request_count: int) -> Metrics:
+    http_config = HttpConfig(
+        '127.0.0.1',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        workers=clients,
+        keep_alive_timeout=5.0,
+        keep_alive_max_requests=request_count + 1,
+    )
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Weitersager',
+        realname='Weitersager',
+        commands=[],
+        channels={IrcChannel(CHANNEL_NAME)},
+    )
+    config = Config(log_level='warning', http=http_config, irc=irc_config)
+
+    expected = clients * request_count
+    announced = []
+    done = Event()
+
+    def announce(channel_name: str, text: str) -> None:
+        announced.append(text)
+        if len(announced) == expected:
+            done.set()
+
+    processor = Processor(config)
+    processor.announcer.announce = announce
+    processor.announcer.start()
+
+    server = create_server(config.http)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    def process() -> None:
+        while not done.is_set():
+            try:
+                processor.process_queue(timeout_seconds=0.1)
+            except Empty:
+                pass
+
+    Thread(target=process, daemon=True).start()
+
+    latencies: list[float] = []
+
+    def client() -> None:
+        conn = HTTPConnection(*server.server_address)
+        for _ in range(request_count):
+            latencies.append(post_message(conn))
+        conn.close()
+
+    threads = [Thread(target=client) for _ in range(clients)]
+
+    with measure() as timing:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.wait()
+
+    server.shutdown()
+    server.server_close()
+    irc_channel_joined.disconnect(processor.enable_channel)
+    message_received.disconnect(processor.handle_message)
+
+    return {
+        'requests_per_second': expected / timing.elapsed_seconds,
+        **summarize_latencies(latencies),
+        # Includes the clients, which run in the same process.
+        'cpu_seconds': timing.cpu_seconds,
+        'cpu_ms_per_request': timing.cpu_seconds / expected * 1000,
+        'max_rss_mib': get_max_rss_mib(),
+    }
+
+
+# microbenchmarks
+
+
+def run_dispatch_request(iterations: int) -> Metrics:
+    app = create_app(set(), {})
+
+    def receive(sender, **kwargs) -> None:
+        pass
+
+    environ = _build_environ()
+
+    message_received.connect(receive)
+    try:
+        return _measure_mean_us(
+            lambda: app.dispatch_request(_build_request(environ)), iterations
+        )
+    finally:
+        message_received.disconnect(receive)
+
+
+def run_get_payload(iterations: int) -> Metrics:
+    environ = _build_environ()
+    return _measure_mean_us(
+        lambda: _get_payload(_build_request(environ)), iterations
+    )
+
+
+def run_extract_values(iterations: int) -> Metrics:
+    keys = {'channel', 'text'}
+    return _measure_mean_us(lambda: _extract_values(PAYLOAD, keys), iterations)
+
+
+def _build_environ() -> dict[str, Any]:
+    builder = EnvironBuilder(method='POST', path='/', json=PAYLOAD)
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _build_request(environ: dict[str, Any]) -> Request:
+    """Build a request with a body stream of its own."""
+    return Request({**environ, 'wsgi.input': BytesIO(BODY)})
+
+
+def _measure_mean_us(func: Callable[[], Any], iterations: int) -> Metrics:
+    return {'mean_us': measure_per_call(func, iterations) * 1_000_000}
+
+
+def main() -> None:
+    args = parse_args()
+
+    logging.disable(logging.WARNING)
+    disable_access_log()
+
+    results = {
+        'http_end_to_end': run_http_end_to_end(args.clients, args.requests),
+        'dispatch_request': run_dispatch_request(args.iterations),
+        'get_payload': run_get_payload(args.iterations),
+        'extract_values': run_extract_values(args.iterations),
+    }
+
+    report(args, results, label='benchmark')
+
+
+if __name__ == '__main__':
+    main()
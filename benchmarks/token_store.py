@@ -0,0 +1,107 @@
+"""
+Benchmark of the external channel token store
+
+Register a number of channel tokens in a store, then report the time it
+takes to load all of them into the in-memory index, the memory the index
+takes, the time per lookup, and the time to refresh the index after a
+single change.
+
+Usage::
+
+    $ python benchmarks/token_store.py --tokens 50000
+    $ python benchmarks/token_store.py --output results.json
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import tracemalloc
+
+from weitersager.tokencli import generate_token
+from weitersager.tokenstore import ChannelTokenIndex, TokenStore
+
+from common import create_arg_parser, measure, report
+
+
+def parse_args() -> Namespace:
+    parser = create_arg_parser()
+    parser.add_argument('--tokens', type=int, default=50_000)
+    parser.add_argument('--channels', type=int, default=100)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    return parser.parse_args()
+
+
+def register_tokens(
+    store: TokenStore, token_count: int, channel_count: int
+) -> list[str]:
+    tokens = [generate_token() for _ in range(token_count)]
+    for i, token in enumerate(tokens):
+        store.register(token, f'#channel{i % channel_count}')
+    return tokens
+
+
+def main() -> None:
+    args = parse_args()
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'tokens.sqlite'
+        writer = TokenStore(path)
+
+        results = {}
+
+        with measure() as timing:
+            tokens = register_tokens(writer, args.tokens, args.channels)
+        results['register'] = {
+            'us_per_token': timing.elapsed_seconds / args.tokens * 1_000_000,
+        }
+
+        reader = TokenStore(path)
+        index = ChannelTokenIndex(reader)
+
+        tracemalloc.start()
+        with measure() as timing:
+            index.refresh()
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results['load index'] = {
+            'elapsed_ms': timing.elapsed_seconds * 1000,
+            'size_mib': size / 1024 / 1024,
+            'bytes_per_token': size / len(index),
+            'peak_mib': peak / 1024 / 1024,
+        }
+
+        lookup_tokens = [tokens[i % len(tokens)] for i in range(args.lookups)]
+        with measure() as timing:
+            for token in lookup_tokens:
+                index.lookup(token)
+        results['lookup'] = {
+            'us_per_lookup': timing.elapsed_seconds / args.lookups * 1_000_000,
+        }
+
+        with measure() as timing:
+            change_count = index.refresh()
+        results['refresh unchanged'] = {
+            'elapsed_us': timing.elapsed_seconds * 1_000_000,
+            'changes': change_count,
+        }
+
+        writer.register(generate_token(), '#new')
+        with measure() as timing:
+            change_count = index.refresh()
+        results['refresh changed'] = {
+            'elapsed_us': timing.elapsed_seconds * 1_000_000,
+            'changes': change_count,
+        }
+
+        reader.close()
+        writer.close()
+
+    report(args, results, label='operation')
+
+
+if __name__ == '__main__':
+    main()
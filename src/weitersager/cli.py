@@ -15,8 +15,9 @@ from pathlib import Path
 import sys
 
 from .config import load_config
+from .log import configure_logging
 from .processor import start
-from .util import configure_logging
+from .processor_aio import start_async
 
 
 def parse_args(args: list[str]) -> Namespace:
@@ -35,8 +36,12 @@ def main() -> None:
     """Load the configuration file, start the IRC bot and HTTP listen server."""
     namespace = parse_args(sys.argv[1:])
     config = load_config(namespace.config_filename)
-    configure_logging(config.log_level)
-    start(config)
+    configure_logging(config.log_level, config.log)
+
+    if config.runtime == 'asyncio':
+        start_async(config, namespace.config_filename)
+    else:
+        start(config, namespace.config_filename)
 
 
 if __name__ == '__main__':
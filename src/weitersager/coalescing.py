@@ -0,0 +1,148 @@
+"""
+weitersager.coalescing
+~~~~~~~~~~~~~~~~~~~~~~
+
+Collapse repeated messages
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Callable
+
+from .message import Message
+
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+# Channel name, text, and priority
+_Key = tuple[str, str, int]
+
+
+@dataclass
+class _Entry:
+    message: Message
+    expires_at: float
+
+
+class Coalescer:
+    """Collapse messages with the same channel, text, and priority into
+    the first one of them that is still queued, counting the
+    repetitions.
+
+    Only messages arriving within the time window after the first one
+    are collapsed. The number of tracked messages is limited; if the
+    limit is reached, the oldest ones are no longer tracked.
+
+    Once a message is no longer tracked, further messages are not
+    collapsed into it, but the repetitions collapsed into it so far are
+    kept until it is released.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+
+        self._lock = Lock()
+        # Ordered by time of arrival, and thus by expiration
+        self._entries: OrderedDict[_Key, _Entry] = OrderedDict()
+        # Number of messages each queued message stands for (if more
+        # than one), by identity, as identical messages are equal
+        self._counts: dict[int, int] = {}
+
+    def add(self, message: Message) -> bool:
+        """Track a message about to be queued.
+
+        Return `True` if it has been collapsed into an identical queued
+        message instead, in which case it must not be queued.
+        """
+        key = _get_key(message)
+
+        with self._lock:
+            now = self._clock()
+            self._remove_expired_entries(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                message_id = id(entry.message)
+                self._counts[message_id] = self._counts.get(message_id, 1) + 1
+                return True
+
+            if len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+
+            self._entries[key] = _Entry(message, now + self.window_seconds)
+            return False
+
+    def discard(self, message: Message) -> None:
+        """Stop tracking a message that could not be queued after all."""
+        self.release(message)
+
+    def discard_repetition(self, message: Message) -> None:
+        """Take back the collapse of a message that could not be
+        accepted after all into an identical queued one (if that is
+        still tracked).
+        """
+        key = _get_key(message)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+
+            message_id = id(entry.message)
+            count = self._counts.get(message_id, 1) - 1
+            if count > 1:
+                self._counts[message_id] = count
+            else:
+                self._counts.pop(message_id, None)
+
+    def release(self, message: Message) -> int:
+        """Stop tracking a message that is about to be sent.
+
+        Return the number of messages it stands for.
+        """
+        key = _get_key(message)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.message is message:
+                del self._entries[key]
+
+            return self._counts.pop(id(message), 1)
+
+    def _remove_expired_entries(self, now: float) -> None:
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.expires_at > now:
+                break
+
+            self._entries.popitem(last=False)
+
+
+def _get_key(message: Message) -> _Key:
+    # A message is not collapsed into one of a lower priority as that
+    # would delay it, nor into one of a higher priority as that would
+    # let it jump the queue.
+    return message.channel_name, message.text, message.priority
+
+
+def format_repeated_text(text: str, count: int) -> str:
+    """Append the number of repetitions, if any, to the text."""
+    if count == 1:
+        return text
+
+    return f'{text} ({count}x)'
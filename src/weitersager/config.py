@@ -10,7 +10,7 @@ Configuration loading
 
 from __future__ import annotations
 from collections.abc import Iterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -19,19 +19,73 @@ import rtoml
 
 DEFAULT_HTTP_HOST = '127.0.0.1'
 DEFAULT_HTTP_PORT = 8080
+DEFAULT_HTTP_WORKERS = 1
+DEFAULT_HTTP_KEEP_ALIVE_MAX_REQUESTS = 100
+DEFAULT_TOKEN_STORE_REFRESH_INTERVAL = 5.0  # seconds
 DEFAULT_IRC_SERVER_PORT = 6667
 DEFAULT_IRC_REALNAME = 'Weitersager'
+DEFAULT_QUEUE_SEGMENT_SIZE = 4 * 1024 * 1024  # bytes
+DEFAULT_QUEUE_SCHEDULING = 'fifo'
+QUEUE_SCHEDULINGS = frozenset(['fifo', 'fair'])
+DEFAULT_QUEUE_COALESCE_MAX_ENTRIES = 10_000
+DEFAULT_QUEUE_PACK_SEPARATOR = ' | '
+DEFAULT_QUEUE_HOLD_MAX_MESSAGES = 100
+DEFAULT_QUEUE_HOLD_MAX_BYTES = 1024 * 1024
+DEFAULT_LOG_FORMAT = 'text'
+LOG_FORMATS = frozenset(['text', 'json'])
+DEFAULT_RUNTIME = 'threaded'
+RUNTIMES = frozenset(['threaded', 'asyncio'])
 
 
 class ConfigurationError(Exception):
     """Indicates a configuration error."""
 
 
+@dataclass(frozen=True)
+class LogConfig:
+    """A logging configuration."""
+
+    format: str = DEFAULT_LOG_FORMAT
+    queue: bool = False
+    message_sample_rate: float = 1.0
+    message_rate_limit: float | None = None
+
+
+@dataclass(frozen=True)
+class TraceConfig:
+    """A message tracing configuration."""
+
+    sample_rate: float = 0.0
+
+
+@dataclass(frozen=True)
+class QueueConfig:
+    """A message queue configuration."""
+
+    capacity: int | None = None
+    path: Path | None = None
+    segment_size: int = DEFAULT_QUEUE_SEGMENT_SIZE
+    scheduling: str = DEFAULT_QUEUE_SCHEDULING
+    channel_weights: dict[str, int] = field(default_factory=dict)
+    coalesce_window: float | None = None
+    coalesce_max_entries: int = DEFAULT_QUEUE_COALESCE_MAX_ENTRIES
+    pack: bool = False
+    pack_separator: str = DEFAULT_QUEUE_PACK_SEPARATOR
+    pack_linger: float = 0.0
+    hold_ttl: float | None = None
+    hold_max_messages: int = DEFAULT_QUEUE_HOLD_MAX_MESSAGES
+    hold_max_bytes: int = DEFAULT_QUEUE_HOLD_MAX_BYTES
+
+
 @dataclass(frozen=True)
 class Config:
     log_level: str
     http: HttpConfig
     irc: IrcConfig
+    queue: QueueConfig = field(default_factory=QueueConfig)
+    runtime: str = DEFAULT_RUNTIME
+    trace: TraceConfig = field(default_factory=TraceConfig)
+    log: LogConfig = field(default_factory=LogConfig)
 
 
 @dataclass(frozen=True)
@@ -42,6 +96,20 @@ class HttpConfig:
     port: int
     api_tokens: set[str]
     channel_tokens_to_channel_names: dict[str, str]
+    workers: int = DEFAULT_HTTP_WORKERS
+    keep_alive_timeout: float | None = None
+    keep_alive_max_requests: int = DEFAULT_HTTP_KEEP_ALIVE_MAX_REQUESTS
+    token_priorities: dict[str, int] = field(default_factory=dict)
+    metrics: bool = False
+    token_store: TokenStoreConfig | None = None
+
+
+@dataclass(frozen=True)
+class TokenStoreConfig:
+    """An external store of channel tokens."""
+
+    path: Path
+    refresh_interval: float = DEFAULT_TOKEN_STORE_REFRESH_INTERVAL
 
 
 @dataclass(frozen=True)
@@ -53,6 +121,9 @@ class IrcServer:
     ssl: bool = False
     password: str | None = None
     rate_limit: float | None = None
+    rate_limit_burst: int | None = None
+    rate_limit_bytes_per_token: int | None = None
+    connections: int = 1
 
 
 @dataclass(frozen=True, order=True)
@@ -63,6 +134,15 @@ class IrcChannel:
     password: str | None = None
 
 
+@dataclass(frozen=True)
+class IrcNetwork:
+    """An additional IRC network, with a server and channels of its own."""
+
+    name: str
+    server: IrcServer
+    channels: set[IrcChannel]
+
+
 @dataclass(frozen=True)
 class IrcConfig:
     """An IRC bot configuration."""
@@ -72,6 +152,35 @@ class IrcConfig:
     realname: str
     commands: list[str]
     channels: set[IrcChannel]
+    networks: list[IrcNetwork] = field(default_factory=list)
+    join_on_demand: bool = False
+    part_idle_after: float | None = None
+
+
+# Separates the network name from the channel name in qualified channel
+# names (e.g. `libera:#lobby`). Channel names cannot contain it.
+NETWORK_SEPARATOR = ':'
+
+
+def qualify_channel_name(network_name: str | None, channel_name: str) -> str:
+    """Return the channel name, qualified with the network name (if
+    any).
+    """
+    if network_name is None:
+        return channel_name
+
+    return f'{network_name}{NETWORK_SEPARATOR}{channel_name}'
+
+
+def split_channel_name(channel_name: str) -> tuple[str | None, str]:
+    """Split a (possibly) qualified channel name into network name (or
+    `None`) and channel name.
+    """
+    network_name, separator, name = channel_name.partition(NETWORK_SEPARATOR)
+    if not separator:
+        return None, channel_name
+
+    return network_name, name
 
 
 def load_config(path: Path) -> Config:
@@ -79,13 +188,23 @@ def load_config(path: Path) -> Config:
     data = rtoml.load(path)
 
     log_level = _get_log_level(data)
+    log_config = _get_log_config(data)
+    runtime = _get_runtime(data)
     http_config = _get_http_config(data)
     irc_config = _get_irc_config(data)
+    queue_config = _get_queue_config(data)
+    trace_config = _get_trace_config(data)
+
+    _check_http_keep_alive(runtime, http_config)
 
     return Config(
         log_level=log_level,
         http=http_config,
         irc=irc_config,
+        queue=queue_config,
+        runtime=runtime,
+        trace=trace_config,
+        log=log_config,
     )
 
 
@@ -98,26 +217,156 @@ def _get_log_level(data: dict[str, Any]) -> str:
     return level
 
 
+def _get_log_config(data: dict[str, Any]) -> LogConfig:
+    data_log = data.get('log', {})
+
+    format_name = data_log.get('format', DEFAULT_LOG_FORMAT)
+    if format_name not in LOG_FORMATS:
+        raise ConfigurationError(f'Unknown log format "{format_name}"')
+
+    queue = data_log.get('queue', False)
+
+    message_sample_rate = float(data_log.get('message_sample_rate', 1.0))
+    if not 0.0 <= message_sample_rate <= 1.0:
+        raise ConfigurationError(
+            'Log message sample rate must be between 0 and 1.'
+        )
+
+    message_rate_limit = data_log.get('message_rate_limit')
+    if message_rate_limit is not None:
+        message_rate_limit = float(message_rate_limit)
+        if message_rate_limit <= 0:
+            raise ConfigurationError('Log message rate limit must be positive.')
+
+    return LogConfig(
+        format=format_name,
+        queue=queue,
+        message_sample_rate=message_sample_rate,
+        message_rate_limit=message_rate_limit,
+    )
+
+
+def _get_runtime(data: dict[str, Any]) -> str:
+    runtime = data.get('runtime', DEFAULT_RUNTIME)
+
+    if runtime not in RUNTIMES:
+        raise ConfigurationError(f'Unknown runtime "{runtime}"')
+
+    return runtime
+
+
 def _get_http_config(data: dict[str, Any]) -> HttpConfig:
     data_http = data.get('http', {})
 
     host = data_http.get('host', DEFAULT_HTTP_HOST)
     port = int(data_http.get('port', DEFAULT_HTTP_PORT))
-    api_tokens = set(data_http.get('api_tokens', []))
-    channel_tokens_to_channel_names = _get_channel_tokens_to_channel_names(data)
+    api_tokens, api_token_priorities = _get_tokens(
+        data_http.get('api_tokens', [])
+    )
+    channel_tokens_to_channel_names, channel_token_priorities = (
+        _get_channel_tokens(data)
+    )
+
+    workers = int(data_http.get('workers', DEFAULT_HTTP_WORKERS))
+    if workers < 1:
+        raise ConfigurationError('Number of HTTP workers must be at least 1.')
+
+    keep_alive_timeout_str = data_http.get('keep_alive_timeout')
+    keep_alive_timeout = (
+        float(keep_alive_timeout_str) if keep_alive_timeout_str else None
+    )
+    keep_alive_max_requests = int(
+        data_http.get(
+            'keep_alive_max_requests', DEFAULT_HTTP_KEEP_ALIVE_MAX_REQUESTS
+        )
+    )
+
+    token_priorities = {**api_token_priorities, **channel_token_priorities}
+
+    metrics = data_http.get('metrics', False)
+
+    token_store = _get_token_store_config(data_http)
+
+    return HttpConfig(
+        host,
+        port,
+        api_tokens,
+        channel_tokens_to_channel_names,
+        workers=workers,
+        keep_alive_timeout=keep_alive_timeout,
+        keep_alive_max_requests=keep_alive_max_requests,
+        token_priorities=token_priorities,
+        metrics=metrics,
+        token_store=token_store,
+    )
+
+
+def _check_http_keep_alive(runtime: str, http_config: HttpConfig) -> None:
+    if runtime != 'threaded' or http_config.keep_alive_timeout is None:
+        return
+
+    # A single worker would be kept busy by one idle persistent
+    # connection, blocking all other clients.
+    if http_config.workers < 2:
+        raise ConfigurationError(
+            'HTTP keep-alive requires at least 2 HTTP workers.'
+        )
+
+
+def _get_token_store_config(
+    data_http: dict[str, Any],
+) -> TokenStoreConfig | None:
+    data_token_store = data_http.get('token_store')
+    if data_token_store is None:
+        return None
+
+    path = Path(data_token_store['path'])
+
+    refresh_interval = float(
+        data_token_store.get(
+            'refresh_interval', DEFAULT_TOKEN_STORE_REFRESH_INTERVAL
+        )
+    )
+    if refresh_interval <= 0:
+        raise ConfigurationError(
+            'Token store refresh interval must be positive.'
+        )
+
+    return TokenStoreConfig(path, refresh_interval=refresh_interval)
 
-    return HttpConfig(host, port, api_tokens, channel_tokens_to_channel_names)
 
+def _get_tokens(values: list[Any]) -> tuple[set[str], dict[str, int]]:
+    """Return tokens and their default message priorities.
 
-def _get_channel_tokens_to_channel_names(
+    A token is given either as string, or as table with keys `token`
+    and (optionally) `priority`.
+    """
+    tokens = set()
+    token_priorities = {}
+
+    for value in values:
+        if isinstance(value, str):
+            tokens.add(value)
+            continue
+
+        token = value['token']
+        tokens.add(token)
+
+        priority = value.get('priority')
+        if priority is not None:
+            token_priorities[token] = int(priority)
+
+    return tokens, token_priorities
+
+
+def _get_channel_tokens(
     data: dict[str, Any],
-) -> dict[str, str]:
+) -> tuple[dict[str, str], dict[str, int]]:
     channel_tokens_to_channel_names = {}
+    token_priorities = {}
 
-    for channel in data['irc'].get('channels', []):
-        channel_name = channel['name']
-
-        tokens = set(channel.get('tokens', []))
+    for channel_name, channel in _iter_channel_tables(data):
+        tokens, priorities = _get_tokens(channel.get('tokens', []))
         for token in tokens:
             if token in channel_tokens_to_channel_names:
                 raise ConfigurationError(
@@ -127,7 +376,9 @@ def _get_channel_tokens_to_channel_names(
 
             channel_tokens_to_channel_names[token] = channel_name
 
-    return channel_tokens_to_channel_names
+        token_priorities.update(priorities)
+
+    return channel_tokens_to_channel_names, token_priorities
 
 
 def _get_irc_config(data: dict[str, Any]) -> IrcConfig:
@@ -138,6 +389,22 @@ def _get_irc_config(data: dict[str, Any]) -> IrcConfig:
     realname = data_irc['bot'].get('realname', DEFAULT_IRC_REALNAME)
     commands = data_irc.get('commands', [])
     channels = set(_get_irc_channels(data_irc))
+    networks = list(_get_irc_networks(data_irc))
+
+    join_on_demand = data_irc.get('join_on_demand', False)
+    part_idle_after_str = data_irc.get('part_idle_after')
+    part_idle_after = (
+        float(part_idle_after_str) if part_idle_after_str else None
+    )
+    if part_idle_after is not None:
+        if not join_on_demand:
+            raise ConfigurationError(
+                'Parting idle channels requires joining channels on demand.'
+            )
+        if part_idle_after <= 0:
+            raise ConfigurationError(
+                'Idle time after which to part channels must be positive.'
+            )
 
     return IrcConfig(
         server=server,
@@ -145,6 +412,9 @@ def _get_irc_config(data: dict[str, Any]) -> IrcConfig:
         realname=realname,
         commands=commands,
         channels=channels,
+        networks=networks,
+        join_on_demand=join_on_demand,
+        part_idle_after=part_idle_after,
     )
 
 
@@ -153,6 +423,10 @@ def _get_irc_server(data_irc: Any) -> IrcServer | None:
     if data_server is None:
         return None
 
+    return _parse_irc_server(data_server)
+
+
+def _parse_irc_server(data_server: Any) -> IrcServer | None:
     host = data_server.get('host')
     if not host:
         return None
@@ -162,14 +436,186 @@ def _get_irc_server(data_irc: Any) -> IrcServer | None:
     password = data_server.get('password')
     rate_limit_str = data_server.get('rate_limit')
     rate_limit = float(rate_limit_str) if rate_limit_str else None
+    rate_limit_burst = _get_optional_positive_int(
+        data_server, 'rate_limit_burst'
+    )
+    rate_limit_bytes_per_token = _get_optional_positive_int(
+        data_server, 'rate_limit_bytes_per_token'
+    )
+    connections = int(data_server.get('connections', 1))
+    if connections < 1:
+        raise ConfigurationError(
+            'Number of IRC server connections must be at least 1.'
+        )
 
     return IrcServer(
-        host=host, port=port, ssl=ssl, password=password, rate_limit=rate_limit
+        host=host,
+        port=port,
+        ssl=ssl,
+        password=password,
+        rate_limit=rate_limit,
+        rate_limit_burst=rate_limit_burst,
+        rate_limit_bytes_per_token=rate_limit_bytes_per_token,
+        connections=connections,
     )
 
 
+def _get_optional_positive_int(data: Any, key: str) -> int | None:
+    value = data.get(key)
+    if value is None:
+        return None
+
+    value = int(value)
+    if value < 1:
+        raise ConfigurationError(f'Value of "{key}" must be at least 1.')
+
+    return value
+
+
 def _get_irc_channels(data_irc: Any) -> Iterator[IrcChannel]:
     for channel in data_irc.get('channels', []):
         name = channel['name']
         password = channel.get('password')
         yield IrcChannel(name, password)
+
+
+def _get_irc_networks(data_irc: Any) -> Iterator[IrcNetwork]:
+    names = set()
+
+    for data_server in data_irc.get('servers', []):
+        name = data_server.get('name')
+        if not name:
+            raise ConfigurationError(
+                'Every IRC server in `irc.servers` needs a name.'
+            )
+
+        if NETWORK_SEPARATOR in name:
+            raise ConfigurationError(
+                f'IRC server name "{name}" must not contain '
+                f'"{NETWORK_SEPARATOR}".'
+            )
+
+        if name in names:
+            raise ConfigurationError(
+                f'IRC server name "{name}" is configured more than once.'
+            )
+        names.add(name)
+
+        server = _parse_irc_server(data_server)
+        if server is None:
+            raise ConfigurationError(f'IRC server "{name}" needs a host.')
+
+        channels = set(_get_irc_channels(data_server))
+
+        yield IrcNetwork(name=name, server=server, channels=channels)
+
+
+def _iter_channel_tables(data: dict[str, Any]) -> Iterator[tuple[str, Any]]:
+    """Yield the configured channels' tables along with the names to
+    address the channels by.
+
+    Names of channels of servers in `irc.servers` are qualified with
+    the server's name.
+    """
+    data_irc = data['irc']
+
+    for channel in data_irc.get('channels', []):
+        yield channel['name'], channel
+
+    for data_server in data_irc.get('servers', []):
+        network_name = data_server.get('name')
+        for channel in data_server.get('channels', []):
+            channel_name = qualify_channel_name(network_name, channel['name'])
+            yield channel_name, channel
+
+
+def _get_queue_config(data: dict[str, Any]) -> QueueConfig:
+    data_queue = data.get('queue', {})
+
+    capacity_str = data_queue.get('capacity')
+    capacity = int(capacity_str) if capacity_str else None
+    if capacity is not None and capacity < 1:
+        raise ConfigurationError('Queue capacity must be at least 1.')
+
+    path_str = data_queue.get('path')
+    path = Path(path_str) if path_str else None
+
+    segment_size = int(
+        data_queue.get('segment_size', DEFAULT_QUEUE_SEGMENT_SIZE)
+    )
+
+    scheduling = data_queue.get('scheduling', DEFAULT_QUEUE_SCHEDULING)
+    if scheduling not in QUEUE_SCHEDULINGS:
+        raise ConfigurationError(f'Unknown queue scheduling "{scheduling}"')
+
+    channel_weights = _get_channel_weights(data)
+
+    coalesce_window_str = data_queue.get('coalesce_window')
+    coalesce_window = (
+        float(coalesce_window_str) if coalesce_window_str else None
+    )
+    coalesce_max_entries = int(
+        data_queue.get(
+            'coalesce_max_entries', DEFAULT_QUEUE_COALESCE_MAX_ENTRIES
+        )
+    )
+
+    pack = data_queue.get('pack', False)
+    pack_separator = data_queue.get(
+        'pack_separator', DEFAULT_QUEUE_PACK_SEPARATOR
+    )
+    pack_linger = float(data_queue.get('pack_linger', 0.0))
+
+    hold_ttl_str = data_queue.get('hold_ttl')
+    hold_ttl = float(hold_ttl_str) if hold_ttl_str else None
+    hold_max_messages = int(
+        data_queue.get('hold_max_messages', DEFAULT_QUEUE_HOLD_MAX_MESSAGES)
+    )
+    hold_max_bytes = int(
+        data_queue.get('hold_max_bytes', DEFAULT_QUEUE_HOLD_MAX_BYTES)
+    )
+
+    return QueueConfig(
+        capacity=capacity,
+        path=path,
+        segment_size=segment_size,
+        scheduling=scheduling,
+        channel_weights=channel_weights,
+        coalesce_window=coalesce_window,
+        coalesce_max_entries=coalesce_max_entries,
+        pack=pack,
+        pack_separator=pack_separator,
+        pack_linger=pack_linger,
+        hold_ttl=hold_ttl,
+        hold_max_messages=hold_max_messages,
+        hold_max_bytes=hold_max_bytes,
+    )
+
+
+def _get_trace_config(data: dict[str, Any]) -> TraceConfig:
+    data_trace = data.get('trace', {})
+
+    sample_rate = float(data_trace.get('sample_rate', 0.0))
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ConfigurationError('Trace sample rate must be between 0 and 1.')
+
+    return TraceConfig(sample_rate=sample_rate)
+
+
+def _get_channel_weights(data: dict[str, Any]) -> dict[str, int]:
+    channel_weights = {}
+
+    for channel_name, channel in _iter_channel_tables(data):
+        weight = channel.get('weight')
+        if weight is None:
+            continue
+
+        weight = int(weight)
+        if weight < 1:
+            raise ConfigurationError(
+                f'Weight for channel "{channel_name}" must be at least 1.'
+            )
+
+        channel_weights[channel_name] = weight
+
+    return channel_weights
@@ -0,0 +1,130 @@
+"""
+weitersager.connection
+~~~~~~~~~~~~~~~~~~~~~~
+
+State of, and reconnecting to, an IRC server connection
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum
+import logging
+import random
+from typing import Callable
+
+from irc.bot import ReconnectStrategy
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_RECONNECT_MIN_DELAY = 1.0  # seconds
+DEFAULT_RECONNECT_MAX_DELAY = 300.0  # seconds
+
+
+class ConnectionState(Enum):
+    DISCONNECTED = 'disconnected'
+    CONNECTING = 'connecting'
+    JOINING = 'joining'  # connected, (re)joining channels
+    CONNECTED = 'connected'
+
+
+@dataclass
+class ConnectionStats:
+    """Reconnects and downtime of a connection."""
+
+    reconnects: int = 0
+    downtime_seconds: float = 0.0  # in total, excluding current downtime
+    disconnected_at: float | None = None  # monotonic time
+    # Time from being welcomed until channels have been joined, on the
+    # latest (re)connect
+    join_seconds: float | None = None
+
+    def record_disconnect(self, now: float) -> None:
+        if self.disconnected_at is None:
+            self.disconnected_at = now
+
+    def record_reconnect(self, now: float) -> float | None:
+        """Record the connection to have been re-established, return
+        the downtime (or `None` on the initial connect).
+        """
+        if self.disconnected_at is None:
+            return None
+
+        downtime = now - self.disconnected_at
+        self.disconnected_at = None
+        self.reconnects += 1
+        self.downtime_seconds += downtime
+        return downtime
+
+    def get_downtime_seconds(self, now: float) -> float:
+        """Return the total downtime, including the current one."""
+        if self.disconnected_at is None:
+            return self.downtime_seconds
+
+        return self.downtime_seconds + (now - self.disconnected_at)
+
+
+class ReconnectBackoff(ReconnectStrategy):
+    """Reconnect after an exponentially growing, randomized delay.
+
+    The delay doubles with each failed attempt, up to the maximum. The
+    actual delay is chosen randomly between the minimum and that value
+    to keep many clients from reconnecting all at once (e.g. after a
+    netsplit). A successful connect resets the delay.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_delay: float = DEFAULT_RECONNECT_MIN_DELAY,
+        max_delay: float = DEFAULT_RECONNECT_MAX_DELAY,
+        random_func: Callable[[], float] = random.random,
+    ) -> None:
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._random_func = random_func
+
+        self.attempts = 0
+        self.stopped = False
+        self._check_scheduled = False
+
+    def get_delay(self) -> float:
+        """Return the delay before the next attempt."""
+        ceiling = min(self.max_delay, self.min_delay * 2**self.attempts)
+        return self.min_delay + (ceiling - self.min_delay) * self._random_func()
+
+    def run(self, bot) -> None:
+        """Schedule an attempt to reconnect."""
+        self.bot = bot
+
+        if self.stopped or self._check_scheduled:
+            return
+
+        delay = self.get_delay()
+        self.attempts += 1
+
+        logger.info('Reconnecting to IRC server in %.1f seconds ...', delay)
+        bot.reactor.scheduler.execute_after(delay, self.check)
+        self._check_scheduled = True
+
+    def check(self) -> None:
+        self._check_scheduled = False
+
+        if self.stopped:
+            return
+
+        if not self.bot.connection.is_connected():
+            self.run(self.bot)
+            self.bot.jump_server()
+
+    def reset(self) -> None:
+        """Start over with the minimum delay."""
+        self.attempts = 0
+
+    def stop(self) -> None:
+        """Do not reconnect anymore."""
+        self.stopped = True
@@ -0,0 +1,176 @@
+"""
+weitersager.holding
+~~~~~~~~~~~~~~~~~~~
+
+Hold messages for channels that have not been joined (yet)
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Callable
+
+from .message import Message
+
+
+DEFAULT_MAX_MESSAGES_PER_CHANNEL = 100
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class HeldLine:
+    """A text to announce, with the message(s) it stems from."""
+
+    channel_name: str
+    text: str
+    messages: list[Message]
+    held_at: float
+    size: int  # bytes
+
+
+class HoldingBuffer:
+    """Hold texts per channel until they can be announced.
+
+    Texts are dropped, oldest first, if they have been held for longer
+    than the time to live, if a channel's limit of held messages is
+    exceeded, or if the total size of held texts exceeds the limit.
+
+    Texts are held and released by the processing thread, but other
+    threads may ask which channels texts are held for.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        max_messages_per_channel: int = DEFAULT_MAX_MESSAGES_PER_CHANNEL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_messages_per_channel = max_messages_per_channel
+        self.max_bytes = max_bytes
+        self._clock = clock
+
+        self._lock = Lock()
+        self._lines_by_channel: dict[str, deque[HeldLine]] = {}
+        self._message_counts_by_channel: dict[str, int] = {}
+        self._total_bytes = 0
+        # Kept up to date instead of counted on demand, as the buffer's
+        # length (and truth value) is checked on every processing cycle.
+        self._line_count = 0
+
+    def __len__(self) -> int:
+        """Return the number of held lines."""
+        return self._line_count
+
+    def is_holding(self, channel_name: str) -> bool:
+        """Return `True` if texts are held for the channel."""
+        with self._lock:
+            return channel_name in self._lines_by_channel
+
+    def get_channel_names(self) -> set[str]:
+        """Return the names of channels texts are held for."""
+        with self._lock:
+            return set(self._lines_by_channel)
+
+    def hold(
+        self, channel_name: str, text: str, messages: list[Message]
+    ) -> list[HeldLine]:
+        """Hold a text for the channel.
+
+        Return lines that have been dropped to make room for it.
+        """
+        line = HeldLine(
+            channel_name=channel_name,
+            text=text,
+            messages=messages,
+            held_at=self._clock(),
+            size=len(text.encode('utf-8')),
+        )
+
+        with self._lock:
+            return self._hold(line)
+
+    def _hold(self, line: HeldLine) -> list[HeldLine]:
+        channel_name = line.channel_name
+
+        self._lines_by_channel.setdefault(channel_name, deque()).append(line)
+        self._message_counts_by_channel[channel_name] = (
+            self._message_counts_by_channel.get(channel_name, 0)
+            + len(line.messages)
+        )
+        self._total_bytes += line.size
+        self._line_count += 1
+
+        dropped_lines = []
+
+        while (
+            self._message_counts_by_channel[channel_name]
+            > self.max_messages_per_channel
+            and len(self._lines_by_channel[channel_name]) > 1
+        ):
+            dropped_lines.append(self._pop_oldest_line(channel_name))
+
+        while self._total_bytes > self.max_bytes and self._line_count > 1:
+            dropped_lines.append(self._pop_oldest_line())
+
+        return dropped_lines
+
+    def release(self, channel_name: str) -> list[HeldLine]:
+        """Return and stop holding the lines for the channel, in the
+        order they have been held.
+        """
+        with self._lock:
+            lines = self._lines_by_channel.pop(channel_name, deque())
+            self._message_counts_by_channel.pop(channel_name, None)
+            self._total_bytes -= sum(line.size for line in lines)
+            self._line_count -= len(lines)
+
+        return list(lines)
+
+    def remove_expired_lines(self) -> list[HeldLine]:
+        """Return and stop holding lines that have outlived their time
+        to live.
+        """
+        expired_before = self._clock() - self.ttl_seconds
+
+        expired_lines = []
+
+        with self._lock:
+            for channel_name in list(self._lines_by_channel):
+                lines = self._lines_by_channel[channel_name]
+                while lines and lines[0].held_at <= expired_before:
+                    expired_lines.append(self._pop_oldest_line(channel_name))
+
+        return expired_lines
+
+    def _pop_oldest_line(self, channel_name: str | None = None) -> HeldLine:
+        """Stop holding the oldest line, of the channel if given.
+
+        The lock must be held.
+        """
+        if channel_name is None:
+            channel_name = min(
+                self._lines_by_channel,
+                key=lambda name: self._lines_by_channel[name][0].held_at,
+            )
+
+        lines = self._lines_by_channel[channel_name]
+        line = lines.popleft()
+
+        if lines:
+            self._message_counts_by_channel[channel_name] -= len(line.messages)
+        else:
+            del self._lines_by_channel[channel_name]
+            del self._message_counts_by_channel[channel_name]
+
+        self._total_bytes -= line.size
+        self._line_count -= 1
+
+        return line
@@ -9,28 +9,78 @@ HTTP server to receive messages
 """
 
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from http import HTTPStatus
+import json
 import logging
+import socket
 import sys
-from wsgiref.simple_server import make_server, ServerHandler, WSGIServer
+from threading import BoundedSemaphore
+import time
+from typing import Any, BinaryIO, Callable, cast, NamedTuple
+from wsgiref.simple_server import (
+    make_server,
+    ServerHandler,
+    WSGIRequestHandler,
+    WSGIServer,
+)
 
 from werkzeug.datastructures import Headers
-from werkzeug.exceptions import abort, HTTPException
+from werkzeug.exceptions import abort, HTTPException, ServiceUnavailable
 from werkzeug.routing import Map, Rule
 from werkzeug.wrappers import Request, Response
+from werkzeug.wsgi import LimitedStream
 
-from .config import HttpConfig
+from .config import DEFAULT_HTTP_KEEP_ALIVE_MAX_REQUESTS, HttpConfig
+from .message import DEFAULT_PRIORITY
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics
+from .queues import QueueFullError
 from .signals import message_received
+from .tokenstore import ChannelToken, ChannelTokenIndex
 from .util import start_thread
 
 
 logger = logging.getLogger(__name__)
 
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Maximum number of messages accepted in a single request
+MAX_BATCH_SIZE = 1000
+
+# Maximum number of channels to announce a single text to
+MAX_CHANNELS_PER_MESSAGE = 100
+
+# WSGI environment key of the time a request has been received
+RECEIVED_AT_ENVIRON_KEY = 'weitersager.received_at'
+
+
 def create_app(
-    api_tokens: set[str], channel_tokens_to_channel_names: dict[str, str]
+    api_tokens: set[str],
+    channel_tokens_to_channel_names: dict[str, str],
+    token_priorities: dict[str, int] | None = None,
+    metrics: Metrics | None = None,
+    token_index: ChannelTokenIndex | None = None,
+    *,
+    sync: Callable[[], None] | None = None,
 ) -> Application:
-    return Application(api_tokens, channel_tokens_to_channel_names)
+    return Application(
+        api_tokens,
+        channel_tokens_to_channel_names,
+        token_priorities,
+        metrics,
+        token_index,
+        sync=sync,
+    )
+
+
+class _Tokens(NamedTuple):
+    """API and channel tokens, and their priorities."""
+
+    api_tokens: set[str]
+    channel_tokens_to_channel_names: dict[str, str]
+    token_priorities: dict[str, int]
 
 
 class Application:
@@ -38,23 +88,42 @@ class Application:
         self,
         api_tokens: set[str],
         channel_tokens_to_channel_names: dict[str, str],
+        token_priorities: dict[str, int] | None = None,
+        metrics: Metrics | None = None,
+        token_index: ChannelTokenIndex | None = None,
+        *,
+        sync: Callable[[], None] | None = None,
     ) -> None:
-        self._api_tokens = api_tokens
-        self._channel_tokens_to_channel_names = channel_tokens_to_channel_names
-
-        self._url_map = Map(
-            [
-                Rule('/', endpoint='root'),
-                Rule('/ct/<channel_token>', endpoint='channel_token'),
-            ]
+        self._tokens = _Tokens(
+            api_tokens, channel_tokens_to_channel_names, token_priorities or {}
         )
+        self._metrics = metrics
+        # Channel tokens from an external store, in addition to the
+        # configured ones
+        self._token_index = token_index
+        # Called after a request has been handled, before responding
+        self._sync = sync
+
+        rules = [
+            Rule('/', endpoint='root'),
+            Rule('/ct/<channel_token>', endpoint='channel_token'),
+        ]
+        if metrics is not None:
+            rules.append(Rule('/metrics', endpoint='metrics', methods=['GET']))
+
+        self._url_map = Map(rules)
 
     def __call__(self, environ, start_response):
         return self.wsgi_app(environ, start_response)
 
     def wsgi_app(self, environ, start_response):
+        environ.setdefault(RECEIVED_AT_ENVIRON_KEY, time.time())
         request = Request(environ)
         response = self.dispatch_request(request)
+
+        if self._sync is not None:
+            self._sync()
+
         return response(environ, start_response)
 
     def dispatch_request(self, request: Request):
@@ -62,46 +131,153 @@ class Application:
 
         try:
             endpoint, values = adapter.match()
-            handler = getattr(self, f'on_{endpoint}')
+        except HTTPException as exc:
+            return exc
+
+        handler = getattr(self, f'on_{endpoint}')
+
+        try:
             return handler(request, **values)
         except HTTPException as exc:
+            if exc.code is not None:
+                self._count_rejected(exc.code)
             return exc
 
+    def update_tokens(
+        self,
+        api_tokens: set[str],
+        channel_tokens_to_channel_names: dict[str, str],
+        token_priorities: dict[str, int] | None = None,
+    ) -> None:
+        """Replace the tokens.
+
+        Requests being handled keep using the tokens they started with.
+        """
+        # Replace all of them at once, so no request sees a mix of old
+        # and new tokens.
+        self._tokens = _Tokens(
+            api_tokens, channel_tokens_to_channel_names, token_priorities or {}
+        )
+
+    def _count_rejected(self, status: int) -> None:
+        if self._metrics is not None:
+            self._metrics.messages_rejected.inc(str(status))
+
     def on_root(self, request: Request) -> Response:
-        if self._api_tokens:
+        tokens = self._tokens
+
+        api_token = None
+        if tokens.api_tokens:
             api_token = _get_api_token(request.headers)
             if not api_token:
                 abort(HTTPStatus.UNAUTHORIZED)
 
-            if api_token not in self._api_tokens:
+            if api_token not in tokens.api_tokens:
                 abort(HTTPStatus.FORBIDDEN)
 
-        data = _extract_payload(request, {'channel', 'text'})
+        default_priority = _get_default_priority(tokens, api_token)
 
-        message_received.send(
-            channel_name=data['channel'],
-            text=data['text'],
-            source_ip_address=request.remote_addr,
-        )
+        payload = _get_payload(request)
+
+        if isinstance(payload, list):
+            return _receive_batch(
+                request,
+                payload,
+                {'channel', 'text'},
+                default_priority,
+                count_rejected=self._count_rejected,
+            )
+
+        data = _extract_values(payload, {'channel', 'text'})
+        if data is None:
+            abort(HTTPStatus.BAD_REQUEST)
+
+        priority = _extract_priority(payload, default_priority)
+        if priority is None:
+            abort(HTTPStatus.BAD_REQUEST)
+
+        channel_names = _get_channel_names(data['channel'])
+        if channel_names is None:
+            abort(HTTPStatus.BAD_REQUEST)
+
+        try:
+            _pass_on_message(request, channel_names, data['text'], priority)
+        except QueueFullError as exc:
+            raise ServiceUnavailable(
+                retry_after=exc.retry_after_seconds
+            ) from exc
 
         return Response('', status=HTTPStatus.ACCEPTED)
 
     def on_channel_token(
         self, request: Request, channel_token: str
     ) -> Response:
-        channel_name = self._channel_tokens_to_channel_names.get(channel_token)
-        if channel_name is None:
-            abort(HTTPStatus.NOT_FOUND)
+        tokens = self._tokens
+
+        channel_name = tokens.channel_tokens_to_channel_names.get(channel_token)
+        if channel_name is not None:
+            default_priority = _get_default_priority(tokens, channel_token)
+        else:
+            stored_token = self._lookup_stored_token(channel_token)
+            if stored_token is None:
+                abort(HTTPStatus.NOT_FOUND)
+
+            channel_name = stored_token.channel_name
+            default_priority = (
+                stored_token.priority
+                if stored_token.priority is not None
+                else DEFAULT_PRIORITY
+            )
+
+        payload = _get_payload(request)
+
+        if isinstance(payload, list):
+            return _receive_batch(
+                request,
+                payload,
+                {'text'},
+                default_priority,
+                channel_name=channel_name,
+                count_rejected=self._count_rejected,
+            )
+
+        data = _extract_values(payload, {'text'})
+        if data is None:
+            abort(HTTPStatus.BAD_REQUEST)
+
+        priority = _extract_priority(payload, default_priority)
+        if priority is None:
+            abort(HTTPStatus.BAD_REQUEST)
 
-        data = _extract_payload(request, {'text'})
+        try:
+            _pass_on_message(request, [channel_name], data['text'], priority)
+        except QueueFullError as exc:
+            raise ServiceUnavailable(
+                retry_after=exc.retry_after_seconds
+            ) from exc
 
-        message_received.send(
-            channel_name=channel_name,
-            text=data['text'],
-            source_ip_address=request.remote_addr,
+        return Response('', status=HTTPStatus.ACCEPTED)
+
+    def _lookup_stored_token(self, channel_token: str) -> ChannelToken | None:
+        if self._token_index is None:
+            return None
+
+        return self._token_index.lookup(channel_token)
+
+    def on_metrics(self, request: Request) -> Response:
+        if self._metrics is None:
+            abort(HTTPStatus.NOT_FOUND)
+
+        return Response(
+            self._metrics.render(), content_type=METRICS_CONTENT_TYPE
         )
 
-        return Response('', status=HTTPStatus.ACCEPTED)
+
+def _get_default_priority(tokens: _Tokens, token: str | None) -> int:
+    if token is None:
+        return DEFAULT_PRIORITY
+
+    return tokens.token_priorities.get(token, DEFAULT_PRIORITY)
 
 
 def _get_api_token(headers: Headers) -> str | None:
@@ -116,8 +292,15 @@ def _get_api_token(headers: Headers) -> str | None:
     return authorization_value[len(prefix) :]
 
 
-def _extract_payload(request: Request, keys: set[str]) -> dict[str, str]:
-    """Extract values for given keys from JSON payload."""
+def _get_payload(request: Request) -> Any:
+    """Return the JSON payload.
+
+    NDJSON payloads are returned as list of items, with `None` for each
+    line that is not valid JSON.
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        return _parse_ndjson(request.get_data(as_text=True))
+
     if not request.is_json:
         abort(HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
 
@@ -125,31 +308,403 @@ def _extract_payload(request: Request, keys: set[str]) -> dict[str, str]:
     if payload is None:
         abort(HTTPStatus.BAD_REQUEST)
 
+    return payload
+
+
+def _parse_ndjson(data: str) -> list[Any]:
+    """Parse newline-delimited JSON, skipping blank lines."""
+    items = []
+
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = None
+
+        items.append(item)
+
+    return items
+
+
+def _extract_values(payload: Any, keys: set[str]) -> dict[str, str] | None:
+    """Extract values for given keys from JSON payload.
+
+    Return `None` if the payload is not an object or lacks a key.
+    """
+    if not isinstance(payload, dict):
+        return None
+
     data = {}
     try:
         for key in keys:
             data[key] = payload[key]
     except KeyError:
-        abort(HTTPStatus.BAD_REQUEST)
+        return None
 
     return data
 
 
+def _get_channel_names(value: Any) -> list[str] | None:
+    """Return the channel name(s) of the `channel` value, which is
+    either a name or a list of names (to announce the text to each of
+    those channels).
+
+    Return `None` if the value is invalid.
+    """
+    if isinstance(value, str):
+        return [value]
+
+    if (
+        not isinstance(value, list)
+        or not value
+        or len(value) > MAX_CHANNELS_PER_MESSAGE
+        or not all(isinstance(name, str) for name in value)
+    ):
+        return None
+
+    # Remove duplicates, but keep the order.
+    return list(dict.fromkeys(value))
+
+
+def _extract_priority(payload: dict[str, Any], default: int) -> int | None:
+    """Extract the optional priority from a JSON object.
+
+    Return `None` if the priority is not an integer.
+    """
+    priority = payload.get('priority', default)
+
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return None
+
+    return priority
+
+
+def _receive_batch(
+    request: Request,
+    items: list[Any],
+    keys: set[str],
+    default_priority: int,
+    *,
+    channel_name: str | None = None,
+    count_rejected: Callable[[int], None] | None = None,
+) -> Response:
+    """Validate and pass on each message of a batch.
+
+    Respond with the status for each item, in submission order.
+
+    An item for multiple channels is accepted for all of them or for
+    none. Once the message queue is full, reject all remaining items so
+    that the client can resubmit them without changing their order.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        abort(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+    results = []
+    retry_after_seconds = None
+
+    for item in items:
+        data = _extract_values(item, keys)
+        if data is None:
+            results.append({'status': HTTPStatus.BAD_REQUEST})
+            continue
+
+        priority = _extract_priority(item, default_priority)
+        if priority is None:
+            results.append({'status': HTTPStatus.BAD_REQUEST})
+            continue
+
+        channel_names = (
+            [channel_name]
+            if channel_name is not None
+            else _get_channel_names(data['channel'])
+        )
+        if channel_names is None:
+            results.append({'status': HTTPStatus.BAD_REQUEST})
+            continue
+
+        if retry_after_seconds is None:
+            try:
+                _pass_on_message(request, channel_names, data['text'], priority)
+            except QueueFullError as exc:
+                retry_after_seconds = exc.retry_after_seconds
+
+        if retry_after_seconds is not None:
+            results.append({'status': HTTPStatus.SERVICE_UNAVAILABLE})
+            continue
+
+        results.append({'status': HTTPStatus.ACCEPTED})
+
+    if count_rejected is not None:
+        for result in results:
+            if result['status'] != HTTPStatus.ACCEPTED:
+                count_rejected(result['status'].value)
+
+    response = Response(
+        json.dumps({'results': results}),
+        status=HTTPStatus.ACCEPTED,
+        mimetype='application/json',
+    )
+
+    if retry_after_seconds is not None:
+        response.headers['Retry-After'] = str(retry_after_seconds)
+
+    return response
+
+
+def _pass_on_message(
+    request: Request, channel_names: list[str], text: str, priority: int
+) -> None:
+    """Signal that a message has been received for the channels.
+
+    Raise `QueueFullError` if the message cannot be accepted (for any
+    of the channels, in which case it has been accepted for none).
+    """
+    message_received.send(
+        channel_names=channel_names,
+        text=text,
+        source_ip_address=request.remote_addr,
+        priority=priority,
+        received_at=request.environ.get(RECEIVED_AT_ENVIRON_KEY),
+    )
+
+
 # Override value of `Server:` header sent by wsgiref.
 ServerHandler.server_software = 'Weitersager'
 
 
-def create_server(config: HttpConfig) -> WSGIServer:
-    """Create the HTTP server."""
-    app = create_app(config.api_tokens, config.channel_tokens_to_channel_names)
+class KeepAliveServerHandler(ServerHandler):
+    """Respond via HTTP/1.1 and tell the client whether the connection
+    stays open.
+    """
+
+    http_version = '1.1'
+
+    # Set by the request handler, and by `start_response`, respectively
+    request_handler: RequestHandler
+    headers: Headers
+
+    def cleanup_headers(self) -> None:
+        super().cleanup_headers()
+
+        request_handler = self.request_handler
+
+        if 'Content-Length' not in self.headers:
+            # Without a length, only closing the connection marks the
+            # end of the response body.
+            request_handler.close_connection = True
+
+        if request_handler.close_connection:
+            self.headers['Connection'] = 'close'
+        elif request_handler.request_version == 'HTTP/1.0':
+            self.headers['Connection'] = 'keep-alive'
+
+
+class RequestHandler(WSGIRequestHandler):
+    """Handle requests, optionally several per connection (HTTP/1.1
+    keep-alive).
+    """
+
+    # The response is written in several small chunks. Send them right
+    # away instead of waiting for the client to acknowledge earlier ones
+    # (which might be delayed) on persistent connections.
+    disable_nagle_algorithm = True
 
-    return make_server(config.host, config.port, app)
+    server: KeepAliveWSGIServer
 
+    def setup(self) -> None:
+        super().setup()
 
-def start_receive_server(config: HttpConfig) -> None:
-    """Start in a separate thread."""
+        # Close idle connections after the timeout.
+        keep_alive_timeout = self.server.keep_alive_timeout
+        if keep_alive_timeout is not None:
+            self.connection.settimeout(keep_alive_timeout)
+
+    def handle(self) -> None:
+        if self.server.keep_alive_timeout is None:
+            # Handle a single request, then close the connection.
+            super().handle()
+            return
+
+        self.protocol_version = 'HTTP/1.1'
+        self.request_count = 0
+
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            self.handle_one_request()
+
+    def handle_one_request(self) -> None:
+        """Handle a single request on a persistent connection."""
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+            if len(self.raw_requestline) > 65536:
+                self.requestline = ''
+                self.request_version = ''
+                self.command = ''
+                self.send_error(HTTPStatus.REQUEST_URI_TOO_LONG)
+                return
+
+            if not self.raw_requestline:
+                # The client has closed the connection.
+                self.close_connection = True
+                return
+
+            if not self.parse_request():
+                # An error response has been sent already.
+                return
+
+            self.request_count += 1
+            if self.request_count >= self.server.keep_alive_max_requests:
+                self.close_connection = True
+
+            if 'Transfer-Encoding' in self.headers:
+                # Chunked request bodies are not supported, so it is
+                # unknown where the next request would start.
+                self.close_connection = True
+
+            try:
+                content_length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                self.send_error(HTTPStatus.BAD_REQUEST, 'Bad Content-Length')
+                return
+
+            # The socket's files are binary files (`socket.makefile`).
+            rfile = cast(BinaryIO, self.rfile)
+            wfile = cast(BinaryIO, self.wfile)
+
+            input_stream = LimitedStream(rfile, content_length)
+
+            handler = KeepAliveServerHandler(
+                input_stream,
+                wfile,
+                self.get_stderr(),
+                self.get_environ(),
+                multithread=False,
+            )
+            handler.request_handler = self  # backpointer for logging
+            handler.run(self.server.application)
+
+            # Discard what the application has not read of the request
+            # body so that the next request can be parsed.
+            input_stream.exhaust()
+
+            self.wfile.flush()
+        except socket.timeout:
+            # The connection has been idle for too long.
+            self.close_connection = True
+
+
+class KeepAliveWSGIServer(WSGIServer):
+    """A WSGI server that can keep connections open for further
+    requests.
+    """
+
+    # Set by `make_server`
+    application: Application
+
+    # Close connections after each request by default.
+    keep_alive_timeout: float | None = None
+    keep_alive_max_requests = DEFAULT_HTTP_KEEP_ALIVE_MAX_REQUESTS
+
+
+class ThreadPoolWSGIServer(KeepAliveWSGIServer):
+    """A WSGI server that handles requests concurrently in a bounded
+    pool of worker threads.
+    """
+
+    def __init__(self, server_address, handler_class, *, max_workers: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='HttpWorker'
+        )
+        # Stop accepting connections while all workers are busy so that
+        # pending requests queue up in the listen backlog instead of in
+        # an unbounded executor queue.
+        self._worker_slots = BoundedSemaphore(max_workers)
+
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address) -> None:
+        """Hand the request over to a worker thread."""
+        self._worker_slots.acquire()
+        try:
+            self._executor.submit(
+                self._process_request_in_worker, request, client_address
+            )
+        except RuntimeError:
+            # The executor has already been shut down.
+            self._worker_slots.release()
+            self.shutdown_request(request)
+
+    def _process_request_in_worker(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._worker_slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def create_server(
+    config: HttpConfig,
+    metrics: Metrics | None = None,
+    token_index: ChannelTokenIndex | None = None,
+    *,
+    sync: Callable[[], None] | None = None,
+) -> KeepAliveWSGIServer:
+    """Create the HTTP server.
+
+    If given, `sync` is called after a request has been handled and
+    before the response is sent.
+    """
+    app = create_app(
+        config.api_tokens,
+        config.channel_tokens_to_channel_names,
+        config.token_priorities,
+        metrics if config.metrics else None,
+        token_index,
+        sync=sync,
+    )
+
+    server_class = _get_server_class(config.workers)
+
+    server = make_server(
+        config.host, config.port, app, server_class, RequestHandler
+    )
+
+    server.keep_alive_timeout = config.keep_alive_timeout
+    server.keep_alive_max_requests = config.keep_alive_max_requests
+
+    return server
+
+
+def _get_server_class(workers: int):
+    """Return a factory for a server that handles requests with the
+    given number of workers.
+    """
+    if workers == 1:
+        return KeepAliveWSGIServer
+
+    return partial(ThreadPoolWSGIServer, max_workers=workers)
+
+
+def start_receive_server(
+    config: HttpConfig,
+    metrics: Metrics | None = None,
+    token_index: ChannelTokenIndex | None = None,
+    *,
+    sync: Callable[[], None] | None = None,
+) -> KeepAliveWSGIServer:
+    """Start in a separate thread, return the server."""
     try:
-        server = create_server(config)
+        server = create_server(config, metrics, token_index, sync=sync)
     except OSError as e:
         sys.stderr.write(f'Error {e.errno:d}: {e.strerror}\n')
         sys.stderr.write(
@@ -162,3 +717,12 @@ def start_receive_server(config: HttpConfig) -> None:
     thread_name = server.__class__.__name__
     start_thread(server.serve_forever, thread_name)
     logger.info('Listening for HTTP requests on %s:%d.', *server.server_address)
+    if config.workers > 1:
+        logger.info('Handling HTTP requests with %d workers.', config.workers)
+    if config.keep_alive_timeout is not None:
+        logger.info(
+            'Keeping idle HTTP connections open for %.1f seconds.',
+            config.keep_alive_timeout,
+        )
+
+    return server
@@ -0,0 +1,399 @@
+"""
+weitersager.http_aio
+~~~~~~~~~~~~~~~~~~~~
+
+HTTP server to receive messages, on an asyncio event loop
+
+Serves the same WSGI application as the threaded server. The
+application only validates requests and puts messages into the queue,
+so it is called directly on the event loop. Making the messages durable
+(with a persistent queue) involves waiting for the disk, so that is
+done in a separate thread before the response is sent.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import asyncio
+from http import HTTPStatus
+from io import BytesIO
+import logging
+import sys
+import time
+from typing import Callable
+from urllib.parse import unquote
+
+from .config import HttpConfig
+from .http import Application, create_app, RECEIVED_AT_ENVIRON_KEY
+from .metrics import Metrics
+from .tokenstore import ChannelTokenIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+SERVER_SOFTWARE = 'Weitersager'
+
+MAX_REQUEST_LINE_LENGTH = 65536  # bytes
+MAX_HEADER_COUNT = 100
+MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # bytes
+
+# How long to wait for the first request on a new connection
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+
+class BadRequest(Exception):
+    """The request cannot be parsed."""
+
+    def __init__(self, status: HTTPStatus) -> None:
+        self.status = status
+
+
+class AsyncHttpServer:
+    """A minimal HTTP/1.1 server for a WSGI application."""
+
+    def __init__(
+        self,
+        app: Application,
+        host: str,
+        port: int,
+        *,
+        keep_alive_timeout: float | None = None,
+        keep_alive_max_requests: int = 100,
+        sync: Callable[[], None] | None = None,
+    ) -> None:
+        self.app = app
+        self.host = host
+        self.port = port
+        self.keep_alive_timeout = keep_alive_timeout
+        self.keep_alive_max_requests = keep_alive_max_requests
+        # Called in a separate thread after the application, before
+        # responding
+        self.sync = sync
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+
+    @property
+    def server_address(self) -> tuple[str, int]:
+        if self.server is None:
+            raise RuntimeError('Server has not been started.')
+
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        request_count = 0
+
+        try:
+            while True:
+                timeout = (
+                    self.keep_alive_timeout
+                    if request_count
+                    else REQUEST_TIMEOUT_SECONDS
+                )
+
+                try:
+                    keep_alive = await asyncio.wait_for(
+                        self._handle_request(reader, writer, request_count),
+                        timeout,
+                    )
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+
+                request_count += 1
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _handle_request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        request_count: int,
+    ) -> bool:
+        """Handle a request, return whether to keep the connection open."""
+        try:
+            request = await _read_request(reader, writer)
+        except BadRequest as exc:
+            _write_response(writer, exc.status, [], b'', keep_alive=False)
+            await writer.drain()
+            return False
+
+        if request is None:
+            # The client has closed the connection.
+            return False
+
+        method, target, version, headers, body, received_at = request
+
+        keep_alive = (
+            self.keep_alive_timeout is not None
+            and request_count + 1 < self.keep_alive_max_requests
+            and _wants_keep_alive(version, headers)
+        )
+
+        environ = _build_environ(
+            method, target, version, headers, body, writer, self.server_address
+        )
+        environ[RECEIVED_AT_ENVIRON_KEY] = received_at
+        status, response_headers, response_body = _call_app(self.app, environ)
+
+        if self.sync is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.sync)
+
+        _write_response(
+            writer,
+            status,
+            response_headers,
+            response_body,
+            keep_alive=keep_alive,
+            http_1_0=(version == 'HTTP/1.0'),
+        )
+        await writer.drain()
+
+        return keep_alive
+
+
+async def _read_request(reader, writer):
+    """Read request line, headers, and body.
+
+    Return `None` if the connection has been closed before a request.
+    """
+    try:
+        request_line = await reader.readuntil(b'\r\n')
+        received_at = time.time()
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial:
+            return None
+        raise BadRequest(HTTPStatus.BAD_REQUEST) from None
+    except asyncio.LimitOverrunError:
+        raise BadRequest(HTTPStatus.REQUEST_URI_TOO_LONG) from None
+
+    if len(request_line) > MAX_REQUEST_LINE_LENGTH:
+        raise BadRequest(HTTPStatus.REQUEST_URI_TOO_LONG)
+
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise BadRequest(HTTPStatus.BAD_REQUEST) from None
+
+    if version not in {'HTTP/1.0', 'HTTP/1.1'}:
+        raise BadRequest(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+
+    headers = await _read_headers(reader)
+
+    if 'transfer-encoding' in headers:
+        # Chunked request bodies are not supported.
+        raise BadRequest(HTTPStatus.LENGTH_REQUIRED)
+
+    try:
+        content_length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise BadRequest(HTTPStatus.BAD_REQUEST) from None
+
+    if content_length < 0:
+        raise BadRequest(HTTPStatus.BAD_REQUEST)
+
+    if content_length > MAX_CONTENT_LENGTH:
+        raise BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+    if headers.get('expect', '').lower() == '100-continue':
+        writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+    try:
+        body = await reader.readexactly(content_length)
+    except asyncio.IncompleteReadError:
+        raise BadRequest(HTTPStatus.BAD_REQUEST) from None
+
+    return method, target, version, headers, body, received_at
+
+
+async def _read_headers(reader) -> dict[str, str]:
+    """Read header lines, with lowercased names."""
+    headers: dict[str, str] = {}
+
+    for _ in range(MAX_HEADER_COUNT + 1):
+        try:
+            line = await reader.readuntil(b'\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            raise BadRequest(HTTPStatus.BAD_REQUEST) from None
+
+        if line == b'\r\n':
+            return headers
+
+        name, separator, value = line.decode('latin-1').partition(':')
+        if not separator:
+            raise BadRequest(HTTPStatus.BAD_REQUEST)
+
+        name = name.strip().lower()
+        value = value.strip()
+        if name in headers:
+            headers[name] += f', {value}'
+        else:
+            headers[name] = value
+
+    raise BadRequest(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+
+def _wants_keep_alive(version: str, headers: dict[str, str]) -> bool:
+    connection = headers.get('connection', '').lower()
+
+    if version == 'HTTP/1.0':
+        return connection == 'keep-alive'
+
+    return connection != 'close'
+
+
+def _build_environ(
+    method, target, version, headers, body, writer, server_address
+) -> dict:
+    path, _, query = target.partition('?')
+    peername = writer.get_extra_info('peername') or ('', 0)
+    server_host, server_port = server_address
+
+    environ = {
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': unquote(path, 'latin-1'),
+        'QUERY_STRING': query,
+        'SERVER_NAME': server_host,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': version,
+        'SERVER_SOFTWARE': SERVER_SOFTWARE,
+        'REMOTE_ADDR': peername[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in headers.items():
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'content-length':
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = value
+
+    return environ
+
+
+def _call_app(app, environ) -> tuple[HTTPStatus, list, bytes]:
+    response_start = {}
+
+    def start_response(status, headers, exc_info=None):
+        response_start['status'] = status
+        response_start['headers'] = headers
+
+    body_iterable = app(environ, start_response)
+    try:
+        body = b''.join(body_iterable)
+    finally:
+        if hasattr(body_iterable, 'close'):
+            body_iterable.close()
+
+    status_code = int(response_start['status'].split(' ', 1)[0])
+
+    return HTTPStatus(status_code), response_start['headers'], body
+
+
+def _write_response(
+    writer,
+    status: HTTPStatus,
+    headers: list[tuple[str, str]],
+    body: bytes,
+    *,
+    keep_alive: bool,
+    http_1_0: bool = False,
+) -> None:
+    lines = [f'HTTP/1.1 {status.value} {status.phrase}']
+
+    for name, value in headers:
+        if name.lower() not in {'content-length', 'connection'}:
+            lines.append(f'{name}: {value}')
+
+    lines.append(f'Server: {SERVER_SOFTWARE}')
+    lines.append(f'Content-Length: {len(body)}')
+
+    if not keep_alive:
+        lines.append('Connection: close')
+    elif http_1_0:
+        lines.append('Connection: keep-alive')
+
+    head = '\r\n'.join(lines) + '\r\n\r\n'
+    writer.write(head.encode('latin-1') + body)
+
+
+def create_async_server(
+    config: HttpConfig,
+    metrics: Metrics | None = None,
+    token_index: ChannelTokenIndex | None = None,
+    *,
+    sync: Callable[[], None] | None = None,
+) -> AsyncHttpServer:
+    """Create the HTTP server.
+
+    If given, `sync` is called (in a separate thread) after a request
+    has been handled and before the response is sent.
+    """
+    app = create_app(
+        config.api_tokens,
+        config.channel_tokens_to_channel_names,
+        config.token_priorities,
+        metrics if config.metrics else None,
+        token_index,
+    )
+
+    return AsyncHttpServer(
+        app,
+        config.host,
+        config.port,
+        keep_alive_timeout=config.keep_alive_timeout,
+        keep_alive_max_requests=config.keep_alive_max_requests,
+        sync=sync,
+    )
+
+
+async def start_async_receive_server(
+    config: HttpConfig,
+    metrics: Metrics | None = None,
+    token_index: ChannelTokenIndex | None = None,
+    *,
+    sync: Callable[[], None] | None = None,
+) -> AsyncHttpServer:
+    """Start the HTTP server on the running event loop."""
+    server = create_async_server(config, metrics, token_index, sync=sync)
+
+    try:
+        await server.start()
+    except OSError as e:
+        sys.stderr.write(f'Error {e.errno:d}: {e.strerror}\n')
+        sys.stderr.write(
+            f'Probably no permission to open port {config.port}. '
+            'Try to specify a port number above 1,024 (or even '
+            '4,096) and up to 65,535.\n'
+        )
+        sys.exit(1)
+
+    logger.info('Listening for HTTP requests on %s:%d.', *server.server_address)
+    if config.keep_alive_timeout is not None:
+        logger.info(
+            'Keeping idle HTTP connections open for %.1f seconds.',
+            config.keep_alive_timeout,
+        )
+
+    return server
@@ -9,19 +9,324 @@ Internet Relay Chat
 """
 
 from __future__ import annotations
+from collections.abc import Iterable
+import contextlib
+from dataclasses import replace
+from functools import partial
 import logging
+from queue import Full, Queue
 import ssl
+from threading import Event, Lock, Thread
+import time
+from typing import Any, Callable, NamedTuple
 
 from irc.bot import ServerSpec, SingleServerIRCBot
+from irc.client import Reactor, ServerConnection, ServerNotConnectedError
 from irc.connection import Factory
+from irc.events import numeric as numeric_event_types
+from irc.strings import lower as irc_lower
 from jaraco.stream.buffer import LenientDecodingLineBuffer
 
-from .config import IrcChannel, IrcConfig, IrcServer
+from .config import (
+    IrcChannel,
+    IrcConfig,
+    IrcServer,
+    qualify_channel_name,
+    split_channel_name,
+)
+from .connection import ConnectionState, ConnectionStats, ReconnectBackoff
+from .log import get_message_logger
+from .ratelimit import limit_rate, TokenBucket
+from .sharding import HashRing, SendRateMeter
 from .signals import irc_channel_joined
 from .util import start_thread
 
 
 logger = logging.getLogger(__name__)
+message_logger = get_message_logger()
+
+
+# Maximum length of a line, in bytes, including the trailing CR-LF
+MAX_LINE_LENGTH = 512
+
+# The server prepends the sender's prefix (`:nick!user@host `) to a
+# message when it relays the message to others. Reserve space for it,
+# assuming common maximum lengths of its parts.
+MAX_NICKNAME_LENGTH = 30
+MAX_USERNAME_LENGTH = 10
+MAX_HOSTNAME_LENGTH = 63
+
+# How often to log the send rates of multiple connections
+SEND_RATES_REPORT_INTERVAL_SECONDS = 60.0
+
+# How long to wait for queued messages to be sent on shutdown
+SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+# How many messages a connection with a queue of its own queues before
+# announcing blocks until one of them has been sent
+SEND_QUEUE_CAPACITY = 100
+
+# How long to wait for channels to be joined after connecting before
+# announcing to those that have been joined so far
+JOIN_TIMEOUT_SECONDS = 30.0
+
+# Events that might signal that a channel could not be joined: all error
+# replies (4xx), by name if known to the IRC library, otherwise by code
+JOIN_ERROR_EVENT_TYPES = frozenset(
+    numeric_event_types.get(str(code), str(code)) for code in range(400, 500)
+)
+
+
+class NotConnectedError(Exception):
+    """Raised if a message cannot be sent as the connection is down."""
+
+
+# A function to call with the names of the channels a text has been sent
+# to (or dropped for), and whether it has been sent
+SentCallback = Callable[[list[str], bool], None]
+
+
+def fold_channel_name(channel_name: str) -> str:
+    """Return the channel name in lowercase, the way IRC servers
+    compare names (RFC 1459 casemapping).
+    """
+    return irc_lower(channel_name)
+
+
+def index_channel_names(channels: Iterable[IrcChannel]) -> dict[str, str]:
+    """Map the folded names of the channels to their names."""
+    return {
+        fold_channel_name(channel.name): channel.name for channel in channels
+    }
+
+
+def get_max_text_length(nickname: str, channel_name: str) -> int:
+    """Return the maximum length, in bytes, of text that can be sent to
+    the channel in a single line.
+    """
+    prefix_length = (
+        len(f':{nickname}!'.encode())
+        + MAX_USERNAME_LENGTH
+        + len('@')
+        + MAX_HOSTNAME_LENGTH
+        + len(' ')
+    )
+    command_length = len(f'PRIVMSG {channel_name} :\r\n'.encode())
+
+    return MAX_LINE_LENGTH - prefix_length - command_length
+
+
+def group_targets(
+    channel_names: list[str], text: str, max_targets: int | None
+) -> list[list[str]]:
+    """Group channel names into as few target lists for a `PRIVMSG`
+    command as the server's limit of targets per command (`None` for no
+    limit) and the line length limit allow.
+    """
+    groups = []
+    group: list[str] = []
+
+    for channel_name in channel_names:
+        candidate = group + [channel_name]
+
+        if group and (
+            (max_targets is not None and len(candidate) > max_targets)
+            or _get_privmsg_line_length(candidate, text) > MAX_LINE_LENGTH
+        ):
+            groups.append(group)
+            group = [channel_name]
+        else:
+            group = candidate
+
+    if group:
+        groups.append(group)
+
+    return groups
+
+
+def _get_privmsg_line_length(targets: list[str], text: str) -> int:
+    return len(f'PRIVMSG {",".join(targets)} :{text}\r\n'.encode())
+
+
+class JoinPlan(NamedTuple):
+    """The lines to join channels with, and the channels that exceed
+    the server's channel limit.
+    """
+
+    lines: list[str]
+    channel_count: int
+    skipped_channels: list[IrcChannel]
+
+
+def plan_joins(
+    channels: Iterable[IrcChannel],
+    features: Any,
+    first_channel_names: set[str] | None = None,
+) -> JoinPlan:
+    """Plan to join the channels with as few `JOIN` lines as the
+    server's advertised limits (`ISUPPORT`) allow.
+
+    Channels whose names are in `first_channel_names` (e.g. those with
+    messages waiting to be announced) are joined first.
+    """
+    ordered_channels = order_channels_to_join(
+        channels, first_channel_names or set()
+    )
+
+    channels_to_join, skipped_channels = limit_channels_to_join(
+        ordered_channels, get_chanlimit(features)
+    )
+
+    lines = group_joins(
+        channels_to_join,
+        get_max_join_targets(features),
+        get_max_line_length(features),
+    )
+
+    return JoinPlan(lines, len(channels_to_join), skipped_channels)
+
+
+def log_join_time(join_plan: JoinPlan | None, join_seconds: float) -> None:
+    """Log how long it took to join channels after connecting."""
+    if join_plan is None:
+        return
+
+    logger.info(
+        'Joined %d channel(s) with %d JOIN line(s) in %.2f seconds.',
+        join_plan.channel_count,
+        len(join_plan.lines),
+        join_seconds,
+    )
+
+
+def log_startup_time(seconds: float) -> None:
+    """Log how long it took until messages could be announced."""
+    logger.info('Ready to announce %.2f seconds after starting.', seconds)
+
+
+def order_channels_to_join(
+    channels: Iterable[IrcChannel], first_channel_names: set[str]
+) -> list[IrcChannel]:
+    """Return the channels in the order to join them: those in the set
+    first, then the others, each sorted by name.
+    """
+    return sorted(
+        channels,
+        key=lambda channel: (channel.name not in first_channel_names, channel),
+    )
+
+
+def limit_channels_to_join(
+    channels: list[IrcChannel], chanlimit: dict[str, int | None]
+) -> tuple[list[IrcChannel], list[IrcChannel]]:
+    """Split the channels into those that can be joined within the
+    server's limit of channels per channel prefix, and the others.
+    """
+    counts_by_prefix: dict[str, int] = {}
+    channels_to_join = []
+    skipped_channels = []
+
+    for channel in channels:
+        prefix = channel.name[:1]
+        limit = chanlimit.get(prefix)
+        count = counts_by_prefix.get(prefix, 0)
+
+        if limit is not None and count >= limit:
+            skipped_channels.append(channel)
+            continue
+
+        counts_by_prefix[prefix] = count + 1
+        channels_to_join.append(channel)
+
+    return channels_to_join, skipped_channels
+
+
+def group_joins(
+    channels: list[IrcChannel],
+    max_targets: int | None,
+    max_line_length: int = MAX_LINE_LENGTH,
+) -> list[str]:
+    """Group channels into as few `JOIN` lines as the server's limit of
+    targets per command (`None` for no limit) and the line length limit
+    allow.
+
+    Return the lines, without line terminators.
+    """
+    lines = []
+    group: list[IrcChannel] = []
+
+    for channel in channels:
+        candidate = group + [channel]
+
+        if group and (
+            (max_targets is not None and len(candidate) > max_targets)
+            or len(f'{format_join(candidate)}\r\n'.encode()) > max_line_length
+        ):
+            lines.append(format_join(group))
+            group = [channel]
+        else:
+            group = candidate
+
+    if group:
+        lines.append(format_join(group))
+
+    return lines
+
+
+def format_join(channels: list[IrcChannel]) -> str:
+    """Return a `JOIN` line for the channels."""
+    # Keys are matched to channels by position, so channels with a key
+    # have to come first.
+    channels = sorted(channels, key=lambda channel: not channel.password)
+
+    channel_names = ','.join(channel.name for channel in channels)
+    keys = ','.join(
+        channel.password for channel in channels if channel.password
+    )
+
+    if keys:
+        return f'JOIN {channel_names} {keys}'
+
+    return f'JOIN {channel_names}'
+
+
+def get_max_join_targets(features: Any) -> int | None:
+    """Return the maximum number of channels per `JOIN` command (`None`
+    for no limit) the server advertises.
+    """
+    targmax = getattr(features, 'targmax', None)
+    if isinstance(targmax, dict):
+        return targmax.get('JOIN')
+
+    return None
+
+
+def get_chanlimit(features: Any) -> dict[str, int | None]:
+    """Return the maximum number of channels to be in, per channel
+    prefix, the server advertises.
+    """
+    chanlimit = getattr(features, 'chanlimit', None)
+    if isinstance(chanlimit, dict):
+        return chanlimit
+
+    # Predecessor of `CHANLIMIT`
+    maxchannels = getattr(features, 'maxchannels', None)
+    if isinstance(maxchannels, int):
+        chantypes = getattr(features, 'chantypes', '#&')
+        return dict.fromkeys(str(chantypes), maxchannels)
+
+    return {}
+
+
+def get_max_line_length(features: Any) -> int:
+    """Return the maximum length of a line, in bytes, including the
+    trailing CR-LF, the server advertises (or the default one).
+    """
+    linelen = getattr(features, 'linelen', None)
+    if isinstance(linelen, int):
+        return linelen
+
+    return MAX_LINE_LENGTH
 
 
 class Announcer:
@@ -30,10 +335,87 @@ class Announcer:
     def start(self) -> None:
         """Start the announcer."""
 
+    def resolve_channel_name(self, channel_name: str) -> str:
+        """Return the name the channel is addressed by internally."""
+        return channel_name
+
     def announce(self, channel_name: str, text: str) -> None:
         """Announce a message."""
         raise NotImplementedError
 
+    def announce_to_channels(self, channel_names: list[str], text: str) -> None:
+        """Announce a message to multiple channels."""
+        for channel_name in channel_names:
+            self.announce(channel_name, text)
+
+    def send(
+        self, channel_names: list[str], text: str, on_sent: SentCallback
+    ) -> None:
+        """Announce a message to one or more channels, and call the
+        function once it has been sent.
+
+        Announcers that send from a queue of their own call it later,
+        from another thread.
+        """
+        if len(channel_names) == 1:
+            self.announce(channel_names[0], text)
+        else:
+            self.announce_to_channels(channel_names, text)
+
+        on_sent(channel_names, True)
+
+    def get_max_text_length(self, channel_name: str) -> int:
+        """Return the maximum length, in bytes, of text that can be
+        announced to the channel at once.
+        """
+        return get_max_text_length('x' * MAX_NICKNAME_LENGTH, channel_name)
+
+    def wait_until_connected(
+        self, timeout_seconds: float | None = None
+    ) -> bool:
+        """Wait until messages can be announced.
+
+        Return `False` if that is still not the case after the timeout.
+        """
+        return True
+
+    def update_channels(self, channels: set[IrcChannel]) -> None:
+        """Join channels that have been added, and part those that have
+        been removed.
+        """
+        raise NotImplementedError
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Join the channel in addition to the others (and again after
+        reconnecting).
+        """
+        raise NotImplementedError
+
+    def part_channel(self, channel_name: str) -> None:
+        """Part the channel (and do not join it again after
+        reconnecting).
+        """
+        raise NotImplementedError
+
+    def update_rate_limit(self, server: IrcServer) -> None:
+        """Apply the server's (changed) send rate limit."""
+        raise NotImplementedError
+
+    def set_join_priority(
+        self, get_channel_names: Callable[[], set[str]]
+    ) -> None:
+        """Have the channels whose names the function returns (e.g.
+        those with messages waiting to be announced) joined first.
+        """
+
+    def get_connection_stats(self) -> dict[str, ConnectionStats]:
+        """Return reconnects and downtime per connection."""
+        return {}
+
+    def get_connection_states(self) -> dict[str, ConnectionState]:
+        """Return the state of each connection."""
+        return {}
+
     def shutdown(self) -> None:
         """Shut the announcer down."""
 
@@ -48,13 +430,57 @@ class IrcAnnouncer(Announcer):
         realname: str,
         commands: list[str],
         channels: set[IrcChannel],
+        *,
+        network_name: str | None = None,
+        join_timeout_seconds: float = JOIN_TIMEOUT_SECONDS,
     ) -> None:
         self.server = server
         self.commands = commands
         self.channels = channels
+        self.join_timeout_seconds = join_timeout_seconds
+        self.name = f'{nickname}@{server.host}:{server.port}'
+
+        self.state = ConnectionState.DISCONNECTED
+        self.stats = ConnectionStats()
+        self._state_lock = Lock()
+        self._connected = Event()
+        self._channel_names_to_join: set[str] = set()
+        self._joins_sent = False
+        self._get_first_channel_names: Callable[[], set[str]] = set
+        self._started_at: float | None = None
+        self._welcomed_at = 0.0
+        self._join_plan: JoinPlan | None = None
 
-        self.bot = _create_bot(server, nickname, realname)
+        self.bot = _create_bot(server, nickname, realname, network_name)
         self.bot.on_welcome = self._on_welcome
+        self.bot.channel_name_getter = self.get_channel_name
+
+        connection = self.bot.connection
+        # Join after the server has advertised its limits (`ISUPPORT`),
+        # which it does after welcoming.
+        connection.add_global_handler('endofmotd', self._on_motd_end)
+        connection.add_global_handler('nomotd', self._on_motd_end)
+        connection.add_global_handler('join', self._on_join)
+        connection.add_global_handler('disconnect', self._on_disconnect)
+        for event_type in JOIN_ERROR_EVENT_TYPES:
+            connection.add_global_handler(event_type, self._on_join_error)
+
+    @property
+    def channels(self) -> set[IrcChannel]:
+        return self._channels
+
+    @channels.setter
+    def channels(self, channels: set[IrcChannel]) -> None:
+        self._channels = channels
+        self._channel_names_by_folded_name = index_channel_names(channels)
+
+    def get_channel_name(self, channel_name: str) -> str:
+        """Return the channel's name as configured, as the server might
+        refer to it in a different case.
+        """
+        return self._channel_names_by_folded_name.get(
+            fold_channel_name(channel_name), channel_name
+        )
 
     def start(self) -> None:
         """Connect to the server, in a separate thread."""
@@ -64,6 +490,8 @@ class IrcAnnouncer(Announcer):
             self.server.port,
         )
 
+        self._started_at = time.monotonic()
+        self._set_state(ConnectionState.CONNECTING)
         start_thread(self.bot.start)
 
     def _on_welcome(self, conn, event) -> None:
@@ -72,39 +500,391 @@ class IrcAnnouncer(Announcer):
             'Connected to IRC server %s:%d.', *conn.socket.getpeername()
         )
 
+        self.bot.recon.reset()
+
+        downtime = self.stats.record_reconnect(time.monotonic())
+        if downtime is not None:
+            logger.info(
+                'Reconnected to IRC server %s:%d after %.1f seconds '
+                '(%d reconnect(s) so far).',
+                self.server.host,
+                self.server.port,
+                downtime,
+                self.stats.reconnects,
+            )
+
+        self._welcomed_at = time.monotonic()
+
         self._send_commands(conn)
+
+        with self._state_lock:
+            self._channel_names_to_join = set(
+                self._channel_names_by_folded_name
+            )
+            self._joins_sent = False
+        self._set_state(ConnectionState.JOINING)
+
+    def _on_motd_end(self, conn, event) -> None:
+        with self._state_lock:
+            if self._joins_sent:
+                return
+            self._joins_sent = True
+
         self._join_channels(conn)
 
+        # Do not wait forever for channels the server does not reply
+        # about (as expected).
+        welcomed_at = self._welcomed_at
+        self.bot.reactor.scheduler.execute_after(
+            self.join_timeout_seconds,
+            lambda: self._on_join_timeout(welcomed_at),
+        )
+
+        self._update_joining_state()
+
+    def _on_join(self, conn, event) -> None:
+        if event.source.nick == self.bot.get_nickname():
+            self._mark_channel_joined(event.target)
+
+    def _on_join_error(self, conn, event) -> None:
+        # Do not wait for channels that cannot be joined.
+        if not event.arguments:
+            return
+
+        channel_name = event.arguments[0]
+        with self._state_lock:
+            folded_channel_name = fold_channel_name(channel_name)
+            if folded_channel_name not in self._channel_names_to_join:
+                # Not about a channel being joined
+                return
+            self._channel_names_to_join.discard(folded_channel_name)
+
+        logger.warning('Cannot join channel %s (%s).', channel_name, event.type)
+        self._update_joining_state()
+
+    def _on_join_timeout(self, welcomed_at: float) -> None:
+        """Stop waiting for channels that have not been joined in time,
+        and announce to the others.
+        """
+        with self._state_lock:
+            if welcomed_at != self._welcomed_at:
+                # Connected again in the meantime
+                return
+            channel_names = sorted(
+                self.get_channel_name(name)
+                for name in self._channel_names_to_join
+            )
+            self._channel_names_to_join.clear()
+
+        if channel_names:
+            logger.warning(
+                'Channel(s) %s not joined within %.1f seconds.',
+                ', '.join(channel_names),
+                self.join_timeout_seconds,
+            )
+        self._update_joining_state()
+
+    def _mark_channel_joined(self, channel_name: str) -> None:
+        with self._state_lock:
+            self._channel_names_to_join.discard(fold_channel_name(channel_name))
+        self._update_joining_state()
+
+    def _update_joining_state(self) -> None:
+        with self._state_lock:
+            done = self._joins_sent and not self._channel_names_to_join
+
+        if done and self.state == ConnectionState.JOINING:
+            self._set_state(ConnectionState.CONNECTED)
+            self._report_join_time()
+
+    def _report_join_time(self) -> None:
+        now = time.monotonic()
+        self.stats.join_seconds = now - self._welcomed_at
+        log_join_time(self._join_plan, self.stats.join_seconds)
+
+        if self._started_at is not None:
+            log_startup_time(now - self._started_at)
+            # Only report this once, not after reconnects.
+            self._started_at = None
+
+    def _on_disconnect(self, conn, event) -> None:
+        if self.state == ConnectionState.CONNECTED:
+            logger.warning(
+                'Disconnected from IRC server %s:%d.',
+                self.server.host,
+                self.server.port,
+            )
+
+        self.stats.record_disconnect(time.monotonic())
+        self._set_state(ConnectionState.DISCONNECTED)
+
+    def _set_state(self, state: ConnectionState) -> None:
+        self.state = state
+
+        if state == ConnectionState.CONNECTED:
+            self._connected.set()
+        else:
+            self._connected.clear()
+
     def _send_commands(self, conn):
         """Send custom commands after having been welcomed by the server."""
         for command in self.commands:
             conn.send_raw(command)
 
+    def set_join_priority(
+        self, get_channel_names: Callable[[], set[str]]
+    ) -> None:
+        """Have the channels whose names the function returns (e.g.
+        those with messages waiting to be announced) joined first.
+        """
+        self._get_first_channel_names = get_channel_names
+
     def _join_channels(self, conn):
-        """Join the configured channels."""
-        channels = sorted(self.channels)
-        logger.info('Channels to join: %s', ', '.join(c.name for c in channels))
+        """Join the configured channels, with as few lines as the
+        server allows.
+        """
+        join_plan = plan_joins(
+            self.channels,
+            conn.features,
+            self._get_channel_names_to_join_first(),
+        )
+        self._join_plan = join_plan
 
-        for channel in channels:
-            logger.info('Joining channel %s ...', channel.name)
-            conn.join(channel.name, channel.password or '')
+        for channel in join_plan.skipped_channels:
+            logger.warning(
+                'Not joining channel %s, the server limits the number of '
+                'channels to be in.',
+                channel.name,
+            )
+            with self._state_lock:
+                self._channel_names_to_join.discard(
+                    fold_channel_name(channel.name)
+                )
+
+        logger.info(
+            'Joining %d channel(s) with %d JOIN line(s) ...',
+            join_plan.channel_count,
+            len(join_plan.lines),
+        )
+        try:
+            for line in join_plan.lines:
+                conn.send_raw(line)
+        except ServerNotConnectedError:
+            pass
+
+    def _get_channel_names_to_join_first(self) -> set[str]:
+        """Return the (unqualified) names of channels on this network
+        to join first.
+        """
+        network_name = self.bot.network_name
+        channel_names = set()
+        for qualified_channel_name in self._get_first_channel_names():
+            name_network_name, channel_name = split_channel_name(
+                qualified_channel_name
+            )
+            if name_network_name == network_name:
+                channel_names.add(channel_name)
+        return channel_names
 
     def announce(self, channel_name: str, text: str) -> None:
-        """Announce a message."""
-        self.bot.connection.privmsg(channel_name, text)
+        """Announce a message.
+
+        Raise `NotConnectedError` if the connection is down.
+        """
+        self._send_privmsg(channel_name, text)
+
+    def announce_to_channels(self, channel_names: list[str], text: str) -> None:
+        """Announce a message to multiple channels, with as few lines as
+        the server allows.
+
+        Raise `NotConnectedError` if the connection is down.
+        """
+        max_targets = self._get_max_privmsg_targets()
+
+        for targets in group_targets(channel_names, text, max_targets):
+            self._send_privmsg(','.join(targets), text)
+
+    def _get_max_privmsg_targets(self) -> int | None:
+        """Return the maximum number of targets per `PRIVMSG` command
+        (`None` for no limit) the server advertises.
+        """
+        features = self.bot.connection.features
+
+        targmax = getattr(features, 'targmax', None)
+        if isinstance(targmax, dict) and 'PRIVMSG' in targmax:
+            return targmax['PRIVMSG']
+
+        maxtargets = getattr(features, 'maxtargets', None)
+        if isinstance(maxtargets, int):
+            return maxtargets
+
+        # Without advertised support, send to one target per line.
+        return 1
+
+    def _send_privmsg(self, target: str, text: str) -> None:
+        connection = self.bot.connection
+
+        try:
+            connection.privmsg(target, text)
+        except ServerNotConnectedError:
+            raise NotConnectedError from None
+
+        # A failed write closes the connection instead of raising.
+        if not connection.is_connected():
+            raise NotConnectedError
+
+    def get_max_text_length(self, channel_name: str) -> int:
+        """Return the maximum length, in bytes, of text that can be
+        announced to the channel at once.
+        """
+        return get_max_text_length(self.bot.get_nickname(), channel_name)
+
+    def update_channels(self, channels: set[IrcChannel]) -> None:
+        """Join channels that have been added, and part those that have
+        been removed.
+
+        If disconnected, channels are joined after reconnecting.
+        """
+        old_channel_names = {channel.name for channel in self.channels}
+        new_channel_names = {channel.name for channel in channels}
+        self.channels = channels
+
+        conn = self.bot.connection
+        if not conn.is_connected():
+            return
+
+        channels_to_join = [
+            channel
+            for channel in sorted(channels)
+            if channel.name not in old_channel_names
+        ]
+
+        try:
+            if channels_to_join:
+                logger.info(
+                    'Joining channel(s) %s ...',
+                    ', '.join(channel.name for channel in channels_to_join),
+                )
+                for line in group_joins(
+                    channels_to_join,
+                    get_max_join_targets(conn.features),
+                    get_max_line_length(conn.features),
+                ):
+                    conn.send_raw(line)
+
+            for channel_name in sorted(old_channel_names - new_channel_names):
+                logger.info('Parting channel %s ...', channel_name)
+                conn.part(channel_name)
+        except ServerNotConnectedError:
+            pass
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Join the channel in addition to the others (and again after
+        reconnecting).
+        """
+        self.update_channels(self.channels | {channel})
+
+    def part_channel(self, channel_name: str) -> None:
+        """Part the channel (and do not join it again after
+        reconnecting).
+        """
+        self.update_channels(
+            {
+                channel
+                for channel in self.channels
+                if channel.name != channel_name
+            }
+        )
+
+    def update_rate_limit(self, server: IrcServer) -> None:
+        """Apply the server's (changed) send rate limit."""
+        self.server = server
+        _set_rate_limit(self.bot.connection, server)
+
+    def wait_until_connected(
+        self, timeout_seconds: float | None = None
+    ) -> bool:
+        """Wait until connected to the server and channels have been
+        (re)joined.
+        """
+        return self._connected.wait(timeout_seconds)
+
+    def get_connection_stats(self) -> dict[str, ConnectionStats]:
+        """Return reconnects and downtime of the connection."""
+        return {self.name: self.stats}
+
+    def get_connection_states(self) -> dict[str, ConnectionState]:
+        """Return the state of the connection."""
+        return {self.name: self.state}
 
     def shutdown(self) -> None:
         """Shut the announcer down."""
+        self.bot.recon.stop()
         self.bot.disconnect('Bye.')
 
 
+class RateLimitedServerConnection(ServerConnection):
+    """A connection to an IRC server that sends lines no faster than
+    its rate limit (if one is set) allows.
+    """
+
+    def __init__(self, reactor: Reactor) -> None:
+        super().__init__(reactor)
+        self._send_raw_limited: Callable[[str], None] | None = None
+
+    def set_rate_limit(
+        self, bucket: TokenBucket | None, *, bytes_per_token: int | None = None
+    ) -> None:
+        """Limit the send rate as the bucket requires, replacing the
+        limit set before (if any). Remove the limit without a bucket.
+        """
+        if bucket is None:
+            self._send_raw_limited = None
+            return
+
+        self._send_raw_limited = limit_rate(
+            super().send_raw, bucket, bytes_per_token=bytes_per_token
+        )
+
+    def send_raw(self, string: str) -> None:
+        """Send a raw line, waiting as long as the rate limit requires."""
+        if self._send_raw_limited is not None:
+            self._send_raw_limited(string)
+        else:
+            super().send_raw(string)
+
+
+class RateLimitedReactor(Reactor):
+    connection_class = RateLimitedServerConnection
+
+
 class Bot(SingleServerIRCBot):
     """An IRC bot to forward messages to IRC channels."""
 
+    reactor_class = RateLimitedReactor
+    connection: RateLimitedServerConnection
+
+    # Name of the network, to qualify channel names with (if any)
+    network_name: str | None = None
+
+    # Returns the channel's name as configured (if set)
+    channel_name_getter: Callable[[str], str] | None = None
+
     def get_version(self) -> str:
         """Return this on CTCP VERSION requests."""
         return 'Weitersager'
 
+    def get_nickname(self) -> str:
+        """Return the nickname in use (or to be used)."""
+        return self._nickname
+
+    def get_channel_name(self, channel_name: str) -> str:
+        """Return the channel's name as configured."""
+        if self.channel_name_getter is None:
+            return channel_name
+
+        return self.channel_name_getter(channel_name)
+
     def on_nicknameinuse(self, conn, event) -> None:
         """Choose another nickname if conflicting."""
         self._nickname += '_'
@@ -116,6 +896,9 @@ class Bot(SingleServerIRCBot):
         channel_name = event.target
 
         if joined_nick == self._nickname:
+            channel_name = qualify_channel_name(
+                self.network_name, self.get_channel_name(channel_name)
+            )
             logger.info('Joined IRC channel: %s', channel_name)
             irc_channel_joined.send(channel_name=channel_name)
 
@@ -125,14 +908,29 @@ class Bot(SingleServerIRCBot):
         logger.warning('Cannot join channel %s (bad key).', channel_name)
 
 
-def _create_bot(server: IrcServer, nickname: str, realname: str) -> Bot:
+def _create_bot(
+    server: IrcServer,
+    nickname: str,
+    realname: str,
+    network_name: str | None = None,
+) -> Bot:
     """Create a bot."""
     server_spec = ServerSpec(server.host, server.port, server.password)
     factory = Factory(wrapper=ssl.wrap_socket) if server.ssl else Factory()
 
-    bot = Bot([server_spec], nickname, realname, connect_factory=factory)
+    # Each bot needs a reconnect strategy of its own.
+    recon = ReconnectBackoff()
+
+    bot = Bot(
+        [server_spec],
+        nickname,
+        realname,
+        recon=recon,
+        connect_factory=factory,
+    )
+    bot.network_name = network_name
 
-    _set_rate_limit(bot.connection, server.rate_limit)
+    _set_rate_limit(bot.connection, server)
 
     # Avoid `UnicodeDecodeError` on non-UTF-8 messages.
     bot.connection.buffer_class = LenientDecodingLineBuffer
@@ -140,16 +938,391 @@ def _create_bot(server: IrcServer, nickname: str, realname: str) -> Bot:
     return bot
 
 
-def _set_rate_limit(connection, rate_limit: float | None) -> None:
-    """Set rate limit."""
-    if rate_limit is not None:
+def _set_rate_limit(
+    connection: RateLimitedServerConnection, server: IrcServer
+) -> None:
+    """Set rate limit, replacing the one set before (if any)."""
+    rate_limit = server.rate_limit
+    if rate_limit is None:
+        logger.info('No IRC send rate limit set.')
+        connection.set_rate_limit(None)
+        return
+
+    if server.rate_limit_burst is None and (
+        server.rate_limit_bytes_per_token is None
+    ):
         logger.info(
             'IRC send rate limit set to %.2f messages per second.',
             rate_limit,
         )
-        connection.set_rate_limit(rate_limit)
     else:
-        logger.info('No IRC send rate limit set.')
+        logger.info(
+            'IRC send rate limit set to %.2f messages per second, '
+            'with bursts of up to %d messages.',
+            rate_limit,
+            server.rate_limit_burst or 1,
+        )
+
+    # Without a burst, this spaces lines evenly.
+    bucket = TokenBucket(rate_limit, server.rate_limit_burst or 1)
+    connection.set_rate_limit(
+        bucket, bytes_per_token=server.rate_limit_bytes_per_token
+    )
+
+
+class ShardedAnnouncer(Announcer):
+    """An announcer that writes messages to IRC over multiple
+    connections, each with a bot of its own.
+
+    Each channel is assigned to one of the connections by consistent
+    hashing. Every connection sends from a queue of its own, in a
+    thread of its own, so that connections send in parallel, each up
+    to the rate limit. Messages for the same channel are sent in order.
+    """
+
+    def __init__(
+        self,
+        server: IrcServer,
+        nickname: str,
+        realname: str,
+        commands: list[str],
+        channels: set[IrcChannel],
+        *,
+        network_name: str | None = None,
+    ) -> None:
+        self.server = server
+
+        nicknames = [
+            _get_shard_nickname(nickname, i) for i in range(server.connections)
+        ]
+        self.hash_ring = HashRing(nicknames)
+
+        channels_by_nickname: dict[str, set[IrcChannel]] = {
+            nickname: set() for nickname in nicknames
+        }
+        for channel in channels:
+            shard_nickname = self.hash_ring.get_node(channel.name)
+            channels_by_nickname[shard_nickname].add(channel)
+
+        self.shards = {
+            nickname: QueuedAnnouncer(
+                IrcAnnouncer(
+                    server,
+                    nickname,
+                    realname,
+                    commands,
+                    channels,
+                    network_name=network_name,
+                )
+            )
+            for nickname, channels in channels_by_nickname.items()
+        }
+
+        self._stopped = Event()
+
+    def start(self) -> None:
+        """Connect to the server, once per connection."""
+        for shard in self.shards.values():
+            shard.start()
+
+        start_thread(self._report_send_rates_regularly)
+
+    def announce(self, channel_name: str, text: str) -> None:
+        """Queue a message to be announced by the connection the
+        channel is assigned to.
+        """
+        self._get_shard(channel_name).announce(channel_name, text)
+
+    def announce_to_channels(self, channel_names: list[str], text: str) -> None:
+        """Queue a message to be announced to multiple channels, by the
+        connections the channels are assigned to.
+        """
+        channel_names_by_shard = self._group_channel_names(channel_names)
+        for shard_nickname, names in channel_names_by_shard.items():
+            self.shards[shard_nickname].announce_to_channels(names, text)
+
+    def send(
+        self, channel_names: list[str], text: str, on_sent: SentCallback
+    ) -> None:
+        """Queue a message to be announced to one or more channels, by
+        the connections the channels are assigned to, and call the
+        function for each of them once it has sent the message.
+        """
+        channel_names_by_shard = self._group_channel_names(channel_names)
+        for shard_nickname, names in channel_names_by_shard.items():
+            self.shards[shard_nickname].send(names, text, on_sent)
+
+    def get_max_text_length(self, channel_name: str) -> int:
+        """Return the maximum length, in bytes, of text that can be
+        announced to the channel at once.
+        """
+        return self._get_shard(channel_name).get_max_text_length(channel_name)
+
+    def wait_until_connected(
+        self, timeout_seconds: float | None = None
+    ) -> bool:
+        """Wait until all connections are up.
+
+        Return `False` if that is still not the case after the timeout.
+        """
+        return _wait_until_all_connected(self.shards.values(), timeout_seconds)
+
+    def is_full(self) -> bool:
+        """Return `True` if announcing might block until a queued
+        message has been sent.
+        """
+        return any(shard.is_full() for shard in self.shards.values())
+
+    def update_channels(self, channels: set[IrcChannel]) -> None:
+        """Have the connections join channels that have been added, and
+        part those that have been removed.
+        """
+        channels_by_nickname: dict[str, set[IrcChannel]] = {
+            nickname: set() for nickname in self.shards
+        }
+        for channel in channels:
+            shard_nickname = self.hash_ring.get_node(channel.name)
+            channels_by_nickname[shard_nickname].add(channel)
+
+        for nickname, shard in self.shards.items():
+            shard.update_channels(channels_by_nickname[nickname])
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Have the connection the channel is assigned to join it."""
+        self._get_shard(channel.name).join_channel(channel)
+
+    def part_channel(self, channel_name: str) -> None:
+        """Have the connection the channel is assigned to part it."""
+        self._get_shard(channel_name).part_channel(channel_name)
+
+    def update_rate_limit(self, server: IrcServer) -> None:
+        """Apply the server's (changed) send rate limit to each
+        connection.
+        """
+        self.server = server
+        for shard in self.shards.values():
+            shard.update_rate_limit(server)
+
+    def set_join_priority(
+        self, get_channel_names: Callable[[], set[str]]
+    ) -> None:
+        """Have the channels whose names the function returns (e.g.
+        those with messages waiting to be announced) joined first.
+        """
+        for shard in self.shards.values():
+            shard.set_join_priority(get_channel_names)
+
+    def _get_shard(self, channel_name: str) -> QueuedAnnouncer:
+        return self.shards[self.hash_ring.get_node(channel_name)]
+
+    def _group_channel_names(
+        self, channel_names: list[str]
+    ) -> dict[str, list[str]]:
+        """Group the channel names by the connections (by initial
+        nickname) the channels are assigned to.
+        """
+        channel_names_by_shard: dict[str, list[str]] = {}
+        for channel_name in channel_names:
+            shard_nickname = self.hash_ring.get_node(channel_name)
+            channel_names_by_shard.setdefault(shard_nickname, []).append(
+                channel_name
+            )
+        return channel_names_by_shard
+
+    def get_send_rates(self) -> dict[str, float]:
+        """Return the number of messages sent per second, per
+        connection (by initial nickname).
+        """
+        return {
+            nickname: shard.send_rate_meter.get_rate()
+            for nickname, shard in self.shards.items()
+        }
+
+    def get_connection_stats(self) -> dict[str, ConnectionStats]:
+        """Return reconnects and downtime per connection."""
+        return _merge_connection_stats(self.shards.values())
+
+    def get_connection_states(self) -> dict[str, ConnectionState]:
+        """Return the state of each connection."""
+        return _merge_connection_states(self.shards.values())
+
+    def _report_send_rates_regularly(self) -> None:
+        while not self._stopped.wait(SEND_RATES_REPORT_INTERVAL_SECONDS):
+            self.report_send_rates()
+
+    def report_send_rates(self) -> None:
+        """Log the send rate of each connection."""
+        for nickname, rate in sorted(self.get_send_rates().items()):
+            logger.info(
+                'Connection %s sends %.2f messages per second.',
+                nickname,
+                rate,
+            )
+
+    def shutdown(self) -> None:
+        """Send queued messages, then shut the connections down."""
+        self._stopped.set()
+
+        for shard in self.shards.values():
+            shard.shutdown()
+
+        self.report_send_rates()
+
+
+class QueuedAnnouncer(Announcer):
+    """Wrap an announcer to send messages from a queue of its own, in a
+    thread of its own.
+
+    Once the queue is full, announcing blocks until a message has been
+    sent.
+    """
+
+    def __init__(
+        self, announcer: Announcer, *, capacity: int = SEND_QUEUE_CAPACITY
+    ) -> None:
+        self.announcer = announcer
+        self.send_rate_meter = SendRateMeter()
+        self._queue: Queue[
+            tuple[list[str], str, SentCallback | None] | None
+        ] = Queue(capacity)
+        self._thread = Thread(target=self._send_messages, daemon=True)
+
+    def start(self) -> None:
+        """Start the announcer and the sending thread."""
+        self.announcer.start()
+        self._thread.start()
+
+    def announce(self, channel_name: str, text: str) -> None:
+        """Queue a message to be sent."""
+        self._queue.put(([channel_name], text, None))
+
+    def announce_to_channels(self, channel_names: list[str], text: str) -> None:
+        """Queue a message to be sent to multiple channels."""
+        self._queue.put((channel_names, text, None))
+
+    def send(
+        self, channel_names: list[str], text: str, on_sent: SentCallback
+    ) -> None:
+        """Queue a message to be sent to one or more channels, and call
+        the function once it has been sent (or dropped).
+        """
+        self._queue.put((channel_names, text, on_sent))
+
+    def get_max_text_length(self, channel_name: str) -> int:
+        """Return the maximum length, in bytes, of text that can be
+        announced to the channel at once.
+        """
+        return self.announcer.get_max_text_length(channel_name)
+
+    def wait_until_connected(
+        self, timeout_seconds: float | None = None
+    ) -> bool:
+        """Wait until messages can be announced.
+
+        Return `False` if that is still not the case after the timeout.
+        """
+        return self.announcer.wait_until_connected(timeout_seconds)
+
+    def is_full(self) -> bool:
+        """Return `True` if announcing would block until a queued
+        message has been sent.
+        """
+        return self._queue.full()
+
+    def update_channels(self, channels: set[IrcChannel]) -> None:
+        """Join channels that have been added, and part those that have
+        been removed.
+        """
+        self.announcer.update_channels(channels)
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Join the channel in addition to the others (and again after
+        reconnecting).
+        """
+        self.announcer.join_channel(channel)
+
+    def part_channel(self, channel_name: str) -> None:
+        """Part the channel (and do not join it again after
+        reconnecting).
+        """
+        self.announcer.part_channel(channel_name)
+
+    def update_rate_limit(self, server: IrcServer) -> None:
+        """Apply the server's (changed) send rate limit."""
+        self.announcer.update_rate_limit(server)
+
+    def set_join_priority(
+        self, get_channel_names: Callable[[], set[str]]
+    ) -> None:
+        """Have the channels whose names the function returns (e.g.
+        those with messages waiting to be announced) joined first.
+        """
+        self.announcer.set_join_priority(get_channel_names)
+
+    def get_connection_stats(self) -> dict[str, ConnectionStats]:
+        """Return reconnects and downtime per connection."""
+        return self.announcer.get_connection_stats()
+
+    def get_connection_states(self) -> dict[str, ConnectionState]:
+        """Return the state of each connection."""
+        return self.announcer.get_connection_states()
+
+    def _send_messages(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            channel_names, text, on_sent = item
+            sent = self._send_message(channel_names, text)
+            if sent:
+                self.send_rate_meter.record()
+
+            if on_sent is not None:
+                on_sent(channel_names, sent)
+
+    def _send_message(self, channel_names: list[str], text: str) -> bool:
+        """Send the message, waiting for the connection to be
+        re-established if necessary.
+        """
+        while True:
+            try:
+                if len(channel_names) == 1:
+                    self.announcer.announce(channel_names[0], text)
+                else:
+                    self.announcer.announce_to_channels(channel_names, text)
+                return True
+            except NotConnectedError:
+                logger.info(
+                    'Could not send message to channel(s) %s, not connected; '
+                    'will retry after reconnect.',
+                    ', '.join(channel_names),
+                )
+                self.announcer.wait_until_connected()
+            except Exception:
+                logger.exception(
+                    'Could not send message to channel(s) %s.',
+                    ', '.join(channel_names),
+                )
+                return False
+
+    def shutdown(self) -> None:
+        """Send queued messages, then shut the announcer down."""
+        with contextlib.suppress(Full):
+            self._queue.put(None, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        if self._thread.is_alive():
+            self._thread.join(SHUTDOWN_TIMEOUT_SECONDS)
+
+        self.announcer.shutdown()
+
+
+def _get_shard_nickname(nickname: str, index: int) -> str:
+    """Return the nickname of the bot for the connection.
+
+    The first connection uses the nickname as is, the following ones
+    append a number, starting at 2.
+    """
+    return nickname if index == 0 else f'{nickname}{index + 1}'
 
 
 class DummyAnnouncer(Announcer):
@@ -166,19 +1339,360 @@ class DummyAnnouncer(Announcer):
 
     def announce(self, channel_name: str, text: str) -> None:
         """Announce a message."""
-        logger.debug('%s> %s', channel_name, text)
+        message_logger.debug('%s> %s', channel_name, text)
+
+    def update_channels(self, channels: set[IrcChannel]) -> None:
+        """Fake joins of channels that have been added."""
+        old_channel_names = {channel.name for channel in self.channels}
+        self.channels = channels
+
+        for channel in sorted(channels):
+            if channel.name not in old_channel_names:
+                irc_channel_joined.send(channel_name=channel.name)
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Fake a join of the channel."""
+        self.update_channels(self.channels | {channel})
+
+    def part_channel(self, channel_name: str) -> None:
+        """Forget about the channel."""
+        self.update_channels(
+            {
+                channel
+                for channel in self.channels
+                if channel.name != channel_name
+            }
+        )
+
+
+class RoutingAnnouncer(Announcer):
+    """An announcer that routes messages to the announcers of multiple
+    networks.
+
+    Channels of additional networks are addressed by their name
+    qualified with the network name (e.g. `libera:#lobby`), or by their
+    name alone if no other network has a channel of that name.
+    """
+
+    def __init__(
+        self,
+        announcers_by_network_name: dict[str | None, Announcer],
+        routes: dict[str, str],
+    ) -> None:
+        self.announcers_by_network_name = announcers_by_network_name
+        self.routes = routes
+
+    def start(self) -> None:
+        """Start the announcers."""
+        for announcer in self.announcers_by_network_name.values():
+            announcer.start()
+
+    def resolve_channel_name(self, channel_name: str) -> str:
+        """Return the name the channel is addressed by internally."""
+        return self.routes.get(channel_name, channel_name)
+
+    def announce(self, channel_name: str, text: str) -> None:
+        """Announce a message via the channel's network."""
+        network_name, name = split_channel_name(channel_name)
+
+        announcer = self.announcers_by_network_name.get(network_name)
+        if announcer is None:
+            logger.warning(
+                'Could not send message to channel %s, unknown network.',
+                channel_name,
+            )
+            return
+
+        announcer.announce(name, text)
+
+    def announce_to_channels(self, channel_names: list[str], text: str) -> None:
+        """Announce a message to multiple channels, via their networks."""
+        names_by_network_name: dict[str | None, list[str]] = {}
+        for channel_name in channel_names:
+            network_name, name = split_channel_name(channel_name)
+            names_by_network_name.setdefault(network_name, []).append(name)
+
+        for network_name, names in names_by_network_name.items():
+            announcer = self.announcers_by_network_name.get(network_name)
+            if announcer is None:
+                logger.warning(
+                    'Could not send message to network %s, unknown network.',
+                    network_name,
+                )
+                continue
+
+            announcer.announce_to_channels(names, text)
+
+    def send(
+        self, channel_names: list[str], text: str, on_sent: SentCallback
+    ) -> None:
+        """Announce a message to one or more channels, via their
+        networks, and call the function for each network once it has
+        sent the message.
+        """
+        names_by_network_name: dict[str | None, list[str]] = {}
+        for channel_name in channel_names:
+            network_name, name = split_channel_name(channel_name)
+            names_by_network_name.setdefault(network_name, []).append(name)
+
+        for network_name, names in names_by_network_name.items():
+            announcer = self.announcers_by_network_name.get(network_name)
+            if announcer is None:
+                logger.warning(
+                    'Could not send message to network %s, unknown network.',
+                    network_name,
+                )
+                on_sent(
+                    [qualify_channel_name(network_name, n) for n in names],
+                    False,
+                )
+                continue
+
+            announcer.send(
+                names, text, partial(_report_sent, on_sent, network_name)
+            )
+
+    def wait_until_connected(
+        self, timeout_seconds: float | None = None
+    ) -> bool:
+        """Wait until the networks whose queues are full are connected.
+
+        Networks with room in their queues take messages while down,
+        so that one network being down does not hold up the others
+        right away.
+
+        Return `False` if that is still not the case after the timeout.
+        """
+        announcers = [
+            announcer
+            for announcer in self.announcers_by_network_name.values()
+            if isinstance(announcer, (QueuedAnnouncer, ShardedAnnouncer))
+            and announcer.is_full()
+        ]
+        return _wait_until_all_connected(announcers, timeout_seconds)
+
+    def get_max_text_length(self, channel_name: str) -> int:
+        """Return the maximum length, in bytes, of text that can be
+        announced to the channel at once.
+        """
+        network_name, name = split_channel_name(channel_name)
+
+        announcer = self.announcers_by_network_name.get(network_name)
+        if announcer is None:
+            return super().get_max_text_length(name)
+
+        return announcer.get_max_text_length(name)
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Join the channel via its network."""
+        network_name, name = split_channel_name(channel.name)
+
+        announcer = self.announcers_by_network_name.get(network_name)
+        if announcer is None:
+            logger.warning(
+                'Could not join channel %s, unknown network.', channel.name
+            )
+            return
+
+        announcer.join_channel(replace(channel, name=name))
+
+    def part_channel(self, channel_name: str) -> None:
+        """Part the channel via its network."""
+        network_name, name = split_channel_name(channel_name)
+
+        announcer = self.announcers_by_network_name.get(network_name)
+        if announcer is not None:
+            announcer.part_channel(name)
+
+    def set_join_priority(
+        self, get_channel_names: Callable[[], set[str]]
+    ) -> None:
+        """Have the channels whose names the function returns (e.g.
+        those with messages waiting to be announced) joined first.
+        """
+        for announcer in self.announcers_by_network_name.values():
+            announcer.set_join_priority(get_channel_names)
+
+    def get_connection_stats(self) -> dict[str, ConnectionStats]:
+        """Return reconnects and downtime per connection."""
+        return _merge_connection_stats(self.announcers_by_network_name.values())
+
+    def get_connection_states(self) -> dict[str, ConnectionState]:
+        """Return the state of each connection."""
+        return _merge_connection_states(
+            self.announcers_by_network_name.values()
+        )
+
+    def shutdown(self) -> None:
+        """Shut the announcers down."""
+        for announcer in self.announcers_by_network_name.values():
+            announcer.shutdown()
+
+
+def _report_sent(
+    on_sent: SentCallback,
+    network_name: str | None,
+    channel_names: list[str],
+    sent: bool,
+) -> None:
+    """Call the function with the channel names qualified with the name
+    of the network they have been sent to.
+    """
+    qualified_channel_names = [
+        qualify_channel_name(network_name, channel_name)
+        for channel_name in channel_names
+    ]
+    on_sent(qualified_channel_names, sent)
+
+
+def _wait_until_all_connected(
+    announcers: Iterable[Announcer], timeout_seconds: float | None
+) -> bool:
+    """Wait until messages can be announced by all announcers.
+
+    Return `False` if that is still not the case after the timeout.
+    """
+    deadline = (
+        time.monotonic() + timeout_seconds
+        if timeout_seconds is not None
+        else None
+    )
+
+    for announcer in announcers:
+        remaining_seconds = (
+            max(deadline - time.monotonic(), 0.0)
+            if deadline is not None
+            else None
+        )
+        if not announcer.wait_until_connected(remaining_seconds):
+            return False
+
+    return True
+
+
+def _merge_connection_stats(
+    announcers: Iterable[Announcer],
+) -> dict[str, ConnectionStats]:
+    stats: dict[str, ConnectionStats] = {}
+    for announcer in announcers:
+        stats.update(announcer.get_connection_stats())
+    return stats
+
+
+def _merge_connection_states(
+    announcers: Iterable[Announcer],
+) -> dict[str, ConnectionState]:
+    states: dict[str, ConnectionState] = {}
+    for announcer in announcers:
+        states.update(announcer.get_connection_states())
+    return states
 
 
 def create_announcer(config: IrcConfig) -> Announcer:
     """Create an announcer."""
-    if config.server is None:
+    if not config.networks:
+        return _create_network_announcer(
+            config, config.server, get_channels_to_join_at_start(config)
+        )
+
+    announcers_by_network_name: dict[str | None, Announcer] = {}
+
+    if config.server is not None or config.channels:
+        announcer = _create_network_announcer(
+            config, config.server, get_channels_to_join_at_start(config)
+        )
+        announcers_by_network_name[None] = _queue_announcer(announcer)
+
+    for network in config.networks:
+        logger.info(
+            'Announcing to network %s via %s:%d.',
+            network.name,
+            network.server.host,
+            network.server.port,
+        )
+        announcer = _create_network_announcer(
+            config,
+            network.server,
+            get_channels_to_join_at_start(config, network.channels),
+            network_name=network.name,
+        )
+        announcers_by_network_name[network.name] = _queue_announcer(announcer)
+
+    routes = _build_routes(config)
+
+    return RoutingAnnouncer(announcers_by_network_name, routes)
+
+
+def get_channels_to_join_at_start(
+    config: IrcConfig, channels: set[IrcChannel] | None = None
+) -> set[IrcChannel]:
+    """Return the channels (by default those of the default network)
+    to join right after connecting.
+
+    When joining on demand, channels are joined once messages for them
+    are to be announced instead.
+    """
+    if config.join_on_demand:
+        return set()
+
+    return channels if channels is not None else config.channels
+
+
+def _create_network_announcer(
+    config: IrcConfig,
+    server: IrcServer | None,
+    channels: set[IrcChannel],
+    *,
+    network_name: str | None = None,
+) -> Announcer:
+    if server is None:
         logger.info('No IRC server specified; will write to STDOUT instead.')
-        return DummyAnnouncer(config.channels)
+        return DummyAnnouncer(channels)
 
-    return IrcAnnouncer(
-        config.server,
+    announcer_class = (
+        ShardedAnnouncer if server.connections > 1 else IrcAnnouncer
+    )
+
+    return announcer_class(
+        server,
         config.nickname,
         config.realname,
         config.commands,
-        config.channels,
+        channels,
+        network_name=network_name,
     )
+
+
+def _queue_announcer(announcer: Announcer) -> Announcer:
+    """Let networks send in parallel, each in a thread of its own.
+
+    A sharded announcer already sends in threads of its own.
+    """
+    if isinstance(announcer, ShardedAnnouncer):
+        return announcer
+
+    return QueuedAnnouncer(announcer)
+
+
+def _build_routes(config: IrcConfig) -> dict[str, str]:
+    """Map unqualified names of additional networks' channels to their
+    qualified names.
+
+    Names of channels of the default network, and names of channels
+    that exist in multiple networks, are left out.
+    """
+    default_channel_names = {channel.name for channel in config.channels}
+
+    qualified_names_by_name: dict[str, list[str]] = {}
+    for network in config.networks:
+        for channel in network.channels:
+            qualified_name = qualify_channel_name(network.name, channel.name)
+            qualified_names_by_name.setdefault(channel.name, []).append(
+                qualified_name
+            )
+
+    return {
+        name: qualified_names[0]
+        for name, qualified_names in qualified_names_by_name.items()
+        if len(qualified_names) == 1 and name not in default_channel_names
+    }
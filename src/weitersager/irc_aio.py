@@ -0,0 +1,622 @@
+"""
+weitersager.irc_aio
+~~~~~~~~~~~~~~~~~~~
+
+Internet Relay Chat, on an asyncio event loop
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Any, Callable
+
+from irc.client import InvalidCharacters, MessageTooLong
+from irc.client_aio import AioConnection, AioReactor
+from irc.connection import AioFactory
+from jaraco.stream.buffer import LenientDecodingLineBuffer
+
+from .config import ConfigurationError, IrcChannel, IrcConfig, IrcServer
+from .connection import ConnectionState, ConnectionStats, ReconnectBackoff
+from .irc import (
+    Announcer,
+    DummyAnnouncer,
+    fold_channel_name,
+    get_channels_to_join_at_start,
+    get_max_join_targets,
+    get_max_line_length,
+    get_max_text_length,
+    group_joins,
+    group_targets,
+    index_channel_names,
+    JOIN_ERROR_EVENT_TYPES,
+    JOIN_TIMEOUT_SECONDS,
+    JoinPlan,
+    log_join_time,
+    log_startup_time,
+    NotConnectedError,
+    plan_joins,
+    SHUTDOWN_TIMEOUT_SECONDS,
+)
+from .ratelimit import get_line_cost, TokenBucket
+from .signals import irc_channel_joined
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAnnouncer(Announcer):
+    """An announcer that runs on an asyncio event loop."""
+
+    async def wait_until_ready(self) -> None:
+        """Wait until further messages can be announced right away."""
+
+    async def shutdown_async(self) -> None:
+        """Shut the announcer down."""
+        self.shutdown()
+
+
+class AioIrcAnnouncer(AsyncAnnouncer):
+    """An announcer that writes messages to IRC, on an asyncio event
+    loop.
+
+    Lines are put into an outbox which is emptied by a separate task,
+    as fast as the rate limit allows. Lines still in the outbox when
+    the connection drops are sent after reconnecting.
+    """
+
+    def __init__(
+        self,
+        server: IrcServer,
+        nickname: str,
+        realname: str,
+        commands: list[str],
+        channels: set[IrcChannel],
+        *,
+        join_timeout_seconds: float = JOIN_TIMEOUT_SECONDS,
+    ) -> None:
+        self.server = server
+        self.nickname = nickname
+        self.realname = realname
+        self.commands = commands
+        self.channels = channels
+        self.join_timeout_seconds = join_timeout_seconds
+        self.name = f'{nickname}@{server.host}:{server.port}'
+
+        self.state = ConnectionState.DISCONNECTED
+        self.stats = ConnectionStats()
+        self.recon = ReconnectBackoff()
+        self.bucket = _create_token_bucket(server)
+
+        self.connection: AioConnection | None = None
+        self._channel_names_to_join: set[str] = set()
+        self._joins_sent = False
+        self._get_first_channel_names: Callable[[], set[str]] = set
+        self._started_at: float | None = None
+        self._welcomed_at = 0.0
+        self._join_plan: JoinPlan | None = None
+        self._outbox: deque[str] = deque()
+        self._stopped = False
+        self._tasks: list[asyncio.Task] = []
+
+        self._registered = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self._outbox_filled = asyncio.Event()
+        self._outbox_emptied = asyncio.Event()
+        self._outbox_emptied.set()
+
+    @property
+    def channels(self) -> set[IrcChannel]:
+        return self._channels
+
+    @channels.setter
+    def channels(self, channels: set[IrcChannel]) -> None:
+        self._channels = channels
+        self._channel_names_by_folded_name = index_channel_names(channels)
+
+    def get_channel_name(self, channel_name: str) -> str:
+        """Return the channel's name as configured, as the server might
+        refer to it in a different case.
+        """
+        return self._channel_names_by_folded_name.get(
+            fold_channel_name(channel_name), channel_name
+        )
+
+    def start(self) -> None:
+        """Connect to the server, in tasks on the running event loop."""
+        reactor = AioReactor(loop=asyncio.get_running_loop())
+
+        connection = self.connection = reactor.server()
+        # Avoid `UnicodeDecodeError` on non-UTF-8 messages.
+        connection.buffer_class = LenientDecodingLineBuffer
+
+        connection.add_global_handler('welcome', self._on_welcome)
+        # Join after the server has advertised its limits (`ISUPPORT`),
+        # which it does after welcoming.
+        connection.add_global_handler('endofmotd', self._on_motd_end)
+        connection.add_global_handler('nomotd', self._on_motd_end)
+        connection.add_global_handler('join', self._on_join)
+        connection.add_global_handler('disconnect', self._on_disconnect)
+        connection.add_global_handler('nicknameinuse', self._on_nicknameinuse)
+        connection.add_global_handler('ctcp', self._on_ctcp)
+        for event_type in JOIN_ERROR_EVENT_TYPES:
+            connection.add_global_handler(event_type, self._on_join_error)
+
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._connect_forever(connection)),
+            asyncio.create_task(self._send_lines_forever(connection)),
+        ]
+
+    async def _connect_forever(self, connection: AioConnection) -> None:
+        """Connect, and reconnect whenever the connection drops."""
+        while not self._stopped:
+            logger.info(
+                'Connecting to IRC server %s:%d ...',
+                self.server.host,
+                self.server.port,
+            )
+            self._set_state(ConnectionState.CONNECTING)
+            self._disconnected.clear()
+
+            try:
+                await connection.connect(
+                    self.server.host,
+                    self.server.port,
+                    self.nickname,
+                    password=self.server.password,
+                    ircname=self.realname,
+                    connect_factory=AioFactory(ssl=self.server.ssl),
+                )
+            except OSError as exc:
+                logger.warning(
+                    'Could not connect to IRC server %s:%d: %s',
+                    self.server.host,
+                    self.server.port,
+                    exc,
+                )
+                self.stats.record_disconnect(time.monotonic())
+                self._set_state(ConnectionState.DISCONNECTED)
+            else:
+                await self._disconnected.wait()
+
+            if self._stopped:
+                break
+
+            delay = self.recon.get_delay()
+            self.recon.attempts += 1
+            logger.info('Reconnecting to IRC server in %.1f seconds ...', delay)
+            await asyncio.sleep(delay)
+
+    def _on_welcome(self, conn, event) -> None:
+        """Join channels after connect."""
+        logger.info(
+            'Connected to IRC server %s:%d.', self.server.host, self.server.port
+        )
+
+        self.recon.reset()
+
+        downtime = self.stats.record_reconnect(time.monotonic())
+        if downtime is not None:
+            logger.info(
+                'Reconnected to IRC server %s:%d after %.1f seconds '
+                '(%d reconnect(s) so far).',
+                self.server.host,
+                self.server.port,
+                downtime,
+                self.stats.reconnects,
+            )
+
+        self._welcomed_at = time.monotonic()
+        self._channel_names_to_join = set(self._channel_names_by_folded_name)
+        self._joins_sent = False
+        self._set_state(ConnectionState.JOINING)
+
+    def _on_motd_end(self, conn, event) -> None:
+        if self._joins_sent:
+            return
+        self._joins_sent = True
+
+        join_plan = plan_joins(
+            self.channels, conn.features, self._get_first_channel_names()
+        )
+        self._join_plan = join_plan
+
+        for channel in join_plan.skipped_channels:
+            logger.warning(
+                'Not joining channel %s, the server limits the number of '
+                'channels to be in.',
+                channel.name,
+            )
+            self._channel_names_to_join.discard(fold_channel_name(channel.name))
+
+        logger.info(
+            'Joining %d channel(s) with %d JOIN line(s) ...',
+            join_plan.channel_count,
+            len(join_plan.lines),
+        )
+
+        # Send commands and joins ahead of lines left over from before.
+        lines = list(self.commands) + join_plan.lines
+        self._outbox.extendleft(reversed(lines))
+        self._notify_outbox_filled()
+
+        self._registered.set()
+
+        # Do not wait forever for channels the server does not reply
+        # about (as expected).
+        asyncio.get_running_loop().call_later(
+            self.join_timeout_seconds,
+            self._on_join_timeout,
+            self._welcomed_at,
+        )
+
+        self._update_joining_state()
+
+    def _on_join(self, conn, event) -> None:
+        if event.source.nick != conn.get_nickname():
+            return
+
+        channel_name = self.get_channel_name(event.target)
+        logger.info('Joined IRC channel: %s', channel_name)
+        irc_channel_joined.send(channel_name=channel_name)
+        self._mark_channel_joined(channel_name)
+
+    def _on_join_error(self, conn, event) -> None:
+        # Do not wait for channels that cannot be joined.
+        if not event.arguments:
+            return
+
+        channel_name = event.arguments[0]
+        folded_channel_name = fold_channel_name(channel_name)
+        if folded_channel_name not in self._channel_names_to_join:
+            # Not about a channel being joined
+            return
+
+        logger.warning('Cannot join channel %s (%s).', channel_name, event.type)
+        self._mark_channel_joined(channel_name)
+
+    def _on_join_timeout(self, welcomed_at: float) -> None:
+        """Stop waiting for channels that have not been joined in time,
+        and announce to the others.
+        """
+        if welcomed_at != self._welcomed_at:
+            # Connected again in the meantime
+            return
+
+        channel_names = sorted(
+            self.get_channel_name(name) for name in self._channel_names_to_join
+        )
+        self._channel_names_to_join.clear()
+
+        if channel_names:
+            logger.warning(
+                'Channel(s) %s not joined within %.1f seconds.',
+                ', '.join(channel_names),
+                self.join_timeout_seconds,
+            )
+        self._update_joining_state()
+
+    def _mark_channel_joined(self, channel_name: str) -> None:
+        self._channel_names_to_join.discard(fold_channel_name(channel_name))
+        self._update_joining_state()
+
+    def _update_joining_state(self) -> None:
+        if (
+            self._joins_sent
+            and not self._channel_names_to_join
+            and self.state == ConnectionState.JOINING
+        ):
+            self._set_state(ConnectionState.CONNECTED)
+            self._report_join_time()
+
+    def _report_join_time(self) -> None:
+        now = time.monotonic()
+        self.stats.join_seconds = now - self._welcomed_at
+        log_join_time(self._join_plan, self.stats.join_seconds)
+
+        if self._started_at is not None:
+            log_startup_time(now - self._started_at)
+            # Only report this once, not after reconnects.
+            self._started_at = None
+
+    def _on_nicknameinuse(self, conn, event) -> None:
+        """Choose another nickname if conflicting."""
+        self.nickname += '_'
+        conn.nick(self.nickname)
+
+    def _on_ctcp(self, conn, event) -> None:
+        if event.arguments and event.arguments[0] == 'VERSION':
+            conn.ctcp_reply(event.source.nick, 'VERSION Weitersager')
+
+    def _on_disconnect(self, conn, event) -> None:
+        if self.state == ConnectionState.CONNECTED:
+            logger.warning(
+                'Disconnected from IRC server %s:%d.',
+                self.server.host,
+                self.server.port,
+            )
+
+        self.stats.record_disconnect(time.monotonic())
+        self._registered.clear()
+        self._set_state(ConnectionState.DISCONNECTED)
+        self._disconnected.set()
+
+    def _set_state(self, state: ConnectionState) -> None:
+        self.state = state
+
+        if state == ConnectionState.CONNECTED:
+            self._connected.set()
+        else:
+            self._connected.clear()
+
+    def announce(self, channel_name: str, text: str) -> None:
+        """Announce a message.
+
+        Raise `NotConnectedError` if the connection is down.
+        """
+        self._put_privmsg(channel_name, text)
+
+    def announce_to_channels(self, channel_names: list[str], text: str) -> None:
+        """Announce a message to multiple channels, with as few lines as
+        the server allows.
+
+        Raise `NotConnectedError` if the connection is down.
+        """
+        max_targets = self._get_max_privmsg_targets()
+
+        for targets in group_targets(channel_names, text, max_targets):
+            self._put_privmsg(','.join(targets), text)
+
+    def _get_max_privmsg_targets(self) -> int | None:
+        """Return the maximum number of targets per `PRIVMSG` command
+        (`None` for no limit) the server advertises.
+        """
+        features = self._get_features()
+
+        targmax = getattr(features, 'targmax', None)
+        if isinstance(targmax, dict) and 'PRIVMSG' in targmax:
+            return targmax['PRIVMSG']
+
+        maxtargets = getattr(features, 'maxtargets', None)
+        if isinstance(maxtargets, int):
+            return maxtargets
+
+        # Without advertised support, send to one target per line.
+        return 1
+
+    def _get_features(self) -> Any:
+        """Return the features the server advertises (`None` before
+        starting).
+        """
+        if self.connection is None:
+            return None
+
+        return self.connection.features
+
+    def _put_privmsg(self, target: str, text: str) -> None:
+        if self.state != ConnectionState.CONNECTED:
+            raise NotConnectedError
+
+        self._outbox.append(f'PRIVMSG {target} :{text}')
+        self._notify_outbox_filled()
+
+    def _notify_outbox_filled(self) -> None:
+        if self._outbox:
+            self._outbox_emptied.clear()
+            self._outbox_filled.set()
+
+    async def _send_lines_forever(self, connection: AioConnection) -> None:
+        """Send lines from the outbox, as fast as the rate limit allows."""
+        while True:
+            await self._outbox_filled.wait()
+            await self._registered.wait()
+
+            if self.bucket is not None:
+                cost = get_line_cost(
+                    self._outbox[0], self.server.rate_limit_bytes_per_token
+                )
+                delay = self.bucket.reserve(cost)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if not self._registered.is_set():
+                # Disconnected while waiting, keep the line.
+                continue
+
+            line = self._outbox.popleft()
+            try:
+                connection.send_raw(line)
+            except (InvalidCharacters, MessageTooLong):
+                logger.exception('Could not send line, dropped it: %r', line)
+
+            if not self._outbox:
+                self._outbox_filled.clear()
+                self._outbox_emptied.set()
+
+    def get_max_text_length(self, channel_name: str) -> int:
+        """Return the maximum length, in bytes, of text that can be
+        announced to the channel at once.
+        """
+        return get_max_text_length(self.nickname, channel_name)
+
+    def update_channels(self, channels: set[IrcChannel]) -> None:
+        """Join channels that have been added, and part those that have
+        been removed.
+
+        If disconnected, channels are joined after reconnecting.
+        """
+        old_channel_names = {channel.name for channel in self.channels}
+        new_channel_names = {channel.name for channel in channels}
+        self.channels = channels
+
+        if not self._registered.is_set():
+            return
+
+        channels_to_join = [
+            channel
+            for channel in sorted(channels)
+            if channel.name not in old_channel_names
+        ]
+        if channels_to_join:
+            logger.info(
+                'Joining channel(s) %s ...',
+                ', '.join(channel.name for channel in channels_to_join),
+            )
+            self._outbox.extend(
+                group_joins(
+                    channels_to_join,
+                    get_max_join_targets(self._get_features()),
+                    get_max_line_length(self._get_features()),
+                )
+            )
+
+        for channel_name in sorted(old_channel_names - new_channel_names):
+            logger.info('Parting channel %s ...', channel_name)
+            self._outbox.append(f'PART {channel_name}')
+
+        self._notify_outbox_filled()
+
+    def join_channel(self, channel: IrcChannel) -> None:
+        """Join the channel in addition to the others (and again after
+        reconnecting).
+        """
+        self.update_channels(self.channels | {channel})
+
+    def part_channel(self, channel_name: str) -> None:
+        """Part the channel (and do not join it again after
+        reconnecting).
+        """
+        self.update_channels(
+            {
+                channel
+                for channel in self.channels
+                if channel.name != channel_name
+            }
+        )
+
+    def update_rate_limit(self, server: IrcServer) -> None:
+        """Apply the server's (changed) send rate limit."""
+        self.server = server
+        self.bucket = _create_token_bucket(server)
+        _log_rate_limit(server)
+
+    def set_join_priority(
+        self, get_channel_names: Callable[[], set[str]]
+    ) -> None:
+        """Have the channels whose names the function returns (e.g.
+        those with messages waiting to be announced) joined first.
+        """
+        self._get_first_channel_names = get_channel_names
+
+    def wait_until_connected(
+        self, timeout_seconds: float | None = None
+    ) -> bool:
+        """Return whether connected to the server and channels have
+        been (re)joined.
+
+        Does not block the event loop; use `wait_until_ready` to wait.
+        """
+        return self.state == ConnectionState.CONNECTED
+
+    async def wait_until_ready(self) -> None:
+        """Wait until connected and the outbox has been emptied."""
+        await self._connected.wait()
+        await self._outbox_emptied.wait()
+
+    def get_connection_stats(self) -> dict[str, ConnectionStats]:
+        """Return reconnects and downtime of the connection."""
+        return {self.name: self.stats}
+
+    def get_connection_states(self) -> dict[str, ConnectionState]:
+        """Return the state of the connection."""
+        return {self.name: self.state}
+
+    def shutdown(self) -> None:
+        """Shut the announcer down."""
+        self._stopped = True
+
+        for task in self._tasks:
+            task.cancel()
+
+        if self.connection is not None and self.connection.is_connected():
+            self.connection.disconnect('Bye.')
+
+    async def shutdown_async(self) -> None:
+        """Send lines left in the outbox (for a limited time), then
+        shut the announcer down.
+        """
+        if self._registered.is_set():
+            try:
+                await asyncio.wait_for(
+                    self._outbox_emptied.wait(), SHUTDOWN_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    'Dropped %d unsent line(s) on shutdown.', len(self._outbox)
+                )
+
+        self.shutdown()
+
+
+class AioDummyAnnouncer(DummyAnnouncer, AsyncAnnouncer):
+    """An announcer that writes messages to STDOUT, on an asyncio event
+    loop.
+    """
+
+
+def _create_token_bucket(server: IrcServer) -> TokenBucket | None:
+    rate_limit = server.rate_limit
+    if rate_limit is None:
+        return None
+
+    return TokenBucket(rate_limit, server.rate_limit_burst or 1)
+
+
+def create_async_announcer(config: IrcConfig) -> AsyncAnnouncer:
+    """Create an announcer for the asyncio runtime.
+
+    Only a single connection to a single server is supported.
+    """
+    if config.networks:
+        raise ConfigurationError(
+            'Multiple IRC networks are not supported by the asyncio runtime.'
+        )
+
+    server = config.server
+    if server is None:
+        logger.info('No IRC server specified; will write to STDOUT instead.')
+        return AioDummyAnnouncer(get_channels_to_join_at_start(config))
+
+    if server.connections > 1:
+        raise ConfigurationError(
+            'Multiple IRC server connections are not supported by the '
+            'asyncio runtime.'
+        )
+
+    _log_rate_limit(server)
+
+    return AioIrcAnnouncer(
+        server,
+        config.nickname,
+        config.realname,
+        config.commands,
+        get_channels_to_join_at_start(config),
+    )
+
+
+def _log_rate_limit(server: IrcServer) -> None:
+    if server.rate_limit is None:
+        logger.info('No IRC send rate limit set.')
+    else:
+        logger.info(
+            'IRC send rate limit set to %.2f messages per second, '
+            'with bursts of up to %d messages.',
+            server.rate_limit,
+            server.rate_limit_burst or 1,
+        )
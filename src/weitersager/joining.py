@@ -0,0 +1,110 @@
+"""
+weitersager.joining
+~~~~~~~~~~~~~~~~~~~
+
+Join channels on demand, and part them when idle
+
+Instead of joining all configured channels right after connecting, a
+channel can be joined once the first message for it is to be announced
+(with messages held until then). Channels that have not been announced
+to for a while can be parted again, so that only the working set of
+active channels stays joined.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+import time
+from typing import Callable
+
+from .config import IrcChannel, IrcConfig, qualify_channel_name
+
+
+class ActiveChannels:
+    """Channels joined on demand, least recently used first.
+
+    As channels are kept in order of use, idle ones are found without
+    looking at those still in use.
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+
+        self._used_at_by_channel: OrderedDict[str, float] = OrderedDict()
+
+    def __contains__(self, channel_name: str) -> bool:
+        return channel_name in self._used_at_by_channel
+
+    def __len__(self) -> int:
+        return len(self._used_at_by_channel)
+
+    def touch(self, channel_name: str) -> bool:
+        """Record the channel as used just now.
+
+        Return `True` if it has not been active before (and thus is to
+        be joined).
+        """
+        is_new = channel_name not in self._used_at_by_channel
+        self._used_at_by_channel[channel_name] = self._clock()
+        self._used_at_by_channel.move_to_end(channel_name)
+        return is_new
+
+    def discard(self, channel_name: str) -> None:
+        """Stop tracking the channel, if it is."""
+        self._used_at_by_channel.pop(channel_name, None)
+
+    def remove_idle(self) -> list[str]:
+        """Return and stop tracking the channels that have not been used
+        for the idle time, least recently used first.
+        """
+        if self.idle_seconds is None:
+            return []
+
+        idle_before = self._clock() - self.idle_seconds
+
+        channel_names = []
+
+        while self._used_at_by_channel:
+            channel_name, used_at = next(iter(self._used_at_by_channel.items()))
+            if used_at > idle_before:
+                break
+
+            del self._used_at_by_channel[channel_name]
+            channel_names.append(channel_name)
+
+        return channel_names
+
+    def get_seconds_until_idle(self) -> float | None:
+        """Return the time until the least recently used channel becomes
+        idle, or `None` if no channel will.
+        """
+        if self.idle_seconds is None or not self._used_at_by_channel:
+            return None
+
+        used_at = next(iter(self._used_at_by_channel.values()))
+        return max(0.0, used_at + self.idle_seconds - self._clock())
+
+
+def get_channels_by_name(config: IrcConfig) -> dict[str, IrcChannel]:
+    """Return the configured channels by the names they are addressed
+    by internally.
+
+    Names of channels of additional networks are qualified with the
+    network name.
+    """
+    channels_by_name = {channel.name: channel for channel in config.channels}
+
+    for network in config.networks:
+        for channel in network.channels:
+            name = qualify_channel_name(network.name, channel.name)
+            channels_by_name[name] = IrcChannel(name, channel.password)
+
+    return channels_by_name
@@ -0,0 +1,295 @@
+"""
+weitersager.journal
+~~~~~~~~~~~~~~~~~~~
+
+Append-only journal to keep queued messages across restarts
+
+Records are appended to segment files. A record either stores a
+message (put) or marks a message as delivered (acknowledgement).
+Segments that only contain delivered messages are removed.
+
+Appending a record only writes it to the operating system. `sync`
+makes all records appended so far durable. Threads calling `sync`
+concurrently share a single `fsync` call (group commit).
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import logging
+import os
+from pathlib import Path
+import struct
+from threading import Condition, Lock
+import zlib
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024  # bytes
+
+SEGMENT_FILENAME_SUFFIX = '.log'
+
+RECORD_TYPE_PUT = 1
+RECORD_TYPE_ACK = 2
+
+# type, sequence number, payload length, checksum
+RECORD_HEADER = struct.Struct('>BQII')
+
+
+class Journal:
+    """A segmented, append-only journal."""
+
+    def __init__(
+        self, path: Path, *, segment_size: int = DEFAULT_SEGMENT_SIZE
+    ) -> None:
+        self.path = path
+        self.segment_size = segment_size
+
+        self._lock = Lock()
+        self._synced = Condition(self._lock)
+
+        # Sequence numbers of undelivered messages, per segment number
+        self._pending_by_segment: dict[int, set[int]] = {}
+        self._segment_by_seq: dict[int, int] = {}
+
+        self._next_seq = 1
+        self._segment_number = 0
+        self._fd = -1
+        self._segment_bytes = 0
+
+        # Records are counted to tell which of them are durable.
+        self._appended_count = 0
+        self._synced_count = 0
+        self._syncing = False
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.recovered_records = self._recover()
+        self._open_segment(self._segment_number + 1)
+
+    # recovery
+
+    def _recover(self) -> list[tuple[int, bytes]]:
+        """Read existing segments, return undelivered messages."""
+        payloads_by_seq: dict[int, bytes] = {}
+
+        for segment_number, segment_path in self._list_segments():
+            self._segment_number = segment_number
+            self._pending_by_segment[segment_number] = set()
+
+            for record_type, seq, payload in _read_records(segment_path):
+                if record_type == RECORD_TYPE_PUT:
+                    payloads_by_seq[seq] = payload
+                    self._add_pending(segment_number, seq)
+                    self._next_seq = max(self._next_seq, seq + 1)
+                elif record_type == RECORD_TYPE_ACK:
+                    payloads_by_seq.pop(seq, None)
+                    self._remove_pending(seq)
+
+        self._remove_delivered_segments()
+
+        if payloads_by_seq:
+            logger.info(
+                'Recovered %d undelivered messages from journal.',
+                len(payloads_by_seq),
+            )
+
+        return sorted(payloads_by_seq.items())
+
+    def _list_segments(self) -> list[tuple[int, Path]]:
+        segments = []
+
+        for segment_path in self.path.glob(f'*{SEGMENT_FILENAME_SUFFIX}'):
+            try:
+                segment_number = int(segment_path.stem)
+            except ValueError:
+                continue
+
+            segments.append((segment_number, segment_path))
+
+        return sorted(segments)
+
+    # writing
+
+    def append(self, payload: bytes) -> int:
+        """Append a message, return its sequence number.
+
+        The record is not durable before `sync` has been called.
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+
+            self._write_record(RECORD_TYPE_PUT, seq, payload)
+            self._add_pending(self._segment_number, seq)
+
+            return seq
+
+    def ack(self, seq: int) -> None:
+        """Mark a message as delivered.
+
+        The acknowledgement becomes durable with the next `sync`. Until
+        then, the message might be recovered (and delivered) again.
+        """
+        with self._lock:
+            if seq not in self._segment_by_seq:
+                return
+
+            self._write_record(RECORD_TYPE_ACK, seq, b'')
+            self._remove_pending(seq)
+            self._remove_delivered_segments()
+
+    def sync(self) -> None:
+        """Make all records appended so far durable."""
+        with self._lock:
+            target_count = self._appended_count
+
+            while self._synced_count < target_count:
+                if not self._syncing:
+                    break
+
+                # Another thread is syncing. Its sync might cover the
+                # records of this thread, too.
+                self._synced.wait()
+            else:
+                return
+
+            self._syncing = True
+            fd = self._fd
+            sync_count = self._appended_count
+
+        try:
+            os.fsync(fd)
+        finally:
+            with self._lock:
+                self._syncing = False
+                self._synced_count = max(self._synced_count, sync_count)
+                self._synced.notify_all()
+
+    def close(self) -> None:
+        """Make all records durable and close the journal."""
+        self.sync()
+
+        with self._lock:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _write_record(self, record_type: int, seq: int, payload: bytes) -> None:
+        if self._segment_bytes >= self.segment_size:
+            self._roll_segment()
+
+        checksum = _calculate_checksum(record_type, seq, payload)
+        header = RECORD_HEADER.pack(record_type, seq, len(payload), checksum)
+        data = header + payload
+
+        os.write(self._fd, data)
+
+        self._segment_bytes += len(data)
+        self._appended_count += 1
+
+    def _roll_segment(self) -> None:
+        """Continue with a new segment.
+
+        Must be called with the lock held.
+        """
+        # Do not close the file while another thread syncs it.
+        while self._syncing:
+            self._synced.wait()
+
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._synced_count = self._appended_count
+
+        self._open_segment(self._segment_number + 1)
+
+    def _open_segment(self, segment_number: int) -> None:
+        segment_path = self._get_segment_path(segment_number)
+        self._fd = os.open(
+            segment_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600
+        )
+        _sync_directory(self.path)
+
+        self._segment_number = segment_number
+        self._segment_bytes = 0
+        self._pending_by_segment[segment_number] = set()
+
+    # compaction
+
+    def _add_pending(self, segment_number: int, seq: int) -> None:
+        self._pending_by_segment[segment_number].add(seq)
+        self._segment_by_seq[seq] = segment_number
+
+    def _remove_pending(self, seq: int) -> None:
+        segment_number = self._segment_by_seq.pop(seq, None)
+        if segment_number is not None:
+            self._pending_by_segment[segment_number].discard(seq)
+
+    def _remove_delivered_segments(self) -> None:
+        """Remove the oldest segments as long as all their messages have
+        been delivered.
+
+        Segments are removed oldest first so that acknowledgements are
+        never removed before the messages they refer to.
+        """
+        for segment_number in sorted(self._pending_by_segment):
+            if segment_number == self._segment_number:
+                break
+
+            if self._pending_by_segment[segment_number]:
+                break
+
+            self._get_segment_path(segment_number).unlink(missing_ok=True)
+            del self._pending_by_segment[segment_number]
+
+    def _get_segment_path(self, segment_number: int) -> Path:
+        return self.path / f'{segment_number:010d}{SEGMENT_FILENAME_SUFFIX}'
+
+
+def _read_records(segment_path: Path):
+    """Yield the records of a segment.
+
+    Stop at the first incomplete or corrupt record, which is what a
+    crash during a write leaves behind.
+    """
+    data = segment_path.read_bytes()
+    offset = 0
+
+    while offset + RECORD_HEADER.size <= len(data):
+        record_type, seq, length, checksum = RECORD_HEADER.unpack_from(
+            data, offset
+        )
+        start = offset + RECORD_HEADER.size
+        end = start + length
+        payload = data[start:end]
+
+        if len(payload) < length or checksum != _calculate_checksum(
+            record_type, seq, payload
+        ):
+            break
+
+        yield record_type, seq, payload
+
+        offset = end
+
+    if offset < len(data):
+        logger.warning(
+            'Ignoring %d bytes of incomplete or corrupt data at the end '
+            'of journal segment %s.',
+            len(data) - offset,
+            segment_path,
+        )
+
+
+def _calculate_checksum(record_type: int, seq: int, payload: bytes) -> int:
+    return zlib.crc32(payload, zlib.crc32(struct.pack('>BQ', record_type, seq)))
+
+
+def _sync_directory(path: Path) -> None:
+    """Make the creation of files in the directory durable."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,211 @@
+"""
+weitersager.log
+~~~~~~~~~~~~~~~
+
+Logging
+
+Log records can be handed over to a background thread through a queue,
+so that threads handling requests and messages do not block on writing
+to STDERR (which can be slow, e.g. with some Docker log drivers).
+
+Records of events that happen for every single message (receiving,
+dropping, holding it, etc.) are logged via a logger of their own. They
+can be sampled and rate-limited to keep them from drowning out
+everything else under load.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import atexit
+from datetime import datetime, timezone
+import json
+import logging
+from logging import Filter, Formatter, Handler, LogRecord, StreamHandler
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+import random
+from threading import Lock
+import time
+from typing import Callable, TextIO
+
+from .config import LogConfig
+from .ratelimit import TokenBucket
+
+
+# Name of the logger for events that happen for every single message
+MESSAGE_LOGGER_NAME = 'weitersager.messages'
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-8s %(message)s'
+
+# How often to report the number of suppressed per-message records
+SUPPRESSED_REPORT_INTERVAL_SECONDS = 60.0
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_message_logger() -> logging.Logger:
+    """Return the logger for events that happen for every message."""
+    return logging.getLogger(MESSAGE_LOGGER_NAME)
+
+
+def configure_logging(
+    level: str,
+    config: LogConfig | None = None,
+    *,
+    stream: TextIO | None = None,
+) -> QueueListener | None:
+    """Configure application-specific loggers.
+
+    Setting the log level does not affect dependencies' loggers.
+
+    Return the listener that writes queued records, if any.
+    """
+    if config is None:
+        config = LogConfig()
+
+    # Get the parent logger of all application-specific
+    # loggers defined in the package's modules.
+    pkg_logger = logging.getLogger(__package__)
+
+    # Configure handler that writes to STDERR (or the given stream).
+    handler: Handler = StreamHandler(stream)
+    handler.setFormatter(_create_formatter(config.format))
+
+    listener = None
+    if config.queue:
+        queue: SimpleQueue[LogRecord] = SimpleQueue()
+        listener = QueueListener(queue, handler)
+        listener.start()
+        # Write records still queued on exit.
+        atexit.register(listener.stop)
+        handler = NonBlockingQueueHandler(queue)
+
+    pkg_logger.addHandler(handler)
+    pkg_logger.setLevel(level)
+
+    message_filter = _create_message_filter(config)
+    if message_filter is not None:
+        get_message_logger().addFilter(message_filter)
+
+    return listener
+
+
+def _create_formatter(format_name: str) -> Formatter:
+    if format_name == 'json':
+        return JsonFormatter()
+
+    return Formatter(TEXT_FORMAT)
+
+
+def _create_message_filter(config: LogConfig) -> MessageLogFilter | None:
+    if config.message_sample_rate >= 1.0 and config.message_rate_limit is None:
+        return None
+
+    return MessageLogFilter(
+        sample_rate=config.message_sample_rate,
+        rate_limit=config.message_rate_limit,
+    )
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Put records into a queue, for a listener to format and write
+    them in a thread of its own.
+
+    Unlike its base class, this handler does not format the record
+    before putting it into the queue, so that the logging thread only
+    pays for creating the record and enqueueing it. The queue does not
+    leave the process, so the record does not have to be made
+    picklable.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        return record
+
+
+class JsonFormatter(Formatter):
+    """Format a record as a single line of JSON."""
+
+    def format(self, record: LogRecord) -> str:
+        data = {
+            'time': _format_timestamp(record.created),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(data, ensure_ascii=False)
+
+
+def _format_timestamp(timestamp: float) -> str:
+    dt = datetime.fromtimestamp(timestamp, timezone.utc)
+    return dt.isoformat(timespec='milliseconds')
+
+
+class MessageLogFilter(Filter):
+    """Let through a sample of records, up to a number per second.
+
+    Regularly log how many records have been suppressed.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: float = 1.0,
+        rate_limit: float | None = None,
+        random_func: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._random_func = random_func
+        self._clock = clock
+
+        self._bucket = (
+            TokenBucket(rate_limit, max(rate_limit, 1.0), clock=clock)
+            if rate_limit is not None
+            else None
+        )
+
+        self._lock = Lock()
+        self.suppressed = 0
+        self._reported_at = clock()
+
+    def filter(self, record: LogRecord) -> bool:
+        if self._accept():
+            return True
+
+        with self._lock:
+            self.suppressed += 1
+
+        self._report_suppressed()
+        return False
+
+    def _accept(self) -> bool:
+        if self.sample_rate < 1.0 and self._random_func() >= self.sample_rate:
+            return False
+
+        return self._bucket is None or self._bucket.take()
+
+    def _report_suppressed(self) -> None:
+        now = self._clock()
+
+        with self._lock:
+            elapsed = now - self._reported_at
+            if elapsed < SUPPRESSED_REPORT_INTERVAL_SECONDS:
+                return
+
+            suppressed = self.suppressed
+            self.suppressed = 0
+            self._reported_at = now
+
+        logger.info(
+            'Suppressed %d per-message log record(s) in the last %.0f seconds.',
+            suppressed,
+            elapsed,
+        )
@@ -0,0 +1,29 @@
+"""
+weitersager.message
+~~~~~~~~~~~~~~~~~~~
+
+Messages
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from typing import NamedTuple
+
+from .tracing import Trace
+
+
+DEFAULT_PRIORITY = 0
+
+
+class Message(NamedTuple):
+    """A message to announce.
+
+    Messages with a higher priority are sent first.
+    """
+
+    channel_name: str
+    text: str
+    priority: int = DEFAULT_PRIORITY
+    trace: Trace | None = None
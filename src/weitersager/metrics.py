@@ -0,0 +1,284 @@
+"""
+weitersager.metrics
+~~~~~~~~~~~~~~~~~~~
+
+Metrics, in the Prometheus text exposition format
+
+Counters and histograms are updated on the hot path (for every request
+and message) from multiple threads. To avoid taking a lock for every
+update, each thread updates values of its own, which are only summed
+up when the metrics are rendered.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+import math
+from threading import local, Lock
+from typing import Callable
+
+
+# Upper bounds, in seconds, of the buckets of the delivery latency
+# histogram
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LabelValues = tuple[str, ...]
+
+# Channel label value of messages for channels that are not configured.
+# Their names come from requests, so labeling each of them separately
+# would let the number of series grow without bounds.
+OTHER_CHANNELS_LABEL_VALUE = '(other)'
+
+# A sample: name suffix, label names and values, value
+Sample = tuple[str, dict[str, str], float]
+
+
+class _PerThreadValues:
+    """Values, updated by each thread without locking, to be merged
+    for reading.
+    """
+
+    def __init__(self, create_values: Callable[[], dict]) -> None:
+        self._create_values = create_values
+        self._local = local()
+        self._lock = Lock()
+        self._values_of_threads: list[dict] = []
+
+    def get(self) -> dict:
+        """Return the values of the current thread."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._create_values()
+            self._local.values = values
+            with self._lock:
+                self._values_of_threads.append(values)
+            return values
+
+    def get_all(self) -> list[dict]:
+        """Return copies of the values of all threads."""
+        with self._lock:
+            values_of_threads = list(self._values_of_threads)
+
+        return [dict(values) for values in values_of_threads]
+
+
+class Counter:
+    """A value that only goes up."""
+
+    type_name = 'counter'
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = _PerThreadValues(dict)
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        values = self._values.get()
+        values[label_values] = values.get(label_values, 0) + amount
+
+    def get_value(self, *label_values: str) -> float:
+        return sum(
+            values.get(label_values, 0) for values in self._values.get_all()
+        )
+
+    def collect(self) -> Iterator[Sample]:
+        totals: dict[LabelValues, float] = {}
+        for values in self._values.get_all():
+            for label_values, value in values.items():
+                totals[label_values] = totals.get(label_values, 0) + value
+
+        for label_values, value in sorted(totals.items()):
+            yield '', dict(zip(self.label_names, label_values)), value
+
+
+class Gauge:
+    """A value that can go up and down, obtained when collected."""
+
+    type_name = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        get_values: Callable[[], dict[LabelValues, float]],
+        label_names: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._get_values = get_values
+
+    def collect(self) -> Iterator[Sample]:
+        for label_values, value in sorted(self._get_values().items()):
+            yield '', dict(zip(self.label_names, label_values)), value
+
+
+class CallbackCounter(Gauge):
+    """A value that only goes up, obtained when collected."""
+
+    type_name = 'counter'
+
+
+class Histogram:
+    """Observed values, counted in buckets."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = ()
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._values = _PerThreadValues(self._create_values)
+
+    def _create_values(self) -> dict[int | str, float]:
+        # Counts by bucket index, and the sum of observed values
+        values: dict[int | str, float] = {
+            index: 0 for index in range(len(self.buckets))
+        }
+        values['sum'] = 0.0
+        return values
+
+    def observe(self, value: float) -> None:
+        values = self._values.get()
+        values[bisect_left(self.buckets, value)] += 1
+        values['sum'] += value
+
+    def collect(self) -> Iterator[Sample]:
+        values_of_threads = self._values.get_all()
+
+        cumulative_count = 0
+        for index, upper_bound in enumerate(self.buckets):
+            cumulative_count += sum(v[index] for v in values_of_threads)
+            labels = {'le': _format_value(upper_bound)}
+            yield '_bucket', labels, cumulative_count
+
+        yield '_sum', {}, sum(v['sum'] for v in values_of_threads)
+        yield '_count', {}, cumulative_count
+
+
+class Registry:
+    """A collection of metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            for suffix, labels, value in metric.collect():
+                lines.append(
+                    f'{metric.name}{suffix}{_format_labels(labels)} '
+                    f'{_format_value(value)}'
+                )
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+
+    pairs = ','.join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+class Metrics:
+    """The metrics of an instance."""
+
+    def __init__(self) -> None:
+        self.registry = Registry()
+
+        self.messages_received = self.registry.register(
+            Counter(
+                'weitersager_messages_received_total',
+                'Messages received.',
+            )
+        )
+        self.messages_rejected = self.registry.register(
+            Counter(
+                'weitersager_messages_rejected_total',
+                'Messages rejected, by HTTP status code.',
+                ['status'],
+            )
+        )
+        self.messages_delivered = self.registry.register(
+            Counter(
+                'weitersager_messages_delivered_total',
+                'Messages sent to IRC.',
+            )
+        )
+        self.messages_dropped = self.registry.register(
+            Counter(
+                'weitersager_messages_dropped_total',
+                'Messages dropped, by (configured) channel and reason.',
+                ['channel', 'reason'],
+            )
+        )
+        self.delivery_latency = self.registry.register(
+            Histogram(
+                'weitersager_message_delivery_seconds',
+                'Time from receiving a message until sending it to IRC.',
+            )
+        )
+
+    def register(self, metric):
+        """Register an additional metric."""
+        return self.registry.register(metric)
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -0,0 +1,138 @@
+"""
+weitersager.packing
+~~~~~~~~~~~~~~~~~~~
+
+Pack multiple messages for the same channel into a single line
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+import time
+from typing import Callable
+
+from .message import Message
+
+
+DEFAULT_SEPARATOR = ' | '
+
+
+@dataclass
+class PackedLine:
+    """Texts of one or more messages, joined into a single line."""
+
+    channel_name: str
+    texts: list[str] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=list)
+    length: int = 0  # bytes
+    due_at: float = 0.0
+
+    def join(self, separator: str) -> str:
+        return separator.join(self.texts)
+
+
+class Packer:
+    """Collect texts per channel and join them into as few lines as fit
+    the maximum length.
+
+    A line is ready to be sent as soon as no further text fits into it,
+    or once the linger time since its first text has passed.
+    """
+
+    def __init__(
+        self,
+        get_max_length: Callable[[str], int],
+        *,
+        separator: str = DEFAULT_SEPARATOR,
+        linger_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._get_max_length = get_max_length
+        self.separator = separator
+        self._separator_length = len(separator.encode('utf-8'))
+        self.linger_seconds = linger_seconds
+        self._clock = clock
+
+        # Ordered by time of the first text, and thus by due time
+        self._lines_by_channel: dict[str, PackedLine] = {}
+
+    def add(self, message: Message, text: str) -> list[PackedLine]:
+        """Add the text of a message to its channel's line.
+
+        Return lines that are ready to be sent.
+        """
+        channel_name = message.channel_name
+        max_length = self._get_max_length(channel_name)
+        text_length = len(text.encode('utf-8'))
+
+        ready_lines = []
+
+        line = self._lines_by_channel.get(channel_name)
+        if (
+            line is not None
+            and line.length + self._separator_length + text_length > max_length
+        ):
+            ready_lines.append(self._lines_by_channel.pop(channel_name))
+            line = None
+
+        if line is None:
+            line = PackedLine(
+                channel_name, due_at=self._clock() + self.linger_seconds
+            )
+            self._lines_by_channel[channel_name] = line
+        else:
+            line.length += self._separator_length
+
+        line.texts.append(text)
+        line.messages.append(message)
+        line.length += text_length
+
+        if line.length + self._separator_length >= max_length:
+            # Nothing else fits.
+            ready_lines.append(self._lines_by_channel.pop(channel_name))
+
+        return ready_lines
+
+    def pop_due_lines(
+        self, has_more_texts: Callable[[str], bool] | None = None
+    ) -> list[PackedLine]:
+        """Return lines whose linger time has passed.
+
+        Keep the lines of channels for which the function (if given)
+        reports more texts to be added soon.
+        """
+        now = self._clock()
+
+        due_lines = [
+            line
+            for line in self._lines_by_channel.values()
+            if line.due_at <= now
+            and (
+                has_more_texts is None or not has_more_texts(line.channel_name)
+            )
+        ]
+
+        for line in due_lines:
+            del self._lines_by_channel[line.channel_name]
+
+        return due_lines
+
+    def pop_all_lines(self) -> list[PackedLine]:
+        """Return all lines, regardless of their linger time."""
+        lines = list(self._lines_by_channel.values())
+        self._lines_by_channel.clear()
+        return lines
+
+    def get_seconds_until_due(self) -> float | None:
+        """Return the time until the next line is due, or `None` if no
+        line is pending.
+        """
+        if not self._lines_by_channel:
+            return None
+
+        next_due_at = min(
+            line.due_at for line in self._lines_by_channel.values()
+        )
+        return max(0.0, next_due_at - self._clock())
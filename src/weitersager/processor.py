@@ -9,30 +9,180 @@ Connect HTTP server and IRC bot.
 """
 
 from __future__ import annotations
+from collections import deque
+from functools import partial
 import logging
-from queue import SimpleQueue
+from pathlib import Path
+from queue import Empty, Full
+import signal
+from threading import Lock
+import time
 from typing import Any
 
-from .config import Config
-from .http import start_receive_server
-from .irc import create_announcer
+from .coalescing import Coalescer, format_repeated_text
+from .config import Config, IrcConfig, load_config, QueueConfig
+from .connection import ConnectionState
+from .holding import HeldLine, HoldingBuffer
+from .http import Application, start_receive_server
+from .irc import Announcer, create_announcer, NotConnectedError
+from .joining import ActiveChannels, get_channels_by_name
+from .log import get_message_logger
+from .message import DEFAULT_PRIORITY, Message
+from .metrics import (
+    CallbackCounter,
+    Gauge,
+    LabelValues,
+    Metrics,
+    OTHER_CHANNELS_LABEL_VALUE,
+)
+from .packing import PackedLine, Packer
+from .queues import (
+    create_message_queue,
+    estimate_drain_seconds,
+    MessageQueue,
+    QueueFullError,
+)
+from .reload import apply_reloadable_settings, diff_configs
 from .signals import irc_channel_joined, message_received
+from .tokenstore import ChannelTokenIndex, open_token_index
+from .tracing import Tracer
+from .util import start_thread
 
 
 logger = logging.getLogger(__name__)
+message_logger = get_message_logger()
+
+
+# How often to check held messages for expiry, and for channels that
+# have been joined in the meantime
+HOLD_CHECK_INTERVAL_SECONDS = 1.0
+
+# How long to hold messages for channels being joined on demand, unless
+# configured otherwise
+DEFAULT_ON_DEMAND_HOLD_TTL_SECONDS = 60.0
 
 
 class Processor:
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self, config: Config, *, announcer: Announcer | None = None
+    ) -> None:
         self.config = config
-        self.announcer = create_announcer(config.irc)
+        self.announcer = (
+            announcer if announcer is not None else create_announcer(config.irc)
+        )
         self.enabled_channel_names: set[str] = set()
-        self.message_queue: SimpleQueue = SimpleQueue()
+        self.message_queue: MessageQueue = create_message_queue(config.queue)
+        self.coalescer = _create_coalescer(config.queue)
+        self.packer = _create_packer(config.queue, self.announcer)
+        self.holding_buffer = _create_holding_buffer(config)
+        # Joined channels whose held messages are to be released
+        self._channel_names_to_release: deque[str] = deque()
+        # Channels joined on demand (if configured to)
+        self.active_channels = _create_active_channels(config.irc)
+        self._channels_by_name = get_channels_by_name(config.irc)
+        # Channels removed from the configuration, to be parted
+        self._channel_names_to_part: deque[str] = deque()
+        # Texts (with their messages) that could not be sent due to
+        # the connection being down, to be sent after reconnecting
+        self._undelivered: deque[tuple[list[str], str, list[Message]]] = deque()
+        # A message (with its text) taken from the queue in advance
+        self._lookahead: tuple[Message, str] | None = None
+        self._paused = False
+        # The HTTP application, once the receive server has been started
+        self.http_app: Application | None = None
+        self._reload_lock = Lock()
+
+        self.metrics = Metrics()
+        self._register_metrics()
+        self.tracer = Tracer(config.trace.sample_rate)
+
+        self.announcer.set_join_priority(self.get_pending_channel_names)
 
         # Up to this point, no signals must have been sent.
         self.connect_to_signals()
         # Signals are allowed be sent from here on.
 
+    def _register_metrics(self) -> None:
+        """Register metrics whose values are obtained when collected."""
+        self.metrics.register(
+            Gauge(
+                'weitersager_queue_messages',
+                'Messages waiting in the queue.',
+                lambda: {(): self.message_queue.qsize()},
+            )
+        )
+        self.metrics.register(
+            Gauge(
+                'weitersager_irc_channels_joined',
+                'IRC channels joined.',
+                lambda: {(): len(self.enabled_channel_names)},
+            )
+        )
+        self.metrics.register(
+            Gauge(
+                'weitersager_irc_connection_state',
+                'State of each IRC connection (1 for the current one).',
+                self._get_connection_state_values,
+                ['connection', 'state'],
+            )
+        )
+        self.metrics.register(
+            CallbackCounter(
+                'weitersager_irc_reconnects_total',
+                'Reconnects, per IRC connection.',
+                self._get_reconnect_values,
+                ['connection'],
+            )
+        )
+        self.metrics.register(
+            Gauge(
+                'weitersager_irc_join_seconds',
+                'Time it took to join channels after the latest (re)connect, '
+                'per IRC connection.',
+                self._get_join_seconds_values,
+                ['connection'],
+            )
+        )
+        self.metrics.register(
+            CallbackCounter(
+                'weitersager_irc_downtime_seconds_total',
+                'Time disconnected, per IRC connection.',
+                self._get_downtime_values,
+                ['connection'],
+            )
+        )
+
+    def _get_join_seconds_values(self) -> dict[LabelValues, float]:
+        stats_by_name = self.announcer.get_connection_stats()
+        return {
+            (name,): stats.join_seconds
+            for name, stats in stats_by_name.items()
+            if stats.join_seconds is not None
+        }
+
+    def _get_reconnect_values(self) -> dict[LabelValues, float]:
+        stats_by_name = self.announcer.get_connection_stats()
+        return {
+            (name,): stats.reconnects for name, stats in stats_by_name.items()
+        }
+
+    def _get_downtime_values(self) -> dict[LabelValues, float]:
+        now = time.monotonic()
+        stats_by_name = self.announcer.get_connection_stats()
+        return {
+            (name,): stats.get_downtime_seconds(now)
+            for name, stats in stats_by_name.items()
+        }
+
+    def _get_connection_state_values(self) -> dict[LabelValues, float]:
+        values: dict[LabelValues, float] = {}
+        for name, state in self.announcer.get_connection_states().items():
+            for possible_state in ConnectionState:
+                values[(name, possible_state.value)] = int(
+                    state == possible_state
+                )
+        return values
+
     def connect_to_signals(self) -> None:
         irc_channel_joined.connect(self.enable_channel)
         message_received.connect(self.handle_message)
@@ -41,44 +191,531 @@ class Processor:
         logger.info('Enabled forwarding to channel %s.', channel_name)
         self.enabled_channel_names.add(channel_name)
 
+        if self.holding_buffer is not None:
+            # Release held messages in the processing thread.
+            self._channel_names_to_release.append(channel_name)
+
+    def get_pending_channel_names(self) -> set[str]:
+        """Return the names of channels with messages waiting to be
+        announced.
+        """
+        channel_names = self.message_queue.get_channel_names()
+
+        if self.holding_buffer is not None:
+            channel_names.update(self.holding_buffer.get_channel_names())
+
+        for undelivered_channel_names, _, _ in list(self._undelivered):
+            channel_names.update(undelivered_channel_names)
+
+        return channel_names
+
+    def disable_channel(self, channel_name: str) -> None:
+        logger.info('Disabled forwarding to channel %s.', channel_name)
+        self.enabled_channel_names.discard(channel_name)
+
     def handle_message(
         self,
         sender: Any | None,
         *,
-        channel_name: str,
+        channel_names: list[str],
         text: str,
         source_ip_address: str | None = None,
+        priority: int = DEFAULT_PRIORITY,
+        received_at: float | None = None,
     ) -> None:
-        """Log and announce an incoming message."""
-        logger.debug(
-            'Received message from %s for channel %s with text "%s".',
-            source_ip_address or 'unknown address',
-            channel_name,
-            text,
-        )
+        """Log and announce an incoming message to each of the channels.
 
-        self.message_queue.put((channel_name, text))
+        Raise `QueueFullError` if the message queue does not have room
+        for the message in all of the channels, in which case it is not
+        queued for any of them.
+        """
+        messages = []
+        for name in channel_names:
+            channel_name = self.announcer.resolve_channel_name(name)
 
-    def announce_message(self, channel_name: str, text: str) -> None:
-        """Announce message on IRC."""
-        if channel_name not in self.enabled_channel_names:
-            logger.warning(
-                'Could not send message to channel %s, not joined.',
+            message_logger.debug(
+                'Received message from %s for channel %s with text "%s".',
+                source_ip_address or 'unknown address',
                 channel_name,
+                text,
             )
-            return
 
-        self.announcer.announce(channel_name, text)
+            self.metrics.messages_received.inc()
+
+            trace = self.tracer.create_trace(source_ip_address, received_at)
+            messages.append(Message(channel_name, text, priority, trace))
+
+        collapsed = [self._collapse(message) for message in messages]
+        messages_to_queue = [
+            message
+            for message, is_collapsed in zip(messages, collapsed)
+            if not is_collapsed
+        ]
+
+        try:
+            self.message_queue.put_all_nowait(messages_to_queue)
+        except Full:
+            if self.coalescer is not None:
+                for message, is_collapsed in zip(messages, collapsed):
+                    if is_collapsed:
+                        self.coalescer.discard_repetition(message)
+                    else:
+                        self.coalescer.discard(message)
+
+            message_logger.warning(
+                'Message queue is full, rejected message for channel(s) %s.',
+                ', '.join(message.channel_name for message in messages),
+            )
+            retry_after_seconds = estimate_drain_seconds(
+                self.message_queue.qsize(), self._get_rate_limit()
+            )
+            raise QueueFullError(retry_after_seconds) from None
+
+    def _collapse(self, message: Message) -> bool:
+        """Return `True` if the message has been collapsed into an
+        identical queued one.
+        """
+        if self.coalescer is None or not self.coalescer.add(message):
+            return False
+
+        message_logger.debug(
+            'Collapsed message for channel %s into identical queued one.',
+            message.channel_name,
+        )
+        return True
+
+    def _get_rate_limit(self) -> float | None:
+        """Return the aggregate send rate limit of all connections."""
+        irc_config = self.config.irc
+
+        servers = [network.server for network in irc_config.networks]
+        if irc_config.server is not None:
+            servers.append(irc_config.server)
+
+        if not servers:
+            return None
+
+        rate_limit = 0.0
+        for server in servers:
+            if server.rate_limit is None:
+                return None
+            rate_limit += server.rate_limit * server.connections
+
+        return rate_limit
+
+    def _send(
+        self, channel_names: list[str], text: str, messages: list[Message]
+    ) -> None:
+        """Send the text, and complete the messages once it has been
+        sent (or dropped).
+
+        The announcer might send it later, from another thread.
+        """
+        if len(channel_names) == 1:
+            channel_name = channel_names[0]
+            if channel_name not in self.enabled_channel_names:
+                message_logger.warning(
+                    'Could not send message to channel %s, not joined.',
+                    channel_name,
+                )
+                self._count_dropped_messages(channel_name, 'not_joined')
+                self._complete_messages(messages, False)
+                return
+
+        self.announcer.send(
+            channel_names, text, partial(self._complete_sent_messages, messages)
+        )
 
     def process_queue(self, timeout_seconds: int | None = None) -> None:
-        """Process a message from the queue."""
-        channel_name, text = self.message_queue.get(timeout=timeout_seconds)
-        self.announce_message(channel_name, text)
+        """Process a message from the queue.
+
+        Pause while the connection to IRC is down.
+        """
+        if not self._wait_until_connected(timeout_seconds):
+            return
+
+        if not self._announce_undelivered():
+            return
+
+        self._process_held_lines()
+        self._part_channels()
+
+        if self.packer is not None:
+            self._process_queue_with_packing(self.packer, timeout_seconds)
+            return
+
+        if self._lookahead is None:
+            message = self._get_message(timeout_seconds)
+            if message is None:
+                return
+            text = self._get_text(message)
+        else:
+            message, text = self._lookahead
+            self._lookahead = None
+
+        messages = [message] + self._take_messages_with_same_text(text, message)
+        self._deliver_to_channels(text, messages)
+
+    def _take_messages_with_same_text(
+        self, text: str, message: Message
+    ) -> list[Message]:
+        """Take messages queued right after the message that have the
+        same text, but are for other channels.
+        """
+        channel_names = {message.channel_name}
+        messages = []
+
+        while True:
+            try:
+                next_message = self.message_queue.get_nowait()
+            except Empty:
+                break
+
+            next_text = self._get_text(next_message)
+
+            if next_text != text or next_message.channel_name in channel_names:
+                self._lookahead = (next_message, next_text)
+                break
+
+            channel_names.add(next_message.channel_name)
+            messages.append(next_message)
+
+        return messages
+
+    def _process_queue_with_packing(
+        self, packer: Packer, timeout_seconds: int | None
+    ) -> None:
+        """Process a message from the queue, packing texts for the same
+        channel into as few lines as possible.
+        """
+        message = self._get_message(timeout_seconds)
+
+        if message is not None:
+            text = self._get_text(message)
+            for line in packer.add(message, text):
+                self._deliver_packed_line(packer, line)
+
+        # Keep collecting texts for a channel as long as more messages
+        # for it are queued, but do not let messages for other channels
+        # hold up its line.
+        for line in packer.pop_due_lines(self.message_queue.has_messages_for):
+            self._deliver_packed_line(packer, line)
+
+    def _get_message(self, timeout_seconds: float | None) -> Message | None:
+        """Take the next message from the queue.
+
+        Return `None` if there is something else to do before a message
+        arrives. Raise `Empty` if no message arrives before the timeout.
+        """
+        wake_up_seconds = self._get_wake_up_seconds()
+        timeout = _min_timeout(timeout_seconds, wake_up_seconds)
+
+        try:
+            return self.message_queue.get(timeout=timeout)
+        except Empty:
+            if wake_up_seconds is None or (
+                timeout_seconds is not None
+                and timeout_seconds < wake_up_seconds
+            ):
+                raise
+            return None
+
+    def _get_wake_up_seconds(self) -> float | None:
+        """Return the time until there is something to do besides
+        processing queued messages, or `None` if there is nothing.
+        """
+        wake_up_seconds = None
+
+        if self.packer is not None:
+            wake_up_seconds = self.packer.get_seconds_until_due()
+
+        if self.holding_buffer:
+            wake_up_seconds = _min_timeout(
+                wake_up_seconds, HOLD_CHECK_INTERVAL_SECONDS
+            )
+
+        if self.active_channels is not None:
+            wake_up_seconds = _min_timeout(
+                wake_up_seconds, self.active_channels.get_seconds_until_idle()
+            )
+
+        return wake_up_seconds
+
+    def _deliver_packed_line(self, packer: Packer, line: PackedLine) -> None:
+        text = line.join(packer.separator)
+        self._deliver(line.channel_name, text, line.messages)
+
+    def _deliver_to_channels(self, text: str, messages: list[Message]) -> None:
+        """Announce the text to the channels of the messages (one per
+        channel) at once, holding it for those not joined yet.
+        """
+        if len(messages) == 1:
+            message = messages[0]
+            self._deliver(message.channel_name, text, messages)
+            return
+
+        messages_to_announce = []
+        for message in messages:
+            if self._must_hold(message.channel_name) or (
+                message.channel_name not in self.enabled_channel_names
+            ):
+                self._deliver(message.channel_name, text, [message])
+            else:
+                self._use_channel(message.channel_name)
+                messages_to_announce.append(message)
+
+        if messages_to_announce:
+            channel_names = [m.channel_name for m in messages_to_announce]
+            self._announce(channel_names, text, messages_to_announce)
+
+    def _deliver(
+        self, channel_name: str, text: str, messages: list[Message]
+    ) -> None:
+        """Announce the text, or hold it until the channel has been
+        joined.
+        """
+        self._use_channel(channel_name)
+
+        holding_buffer = self.holding_buffer
+        if holding_buffer is not None and self._must_hold(channel_name):
+            message_logger.info(
+                'Holding message for channel %s until joined.', channel_name
+            )
+            dropped_lines = holding_buffer.hold(channel_name, text, messages)
+            for line in dropped_lines:
+                message_logger.warning(
+                    'Dropped held message for channel %s, too many messages '
+                    'held.',
+                    line.channel_name,
+                )
+                self._drop_messages(line, 'hold_full')
+            return
+
+        self._announce([channel_name], text, messages)
+
+    def _use_channel(self, channel_name: str) -> None:
+        """Record the channel as used, and, if joining channels on
+        demand, join it unless it has been joined (or is being joined)
+        already.
+        """
+        if self.active_channels is None:
+            return
+
+        channel = self._channels_by_name.get(channel_name)
+        if channel is None:
+            # Only join configured channels.
+            return
+
+        if self.active_channels.touch(channel_name):
+            logger.info('Joining channel %s on demand ...', channel_name)
+            self.announcer.join_channel(channel)
+
+    def _must_hold(self, channel_name: str) -> bool:
+        return self.holding_buffer is not None and (
+            channel_name not in self.enabled_channel_names
+            or self.holding_buffer.is_holding(channel_name)
+        )
+
+    def _announce(
+        self, channel_names: list[str], text: str, messages: list[Message]
+    ) -> None:
+        """Announce the text, or keep it if the connection is down."""
+        if not self._undelivered:
+            try:
+                self._send(channel_names, text, messages)
+            except NotConnectedError:
+                pass
+            else:
+                return
+
+        message_logger.info(
+            'Could not send message to channel(s) %s, not connected; '
+            'will retry after reconnect.',
+            ', '.join(channel_names),
+        )
+        self._undelivered.append((channel_names, text, messages))
+
+    def _wait_until_connected(self, timeout_seconds: float | None) -> bool:
+        """Wait until the announcer is (re)connected.
+
+        Return `False` if still disconnected after the timeout.
+        """
+        if self.announcer.wait_until_connected(0):
+            return True
+
+        if not self._paused:
+            logger.warning('Pausing queue processing until reconnected.')
+            self._paused = True
+
+        if not self.announcer.wait_until_connected(timeout_seconds):
+            return False
+
+        logger.info('Resuming queue processing.')
+        self._paused = False
+        return True
+
+    def _announce_undelivered(self) -> bool:
+        """Announce texts that could not be sent before, in order.
+
+        Return `False` if the connection went down again meanwhile.
+        """
+        while self._undelivered:
+            channel_names, text, messages = self._undelivered[0]
+
+            try:
+                self._send(channel_names, text, messages)
+            except NotConnectedError:
+                return False
+
+            self._undelivered.popleft()
+
+        return True
+
+    def _process_held_lines(self) -> None:
+        """Drop expired held lines, announce those for joined channels."""
+        if self.holding_buffer is None:
+            return
+
+        for line in self.holding_buffer.remove_expired_lines():
+            message_logger.warning(
+                'Dropped held message for channel %s, not joined in time.',
+                line.channel_name,
+            )
+            self._drop_messages(line, 'hold_expired')
+
+            channel_name = line.channel_name
+            if (
+                self.active_channels is not None
+                and channel_name in self.active_channels
+                and channel_name not in self.enabled_channel_names
+            ):
+                # Give up on joining, but try again with the next
+                # message for the channel.
+                self.active_channels.discard(channel_name)
+                self.announcer.part_channel(channel_name)
+
+        while self._channel_names_to_release:
+            channel_name = self._channel_names_to_release.popleft()
+            lines = self.holding_buffer.release(channel_name)
+            if lines:
+                logger.info(
+                    'Announcing %d held message(s) for channel %s.',
+                    len(lines),
+                    channel_name,
+                )
+            for line in lines:
+                self._announce_held_line(line)
+
+    def _part_channels(self) -> None:
+        """Part channels joined on demand that have been idle for a
+        while, or that have been removed from the configuration.
+        """
+        if self.active_channels is None:
+            return
+
+        while self._channel_names_to_part:
+            channel_name = self._channel_names_to_part.popleft()
+            if channel_name in self.active_channels:
+                self.active_channels.discard(channel_name)
+                self.announcer.part_channel(channel_name)
+
+        for channel_name in self.active_channels.remove_idle():
+            if (
+                self.holding_buffer is not None
+                and self.holding_buffer.is_holding(channel_name)
+            ):
+                # Still waiting for the channel to be joined.
+                self.active_channels.touch(channel_name)
+                continue
+
+            logger.info(
+                'Parting channel %s, idle for %.1f seconds ...',
+                channel_name,
+                self.active_channels.idle_seconds,
+            )
+            self.disable_channel(channel_name)
+            self.announcer.part_channel(channel_name)
+
+    def _announce_held_line(self, line: HeldLine) -> None:
+        self._announce([line.channel_name], line.text, line.messages)
+
+    def _complete_sent_messages(
+        self, messages: list[Message], channel_names: list[str], sent: bool
+    ) -> None:
+        """Complete the messages for the channels the text has been sent
+        to (or dropped for).
+        """
+        names = set(channel_names)
+        self._complete_messages(
+            [message for message in messages if message.channel_name in names],
+            sent,
+        )
+
+    def _complete_messages(self, messages: list[Message], sent: bool) -> None:
+        """Record the messages as sent (unless dropped), and acknowledge
+        them.
+        """
+        if sent:
+            now = time.time()
+            for message in messages:
+                trace = message.trace
+                if trace is not None:
+                    trace.sent_at = now
+                    self.metrics.delivery_latency.observe(
+                        now - trace.received_at
+                    )
+                    self.tracer.log(message.channel_name, trace)
+            self.metrics.messages_delivered.inc(amount=len(messages))
+
+        self._ack_messages(messages)
+
+    def _drop_messages(self, line: HeldLine, reason: str) -> None:
+        self._count_dropped_messages(
+            line.channel_name, reason, amount=len(line.messages)
+        )
+        self._ack_messages(line.messages)
+
+    def _count_dropped_messages(
+        self, channel_name: str, reason: str, *, amount: int = 1
+    ) -> None:
+        if channel_name not in self._channels_by_name:
+            channel_name = OTHER_CHANNELS_LABEL_VALUE
+
+        self.metrics.messages_dropped.inc(channel_name, reason, amount=amount)
+
+    def _ack_messages(self, messages: list[Message]) -> None:
+        for message in messages:
+            self.message_queue.ack(message)
+
+    def _get_text(self, message: Message) -> str:
+        """Return the text to announce for the message."""
+        if self.coalescer is None:
+            return message.text
+
+        count = self.coalescer.release(message)
+        return format_repeated_text(message.text, count)
 
     def run(self) -> None:
         """Run the main loop."""
         self.announcer.start()
-        start_receive_server(self.config.http)
+        token_index = self.start_token_index()
+
+        # Do not wait for the journal for each message. The HTTP server
+        # syncs it once per request instead.
+        self.message_queue.sync_on_put = False
+        sync = (
+            self.message_queue.sync
+            if self.config.queue.path is not None
+            else None
+        )
+        server = start_receive_server(
+            self.config.http, self.metrics, token_index, sync=sync
+        )
+        self.http_app = server.application
+
+        capacity = self.config.queue.capacity
+        if capacity is not None:
+            logger.info('Message queue capacity set to %d messages.', capacity)
 
         logger.info('Starting to process queue ...')
         try:
@@ -88,10 +725,186 @@ class Processor:
             pass
 
         logger.info('Shutting down ...')
+        self._deliver_pending()
         self.announcer.shutdown()
+        self.message_queue.close()
+
+    def start_token_index(self) -> ChannelTokenIndex | None:
+        """Load the channel tokens from the external store (if one is
+        configured), and keep refreshing them in the background.
+        """
+        token_store_config = self.config.http.token_store
+        if token_store_config is None:
+            return None
+
+        token_index = open_token_index(token_store_config.path)
+        start_thread(
+            partial(
+                token_index.refresh_forever,
+                token_store_config.refresh_interval,
+            ),
+            'TokenIndexRefresher',
+        )
+        return token_index
+
+    def reload_config(self, path: Path) -> None:
+        """Load the configuration file again, and apply the settings
+        that can be changed without a restart.
+        """
+        logger.info('Reloading configuration from %s ...', path)
+
+        try:
+            config = load_config(path)
+        except Exception:
+            logger.exception(
+                'Could not reload configuration, keeping the current one.'
+            )
+            return
+
+        self.apply_config(config)
+
+    def apply_config(self, config: Config) -> None:
+        """Apply the settings that can be changed without a restart,
+        keeping the IRC connection(s) up.
+        """
+        with self._reload_lock:
+            changes = diff_configs(self.config, config)
+
+            if changes.is_empty():
+                logger.info('Configuration has not changed.')
+                return
+
+            if changes.restart_required:
+                logger.warning(
+                    'Changes to %s only take effect after a restart.',
+                    ', '.join(changes.restart_required),
+                )
+
+            if changes.tokens_changed:
+                if self.http_app is not None:
+                    self.http_app.update_tokens(
+                        config.http.api_tokens,
+                        config.http.channel_tokens_to_channel_names,
+                        config.http.token_priorities,
+                    )
+                logger.info('Updated API and channel tokens.')
+
+            if changes.channels_changed:
+                # Stop sending to channels before parting them.
+                for channel_name in changes.channel_names_to_part:
+                    self.disable_channel(channel_name)
+
+                if self.active_channels is not None:
+                    # Join added channels on demand, too. Part removed
+                    # ones in the processing thread.
+                    self._channels_by_name = get_channels_by_name(config.irc)
+                    self._channel_names_to_part.extend(
+                        changes.channel_names_to_part
+                    )
+                else:
+                    self.announcer.update_channels(config.irc.channels)
+
+            server = config.irc.server
+            if changes.rate_limit_changed and server is not None:
+                self.announcer.update_rate_limit(server)
+
+            self.config = apply_reloadable_settings(self.config, config)
 
+    def _deliver_pending(self) -> None:
+        """Deliver messages taken from the queue but not delivered yet."""
+        if self._lookahead is not None:
+            message, text = self._lookahead
+            self._lookahead = None
+            self._deliver(message.channel_name, text, [message])
+        if self.packer is not None:
+            for line in self.packer.pop_all_lines():
+                self._deliver_packed_line(self.packer, line)
 
-def start(config: Config) -> None:
-    """Start the IRC bot and the HTTP listen server."""
+
+def _create_coalescer(config: QueueConfig) -> Coalescer | None:
+    if config.coalesce_window is None:
+        return None
+
+    logger.info(
+        'Collapsing identical messages within %.1f seconds.',
+        config.coalesce_window,
+    )
+    return Coalescer(
+        config.coalesce_window, max_entries=config.coalesce_max_entries
+    )
+
+
+def _create_packer(config: QueueConfig, announcer: Announcer) -> Packer | None:
+    if not config.pack:
+        return None
+
+    logger.info('Packing messages for the same channel into single lines.')
+    return Packer(
+        announcer.get_max_text_length,
+        separator=config.pack_separator,
+        linger_seconds=config.pack_linger,
+    )
+
+
+def _create_holding_buffer(config: Config) -> HoldingBuffer | None:
+    hold_ttl = config.queue.hold_ttl
+    if hold_ttl is None:
+        if not config.irc.join_on_demand:
+            return None
+
+        # Messages have to be held while their channel is being joined.
+        hold_ttl = DEFAULT_ON_DEMAND_HOLD_TTL_SECONDS
+
+    logger.info(
+        'Holding messages for channels not joined yet for up to %.1f seconds.',
+        hold_ttl,
+    )
+    return HoldingBuffer(
+        hold_ttl,
+        max_messages_per_channel=config.queue.hold_max_messages,
+        max_bytes=config.queue.hold_max_bytes,
+    )
+
+
+def _create_active_channels(config: IrcConfig) -> ActiveChannels | None:
+    if not config.join_on_demand:
+        return None
+
+    if config.part_idle_after is None:
+        logger.info('Joining channels on demand.')
+    else:
+        logger.info(
+            'Joining channels on demand, parting them after %.1f seconds '
+            'without messages.',
+            config.part_idle_after,
+        )
+    return ActiveChannels(config.part_idle_after)
+
+
+def _min_timeout(*timeouts: float | None) -> float | None:
+    """Return the shortest timeout, with `None` meaning no timeout."""
+    return min(
+        (timeout for timeout in timeouts if timeout is not None),
+        default=None,
+    )
+
+
+def start(config: Config, config_path: Path | None = None) -> None:
+    """Start the IRC bot and the HTTP listen server.
+
+    If the path of the configuration file is given, reload it on
+    `SIGHUP`.
+    """
     processor = Processor(config)
+
+    if config_path is not None and hasattr(signal, 'SIGHUP'):
+
+        def handle_sighup(signum, frame) -> None:
+            # Keep the main thread from waiting for the reload.
+            start_thread(
+                lambda: processor.reload_config(config_path), 'ConfigReload'
+            )
+
+        signal.signal(signal.SIGHUP, handle_sighup)
+
     processor.run()
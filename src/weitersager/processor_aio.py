@@ -0,0 +1,150 @@
+"""
+weitersager.processor_aio
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Connect HTTP server and IRC bot, on a single asyncio event loop.
+
+Receiving, queueing, and sending messages all happen in the same
+thread, so the queue's locks are hardly ever contended. Only waiting for
+messages to be written to disk (with a persistent queue) happens in a
+separate thread, so that it does not block the event loop.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import logging
+from pathlib import Path
+from queue import Empty
+import signal
+from typing import Any
+
+from .config import Config
+from .http_aio import start_async_receive_server
+from .irc_aio import AsyncAnnouncer, create_async_announcer
+from .message import DEFAULT_PRIORITY
+from .processor import Processor
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncProcessor(Processor):
+    """A processor that waits on the event loop instead of blocking."""
+
+    announcer: AsyncAnnouncer
+
+    def __init__(
+        self, config: Config, *, announcer: AsyncAnnouncer | None = None
+    ) -> None:
+        if announcer is None:
+            announcer = create_async_announcer(config.irc)
+
+        self._wake_up = asyncio.Event()
+
+        super().__init__(config, announcer=announcer)
+
+        # Do not wait for the journal on the event loop. The HTTP server
+        # syncs it in a separate thread instead.
+        self.message_queue.sync_on_put = False
+
+    def enable_channel(self, sender, *, channel_name=None) -> None:
+        super().enable_channel(sender, channel_name=channel_name)
+        self._wake_up.set()
+
+    def handle_message(
+        self,
+        sender: Any | None,
+        *,
+        channel_names: list[str],
+        text: str,
+        source_ip_address: str | None = None,
+        priority: int = DEFAULT_PRIORITY,
+        received_at: float | None = None,
+    ) -> None:
+        """Log and announce an incoming message to each of the channels.
+
+        Raise `QueueFullError` if the message queue does not have room
+        for the message in all of the channels.
+        """
+        super().handle_message(
+            sender,
+            channel_names=channel_names,
+            text=text,
+            source_ip_address=source_ip_address,
+            priority=priority,
+            received_at=received_at,
+        )
+        self._wake_up.set()
+
+    async def process_queue_async(self) -> None:
+        """Process a message from the queue, or wait until there is
+        something to do.
+        """
+        await self.announcer.wait_until_ready()
+
+        self._wake_up.clear()
+        try:
+            self.process_queue(timeout_seconds=0)
+        except Empty:
+            timeout = self._get_wake_up_seconds()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake_up.wait(), timeout)
+        else:
+            # Let the event loop handle requests in between messages.
+            await asyncio.sleep(0)
+
+    async def run_async(self) -> None:
+        """Run the main loop."""
+        self.announcer.start()
+        token_index = self.start_token_index()
+        sync = (
+            self.message_queue.sync
+            if self.config.queue.path is not None
+            else None
+        )
+        server = await start_async_receive_server(
+            self.config.http, self.metrics, token_index, sync=sync
+        )
+        self.http_app = server.app
+
+        capacity = self.config.queue.capacity
+        if capacity is not None:
+            logger.info('Message queue capacity set to %d messages.', capacity)
+
+        logger.info('Starting to process queue ...')
+        try:
+            while True:
+                await self.process_queue_async()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            logger.info('Shutting down ...')
+            await server.close()
+            self._deliver_pending()
+            await self.announcer.shutdown_async()
+            self.message_queue.close()
+
+
+async def _run(config: Config, config_path: Path | None) -> None:
+    processor = AsyncProcessor(config)
+
+    if config_path is not None and hasattr(signal, 'SIGHUP'):
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP, processor.reload_config, config_path
+        )
+
+    await processor.run_async()
+
+
+def start_async(config: Config, config_path: Path | None = None) -> None:
+    """Start the IRC bot and the HTTP listen server, on an event loop.
+
+    If the path of the configuration file is given, reload it on
+    `SIGHUP`.
+    """
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run(config, config_path))
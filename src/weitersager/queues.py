@@ -0,0 +1,342 @@
+"""
+weitersager.queues
+~~~~~~~~~~~~~~~~~~
+
+Message queues
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from collections import Counter, deque
+from functools import partial
+import heapq
+import json
+import logging
+import math
+from queue import Full, Queue
+import time
+from typing import Callable, Union
+
+from .config import QueueConfig
+from .journal import Journal
+from .message import Message
+from .tracing import Trace
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Indicates that the message queue has reached its capacity."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__(retry_after_seconds)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class FifoScheduler:
+    """Hand out messages in order of arrival."""
+
+    def __init__(self) -> None:
+        self._messages: deque[Message] = deque()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def push(self, message: Message) -> None:
+        self._messages.append(message)
+
+    def pop(self) -> Message:
+        return self._messages.popleft()
+
+
+class FairScheduler:
+    """Hand out messages channel by channel, in weighted round-robin
+    order.
+
+    Each channel with queued messages takes a turn of as many messages
+    as its weight, then it is the next channel's turn. Messages for the
+    same channel are handed out in order of arrival.
+    """
+
+    def __init__(self, weights: dict[str, int]) -> None:
+        self._weights = weights
+        self._messages_by_channel: dict[str, deque[Message]] = {}
+        # Channels with queued messages, the one whose turn it is first
+        self._channel_names: deque[str] = deque()
+        self._remaining_turn = 0
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def push(self, message: Message) -> None:
+        channel_name = message.channel_name
+
+        messages = self._messages_by_channel.get(channel_name)
+        if messages is None:
+            messages = self._messages_by_channel[channel_name] = deque()
+            self._channel_names.append(channel_name)
+
+        messages.append(message)
+        self._length += 1
+
+    def pop(self) -> Message:
+        channel_name = self._channel_names[0]
+        if self._remaining_turn == 0:
+            self._remaining_turn = self._weights.get(channel_name, 1)
+
+        messages = self._messages_by_channel[channel_name]
+        message = messages.popleft()
+        self._length -= 1
+        self._remaining_turn -= 1
+
+        if not messages:
+            del self._messages_by_channel[channel_name]
+            self._channel_names.popleft()
+            self._remaining_turn = 0
+        elif self._remaining_turn == 0:
+            self._channel_names.rotate(-1)
+
+        return message
+
+
+Scheduler = Union[FifoScheduler, FairScheduler]
+
+
+class PriorityScheduler:
+    """Hand out messages with higher priority first.
+
+    Messages of the same priority are handed out by a separate scheduler
+    per priority level.
+    """
+
+    def __init__(self, create_scheduler: Callable[[], Scheduler]) -> None:
+        self._create_scheduler = create_scheduler
+        self._schedulers_by_priority: dict[int, Scheduler] = {}
+        # Heap of negated priorities that have messages queued
+        self._negated_priorities: list[int] = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def push(self, message: Message) -> None:
+        priority = message.priority
+
+        scheduler = self._schedulers_by_priority.get(priority)
+        if scheduler is None:
+            scheduler = self._create_scheduler()
+            self._schedulers_by_priority[priority] = scheduler
+            heapq.heappush(self._negated_priorities, -priority)
+
+        scheduler.push(message)
+        self._length += 1
+
+    def pop(self) -> Message:
+        priority = -self._negated_priorities[0]
+        scheduler = self._schedulers_by_priority[priority]
+
+        message = scheduler.pop()
+        self._length -= 1
+
+        if not scheduler:
+            del self._schedulers_by_priority[priority]
+            heapq.heappop(self._negated_priorities)
+
+        return message
+
+
+class MessageQueue(Queue):
+    """A queue of messages.
+
+    Messages are handed out in the order determined by the scheduler
+    (default: by priority, then order of arrival).
+
+    If a journal is given, messages are recorded in it and kept until
+    they have been acknowledged, so they survive a restart. Unless
+    `sync_on_put` is disabled, `put` waits for messages to be made
+    durable; otherwise, `sync` has to be called to do so.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        *,
+        scheduler: PriorityScheduler | None = None,
+        journal: Journal | None = None,
+        sync_on_put: bool = True,
+    ) -> None:
+        if scheduler is None:
+            scheduler = PriorityScheduler(FifoScheduler)
+        self._scheduler = scheduler
+        self._journal = journal
+        self.sync_on_put = sync_on_put
+
+        super().__init__(maxsize)
+
+        if journal is not None:
+            self._restore(journal)
+
+    def _init(self, maxsize: int) -> None:
+        # Journal sequence numbers of messages not yet acknowledged, by
+        # message object identity
+        self._seqs: dict[int, int] = {}
+        # Numbers of queued messages, by channel name
+        self._counts_by_channel_name: Counter[str] = Counter()
+
+    def _qsize(self) -> int:
+        return len(self._scheduler)
+
+    def _put(self, message: Message) -> None:
+        if message.trace is not None:
+            message.trace.enqueued_at = time.time()
+
+        if self._journal is not None:
+            seq = self._journal.append(_serialize(message))
+            self._seqs[id(message)] = seq
+
+        self._scheduler.push(message)
+        self._counts_by_channel_name[message.channel_name] += 1
+
+    def _get(self) -> Message:
+        message = self._scheduler.pop()
+        self._count_removal(message.channel_name)
+
+        if message.trace is not None:
+            message.trace.dequeued_at = time.time()
+
+        return message
+
+    def _restore(self, journal: Journal) -> None:
+        """Put undelivered messages from the journal into the queue."""
+        with self.mutex:
+            for seq, payload in journal.recovered_records:
+                message = _deserialize(payload)
+                self._seqs[id(message)] = seq
+                self._scheduler.push(message)
+                self._counts_by_channel_name[message.channel_name] += 1
+                self.unfinished_tasks += 1
+
+        journal.recovered_records = []
+
+    def _count_removal(self, channel_name: str) -> None:
+        count = self._counts_by_channel_name[channel_name] - 1
+        if count > 0:
+            self._counts_by_channel_name[channel_name] = count
+        else:
+            del self._counts_by_channel_name[channel_name]
+
+    def get_channel_names(self) -> set[str]:
+        """Return the names of channels with queued messages."""
+        with self.mutex:
+            return set(self._counts_by_channel_name)
+
+    def has_messages_for(self, channel_name: str) -> bool:
+        """Return `True` if messages for the channel are queued."""
+        with self.mutex:
+            return channel_name in self._counts_by_channel_name
+
+    def put(self, message: Message, block: bool = True, timeout=None) -> None:
+        """Put a message into the queue.
+
+        With a journal, return only after the message has been made
+        durable (unless syncing on put is disabled).
+        """
+        super().put(message, block, timeout)
+
+        if self.sync_on_put:
+            self.sync()
+
+    def put_all_nowait(self, messages: list[Message]) -> None:
+        """Put the messages into the queue, either all of them or, if
+        there is not enough room for all of them, none (raising `Full`).
+
+        With a journal, return only after the messages have been made
+        durable (unless syncing on put is disabled).
+        """
+        if not messages:
+            return
+
+        with self.not_full:
+            if 0 < self.maxsize < self._qsize() + len(messages):
+                raise Full
+
+            for message in messages:
+                self._put(message)
+            self.unfinished_tasks += len(messages)
+            self.not_empty.notify(len(messages))
+
+        if self.sync_on_put:
+            self.sync()
+
+    def sync(self) -> None:
+        """Make the messages put so far durable (if there is a journal)."""
+        if self._journal is not None:
+            self._journal.sync()
+
+    def ack(self, message: Message) -> None:
+        """Acknowledge that a message taken from the queue has been
+        handled, so it does not have to be kept any longer.
+        """
+        if self._journal is None:
+            return
+
+        with self.mutex:
+            seq = self._seqs.pop(id(message), None)
+
+        if seq is not None:
+            self._journal.ack(seq)
+
+    def close(self) -> None:
+        """Close the journal, if any."""
+        if self._journal is not None:
+            self._journal.close()
+
+
+def _serialize(message: Message) -> bytes:
+    trace = message.trace.to_list() if message.trace is not None else None
+    values = [message.channel_name, message.text, message.priority, trace]
+    return json.dumps(values).encode('utf-8')
+
+
+def _deserialize(payload: bytes) -> Message:
+    # Records written by earlier versions lack the trace.
+    channel_name, text, priority, *rest = json.loads(payload)
+    trace = Trace.from_list(rest[0]) if rest and rest[0] is not None else None
+    return Message(channel_name, text, priority, trace)
+
+
+def create_message_queue(config: QueueConfig) -> MessageQueue:
+    """Create a message queue."""
+    scheduler = _create_scheduler(config)
+
+    journal = None
+    if config.path is not None:
+        logger.info('Keeping queued messages in journal at %s.', config.path)
+        journal = Journal(config.path, segment_size=config.segment_size)
+
+    return MessageQueue(
+        maxsize=config.capacity or 0, scheduler=scheduler, journal=journal
+    )
+
+
+def _create_scheduler(config: QueueConfig) -> PriorityScheduler:
+    if config.scheduling == 'fair':
+        logger.info('Scheduling messages fairly across channels.')
+        return PriorityScheduler(partial(FairScheduler, config.channel_weights))
+
+    return PriorityScheduler(FifoScheduler)
+
+
+def estimate_drain_seconds(queue_size: int, rate_limit: float | None) -> int:
+    """Estimate how long it takes to send the queued messages.
+
+    Return at least one second.
+    """
+    if not rate_limit:
+        return 1
+
+    return max(1, math.ceil(queue_size / rate_limit))
@@ -0,0 +1,112 @@
+"""
+weitersager.ratelimit
+~~~~~~~~~~~~~~~~~~~~~
+
+Limit the rate of lines sent to an IRC server
+
+IRC servers allow clients to send a burst of lines at once, but
+disconnect them for flooding if they keep sending faster than a steady
+rate. A token bucket models this: it holds up to `burst` tokens and is
+refilled at `rate` tokens per second. Each line takes a token (or more,
+for long lines), and has to wait if no token is left.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import functools
+from threading import Lock
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """A token bucket."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._lock = Lock()
+
+        # Start full to allow an initial burst (e.g. channel joins).
+        self._tokens = burst
+        self._updated_at = clock()
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Take tokens, return the number of seconds to wait until they
+        are available.
+
+        Tokens not yet available are borrowed from future refills, so
+        that subsequent reservations queue up behind this one.
+        """
+        with self._lock:
+            self._refill()
+
+            self._tokens -= cost
+            if self._tokens >= 0:
+                return 0.0
+
+            return -self._tokens / self.rate
+
+    def take(self, cost: float = 1.0) -> bool:
+        """Take tokens if available (without borrowing), return whether
+        they were.
+        """
+        with self._lock:
+            self._refill()
+
+            if self._tokens < cost:
+                return False
+
+            self._tokens -= cost
+            return True
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+
+def get_line_cost(line: str, bytes_per_token: int | None = None) -> float:
+    """Return the number of tokens it takes to send the line.
+
+    Without `bytes_per_token`, every line costs one token. Otherwise,
+    a line additionally costs one token per that many bytes, similar to
+    the flood penalty some servers (e.g. ircu) impose on long lines.
+    """
+    if bytes_per_token is None:
+        return 1.0
+
+    length = len(line.encode('utf-8', 'replace')) + len('\r\n')
+    return 1.0 + length / bytes_per_token
+
+
+def limit_rate(
+    send_raw: Callable[[str], None],
+    bucket: TokenBucket,
+    *,
+    bytes_per_token: int | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Callable[[str], None]:
+    """Wrap the function to send raw lines so that it blocks as long as
+    the bucket requires.
+    """
+
+    @functools.wraps(send_raw)
+    def send_raw_limited(line: str) -> None:
+        delay = bucket.reserve(get_line_cost(line, bytes_per_token))
+        if delay > 0:
+            sleep(delay)
+
+        send_raw(line)
+
+    return send_raw_limited
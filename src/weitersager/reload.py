@@ -0,0 +1,211 @@
+"""
+weitersager.reload
+~~~~~~~~~~~~~~~~~~
+
+Reload the configuration of a running instance
+
+Some settings can be changed without a restart, and thus without
+dropping the connection to the IRC server and rejoining all channels:
+API and channel tokens (with their priorities), the channels to join,
+and the send rate limit. Changes to other settings are detected, but
+only take effect after a restart.
+
+With additional IRC networks, channels and rate limits cannot be
+changed without a restart.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, replace
+
+from .config import Config, HttpConfig, IrcChannel, IrcServer
+
+
+@dataclass(frozen=True)
+class ConfigChanges:
+    """The differences between two configurations."""
+
+    tokens_changed: bool
+    channels_changed: bool
+    channels_to_join: list[IrcChannel]
+    channel_names_to_part: list[str]
+    rate_limit_changed: bool
+    # Names of changed settings that require a restart
+    restart_required: list[str]
+
+    def is_empty(self) -> bool:
+        return not (
+            self.tokens_changed
+            or self.channels_changed
+            or self.rate_limit_changed
+            or self.restart_required
+        )
+
+
+def diff_configs(old: Config, new: Config) -> ConfigChanges:
+    """Return the differences between the running and a new
+    configuration.
+    """
+    tokens_changed = _get_tokens(old.http) != _get_tokens(new.http)
+
+    restart_required = _get_changes_requiring_restart(old, new)
+
+    if _has_networks(old, new):
+        channels_changed = False
+        rate_limit_changed = False
+        if old.irc.channels != new.irc.channels:
+            restart_required.append('irc.channels')
+        if _has_rate_limit_changed(old.irc.server, new.irc.server):
+            restart_required.append('irc.server')
+    else:
+        channels_changed = old.irc.channels != new.irc.channels
+        rate_limit_changed = _has_rate_limit_changed(
+            old.irc.server, new.irc.server
+        )
+
+    old_channel_names = {channel.name for channel in old.irc.channels}
+    new_channel_names = {channel.name for channel in new.irc.channels}
+
+    channels_to_join = []
+    channel_names_to_part = []
+    if channels_changed:
+        channels_to_join = sorted(
+            channel
+            for channel in new.irc.channels
+            if channel.name not in old_channel_names
+        )
+        channel_names_to_part = sorted(old_channel_names - new_channel_names)
+
+    return ConfigChanges(
+        tokens_changed=tokens_changed,
+        channels_changed=channels_changed,
+        channels_to_join=channels_to_join,
+        channel_names_to_part=channel_names_to_part,
+        rate_limit_changed=rate_limit_changed,
+        restart_required=sorted(set(restart_required)),
+    )
+
+
+def apply_reloadable_settings(old: Config, new: Config) -> Config:
+    """Return the running configuration with the settings of the new
+    one that can be changed without a restart.
+    """
+    http = replace(
+        old.http,
+        api_tokens=new.http.api_tokens,
+        channel_tokens_to_channel_names=(
+            new.http.channel_tokens_to_channel_names
+        ),
+        token_priorities=new.http.token_priorities,
+    )
+
+    irc = old.irc
+    if not _has_networks(old, new):
+        irc = replace(
+            irc,
+            server=_apply_rate_limit(old.irc.server, new.irc.server),
+            channels=new.irc.channels,
+        )
+
+    return replace(old, http=http, irc=irc)
+
+
+def _get_changes_requiring_restart(old: Config, new: Config) -> list[str]:
+    names = []
+
+    for name in ['log_level', 'runtime', 'queue', 'trace', 'log']:
+        if getattr(old, name) != getattr(new, name):
+            names.append(name)
+
+    if _without_tokens(old.http) != _without_tokens(new.http):
+        names.append('http')
+
+    if (old.irc.nickname, old.irc.realname) != (
+        new.irc.nickname,
+        new.irc.realname,
+    ):
+        names.append('irc.bot')
+
+    if old.irc.commands != new.irc.commands:
+        names.append('irc.commands')
+
+    if old.irc.networks != new.irc.networks:
+        names.append('irc.networks')
+
+    for name in ['join_on_demand', 'part_idle_after']:
+        if getattr(old.irc, name) != getattr(new.irc, name):
+            names.append(f'irc.{name}')
+
+    if _without_rate_limit(old.irc.server) != _without_rate_limit(
+        new.irc.server
+    ):
+        names.append('irc.server')
+
+    return names
+
+
+def _has_networks(old: Config, new: Config) -> bool:
+    return bool(old.irc.networks or new.irc.networks)
+
+
+def _get_tokens(config: HttpConfig) -> tuple:
+    return (
+        config.api_tokens,
+        config.channel_tokens_to_channel_names,
+        config.token_priorities,
+    )
+
+
+def _without_tokens(config: HttpConfig) -> HttpConfig:
+    return replace(
+        config,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        token_priorities={},
+    )
+
+
+def _has_rate_limit_changed(
+    old: IrcServer | None, new: IrcServer | None
+) -> bool:
+    if old is None or new is None:
+        # Switching IRC dummy mode on or off requires a restart anyway.
+        return False
+
+    return _get_rate_limit(old) != _get_rate_limit(new)
+
+
+def _get_rate_limit(server: IrcServer) -> tuple:
+    return (
+        server.rate_limit,
+        server.rate_limit_burst,
+        server.rate_limit_bytes_per_token,
+    )
+
+
+def _without_rate_limit(server: IrcServer | None) -> IrcServer | None:
+    if server is None:
+        return None
+
+    return replace(
+        server,
+        rate_limit=None,
+        rate_limit_burst=None,
+        rate_limit_bytes_per_token=None,
+    )
+
+
+def _apply_rate_limit(
+    old: IrcServer | None, new: IrcServer | None
+) -> IrcServer | None:
+    if old is None or new is None:
+        return old
+
+    return replace(
+        old,
+        rate_limit=new.rate_limit,
+        rate_limit_burst=new.rate_limit_burst,
+        rate_limit_bytes_per_token=new.rate_limit_bytes_per_token,
+    )
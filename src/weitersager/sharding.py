@@ -0,0 +1,103 @@
+"""
+weitersager.sharding
+~~~~~~~~~~~~~~~~~~~~
+
+Distribute channels across connections
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from bisect import bisect
+from collections import deque
+from collections.abc import Iterable
+import hashlib
+from threading import Lock
+import time
+from typing import Callable
+
+
+DEFAULT_REPLICAS = 100
+
+
+class HashRing:
+    """Assign keys to nodes by consistent hashing.
+
+    Each node is placed on the ring multiple times (replicas) to spread
+    keys evenly. Adding or removing a node only reassigns the keys of
+    that node.
+    """
+
+    def __init__(
+        self, nodes: Iterable[str], *, replicas: int = DEFAULT_REPLICAS
+    ) -> None:
+        self.replicas = replicas
+        self._positions: list[int] = []
+        self._nodes_by_position: dict[int, str] = {}
+
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str) -> None:
+        for replica in range(self.replicas):
+            position = _hash(f'{node}#{replica}')
+            self._nodes_by_position[position] = node
+
+        self._positions = sorted(self._nodes_by_position)
+
+    def remove_node(self, node: str) -> None:
+        for replica in range(self.replicas):
+            position = _hash(f'{node}#{replica}')
+            self._nodes_by_position.pop(position, None)
+
+        self._positions = sorted(self._nodes_by_position)
+
+    def get_node(self, key: str) -> str:
+        """Return the node the key is assigned to."""
+        if not self._positions:
+            raise LookupError('No nodes on hash ring.')
+
+        index = bisect(self._positions, _hash(key)) % len(self._positions)
+        return self._nodes_by_position[self._positions[index]]
+
+
+def _hash(value: str) -> int:
+    digest = hashlib.md5(value.encode(), usedforsecurity=False).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class SendRateMeter:
+    """Measure the number of messages sent per second over a sliding
+    time window.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._timestamps: deque[float] = deque()
+        self.total = 0
+
+    def record(self) -> None:
+        """Record a sent message."""
+        with self._lock:
+            self._timestamps.append(self._clock())
+            self.total += 1
+            self._remove_old_timestamps()
+
+    def get_rate(self) -> float:
+        """Return the number of messages sent per second."""
+        with self._lock:
+            self._remove_old_timestamps()
+            return len(self._timestamps) / self.window_seconds
+
+    def _remove_old_timestamps(self) -> None:
+        start = self._clock() - self.window_seconds
+        while self._timestamps and self._timestamps[0] <= start:
+            self._timestamps.popleft()
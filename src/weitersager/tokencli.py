@@ -2,13 +2,20 @@
 weitersager.tokencli
 ~~~~~~~~~~~~~~~~~~~~
 
-Command line tool to generate secret tokens
+Command line tool to generate secret tokens, and to register them in
+(or revoke them from) a token store
 
 :Copyright: 2007-2025 Jochen Kupperschmidt
 :License: MIT, see LICENSE for details.
 """
 
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
 from secrets import token_urlsafe
+import sys
+
+from .tokenstore import TokenStore
 
 
 def generate_token() -> str:
@@ -16,10 +23,85 @@ def generate_token() -> str:
     return token_urlsafe()
 
 
-def main() -> None:
-    """Write a secure token to STDOUT."""
+def parse_args(args: list[str] | None = None) -> Namespace:
+    """Parse command line arguments."""
+    parser = ArgumentParser(
+        description='Generate a secure token, and optionally register '
+        'it as channel token in a token store.'
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    parser_register = subparsers.add_parser(
+        'register',
+        help='generate a channel token and register it in the token store',
+    )
+    parser_register.add_argument(
+        'store_path', metavar='STORE', type=Path, help='token store file'
+    )
+    parser_register.add_argument('channel_name', metavar='CHANNEL')
+    parser_register.add_argument(
+        '--priority',
+        type=int,
+        help='default priority of messages submitted with the token',
+    )
+
+    parser_revoke = subparsers.add_parser(
+        'revoke', help='revoke a channel token in the token store'
+    )
+    parser_revoke.add_argument(
+        'store_path', metavar='STORE', type=Path, help='token store file'
+    )
+    parser_revoke.add_argument('token', metavar='TOKEN')
+
+    return parser.parse_args(args)
+
+
+def register_token(
+    store_path: Path, channel_name: str, *, priority: int | None = None
+) -> str:
+    """Generate a token, register it for the channel, and return it."""
     token = generate_token()
-    print(token)
+
+    store = TokenStore(store_path)
+    try:
+        store.register(token, channel_name, priority=priority)
+    finally:
+        store.close()
+
+    return token
+
+
+def revoke_token(store_path: Path, token: str) -> bool:
+    """Revoke the token. Return `False` if no such token is active."""
+    store = TokenStore(store_path)
+    try:
+        return store.revoke(token)
+    finally:
+        store.close()
+
+
+def main(args: list[str] | None = None) -> None:
+    """Write a secure token to STDOUT.
+
+    When registering a token, it is only shown this once, as the store
+    keeps just a hash of it.
+    """
+    namespace = parse_args(args)
+
+    if namespace.command == 'register':
+        token = register_token(
+            namespace.store_path,
+            namespace.channel_name,
+            priority=namespace.priority,
+        )
+        print(token)
+    elif namespace.command == 'revoke':
+        if not revoke_token(namespace.store_path, namespace.token):
+            sys.stderr.write('No such active token.\n')
+            sys.exit(1)
+    else:
+        token = generate_token()
+        print(token)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,257 @@
+"""
+weitersager.tokenstore
+~~~~~~~~~~~~~~~~~~~~~~
+
+External store of channel tokens
+
+Channel tokens are kept in an SQLite database, so that tokens can be
+registered and revoked (e.g. via `weitersager-token`) without editing
+the configuration and restarting.
+
+Only a SHA-256 hash of each token is stored. As tokens are random and
+long, hashes cannot feasibly be reversed, and a plain (unsalted) hash
+allows looking up a token with a single dictionary access.
+
+Each change to a token is stamped with a version number that is higher
+than any before. The running instance keeps an in-memory index of all
+active tokens and regularly applies only the changes made since it last
+looked. Revoked tokens are kept as rows (marked as such) so that the
+revocation is seen by the index, too.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import hashlib
+import logging
+from pathlib import Path
+import sqlite3
+import sys
+from threading import Event, Lock
+from typing import Any, NamedTuple
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_tokens (
+    token_hash BLOB PRIMARY KEY,
+    channel_name TEXT NOT NULL,
+    priority INTEGER,
+    revoked INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channel_tokens_version
+    ON channel_tokens (version);
+"""
+
+
+def hash_token(token: str) -> bytes:
+    """Return the hash of a token, as stored."""
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+class ChannelToken(NamedTuple):
+    """The channel a token grants access to, and the token's default
+    message priority (if any).
+    """
+
+    channel_name: str
+    priority: int | None
+
+
+class TokenChange(NamedTuple):
+    """A registered or revoked token, as of a version."""
+
+    token_hash: bytes
+    channel_name: str
+    priority: int | None
+    revoked: bool
+    version: int
+
+
+class TokenStore:
+    """Channel tokens in an SQLite database."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # Only used by one thread at a time; see `ChannelTokenIndex`.
+        self._connection = sqlite3.connect(
+            str(path), isolation_level=None, check_same_thread=False
+        )
+        # Let the running instance read while tokens are being written.
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        self._write_count = 0
+
+    def register(
+        self, token: str, channel_name: str, *, priority: int | None = None
+    ) -> None:
+        """Register a token for the channel, replacing a registration of
+        the same token (if any).
+        """
+        self._write(
+            """
+            INSERT OR REPLACE INTO channel_tokens
+                (token_hash, channel_name, priority, revoked, version)
+            VALUES (:token_hash, :channel_name, :priority, 0, :version)
+            """,
+            {
+                'token_hash': hash_token(token),
+                'channel_name': channel_name,
+                'priority': priority,
+            },
+        )
+
+    def revoke(self, token: str) -> bool:
+        """Revoke the token.
+
+        Return `False` if no such token is active.
+        """
+        cursor = self._write(
+            """
+            UPDATE channel_tokens SET revoked = 1, version = :version
+            WHERE token_hash = :token_hash AND revoked = 0
+            """,
+            {'token_hash': hash_token(token)},
+        )
+        return cursor.rowcount > 0
+
+    def _write(self, sql: str, params: dict[str, Any]) -> sqlite3.Cursor:
+        """Execute the statement with the next version."""
+        connection = self._connection
+        # Take the write lock before determining the next version.
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            version = self._get_latest_version() + 1
+            cursor = connection.execute(sql, {**params, 'version': version})
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        self._write_count += 1
+        return cursor
+
+    def _get_latest_version(self) -> int:
+        row = self._connection.execute(
+            'SELECT COALESCE(MAX(version), 0) FROM channel_tokens'
+        ).fetchone()
+        return row[0]
+
+    def get_changes(self, since_version: int = 0) -> list[TokenChange]:
+        """Return the changes made after the version, oldest first."""
+        rows = self._connection.execute(
+            """
+            SELECT token_hash, channel_name, priority, revoked, version
+            FROM channel_tokens
+            WHERE version > ?
+            ORDER BY version
+            """,
+            (since_version,),
+        ).fetchall()
+
+        return [
+            TokenChange(
+                bytes(token_hash),
+                channel_name,
+                priority,
+                bool(revoked),
+                version,
+            )
+            for token_hash, channel_name, priority, revoked, version in rows
+        ]
+
+    def get_data_version(self) -> int:
+        """Return a number that increases whenever changes have been
+        committed to the database.
+        """
+        # SQLite's data version only reflects commits made via other
+        # connections, so add those made via this one.
+        row = self._connection.execute('PRAGMA data_version').fetchone()
+        return row[0] + self._write_count
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class ChannelTokenIndex:
+    """An in-memory index of the active tokens in a store, by hash."""
+
+    def __init__(self, store: TokenStore) -> None:
+        self.store = store
+        self._tokens: dict[bytes, ChannelToken] = {}
+        self._version = 0
+        self._data_version: int | None = None
+        self._lock = Lock()
+        self._stopped = Event()
+
+    def lookup(self, token: str) -> ChannelToken | None:
+        """Return the channel (and priority) for the token, if active."""
+        return self._tokens.get(hash_token(token))
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def refresh(self) -> int:
+        """Apply the changes made to the store since the last refresh.
+
+        Return the number of changes applied.
+        """
+        with self._lock:
+            data_version = self.store.get_data_version()
+            if data_version == self._data_version:
+                # Nothing has been committed in the meantime.
+                return 0
+
+            changes = self.store.get_changes(self._version)
+            self._data_version = data_version
+
+            for change in changes:
+                self._apply(change)
+                self._version = change.version
+
+            return len(changes)
+
+    def _apply(self, change: TokenChange) -> None:
+        if change.revoked:
+            self._tokens.pop(change.token_hash, None)
+            return
+
+        # Share the channel name between all tokens of a channel.
+        channel_name = sys.intern(change.channel_name)
+        self._tokens[change.token_hash] = ChannelToken(
+            channel_name, change.priority
+        )
+
+    def refresh_forever(self, interval_seconds: float) -> None:
+        """Refresh regularly, until stopped."""
+        while not self._stopped.wait(interval_seconds):
+            try:
+                change_count = self.refresh()
+            except sqlite3.Error:
+                logger.exception('Could not refresh channel tokens.')
+                continue
+
+            if change_count:
+                logger.info(
+                    'Applied %d change(s) to channel tokens; '
+                    '%d token(s) active.',
+                    change_count,
+                    len(self),
+                )
+
+    def stop(self) -> None:
+        """Stop refreshing regularly."""
+        self._stopped.set()
+
+
+def open_token_index(path: Path) -> ChannelTokenIndex:
+    """Open the token store and load its active tokens."""
+    index = ChannelTokenIndex(TokenStore(path))
+    index.refresh()
+    logger.info(
+        'Loaded %d channel token(s) from token store %s.', len(index), path
+    )
+    return index
@@ -0,0 +1,133 @@
+"""
+weitersager.tracing
+~~~~~~~~~~~~~~~~~~~
+
+Trace the way of messages through the pipeline
+
+A trace records when a message has been received (by the HTTP server),
+enqueued, dequeued, and sent. The durations in between tell whether
+time is spent on handling the request, waiting in the queue, or
+delivering (holding, packing, and rate limiting).
+
+A sample of traces can be written to a log.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+import logging
+import random
+import secrets
+import time
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+
+class Trace:
+    """An ID and timestamps (seconds since the epoch) of a message."""
+
+    __slots__ = (
+        'message_id',
+        'source_ip_address',
+        'received_at',
+        'enqueued_at',
+        'dequeued_at',
+        'sent_at',
+        'sampled',
+    )
+
+    def __init__(
+        self,
+        message_id: str,
+        source_ip_address: str | None,
+        received_at: float,
+        *,
+        sampled: bool = False,
+    ) -> None:
+        self.message_id = message_id
+        self.source_ip_address = source_ip_address
+        self.received_at = received_at
+        self.enqueued_at: float | None = None
+        self.dequeued_at: float | None = None
+        self.sent_at: float | None = None
+        self.sampled = sampled
+
+    def __repr__(self) -> str:
+        return f'Trace({self.message_id!r})'
+
+    def to_list(self) -> list[Any]:
+        """Return the values to keep across a restart."""
+        return [
+            self.message_id,
+            self.source_ip_address,
+            self.received_at,
+            self.enqueued_at,
+        ]
+
+    @classmethod
+    def from_list(cls, values: list[Any]) -> Trace:
+        message_id, source_ip_address, received_at, enqueued_at = values
+        trace = cls(message_id, source_ip_address, received_at)
+        trace.enqueued_at = enqueued_at
+        return trace
+
+
+class Tracer:
+    """Create traces, and log a sample of them."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        *,
+        random_func=random.random,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self._random_func = random_func
+
+    def create_trace(
+        self, source_ip_address: str | None, received_at: float | None
+    ) -> Trace:
+        if received_at is None:
+            received_at = time.time()
+
+        sampled = (
+            self.sample_rate > 0 and self._random_func() < self.sample_rate
+        )
+
+        return Trace(
+            _generate_message_id(),
+            source_ip_address,
+            received_at,
+            sampled=sampled,
+        )
+
+    def log(self, channel_name: str, trace: Trace) -> None:
+        """Log the trace of a sent message, if sampled."""
+        if not trace.sampled:
+            return
+
+        logger.info(
+            'Message %s for channel %s from %s: '
+            'receive %s, queue %s, deliver %s, total %s',
+            trace.message_id,
+            channel_name,
+            trace.source_ip_address or 'unknown address',
+            _format_duration(trace.received_at, trace.enqueued_at),
+            _format_duration(trace.enqueued_at, trace.dequeued_at),
+            _format_duration(trace.dequeued_at, trace.sent_at),
+            _format_duration(trace.received_at, trace.sent_at),
+        )
+
+
+def _generate_message_id() -> str:
+    return secrets.token_hex(8)
+
+
+def _format_duration(start: float | None, end: float | None) -> str:
+    if start is None or end is None:
+        return '?'
+
+    return f'{(end - start) * 1000:.1f} ms'
@@ -0,0 +1,398 @@
+"""
+A minimal IRC server, to run in-process for tests and benchmarks
+
+It supports just enough of the protocol to exercise an announcer end
+to end: registration, joining channels (with keys), sending messages,
+and pings. To test how announcers cope with a real server's behavior,
+it can kill clients that send too fast (as IRC servers do on "excess
+flood") and drop connections after a given number of messages.
+
+Messages are not relayed to other clients but recorded, so that they
+can be inspected or counted.
+
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from __future__ import annotations
+from collections.abc import Iterable, Sequence
+import socket
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from threading import Condition, Lock, Thread
+import time
+
+
+DEFAULT_SERVER_NAME = 'fake.ircd'
+
+# How often the server checks whether it has been asked to shut down
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class FakeIrcServer:
+    """An IRC server that runs in a thread of its own.
+
+    To have clients killed for flooding, set a penalty (in seconds) per
+    line. Each line received adds the penalty to the client's clock,
+    which cannot run ahead of the current time by more than the flood
+    limit (in seconds) without the client being disconnected. This is
+    the scheme many IRC servers use: a client may send a burst of
+    `flood_limit_seconds / flood_penalty_seconds` lines, and then one
+    line per `flood_penalty_seconds`.
+
+    To drop connections at certain points, pass the numbers of received
+    `PRIVMSG` lines (in total, across connections) after which to
+    disconnect the client that sent it.
+
+    To have joining certain channels fail, map their names to the
+    numeric to reply with, or to `None` to not reply at all.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        *,
+        server_name: str = DEFAULT_SERVER_NAME,
+        channel_keys: dict[str, str] | None = None,
+        max_channels: int | None = None,
+        isupport: Sequence[str] = (),
+        flood_penalty_seconds: float | None = None,
+        flood_limit_seconds: float = 10.0,
+        disconnect_after_privmsgs: Iterable[int] = (),
+        join_replies: dict[str, str | None] | None = None,
+    ) -> None:
+        self.server_name = server_name
+        self.channel_keys = channel_keys or {}
+        self.max_channels = max_channels
+        self.isupport = list(isupport)
+        if max_channels is not None:
+            self.isupport.append(f'CHANLIMIT=#&:{max_channels}')
+        self.flood_penalty_seconds = flood_penalty_seconds
+        self.flood_limit_seconds = flood_limit_seconds
+        self._disconnect_after_privmsgs = set(disconnect_after_privmsgs)
+        self.join_replies = join_replies or {}
+
+        self.lines: list[str] = []
+        self.privmsg_count = 0
+        self.connection_count = 0
+        self.flood_kills = 0
+
+        self._clients: list[_Client] = []
+        self._lock = Lock()
+        self._privmsg_received = Condition(self._lock)
+
+        self._server = _TcpServer((host, port), _RequestHandler)
+        self._server.fake_ircd = self
+
+    @property
+    def server_address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> int:
+        """Start serving, in a separate thread, and return the port."""
+        thread = Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': POLL_INTERVAL_SECONDS},
+            daemon=True,
+        )
+        thread.start()
+        return self.server_address[1]
+
+    def close(self) -> None:
+        """Disconnect all clients and stop serving."""
+        self.disconnect_clients()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def disconnect_clients(self, reason: str = 'Closing Link') -> None:
+        """Drop the connections of all clients."""
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            client.disconnect(reason)
+
+    def ping_clients(self, token: str = DEFAULT_SERVER_NAME) -> None:
+        """Send a `PING` to all clients."""
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            client.send(f'PING :{token}')
+
+    def get_nicknames(self) -> set[str]:
+        """Return the nicknames of the registered clients."""
+        with self._lock:
+            return {
+                client.nickname for client in self._clients if client.registered
+            }
+
+    def get_channel_names(self, nickname: str) -> set[str]:
+        """Return the names of the channels the client has joined."""
+        with self._lock:
+            for client in self._clients:
+                if client.nickname == nickname:
+                    return set(client.channel_names)
+
+        return set()
+
+    def get_privmsgs(self) -> list[str]:
+        """Return the `PRIVMSG` lines received so far."""
+        with self._lock:
+            return [line for line in self.lines if line.startswith('PRIVMSG ')]
+
+    def wait_for_privmsgs(
+        self, count: int, timeout_seconds: float | None = None
+    ) -> bool:
+        """Wait until that many `PRIVMSG` lines have been received.
+
+        Return `False` if that is still not the case after the timeout.
+        """
+        with self._privmsg_received:
+            return self._privmsg_received.wait_for(
+                lambda: self.privmsg_count >= count, timeout_seconds
+            )
+
+    # connection handling
+
+    def _add_client(self, client: _Client) -> None:
+        with self._lock:
+            self._clients.append(client)
+            self.connection_count += 1
+
+    def _remove_client(self, client: _Client) -> None:
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def _handle_line(self, client: _Client, line: str) -> None:
+        if client.disconnected:
+            # Ignore lines that arrived before the connection was closed.
+            return
+
+        if client.registered and self._is_flooding(client):
+            # Drop the line, and the client.
+            with self._lock:
+                self.flood_kills += 1
+            client.disconnect('Excess Flood')
+            return
+
+        with self._lock:
+            self.lines.append(line)
+
+        command, params = _parse_line(line)
+        handler = getattr(self, f'_handle_{command.lower()}', None)
+        if handler is not None:
+            handler(client, params)
+
+    def _is_flooding(self, client: _Client) -> bool:
+        if self.flood_penalty_seconds is None:
+            return False
+
+        now = time.monotonic()
+        client.penalty_until = (
+            max(client.penalty_until, now) + self.flood_penalty_seconds
+        )
+        return client.penalty_until - now > self.flood_limit_seconds
+
+    # commands
+
+    def _handle_nick(self, client: _Client, params: list[str]) -> None:
+        if not params:
+            return
+
+        nickname = params[0]
+        if nickname in self.get_nicknames():
+            client.send_numeric('433', nickname, 'Nickname is already in use')
+            return
+
+        client.nickname = nickname
+        self._register(client)
+
+    def _handle_user(self, client: _Client, params: list[str]) -> None:
+        client.has_sent_user = True
+        self._register(client)
+
+    def _register(self, client: _Client) -> None:
+        if client.registered or not client.has_sent_user:
+            return
+
+        if client.nickname is None:
+            return
+
+        client.registered = True
+        client.send_numeric('001', f'Welcome, {client.nickname}')
+        if self.isupport:
+            client.send_numeric(
+                '005', *self.isupport, 'are supported by this server'
+            )
+        client.send_numeric('376', 'End of /MOTD command.')
+
+    def _handle_join(self, client: _Client, params: list[str]) -> None:
+        if not client.registered or not params:
+            return
+
+        channel_names = params[0].split(',')
+        keys = params[1].split(',') if len(params) > 1 else []
+
+        for index, channel_name in enumerate(channel_names):
+            key = keys[index] if index < len(keys) else None
+            self._join(client, channel_name, key)
+
+    def _join(self, client: _Client, channel_name: str, key: str | None):
+        if channel_name in client.channel_names:
+            return
+
+        if channel_name in self.join_replies:
+            numeric = self.join_replies[channel_name]
+            if numeric is not None:
+                client.send_numeric(
+                    numeric, channel_name, 'Cannot join channel'
+                )
+            return
+
+        if not channel_name.startswith(('#', '&')):
+            client.send_numeric('403', channel_name, 'No such channel')
+            return
+
+        required_key = self.channel_keys.get(channel_name)
+        if required_key is not None and key != required_key:
+            client.send_numeric('475', channel_name, 'Cannot join channel (+k)')
+            return
+
+        if (
+            self.max_channels is not None
+            and len(client.channel_names) >= self.max_channels
+        ):
+            client.send_numeric(
+                '405', channel_name, 'You have joined too many channels'
+            )
+            return
+
+        client.channel_names.add(channel_name)
+        client.send(f':{client.get_prefix()} JOIN {channel_name}')
+
+    def _handle_part(self, client: _Client, params: list[str]) -> None:
+        if not client.registered or not params:
+            return
+
+        for channel_name in params[0].split(','):
+            if channel_name in client.channel_names:
+                client.channel_names.discard(channel_name)
+                client.send(f':{client.get_prefix()} PART {channel_name}')
+
+    def _handle_privmsg(self, client: _Client, params: list[str]) -> None:
+        if not client.registered or len(params) < 2:
+            return
+
+        for target in params[0].split(','):
+            if target not in client.channel_names:
+                client.send_numeric('404', target, 'Cannot send to channel')
+
+        with self._privmsg_received:
+            self.privmsg_count += 1
+            count = self.privmsg_count
+            self._privmsg_received.notify_all()
+
+        if count in self._disconnect_after_privmsgs:
+            client.disconnect('Closing Link')
+
+    def _handle_ping(self, client: _Client, params: list[str]) -> None:
+        token = params[0] if params else self.server_name
+        client.send(f':{self.server_name} PONG {self.server_name} :{token}')
+
+    def _handle_quit(self, client: _Client, params: list[str]) -> None:
+        client.disconnect('Quit')
+
+
+def _parse_line(line: str) -> tuple[str, list[str]]:
+    """Split a line into command and parameters."""
+    if line.startswith(':'):
+        # Ignore a prefix sent by the client.
+        _, _, line = line.partition(' ')
+
+    if ' :' in line:
+        head, trailing = line.split(' :', 1)
+        params = head.split() + [trailing]
+    else:
+        params = line.split()
+
+    if not params:
+        return '', []
+
+    return params[0].upper(), params[1:]
+
+
+class _Client:
+    """A client's connection, and what the server knows about it."""
+
+    def __init__(self, server_name: str, sock: socket.socket) -> None:
+        self.server_name = server_name
+        self.socket = sock
+        self.nickname: str | None = None
+        self.has_sent_user = False
+        self.registered = False
+        self.channel_names: set[str] = set()
+        self.penalty_until = 0.0
+        self.disconnected = False
+        self._send_lock = Lock()
+
+    def get_prefix(self) -> str:
+        return f'{self.nickname}!user@localhost'
+
+    def send_numeric(self, numeric: str, *params: str) -> None:
+        nickname = self.nickname or '*'
+        *middle, trailing = params
+        line = ' '.join([f':{self.server_name}', numeric, nickname, *middle])
+        self.send(f'{line} :{trailing}')
+
+    def send(self, line: str) -> None:
+        data = f'{line}\r\n'.encode()
+        with self._send_lock:
+            try:
+                self.socket.sendall(data)
+            except OSError:
+                pass
+
+    def disconnect(self, reason: str) -> None:
+        if self.disconnected:
+            return
+
+        self.disconnected = True
+        self.send(f'ERROR :{reason}')
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _TcpServer(ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    fake_ircd: FakeIrcServer
+
+
+class _RequestHandler(StreamRequestHandler):
+    server: _TcpServer
+
+    def handle(self) -> None:
+        fake_ircd = self.server.fake_ircd
+        client = _Client(fake_ircd.server_name, self.connection)
+        fake_ircd._add_client(client)
+
+        try:
+            for data in self.rfile:
+                line = data.decode('utf-8', 'replace').rstrip('\r\n')
+                fake_ircd._handle_line(client, line)
+        except OSError:
+            pass
+        finally:
+            fake_ircd._remove_client(client)
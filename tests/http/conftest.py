@@ -14,17 +14,33 @@ from weitersager.http import create_server
 @pytest.fixture
 def make_server():
     # Per default, bind to localhost on random user port.
-    def _wrapper(host='', port=0, *, api_tokens=None):
+    def _wrapper(
+        host='',
+        port=0,
+        *,
+        api_tokens=None,
+        channel_tokens_to_channel_names=None,
+        token_priorities=None,
+        metrics=None,
+        token_index=None,
+        sync=None,
+    ):
         if api_tokens is None:
             api_tokens = set()
+        if channel_tokens_to_channel_names is None:
+            channel_tokens_to_channel_names = {}
+        if token_priorities is None:
+            token_priorities = {}
         config = HttpConfig(
             host,
             port,
             api_tokens=api_tokens,
-            channel_tokens_to_channel_names={},
+            channel_tokens_to_channel_names=channel_tokens_to_channel_names,
+            token_priorities=token_priorities,
+            metrics=metrics is not None,
         )
 
-        server = create_server(config)
+        server = create_server(config, metrics, token_index, sync=sync)
 
         thread = Thread(target=server.handle_request)
         thread.start()
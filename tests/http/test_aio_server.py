@@ -0,0 +1,131 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from http.client import HTTPConnection
+import json
+from threading import Thread
+
+import pytest
+
+from weitersager.config import HttpConfig
+from weitersager.http_aio import create_async_server
+from weitersager.signals import message_received
+
+
+@pytest.fixture
+def server():
+    with run_server() as server:
+        yield server
+
+
+@contextmanager
+def run_server(**kwargs):
+    config = HttpConfig(
+        '127.0.0.1',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        keep_alive_timeout=5.0,
+    )
+    server = create_async_server(config, **kwargs)
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+@pytest.fixture
+def received():
+    received = []
+
+    def receive(sender, **kwargs):
+        for channel_name in kwargs['channel_names']:
+            received.append((channel_name, kwargs['text']))
+
+    message_received.connect(receive)
+    yield received
+    message_received.disconnect(receive)
+
+
+def test_valid_requests_over_one_connection(server, received):
+    conn = HTTPConnection(*server.server_address)
+
+    for text in ['one', 'two']:
+        response = post(conn, {'channel': '#party', 'text': text})
+        response.read()
+
+        assert response.status == 202
+        assert response.getheader('Server') == 'Weitersager'
+        assert response.getheader('Connection') is None
+
+    conn.close()
+
+    assert received == [('#party', 'one'), ('#party', 'two')]
+
+
+def test_request_without_text(server, received):
+    conn = HTTPConnection(*server.server_address)
+
+    response = post(conn, {'channel': '#silence'})
+    response.read()
+    conn.close()
+
+    assert response.status == 400
+    assert received == []
+
+
+def test_connection_closed_on_request(server, received):
+    conn = HTTPConnection(*server.server_address)
+
+    response = post(
+        conn, {'channel': '#party', 'text': 'bye'}, connection='close'
+    )
+    response.read()
+    conn.close()
+
+    assert response.status == 202
+    assert response.getheader('Connection') == 'close'
+
+
+def test_synced_off_event_loop_before_response(received):
+    synced_on_event_loop = []
+
+    def sync():
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            synced_on_event_loop.append(False)
+        else:
+            synced_on_event_loop.append(True)
+
+    with run_server(sync=sync) as server:
+        conn = HTTPConnection(*server.server_address)
+        response = post(conn, {'channel': '#party', 'text': 'durable'})
+        response.read()
+        conn.close()
+
+    assert response.status == 202
+    assert received == [('#party', 'durable')]
+    assert synced_on_event_loop == [False]
+
+
+def post(conn, data, *, connection=None):
+    headers = {'Content-Type': 'application/json'}
+    if connection is not None:
+        headers['Connection'] = connection
+
+    conn.request('POST', '/', body=json.dumps(data).encode(), headers=headers)
+    return conn.getresponse()
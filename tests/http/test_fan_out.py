@@ -0,0 +1,85 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.signals import message_received
+
+
+@pytest.fixture
+def received_messages():
+    messages = []
+
+    def handle_message_received(sender, **data):
+        messages.append((data['channel_names'], data['text']))
+
+    message_received.connect(handle_message_received)
+
+    yield messages
+
+    message_received.disconnect(handle_message_received)
+
+
+def test_text_to_multiple_channels(make_server, received_messages):
+    server = make_server()
+    data = {'channel': ['#one', '#two', '#one', '#three'], 'text': 'hi'}
+
+    response = urlopen(build_request(server, json.dumps(data)))
+
+    assert response.code == 202
+    # Passed on at once, to be accepted for all channels or for none.
+    assert received_messages == [(['#one', '#two', '#three'], 'hi')]
+
+
+def test_text_to_multiple_channels_in_batch(make_server, received_messages):
+    server = make_server()
+    data = [
+        {'channel': ['#one', '#two'], 'text': 'hi'},
+        {'channel': [], 'text': 'nobody'},
+    ]
+
+    response = urlopen(build_request(server, json.dumps(data)))
+
+    assert json.load(response) == {
+        'results': [
+            {'status': 202},
+            {'status': 400},
+        ]
+    }
+    assert received_messages == [(['#one', '#two'], 'hi')]
+
+
+@pytest.mark.parametrize(
+    'channel',
+    [
+        [],
+        ['#one', 42],
+        [f'#channel{i}' for i in range(101)],
+    ],
+)
+def test_invalid_channel_list(make_server, received_messages, channel):
+    server = make_server()
+    data = {'channel': channel, 'text': 'hi'}
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(build_request(server, json.dumps(data)))
+
+    assert excinfo.value.code == 400
+    assert received_messages == []
+
+
+def build_request(server, data):
+    server_host, server_port = server.server_address
+    url = f'http://{server_host}:{server_port}/'
+
+    headers = {'Content-Type': 'application/json'}
+
+    return Request(
+        url, data=data.encode('utf-8'), headers=headers, method='POST'
+    )
@@ -0,0 +1,151 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from http.client import HTTPConnection
+import json
+from threading import Thread
+import time
+
+import pytest
+
+from weitersager.config import HttpConfig
+from weitersager.http import create_server
+
+
+BODY = json.dumps({'channel': '#party', 'text': 'Limbo!'})
+HEADERS = {'Content-Type': 'application/json'}
+
+
+@pytest.fixture
+def make_keep_alive_server():
+    def _wrapper(*, keep_alive_timeout=5.0, keep_alive_max_requests=100):
+        config = HttpConfig(
+            '',
+            0,
+            api_tokens=set(),
+            channel_tokens_to_channel_names={},
+            workers=2,
+            keep_alive_timeout=keep_alive_timeout,
+            keep_alive_max_requests=keep_alive_max_requests,
+        )
+
+        server = create_server(config)
+        servers.append(server)
+
+        thread = Thread(target=server.serve_forever)
+        thread.start()
+        threads.append(thread)
+
+        return server
+
+    servers = []
+    threads = []
+
+    yield _wrapper
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    for thread in threads:
+        thread.join()
+
+
+def test_multiple_requests_per_connection(make_keep_alive_server):
+    server = make_keep_alive_server()
+    conn = HTTPConnection(*server.server_address)
+
+    for _ in range(3):
+        conn.request('POST', '/', body=BODY, headers=HEADERS)
+        response = conn.getresponse()
+        response.read()
+
+        assert response.status == 202
+        assert response.version == 11
+        assert response.getheader('Connection') is None
+
+    conn.close()
+
+
+def test_unread_request_body_is_discarded(make_keep_alive_server):
+    server = make_keep_alive_server()
+    conn = HTTPConnection(*server.server_address)
+
+    # The application rejects this request without reading its body.
+    conn.request('POST', '/foo', body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+
+    assert response.status == 404
+
+    conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+
+    assert response.status == 202
+
+    conn.close()
+
+
+def test_connection_closed_after_max_requests(make_keep_alive_server):
+    server = make_keep_alive_server(keep_alive_max_requests=2)
+    conn = HTTPConnection(*server.server_address)
+
+    conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+
+    assert response.getheader('Connection') is None
+
+    conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+
+    assert response.getheader('Connection') == 'close'
+    assert response.will_close
+
+    conn.close()
+
+
+def test_idle_connection_closed_after_timeout(make_keep_alive_server):
+    server = make_keep_alive_server(keep_alive_timeout=0.1)
+    conn = HTTPConnection(*server.server_address)
+
+    conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+
+    assert response.status == 202
+
+    time.sleep(0.3)
+
+    # The server has closed its end of the connection.
+    assert conn.sock.recv(1) == b''
+
+    conn.close()
+
+
+def test_idle_connection_does_not_block_other_clients(
+    make_keep_alive_server,
+):
+    server = make_keep_alive_server()
+
+    idle_conn = HTTPConnection(*server.server_address)
+    idle_conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = idle_conn.getresponse()
+    response.read()
+
+    assert response.status == 202
+
+    # Keep the first connection open (but idle) while another client
+    # connects.
+    other_conn = HTTPConnection(*server.server_address, timeout=2)
+    other_conn.request('POST', '/', body=BODY, headers=HEADERS)
+    response = other_conn.getresponse()
+    response.read()
+
+    assert response.status == 202
+
+    other_conn.close()
+    idle_conn.close()
@@ -0,0 +1,69 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.metrics import Metrics
+
+
+def test_metrics(make_server):
+    metrics = Metrics()
+    metrics.messages_received.inc()
+    server = make_server(metrics=metrics)
+
+    response = urlopen(build_url(server, '/metrics'))
+
+    assert response.code == 200
+    assert response.headers['Content-Type'].startswith('text/plain')
+    body = response.read().decode()
+    assert 'weitersager_messages_received_total 1\n' in body
+
+
+def test_metrics_disabled(make_server):
+    server = make_server()
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(build_url(server, '/metrics'))
+
+    assert excinfo.value.code == 404
+
+
+def test_rejected_message_counted(make_server):
+    metrics = Metrics()
+    server = make_server(metrics=metrics)
+
+    with pytest.raises(HTTPError):
+        urlopen(build_request(server, {'channel': '#silence'}))
+
+    assert metrics.messages_rejected.get_value('400') == 1
+
+
+def test_rejected_batch_items_counted(make_server):
+    metrics = Metrics()
+    server = make_server(metrics=metrics)
+
+    items = [{'channel': '#one'}, {'text': 'two'}, {'channel': '#three'}]
+    response = urlopen(build_request(server, items))
+
+    assert response.code == 202
+    assert metrics.messages_rejected.get_value('400') == 3
+
+
+def build_url(server, path):
+    host, port = server.server_address
+    return f'http://{host}:{port}{path}'
+
+
+def build_request(server, data):
+    return Request(
+        build_url(server, '/'),
+        data=json.dumps(data).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
@@ -0,0 +1,129 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.signals import message_received
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server()
+
+
+@pytest.fixture
+def server_with_token_priorities(make_server):
+    return make_server(
+        api_tokens={
+            'nXeAmGYSRulHkD-6MVNYP6Mgi7ZLFPqMuOGx8Ak8qDo',
+            'KfLp3FXhQlD7iqdwN1aTtqakSeX7q_pT7wKxhvfYUwE',
+        },
+        token_priorities={
+            'nXeAmGYSRulHkD-6MVNYP6Mgi7ZLFPqMuOGx8Ak8qDo': 10,
+        },
+    )
+
+
+@pytest.fixture
+def received_priorities():
+    priorities = []
+
+    def handle_message_received(sender, **data):
+        priorities.append(data['priority'])
+
+    message_received.connect(handle_message_received)
+
+    yield priorities
+
+    message_received.disconnect(handle_message_received)
+
+
+def test_default_priority(server, received_priorities):
+    request = build_request(server, {'channel': '#ci', 'text': 'Build OK'})
+
+    urlopen(request)
+
+    assert received_priorities == [0]
+
+
+def test_priority_from_payload(server, received_priorities):
+    data = {'channel': '#ops', 'text': 'Disk full!', 'priority': 5}
+    request = build_request(server, data)
+
+    urlopen(request)
+
+    assert received_priorities == [5]
+
+
+@pytest.mark.parametrize('priority', ['high', 1.5, True, None])
+def test_invalid_priority(server, received_priorities, priority):
+    data = {'channel': '#ops', 'text': 'Disk full!', 'priority': priority}
+    request = build_request(server, data)
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(request)
+
+    assert excinfo.value.code == 400
+    assert received_priorities == []
+
+
+def test_priority_from_token(server_with_token_priorities, received_priorities):
+    request = build_request(
+        server_with_token_priorities,
+        {'channel': '#ops', 'text': 'Disk full!'},
+        api_token='nXeAmGYSRulHkD-6MVNYP6Mgi7ZLFPqMuOGx8Ak8qDo',
+    )
+
+    urlopen(request)
+
+    assert received_priorities == [10]
+
+
+def test_payload_priority_overrides_token_priority(
+    server_with_token_priorities, received_priorities
+):
+    request = build_request(
+        server_with_token_priorities,
+        {'channel': '#ops', 'text': 'Not that urgent', 'priority': 1},
+        api_token='nXeAmGYSRulHkD-6MVNYP6Mgi7ZLFPqMuOGx8Ak8qDo',
+    )
+
+    urlopen(request)
+
+    assert received_priorities == [1]
+
+
+def test_token_without_priority(
+    server_with_token_priorities, received_priorities
+):
+    request = build_request(
+        server_with_token_priorities,
+        {'channel': '#ci', 'text': 'Build OK'},
+        api_token='KfLp3FXhQlD7iqdwN1aTtqakSeX7q_pT7wKxhvfYUwE',
+    )
+
+    urlopen(request)
+
+    assert received_priorities == [0]
+
+
+# helpers
+
+
+def build_request(server, data, *, api_token=None):
+    server_host, server_port = server.server_address
+    url = f'http://{server_host}:{server_port}/'
+
+    data = json.dumps(data).encode('utf-8')
+
+    headers = {'Content-Type': 'application/json'}
+    if api_token:
+        headers['Authorization'] = f'Bearer {api_token}'
+
+    return Request(url, data=data, headers=headers, method='POST')
@@ -0,0 +1,78 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.queues import QueueFullError
+from weitersager.signals import message_received
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server()
+
+
+@pytest.fixture
+def queue_capacity_two():
+    accepted = []
+
+    def handle_message_received(sender, **data):
+        if len(accepted) >= 2:
+            raise QueueFullError(42)
+        accepted.append(data['text'])
+
+    message_received.connect(handle_message_received)
+
+    yield accepted
+
+    message_received.disconnect(handle_message_received)
+
+
+def test_single_message_rejected(server, queue_capacity_two):
+    queue_capacity_two.extend(['first', 'second'])
+
+    request = build_request(server, {'channel': '#party', 'text': 'Limbo!'})
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(request)
+
+    assert excinfo.value.code == 503
+    assert excinfo.value.headers['Retry-After'] == '42'
+
+
+def test_remaining_batch_items_rejected(server, queue_capacity_two):
+    data = [{'channel': '#party', 'text': str(i)} for i in range(4)]
+    request = build_request(server, data)
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert response.headers['Retry-After'] == '42'
+    assert json.load(response) == {
+        'results': [
+            {'status': 202},
+            {'status': 202},
+            {'status': 503},
+            {'status': 503},
+        ]
+    }
+    assert queue_capacity_two == ['0', '1']
+
+
+# helpers
+
+
+def build_request(server, data):
+    server_host, server_port = server.server_address
+    url = f'http://{server_host}:{server_port}/'
+
+    data = json.dumps(data).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+
+    return Request(url, data=data, headers=headers, method='POST')
@@ -0,0 +1,175 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.signals import message_received
+
+
+@pytest.fixture
+def server(make_server):
+    channel_tokens_to_channel_names = {
+        'xsP1y9cUm5MqxUmXg_7a7lKeBB7MFb_ZMb3yGUp8dRw': '#tokenized',
+    }
+    return make_server(
+        channel_tokens_to_channel_names=channel_tokens_to_channel_names
+    )
+
+
+@pytest.fixture
+def received_messages():
+    messages = []
+
+    def handle_message_received(sender, **data):
+        for channel_name in data['channel_names']:
+            messages.append((channel_name, data['text']))
+
+    message_received.connect(handle_message_received)
+
+    yield messages
+
+    message_received.disconnect(handle_message_received)
+
+
+def test_json_array(server, received_messages):
+    data = [
+        {'channel': '#one', 'text': 'first'},
+        {'channel': '#two', 'text': 'second'},
+    ]
+    request = build_request(server, '', json.dumps(data), 'application/json')
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert json.load(response) == {
+        'results': [
+            {'status': 202},
+            {'status': 202},
+        ]
+    }
+    assert received_messages == [
+        ('#one', 'first'),
+        ('#two', 'second'),
+    ]
+
+
+def test_sync_once_per_batch(make_server, received_messages):
+    syncs = []
+
+    def sync():
+        # Sync after all messages have been passed on.
+        syncs.append(len(received_messages))
+
+    server = make_server(sync=sync)
+    data = [{'channel': '#one', 'text': str(i)} for i in range(3)]
+    request = build_request(server, '', json.dumps(data), 'application/json')
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert syncs == [3]
+
+
+def test_json_array_with_invalid_items(server, received_messages):
+    data = [
+        {'channel': '#one', 'text': 'first'},
+        {'text': 'Which channel is this?!'},
+        'not an object',
+        {'channel': '#two', 'text': 'second'},
+    ]
+    request = build_request(server, '', json.dumps(data), 'application/json')
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert json.load(response) == {
+        'results': [
+            {'status': 202},
+            {'status': 400},
+            {'status': 400},
+            {'status': 202},
+        ]
+    }
+    assert received_messages == [
+        ('#one', 'first'),
+        ('#two', 'second'),
+    ]
+
+
+def test_ndjson(server, received_messages):
+    data = '\n'.join(
+        [
+            json.dumps({'channel': '#one', 'text': 'first'}),
+            '{ broken',
+            '',
+            json.dumps({'channel': '#two', 'text': 'second'}),
+        ]
+    )
+    request = build_request(server, '', data, 'application/x-ndjson')
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert json.load(response) == {
+        'results': [
+            {'status': 202},
+            {'status': 400},
+            {'status': 202},
+        ]
+    }
+    assert received_messages == [
+        ('#one', 'first'),
+        ('#two', 'second'),
+    ]
+
+
+def test_json_array_via_channel_token(server, received_messages):
+    data = [
+        {'text': 'first'},
+        {'channel': '#ignored', 'text': 'second'},
+    ]
+    request = build_request(
+        server,
+        'ct/xsP1y9cUm5MqxUmXg_7a7lKeBB7MFb_ZMb3yGUp8dRw',
+        json.dumps(data),
+        'application/json',
+    )
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert received_messages == [
+        ('#tokenized', 'first'),
+        ('#tokenized', 'second'),
+    ]
+
+
+def test_too_large_batch(server, received_messages):
+    data = [{'channel': '#one', 'text': 'spam'}] * 1001
+    request = build_request(server, '', json.dumps(data), 'application/json')
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(request)
+
+    assert excinfo.value.code == 413
+    assert received_messages == []
+
+
+# helpers
+
+
+def build_request(server, path, data, content_type):
+    server_host, server_port = server.server_address
+    url = f'http://{server_host}:{server_port}/{path}'
+
+    headers = {'Content-Type': content_type}
+
+    return Request(
+        url, data=data.encode('utf-8'), headers=headers, method='POST'
+    )
@@ -63,6 +63,34 @@ def test_receive_server_without_text(server):
     assert excinfo.value.code == 400
 
 
+@pytest.mark.parametrize('data', ['Limbo!', 42, None])
+def test_receive_server_with_payload_other_than_object(server, data):
+    request = build_request(server, data)
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(request)
+
+    assert excinfo.value.code == 400
+
+
+def test_channel_token_with_payload_other_than_object(make_server):
+    server = make_server(
+        channel_tokens_to_channel_names={'fPx5Fvv9qW6c': '#party'}
+    )
+    url = get_server_url(server) + 'ct/fPx5Fvv9qW6c'
+    request = Request(
+        url,
+        data=b'"Limbo!"',
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(request)
+
+    assert excinfo.value.code == 400
+
+
 # restricted access
 
 
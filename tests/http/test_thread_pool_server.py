@@ -0,0 +1,66 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+import socket
+from threading import Thread
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.config import HttpConfig
+from weitersager.http import create_server, ThreadPoolWSGIServer
+
+
+@pytest.fixture
+def thread_pool_server():
+    config = HttpConfig(
+        '',
+        0,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        workers=2,
+    )
+
+    server = create_server(config)
+
+    thread = Thread(target=server.serve_forever)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_server_type(thread_pool_server):
+    assert isinstance(thread_pool_server, ThreadPoolWSGIServer)
+
+
+def test_slow_client_does_not_block_other_clients(thread_pool_server):
+    # Occupy one worker with a client that never completes its request.
+    slow_client = socket.create_connection(thread_pool_server.server_address)
+    slow_client.sendall(b'POST / HTTP/1.0\r\n')
+
+    try:
+        data = json.dumps({'channel': '#party', 'text': 'Limbo!'})
+        request = Request(
+            get_server_url(thread_pool_server),
+            data=data.encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+
+        response = urlopen(request, timeout=5)
+
+        assert response.code == 202
+    finally:
+        slow_client.close()
+
+
+def get_server_url(server):
+    server_host, server_port = server.server_address
+    return f'http://{server_host}:{server_port}/'
@@ -0,0 +1,106 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from weitersager.signals import message_received
+from weitersager.tokenstore import ChannelTokenIndex, TokenStore
+
+
+@pytest.fixture
+def token_index(tmp_path):
+    store = TokenStore(tmp_path / 'tokens.sqlite')
+    store.register('6xSAh5aK5Gh-Z_JEYh4Jqg7DVyFP9sF1Uj4kGhU3hpk', '#stored')
+    store.register(
+        'Bz-0GT0ywnN5dzSGkV6Ab8YMPsG_MUMw2ZSeE8AtoyI', '#urgent', priority=7
+    )
+    index = ChannelTokenIndex(store)
+    index.refresh()
+    yield index
+    store.close()
+
+
+@pytest.fixture
+def server(make_server, token_index):
+    return make_server(
+        channel_tokens_to_channel_names={
+            'cFq9dd7PEoz1YbY0OSJmy7-2ZRG3Dn0Y1MBqKQ9j2cQ': '#configured',
+        },
+        token_index=token_index,
+    )
+
+
+@pytest.fixture
+def received_messages():
+    messages = []
+
+    def handle_message_received(sender, **data):
+        for channel_name in data['channel_names']:
+            messages.append((channel_name, data['text'], data['priority']))
+
+    message_received.connect(handle_message_received)
+
+    yield messages
+
+    message_received.disconnect(handle_message_received)
+
+
+def test_stored_channel_token(server, received_messages):
+    request = build_request(
+        server, '6xSAh5aK5Gh-Z_JEYh4Jqg7DVyFP9sF1Uj4kGhU3hpk', 'Hi!'
+    )
+
+    response = urlopen(request)
+
+    assert response.code == 202
+    assert received_messages == [('#stored', 'Hi!', 0)]
+
+
+def test_stored_channel_token_with_priority(server, received_messages):
+    request = build_request(
+        server, 'Bz-0GT0ywnN5dzSGkV6Ab8YMPsG_MUMw2ZSeE8AtoyI', 'Fire!'
+    )
+
+    urlopen(request)
+
+    assert received_messages == [('#urgent', 'Fire!', 7)]
+
+
+def test_configured_channel_token(server, received_messages):
+    request = build_request(
+        server, 'cFq9dd7PEoz1YbY0OSJmy7-2ZRG3Dn0Y1MBqKQ9j2cQ', 'Hello'
+    )
+
+    urlopen(request)
+
+    assert received_messages == [('#configured', 'Hello', 0)]
+
+
+def test_revoked_channel_token(server, token_index, received_messages):
+    token_index.store.revoke('6xSAh5aK5Gh-Z_JEYh4Jqg7DVyFP9sF1Uj4kGhU3hpk')
+    token_index.refresh()
+    request = build_request(
+        server, '6xSAh5aK5Gh-Z_JEYh4Jqg7DVyFP9sF1Uj4kGhU3hpk', 'Hi!'
+    )
+
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(request)
+
+    assert excinfo.value.code == 404
+    assert received_messages == []
+
+
+def build_request(server, channel_token, text):
+    server_host, server_port = server.server_address
+    url = f'http://{server_host}:{server_port}/ct/{channel_token}'
+
+    data = json.dumps({'text': text}).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+
+    return Request(url, data=data, headers=headers, method='POST')
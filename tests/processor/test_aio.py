@@ -0,0 +1,95 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import asyncio
+
+from weitersager.config import Config, HttpConfig, IrcConfig, QueueConfig
+from weitersager.irc_aio import AioDummyAnnouncer
+from weitersager.processor_aio import AsyncProcessor
+
+
+def create_processor(queue_config):
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=queue_config,
+        runtime='asyncio',
+    )
+
+    return AsyncProcessor(config)
+
+
+def test_messages_announced_on_arrival():
+    announced = []
+
+    async def run():
+        processor = create_processor(QueueConfig())
+        assert isinstance(processor.announcer, AioDummyAnnouncer)
+        processor.announcer.announce = lambda channel_name, text: (
+            announced.append((channel_name, text))
+        )
+        processor.enable_channel(None, channel_name='#ci')
+
+        task = asyncio.create_task(process_forever(processor))
+
+        processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+        await asyncio.sleep(0.01)
+        assert announced == [('#ci', 'build 1 OK')]
+
+        # Idle now, woken up by the next message.
+        processor.handle_message(None, channel_names=['#ci'], text='build 2 OK')
+        await asyncio.sleep(0.01)
+        assert announced == [('#ci', 'build 1 OK'), ('#ci', 'build 2 OK')]
+
+        task.cancel()
+
+    asyncio.run(run())
+
+
+def test_packed_line_announced_after_linger():
+    announced = []
+
+    async def run():
+        queue_config = QueueConfig(pack=True, pack_linger=0.05)
+        processor = create_processor(queue_config)
+        processor.announcer.announce = lambda channel_name, text: (
+            announced.append((channel_name, text))
+        )
+        processor.enable_channel(None, channel_name='#ci')
+
+        task = asyncio.create_task(process_forever(processor))
+
+        processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+        processor.handle_message(None, channel_names=['#ci'], text='build 2 OK')
+        await asyncio.sleep(0.01)
+        assert announced == []
+
+        await asyncio.sleep(0.1)
+        assert announced == [('#ci', 'build 1 OK | build 2 OK')]
+
+        task.cancel()
+
+    asyncio.run(run())
+
+
+async def process_forever(processor):
+    while True:
+        await processor.process_queue_async()
@@ -0,0 +1,90 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.config import Config, HttpConfig, IrcConfig, QueueConfig
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    queue_config = QueueConfig(coalesce_window=60)
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=queue_config,
+    )
+
+    return Processor(config)
+
+
+def test_identical_messages_announced_once(processor):
+    announced = []
+
+    def announce(channel_name, text):
+        announced.append((channel_name, text))
+
+    processor.announcer.announce = announce
+
+    irc_channel_joined.send(channel_name='#ops')
+
+    for text in ['Disk full!', 'Disk full!', 'Host down!', 'Disk full!']:
+        processor.handle_message(None, channel_names=['#ops'], text=text)
+
+    assert processor.message_queue.qsize() == 2
+
+    processor.process_queue(timeout_seconds=1)
+    processor.process_queue(timeout_seconds=1)
+
+    assert announced == [
+        ('#ops', 'Disk full! (3x)'),
+        ('#ops', 'Host down!'),
+    ]
+
+
+def test_higher_priority_message_not_collapsed(processor):
+    announced = []
+
+    def announce(channel_name, text):
+        announced.append((channel_name, text))
+
+    processor.announcer.announce = announce
+
+    irc_channel_joined.send(channel_name='#ops')
+
+    processor.handle_message(None, channel_names=['#ops'], text='Host down!')
+    processor.handle_message(None, channel_names=['#ops'], text='Disk full!')
+    processor.handle_message(
+        None, channel_names=['#ops'], text='Disk full!', priority=10
+    )
+
+    for _ in range(3):
+        processor.process_queue(timeout_seconds=1)
+
+    # Not held back behind the message of lower priority
+    assert announced == [
+        ('#ops', 'Disk full!'),
+        ('#ops', 'Host down!'),
+        ('#ops', 'Disk full!'),
+    ]
@@ -0,0 +1,63 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.config import Config, HttpConfig, IrcConfig
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    config = Config(log_level='debug', http=http_config, irc=irc_config)
+
+    return Processor(config)
+
+
+def test_identical_texts_announced_together(processor):
+    announced = []
+
+    def announce(channel_name, text):
+        announced.append(([channel_name], text))
+
+    def announce_to_channels(channel_names, text):
+        announced.append((channel_names, text))
+
+    processor.announcer.announce = announce
+    processor.announcer.announce_to_channels = announce_to_channels
+
+    for channel_name in ['#one', '#two', '#three']:
+        irc_channel_joined.send(channel_name=channel_name)
+
+    processor.handle_message(None, channel_names=['#one'], text='deployed')
+    processor.handle_message(None, channel_names=['#two'], text='deployed')
+    processor.handle_message(None, channel_names=['#three'], text='deployed')
+    processor.handle_message(None, channel_names=['#one'], text='deployed')
+    processor.handle_message(None, channel_names=['#two'], text='rolled back')
+
+    for _ in range(3):
+        processor.process_queue(timeout_seconds=1)
+
+    assert announced == [
+        (['#one', '#two', '#three'], 'deployed'),
+        (['#one'], 'deployed'),
+        (['#two'], 'rolled back'),
+    ]
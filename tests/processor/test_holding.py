@@ -0,0 +1,80 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from queue import Empty
+
+import pytest
+
+from weitersager.config import Config, HttpConfig, IrcConfig, QueueConfig
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    queue_config = QueueConfig(hold_ttl=60.0)
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=queue_config,
+    )
+
+    return Processor(config)
+
+
+def test_messages_held_until_channel_joined(processor):
+    announced = []
+
+    def announce(channel_name, text):
+        announced.append((channel_name, text))
+
+    processor.announcer.announce = announce
+
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.handle_message(None, channel_names=['#ci'], text='build 2 OK')
+
+    for _ in range(2):
+        processor.process_queue(timeout_seconds=1)
+
+    assert announced == []
+    assert len(processor.holding_buffer) == 2
+
+    irc_channel_joined.send(channel_name='#ci')
+    processor.handle_message(None, channel_names=['#ci'], text='build 3 OK')
+
+    # Held messages are announced before the next queued one.
+    processor.process_queue(timeout_seconds=1)
+
+    assert announced == [
+        ('#ci', 'build 1 OK'),
+        ('#ci', 'build 2 OK'),
+        ('#ci', 'build 3 OK'),
+    ]
+    assert len(processor.holding_buffer) == 0
+
+
+def test_wait_for_messages_until_timeout(processor):
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.process_queue(timeout_seconds=1)
+
+    with pytest.raises(Empty):
+        processor.process_queue(timeout_seconds=0.1)
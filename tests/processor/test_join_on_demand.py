@@ -0,0 +1,190 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from dataclasses import replace
+from queue import Empty
+
+import pytest
+
+from weitersager.config import (
+    Config,
+    HttpConfig,
+    IrcChannel,
+    IrcConfig,
+)
+from weitersager.holding import HoldingBuffer
+from weitersager.irc import Announcer
+from weitersager.joining import ActiveChannels
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingAnnouncer(Announcer):
+    def __init__(self):
+        self.announced = []
+        self.joined_channels = []
+        self.parted_channel_names = []
+
+    def announce(self, channel_name, text):
+        self.announced.append((channel_name, text))
+
+    def join_channel(self, channel):
+        self.joined_channels.append(channel)
+
+    def part_channel(self, channel_name):
+        self.parted_channel_names.append(channel_name)
+
+
+@pytest.fixture
+def announcer():
+    return RecordingAnnouncer()
+
+
+@pytest.fixture
+def processor(announcer):
+    return Processor(create_config(), announcer=announcer)
+
+
+def test_no_channels_joined_at_start(processor, announcer):
+    assert processor.holding_buffer is not None
+    assert announcer.joined_channels == []
+
+
+def test_join_on_first_message(processor, announcer):
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.handle_message(None, channel_names=['#ci'], text='build 2 OK')
+    for _ in range(2):
+        processor.process_queue(timeout_seconds=1)
+
+    # Joined only once, messages held until then.
+    assert announcer.joined_channels == [IrcChannel('#ci', password='s3cr3t')]
+    assert announcer.announced == []
+
+    irc_channel_joined.send(channel_name='#ci')
+    processor.handle_message(None, channel_names=['#ci'], text='build 3 OK')
+    processor.process_queue(timeout_seconds=1)
+
+    assert announcer.announced == [
+        ('#ci', 'build 1 OK'),
+        ('#ci', 'build 2 OK'),
+        ('#ci', 'build 3 OK'),
+    ]
+    assert announcer.joined_channels == [IrcChannel('#ci', password='s3cr3t')]
+
+
+def test_unconfigured_channel_not_joined(processor, announcer):
+    processor.handle_message(None, channel_names=['#random'], text='hello')
+    processor.process_queue(timeout_seconds=1)
+
+    assert announcer.joined_channels == []
+    assert len(processor.holding_buffer) == 1
+
+
+def test_part_idle_channels(announcer):
+    config = create_config()
+    config = replace(config, irc=replace(config.irc, part_idle_after=60.0))
+    processor = Processor(config, announcer=announcer)
+    clock = FakeClock()
+    processor.active_channels = ActiveChannels(60.0, clock=clock)
+
+    for channel_name in ['#ci', '#alerts']:
+        processor.handle_message(None, channel_names=[channel_name], text='hi')
+        irc_channel_joined.send(channel_name=channel_name)
+        processor.process_queue(timeout_seconds=1)
+
+    clock.now = 30.0
+    processor.handle_message(None, channel_names=['#alerts'], text='still here')
+    processor.process_queue(timeout_seconds=1)
+
+    clock.now = 70.0
+    with pytest.raises(Empty):
+        processor.process_queue(timeout_seconds=0)
+
+    assert announcer.parted_channel_names == ['#ci']
+    assert processor.enabled_channel_names == {'#alerts'}
+    # Woken up when #alerts becomes idle
+    assert processor._get_wake_up_seconds() == 20.0
+
+    # Joined again on the next message.
+    processor.handle_message(None, channel_names=['#ci'], text='back')
+    processor.process_queue(timeout_seconds=1)
+
+    assert [channel.name for channel in announcer.joined_channels] == [
+        '#ci',
+        '#alerts',
+        '#ci',
+    ]
+
+
+def test_rejoin_after_held_messages_expired(processor, announcer):
+    clock = FakeClock()
+    processor.holding_buffer = HoldingBuffer(10.0, clock=clock)
+
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.process_queue(timeout_seconds=1)
+
+    # Not joined in time
+    clock.now = 20.0
+    processor.handle_message(None, channel_names=['#ci'], text='build 2 OK')
+    processor.process_queue(timeout_seconds=1)
+
+    assert announcer.parted_channel_names == ['#ci']
+    assert announcer.joined_channels == [
+        IrcChannel('#ci', password='s3cr3t'),
+        IrcChannel('#ci', password='s3cr3t'),
+    ]
+    assert len(processor.holding_buffer) == 1
+
+
+def test_apply_config_parts_removed_channels(processor, announcer):
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    irc_channel_joined.send(channel_name='#ci')
+    processor.process_queue(timeout_seconds=1)
+
+    config = create_config()
+    new_config = replace(
+        config, irc=replace(config.irc, channels={IrcChannel('#alerts')})
+    )
+    processor.apply_config(new_config)
+    processor.handle_message(None, channel_names=['#alerts'], text='alert')
+    processor.process_queue(timeout_seconds=1)
+
+    assert announcer.parted_channel_names == ['#ci']
+    assert processor.enabled_channel_names == set()
+    assert announcer.joined_channels == [
+        IrcChannel('#ci', password='s3cr3t'),
+        IrcChannel('#alerts'),
+    ]
+
+
+def create_config():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels={
+            IrcChannel('#ci', password='s3cr3t'),
+            IrcChannel('#alerts'),
+        },
+        join_on_demand=True,
+    )
+
+    return Config(log_level='debug', http=http_config, irc=irc_config)
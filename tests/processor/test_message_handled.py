@@ -62,7 +62,7 @@ def send_message_received_signal(channel_name, text):
     source_ip_address = '127.0.0.1'
     message_received.send(
         None,
-        channel_name=channel_name,
+        channel_names=[channel_name],
         text=text,
         source_ip_address=source_ip_address,
     )
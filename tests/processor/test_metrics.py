@@ -0,0 +1,135 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from threading import Event
+
+import pytest
+
+from weitersager.config import (
+    Config,
+    HttpConfig,
+    IrcChannel,
+    IrcConfig,
+    QueueConfig,
+)
+from weitersager.connection import ConnectionState
+from weitersager.irc import Announcer, QueuedAnnouncer
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+        metrics=True,
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels={IrcChannel('#ci'), IrcChannel('#ops')},
+    )
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=QueueConfig(),
+    )
+
+    processor = Processor(config)
+    processor.announcer.announce = lambda channel_name, text: None
+    return processor
+
+
+def test_messages_counted(processor):
+    metrics = processor.metrics
+
+    irc_channel_joined.send(channel_name='#ci')
+
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.handle_message(None, channel_names=['#ops'], text='disk full')
+
+    rendered = metrics.render()
+    assert 'weitersager_messages_received_total 2\n' in rendered
+    assert 'weitersager_queue_messages 2\n' in rendered
+
+    for _ in range(2):
+        processor.process_queue(timeout_seconds=1)
+
+    assert metrics.messages_delivered.get_value() == 1
+    assert metrics.messages_dropped.get_value('#ops', 'not_joined') == 1
+
+    rendered = metrics.render()
+    assert 'weitersager_queue_messages 0\n' in rendered
+    assert 'weitersager_irc_channels_joined 1\n' in rendered
+    assert (
+        'weitersager_message_delivery_seconds_bucket{le="+Inf"} 1\n' in rendered
+    )
+
+
+def test_dropped_messages_for_unknown_channels_counted_together(processor):
+    metrics = processor.metrics
+
+    for channel_name in ['#ops', '#random1', '#random2']:
+        text = f'Hi, {channel_name}!'
+        processor.handle_message(None, channel_names=[channel_name], text=text)
+
+    for _ in range(3):
+        processor.process_queue(timeout_seconds=1)
+
+    assert metrics.messages_dropped.get_value('#ops', 'not_joined') == 1
+    assert metrics.messages_dropped.get_value('(other)', 'not_joined') == 2
+
+    rendered = metrics.render()
+    assert '#random' not in rendered
+
+
+class BlockingAnnouncer(Announcer):
+    def __init__(self):
+        self.unblocked = Event()
+
+    def announce(self, channel_name, text):
+        self.unblocked.wait()
+
+
+def test_messages_counted_as_delivered_once_sent(processor):
+    metrics = processor.metrics
+    inner_announcer = BlockingAnnouncer()
+    processor.announcer = QueuedAnnouncer(inner_announcer)
+    processor.announcer.start()
+
+    irc_channel_joined.send(channel_name='#ci')
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.process_queue(timeout_seconds=1)
+
+    # Handed over to the queue of the connection, but not sent yet
+    assert metrics.messages_delivered.get_value() == 0
+
+    inner_announcer.unblocked.set()
+    processor.announcer.shutdown()
+
+    assert metrics.messages_delivered.get_value() == 1
+
+
+def test_connection_state(processor):
+    processor.announcer.get_connection_states = lambda: {
+        'Nick@irc.example.com:6667': ConnectionState.JOINING,
+    }
+
+    rendered = processor.metrics.render()
+
+    prefix = (
+        'weitersager_irc_connection_state'
+        '{connection="Nick@irc.example.com:6667",state='
+    )
+    assert prefix + '"connected"} 0\n' in rendered
+    assert prefix + '"joining"} 1\n' in rendered
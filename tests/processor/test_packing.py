@@ -0,0 +1,87 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.config import Config, HttpConfig, IrcConfig, QueueConfig
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    queue_config = QueueConfig(pack=True, pack_separator=' / ')
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=queue_config,
+    )
+
+    return Processor(config)
+
+
+def test_queued_messages_packed(processor):
+    announced = []
+
+    def announce(channel_name, text):
+        announced.append((channel_name, text))
+
+    processor.announcer.announce = announce
+
+    irc_channel_joined.send(channel_name='#ci')
+    irc_channel_joined.send(channel_name='#ops')
+
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    processor.handle_message(None, channel_names=['#ops'], text='disk full')
+    processor.handle_message(None, channel_names=['#ci'], text='build 2 OK')
+
+    for _ in range(3):
+        processor.process_queue(timeout_seconds=1)
+
+    # The line for `#ops` is not held up by the one for `#ci`.
+    assert announced == [
+        ('#ops', 'disk full'),
+        ('#ci', 'build 1 OK / build 2 OK'),
+    ]
+
+
+def test_line_sent_while_other_channel_stays_busy(processor):
+    announced = []
+
+    def announce(channel_name, text):
+        announced.append((channel_name, text))
+
+    processor.announcer.announce = announce
+
+    irc_channel_joined.send(channel_name='#ci')
+    irc_channel_joined.send(channel_name='#ops')
+
+    processor.handle_message(None, channel_names=['#ci'], text='build 1 OK')
+    for i in range(5):
+        processor.handle_message(
+            None, channel_names=['#ops'], text=f'alert {i}'
+        )
+
+    processor.process_queue(timeout_seconds=1)
+
+    # Messages for `#ops` are still queued.
+    assert announced == [('#ci', 'build 1 OK')]
@@ -0,0 +1,82 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.config import (
+    Config,
+    HttpConfig,
+    IrcConfig,
+    IrcServer,
+    QueueConfig,
+)
+from weitersager.processor import Processor
+from weitersager.queues import QueueFullError
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=IrcServer('irc.server.test', rate_limit=0.5),
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    queue_config = QueueConfig(capacity=3)
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=queue_config,
+    )
+
+    return Processor(config)
+
+
+def test_message_rejected_when_queue_is_full(processor):
+    for _ in range(3):
+        handle_message(processor)
+
+    with pytest.raises(QueueFullError) as excinfo:
+        handle_message(processor)
+
+    # Three messages at a rate of one message per two seconds
+    assert excinfo.value.retry_after_seconds == 6
+
+    assert processor.message_queue.qsize() == 3
+
+
+def test_message_to_multiple_channels_rejected_as_a_whole(processor):
+    handle_message(processor)
+
+    with pytest.raises(QueueFullError):
+        processor.handle_message(
+            None, channel_names=['#one', '#two', '#three'], text='Spam!'
+        )
+
+    # Not queued for any of the channels
+    assert processor.message_queue.get_channel_names() == {'#flood'}
+
+    processor.handle_message(None, channel_names=['#one', '#two'], text='Hi!')
+
+    assert processor.message_queue.get_channel_names() == {
+        '#flood',
+        '#one',
+        '#two',
+    }
+
+
+def handle_message(processor):
+    processor.handle_message(None, channel_names=['#flood'], text='Spam!')
@@ -0,0 +1,84 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.config import Config, HttpConfig, IrcConfig
+from weitersager.irc import Announcer, NotConnectedError
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+class FlakyAnnouncer(Announcer):
+    def __init__(self):
+        self.connected = True
+        self.drop_connection = False
+        self.announced = []
+
+    def announce(self, channel_name, text):
+        if self.drop_connection:
+            self.connected = False
+            self.drop_connection = False
+
+        if not self.connected:
+            raise NotConnectedError
+
+        self.announced.append((channel_name, text))
+
+    def wait_until_connected(self, timeout_seconds=None):
+        return self.connected
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    config = Config(log_level='debug', http=http_config, irc=irc_config)
+
+    processor = Processor(config)
+    processor.announcer = FlakyAnnouncer()
+    return processor
+
+
+def test_pause_while_disconnected(processor):
+    announcer = processor.announcer
+    irc_channel_joined.send(channel_name='#ops')
+
+    processor.handle_message(None, channel_names=['#ops'], text='one')
+    processor.handle_message(None, channel_names=['#ops'], text='two')
+    processor.handle_message(None, channel_names=['#ops'], text='three')
+
+    processor.process_queue(timeout_seconds=1)
+
+    # The connection drops while a message is being sent.
+    announcer.drop_connection = True
+    processor.process_queue(timeout_seconds=1)
+    assert announcer.announced == [('#ops', 'one')]
+
+    # Queue consumption is paused.
+    processor.process_queue(timeout_seconds=0.1)
+    assert announcer.announced == [('#ops', 'one')]
+
+    announcer.connected = True
+    processor.process_queue(timeout_seconds=1)
+
+    assert announcer.announced == [
+        ('#ops', 'one'),
+        ('#ops', 'two'),
+        ('#ops', 'three'),
+    ]
@@ -0,0 +1,75 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from dataclasses import replace
+
+from weitersager.config import Config, HttpConfig, IrcChannel, IrcConfig
+from weitersager.http import create_app
+from weitersager.processor import Processor
+
+
+def test_apply_config_joins_and_parts_channels():
+    processor = create_processor({IrcChannel('#one'), IrcChannel('#two')})
+    processor.announcer.start()
+    assert processor.enabled_channel_names == {'#one', '#two'}
+
+    new_config = create_config({IrcChannel('#two'), IrcChannel('#three')})
+    processor.apply_config(new_config)
+
+    assert processor.enabled_channel_names == {'#two', '#three'}
+    assert processor.config.irc.channels == new_config.irc.channels
+
+
+def test_apply_config_swaps_tokens():
+    processor = create_processor({IrcChannel('#one')})
+    processor.http_app = create_app({'old'}, {})
+
+    config = create_config({IrcChannel('#one')})
+    new_config = replace(
+        config,
+        http=replace(
+            config.http,
+            api_tokens={'new'},
+            channel_tokens_to_channel_names={'ct': '#one'},
+        ),
+    )
+    processor.apply_config(new_config)
+
+    tokens = processor.http_app._tokens
+    assert tokens.api_tokens == {'new'}
+    assert tokens.channel_tokens_to_channel_names == {'ct': '#one'}
+    assert processor.config.http.api_tokens == {'new'}
+
+
+def test_apply_config_keeps_settings_requiring_restart():
+    processor = create_processor({IrcChannel('#one')})
+
+    config = create_config({IrcChannel('#one')})
+    processor.apply_config(replace(config, log_level='info'))
+
+    assert processor.config.log_level == 'debug'
+
+
+def create_processor(channels):
+    return Processor(create_config(channels))
+
+
+def create_config(channels):
+    http_config = HttpConfig(
+        host='127.0.0.1',
+        port=8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='nick',
+        realname='Nick',
+        commands=[],
+        channels=channels,
+    )
+
+    return Config(log_level='debug', http=http_config, irc=irc_config)
@@ -0,0 +1,81 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import logging
+
+import pytest
+
+from weitersager.config import (
+    Config,
+    HttpConfig,
+    IrcConfig,
+    QueueConfig,
+    TraceConfig,
+)
+from weitersager.processor import Processor
+from weitersager.signals import irc_channel_joined
+
+
+@pytest.fixture
+def processor():
+    http_config = HttpConfig(
+        'localhost',
+        8080,
+        api_tokens=set(),
+        channel_tokens_to_channel_names={},
+    )
+
+    irc_config = IrcConfig(
+        server=None,
+        nickname='Nick',
+        realname='Nick',
+        commands=[],
+        channels=set(),
+    )
+
+    config = Config(
+        log_level='debug',
+        http=http_config,
+        irc=irc_config,
+        queue=QueueConfig(),
+        trace=TraceConfig(sample_rate=1.0),
+    )
+
+    return Processor(config)
+
+
+def test_message_traced(processor, caplog):
+    traces = []
+    create_trace = processor.tracer.create_trace
+
+    def create_and_keep_trace(*args):
+        trace = create_trace(*args)
+        traces.append(trace)
+        return trace
+
+    processor.tracer.create_trace = create_and_keep_trace
+    processor.announcer.announce = lambda channel_name, text: None
+    irc_channel_joined.send(channel_name='#ops')
+
+    processor.handle_message(
+        None,
+        channel_names=['#ops'],
+        text='disk full',
+        source_ip_address='10.0.0.1',
+        received_at=1700000000.0,
+    )
+
+    with caplog.at_level(logging.INFO, logger='weitersager.tracing'):
+        processor.process_queue(timeout_seconds=1)
+
+    trace = traces[0]
+    assert trace.received_at == 1700000000.0
+    assert trace.received_at <= trace.enqueued_at
+    assert trace.enqueued_at <= trace.dequeued_at <= trace.sent_at
+
+    assert len(caplog.messages) == 1
+    assert caplog.messages[0].startswith(
+        f'Message {trace.message_id} for channel #ops from 10.0.0.1: receive '
+    )
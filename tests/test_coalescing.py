@@ -0,0 +1,134 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.coalescing import Coalescer, format_repeated_text
+from weitersager.message import Message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_collapse_identical_messages(clock):
+    coalescer = Coalescer(60, clock=clock)
+    first = Message('#ops', 'Disk full!')
+
+    assert not coalescer.add(first)
+    assert coalescer.add(Message('#ops', 'Disk full!'))
+    assert coalescer.add(Message('#ops', 'Disk full!'))
+
+    assert coalescer.release(first) == 3
+
+
+def test_discard_repetition(clock):
+    coalescer = Coalescer(60, clock=clock)
+    first = Message('#ops', 'Disk full!')
+    coalescer.add(first)
+    for _ in range(2):
+        repetition = Message('#ops', 'Disk full!')
+        coalescer.add(repetition)
+
+    coalescer.discard_repetition(repetition)
+
+    assert coalescer.release(first) == 2
+
+
+def test_do_not_collapse_different_messages(clock):
+    coalescer = Coalescer(60, clock=clock)
+
+    assert not coalescer.add(Message('#ops', 'Disk full!'))
+    assert not coalescer.add(Message('#dev', 'Disk full!'))
+    assert not coalescer.add(Message('#ops', 'Disk almost full.'))
+    assert not coalescer.add(Message('#ops', 'Disk full!', priority=10))
+
+
+def test_do_not_collapse_after_release(clock):
+    coalescer = Coalescer(60, clock=clock)
+    first = Message('#ops', 'Disk full!')
+    coalescer.add(first)
+
+    coalescer.release(first)
+
+    assert not coalescer.add(Message('#ops', 'Disk full!'))
+
+
+def test_do_not_collapse_after_window(clock):
+    coalescer = Coalescer(60, clock=clock)
+    first = Message('#ops', 'Disk full!')
+    coalescer.add(first)
+
+    clock.now = 61.0
+    second = Message('#ops', 'Disk full!')
+
+    assert not coalescer.add(second)
+    assert coalescer.add(Message('#ops', 'Disk full!'))
+
+    # The repetitions belong to the second message.
+    assert coalescer.release(first) == 1
+    assert coalescer.release(second) == 2
+
+
+def test_limit_tracked_messages(clock):
+    coalescer = Coalescer(60, max_entries=2, clock=clock)
+    coalescer.add(Message('#ops', 'one'))
+    coalescer.add(Message('#ops', 'two'))
+    coalescer.add(Message('#ops', 'three'))
+
+    # The oldest message is no longer tracked.
+    assert not coalescer.add(Message('#ops', 'one'))
+
+
+def test_keep_count_after_window(clock):
+    coalescer = Coalescer(60, clock=clock)
+    first = Message('#ops', 'Disk full!')
+    coalescer.add(first)
+    for _ in range(4):
+        coalescer.add(Message('#ops', 'Disk full!'))
+
+    # The first message is still queued when the window has passed.
+    clock.now = 61.0
+    coalescer.add(Message('#ops', 'Host down!'))
+
+    assert coalescer.release(first) == 5
+
+
+def test_keep_count_after_eviction(clock):
+    coalescer = Coalescer(60, max_entries=2, clock=clock)
+    first = Message('#ops', 'Disk full!')
+    coalescer.add(first)
+    coalescer.add(Message('#ops', 'Disk full!'))
+
+    # Evicts the first message while it is still queued.
+    coalescer.add(Message('#ops', 'two'))
+    coalescer.add(Message('#ops', 'three'))
+
+    second = Message('#ops', 'Disk full!')
+    assert not coalescer.add(second)
+
+    assert coalescer.release(first) == 2
+    assert coalescer.release(second) == 1
+
+
+@pytest.mark.parametrize(
+    'count, expected',
+    [
+        (1, 'Disk full!'),
+        (2, 'Disk full! (2x)'),
+        (42, 'Disk full! (42x)'),
+    ],
+)
+def test_format_repeated_text(count, expected):
+    assert format_repeated_text('Disk full!', count) == expected
@@ -0,0 +1,170 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from irc.client import Event, NickMask
+import pytest
+
+from weitersager.connection import (
+    ConnectionState,
+    ConnectionStats,
+    ReconnectBackoff,
+)
+from weitersager.irc import create_announcer, IrcChannel, IrcConfig, IrcServer
+from weitersager.signals import irc_channel_joined
+
+
+def test_backoff_grows_exponentially_up_to_maximum():
+    backoff = ReconnectBackoff(
+        min_delay=1.0, max_delay=30.0, random_func=lambda: 1.0
+    )
+
+    delays = []
+    for _ in range(7):
+        delays.append(backoff.get_delay())
+        backoff.attempts += 1
+
+    assert delays == [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+
+    backoff.reset()
+    assert backoff.get_delay() == 1.0
+
+
+def test_backoff_is_jittered():
+    backoff = ReconnectBackoff(
+        min_delay=1.0, max_delay=30.0, random_func=lambda: 0.5
+    )
+    backoff.attempts = 3
+
+    assert backoff.get_delay() == 4.5
+
+
+def test_connection_stats():
+    stats = ConnectionStats()
+
+    assert stats.record_reconnect(5.0) is None
+
+    stats.record_disconnect(10.0)
+    stats.record_disconnect(12.0)  # failed reconnect attempt
+    assert stats.get_downtime_seconds(15.0) == 5.0
+
+    assert stats.record_reconnect(20.0) == 10.0
+    assert stats.reconnects == 1
+    assert stats.downtime_seconds == 10.0
+
+
+@pytest.fixture
+def announcer():
+    config = IrcConfig(
+        server=IrcServer('irc.server.test'),
+        nickname='nick',
+        realname='Nick',
+        commands=[],
+        channels={IrcChannel('#one'), IrcChannel('#two')},
+    )
+
+    announcer = create_announcer(config)
+
+    yield announcer
+
+    announcer.shutdown()
+
+
+def test_connected_once_channels_joined(announcer, monkeypatch):
+    conn = announcer.bot.connection
+    sent = []
+    monkeypatch.setattr(conn, 'send_raw', sent.append)
+    monkeypatch.setattr(conn, 'socket', FakeSocket(), raising=False)
+
+    announcer._on_welcome(conn, None)
+    announcer._on_motd_end(conn, None)
+
+    assert sent == ['JOIN #one,#two']
+    assert announcer.state == ConnectionState.JOINING
+    assert not announcer.wait_until_connected(0)
+
+    announcer._on_join(conn, create_join_event('#one'))
+    error_event = Event(
+        type='badchannelkey', source='irc.server.test', target='nick'
+    )
+    error_event.arguments = ['#two']
+    announcer._on_join_error(conn, error_event)
+
+    assert announcer.state == ConnectionState.CONNECTED
+    assert announcer.wait_until_connected(0)
+
+    announcer._on_disconnect(conn, None)
+
+    assert announcer.state == ConnectionState.DISCONNECTED
+    assert not announcer.wait_until_connected(0)
+
+    announcer._on_welcome(conn, None)
+    announcer._on_motd_end(conn, None)
+    announcer._on_join(conn, create_join_event('#one'))
+    announcer._on_join(conn, create_join_event('#two'))
+
+    assert announcer.state == ConnectionState.CONNECTED
+    stats = announcer.get_connection_stats()['nick@irc.server.test:6667']
+    assert stats.reconnects == 1
+
+
+def test_join_echo_compared_casefolded(announcer, monkeypatch):
+    conn = announcer.bot.connection
+    monkeypatch.setattr(conn, 'send_raw', lambda line: None)
+    monkeypatch.setattr(conn, 'socket', FakeSocket(), raising=False)
+
+    received_signal_data = []
+
+    @irc_channel_joined.connect
+    def handle_irc_channel_joined(sender, **data):
+        received_signal_data.append(data)
+
+    announcer._on_welcome(conn, None)
+    announcer._on_motd_end(conn, None)
+
+    for channel_name in ['#ONE', '#Two']:
+        join_event = create_join_event(channel_name)
+        announcer._on_join(conn, join_event)
+        announcer.bot.on_join(conn, join_event)
+
+    assert announcer.state == ConnectionState.CONNECTED
+    # Named as configured
+    assert received_signal_data == [
+        {'channel_name': '#one'},
+        {'channel_name': '#two'},
+    ]
+
+
+def test_any_error_reply_ends_waiting_for_channel(announcer, monkeypatch):
+    conn = announcer.bot.connection
+    monkeypatch.setattr(conn, 'send_raw', lambda line: None)
+    monkeypatch.setattr(conn, 'socket', FakeSocket(), raising=False)
+
+    announcer._on_welcome(conn, None)
+    announcer._on_motd_end(conn, None)
+    announcer._on_join(conn, create_join_event('#one'))
+
+    # Unrelated to the channel being joined
+    announcer._on_join_error(conn, create_error_event('433', 'nick'))
+    assert announcer.state == ConnectionState.JOINING
+
+    # 477: needs a registered nickname
+    announcer._on_join_error(conn, create_error_event('477', '#TWO'))
+    assert announcer.state == ConnectionState.CONNECTED
+
+
+class FakeSocket:
+    def getpeername(self):
+        return ('10.0.0.99', 6667)
+
+
+def create_join_event(channel_name):
+    nickmask = NickMask('nick!nick@irc.server.test')
+    return Event(type='join', source=nickmask, target=channel_name)
+
+
+def create_error_event(event_type, argument):
+    event = Event(type=event_type, source='irc.server.test', target='nick')
+    event.arguments = [argument]
+    return event
@@ -9,6 +9,7 @@ from weitersager.irc import (
     create_announcer,
     DummyAnnouncer,
     IrcAnnouncer,
+    IrcChannel,
     IrcConfig,
     IrcServer,
 )
@@ -33,3 +34,18 @@ def test_create_announcer(server, expected_type):
     announcer = create_announcer(config)
 
     assert type(announcer) is expected_type
+
+
+def test_create_announcer_joining_on_demand():
+    config = IrcConfig(
+        server=None,
+        nickname='nick',
+        realname='Nick',
+        commands=[],
+        channels={IrcChannel('#one'), IrcChannel('#two')},
+        join_on_demand=True,
+    )
+
+    announcer = create_announcer(config)
+
+    assert announcer.channels == set()
@@ -0,0 +1,171 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import socket
+
+import pytest
+
+from .fake_ircd import FakeIrcServer
+
+
+class Client:
+    def __init__(self, server_address):
+        self.socket = socket.create_connection(server_address, timeout=1)
+        self.file = self.socket.makefile('rb')
+
+    def send(self, line):
+        self.socket.sendall(f'{line}\r\n'.encode())
+
+    def receive(self):
+        return self.file.readline().decode().rstrip('\r\n')
+
+    def register(self, nickname):
+        self.send(f'NICK {nickname}')
+        self.send(f'USER {nickname} 0 * :{nickname}')
+
+        lines = [self.receive()]
+        while ' 376 ' not in lines[-1]:
+            lines.append(self.receive())
+        return lines
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def _wrapper(server):
+        client = Client(server.server_address)
+        clients.append(client)
+        return client
+
+    yield _wrapper
+
+    for client in clients:
+        client.close()
+
+
+def test_registration(make_client):
+    with FakeIrcServer(isupport=['TARGMAX=PRIVMSG:4'], max_channels=2) as ircd:
+        client = make_client(ircd)
+
+        assert client.register('Bot') == [
+            ':fake.ircd 001 Bot :Welcome, Bot',
+            (
+                ':fake.ircd 005 Bot TARGMAX=PRIVMSG:4 CHANLIMIT=#&:2 '
+                ':are supported by this server'
+            ),
+            ':fake.ircd 376 Bot :End of /MOTD command.',
+        ]
+        assert ircd.get_nicknames() == {'Bot'}
+
+
+def test_nickname_in_use(make_client):
+    with FakeIrcServer() as ircd:
+        make_client(ircd).register('Bot')
+
+        client = make_client(ircd)
+        client.send('NICK Bot')
+
+        assert client.receive() == (
+            ':fake.ircd 433 * Bot :Nickname is already in use'
+        )
+
+
+def test_join_with_keys(make_client):
+    with FakeIrcServer(channel_keys={'#two': 'secret'}) as ircd:
+        client = make_client(ircd)
+        client.register('Bot')
+
+        client.send('JOIN #one,#two,#three ,wrong')
+        assert client.receive() == ':Bot!user@localhost JOIN #one'
+        assert client.receive() == (
+            ':fake.ircd 475 Bot #two :Cannot join channel (+k)'
+        )
+        assert client.receive() == ':Bot!user@localhost JOIN #three'
+
+        client.send('JOIN #two secret')
+        assert client.receive() == ':Bot!user@localhost JOIN #two'
+
+        assert ircd.get_channel_names('Bot') == {'#one', '#two', '#three'}
+
+
+def test_join_too_many_channels(make_client):
+    with FakeIrcServer(max_channels=1) as ircd:
+        client = make_client(ircd)
+        client.register('Bot')
+
+        client.send('JOIN #one,#two')
+        assert client.receive() == ':Bot!user@localhost JOIN #one'
+        assert client.receive() == (
+            ':fake.ircd 405 Bot #two :You have joined too many channels'
+        )
+
+
+def test_privmsg(make_client):
+    with FakeIrcServer() as ircd:
+        client = make_client(ircd)
+        client.register('Bot')
+        client.send('JOIN #one')
+        client.receive()
+
+        client.send('PRIVMSG #one :Hello!')
+        client.send('PRIVMSG #two :Hello?')
+        assert client.receive() == (
+            ':fake.ircd 404 Bot #two :Cannot send to channel'
+        )
+
+        assert ircd.wait_for_privmsgs(2, timeout_seconds=1)
+        assert ircd.get_privmsgs() == [
+            'PRIVMSG #one :Hello!',
+            'PRIVMSG #two :Hello?',
+        ]
+
+
+def test_ping(make_client):
+    with FakeIrcServer() as ircd:
+        client = make_client(ircd)
+
+        client.send('PING :token')
+        assert client.receive() == ':fake.ircd PONG fake.ircd :token'
+
+        ircd.ping_clients('check')
+        assert client.receive() == 'PING :check'
+
+
+def test_flood_kill(make_client):
+    with FakeIrcServer(flood_penalty_seconds=1, flood_limit_seconds=3) as ircd:
+        client = make_client(ircd)
+        client.register('Bot')
+        client.send('JOIN #one')
+        client.receive()
+
+        for text in ['one', 'two', 'three', 'four']:
+            client.send(f'PRIVMSG #one :{text}')
+
+        assert client.receive() == 'ERROR :Excess Flood'
+        assert client.receive() == ''
+        assert ircd.flood_kills == 1
+        # The `JOIN` counts, too.
+        assert ircd.get_privmsgs() == [
+            'PRIVMSG #one :one',
+            'PRIVMSG #one :two',
+        ]
+
+
+def test_disconnect_after_privmsgs(make_client):
+    with FakeIrcServer(disconnect_after_privmsgs=[2]) as ircd:
+        client = make_client(ircd)
+        client.register('Bot')
+
+        client.send('PRIVMSG #one :one')
+        client.send('PRIVMSG #one :two')
+
+        lines = [client.receive() for _ in range(4)]
+        assert lines[2:] == ['ERROR :Closing Link', '']
+        assert ircd.privmsg_count == 2
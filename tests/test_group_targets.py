@@ -0,0 +1,82 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.irc import (
+    create_announcer,
+    group_targets,
+    IrcChannel,
+    IrcConfig,
+    IrcServer,
+)
+
+
+CHANNEL_NAMES = ['#one', '#two', '#three', '#four', '#five']
+
+
+@pytest.mark.parametrize(
+    'max_targets, expected',
+    [
+        (1, [['#one'], ['#two'], ['#three'], ['#four'], ['#five']]),
+        (2, [['#one', '#two'], ['#three', '#four'], ['#five']]),
+        (None, [CHANNEL_NAMES]),
+    ],
+)
+def test_group_targets_by_max_targets(max_targets, expected):
+    assert group_targets(CHANNEL_NAMES, 'hi', max_targets) == expected
+
+
+def test_group_targets_by_line_length():
+    text = 'x' * 480  # leaves room for 20 bytes of targets
+
+    assert group_targets(CHANNEL_NAMES, text, None) == [
+        ['#one', '#two', '#three'],
+        ['#four', '#five'],
+    ]
+
+
+@pytest.fixture
+def announcer():
+    config = IrcConfig(
+        server=IrcServer('irc.server.test'),
+        nickname='nick',
+        realname='Nick',
+        commands=[],
+        channels={IrcChannel(name) for name in CHANNEL_NAMES},
+    )
+
+    announcer = create_announcer(config)
+
+    yield announcer
+
+    announcer.shutdown()
+
+
+@pytest.mark.parametrize(
+    'isupport, expected',
+    [
+        ([], ['#one', '#two', '#three', '#four', '#five']),
+        (['MAXTARGETS=4'], ['#one,#two,#three,#four', '#five']),
+        (['TARGMAX=NAMES:1,PRIVMSG:3'], ['#one,#two,#three', '#four,#five']),
+        (['TARGMAX=PRIVMSG:'], ['#one,#two,#three,#four,#five']),
+    ],
+)
+def test_announce_to_channels(announcer, monkeypatch, isupport, expected):
+    connection = announcer.bot.connection
+    for feature in isupport:
+        connection.features.load_feature(feature)
+
+    targets = []
+
+    def privmsg(target, text):
+        targets.append(target)
+
+    monkeypatch.setattr(connection, 'privmsg', privmsg)
+    monkeypatch.setattr(connection, 'is_connected', lambda: True)
+
+    announcer.announce_to_channels(CHANNEL_NAMES, 'hi')
+
+    assert targets == expected
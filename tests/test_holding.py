@@ -0,0 +1,104 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.holding import HoldingBuffer
+from weitersager.message import Message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def hold(buffer, channel_name, text):
+    message = Message(channel_name, text)
+    return buffer.hold(channel_name, text, [message])
+
+
+def test_release_in_order(clock):
+    buffer = HoldingBuffer(60, clock=clock)
+
+    hold(buffer, '#ci', 'build 1 OK')
+    hold(buffer, '#ops', 'disk full')
+    hold(buffer, '#ci', 'build 2 OK')
+
+    assert buffer.is_holding('#ci')
+    assert [line.text for line in buffer.release('#ci')] == [
+        'build 1 OK',
+        'build 2 OK',
+    ]
+    assert not buffer.is_holding('#ci')
+    assert buffer.release('#ci') == []
+    assert len(buffer) == 1
+
+
+def test_channel_names_snapshot(clock):
+    buffer = HoldingBuffer(60, clock=clock)
+    hold(buffer, '#ci', 'build 1 OK')
+    hold(buffer, '#ops', 'disk full')
+
+    channel_names = buffer.get_channel_names()
+    buffer.release('#ci')
+
+    assert channel_names == {'#ci', '#ops'}
+    assert buffer.get_channel_names() == {'#ops'}
+
+
+def test_drop_oldest_beyond_channel_limit(clock):
+    buffer = HoldingBuffer(60, max_messages_per_channel=2, clock=clock)
+
+    assert hold(buffer, '#ci', 'build 1 OK') == []
+    assert hold(buffer, '#ci', 'build 2 OK') == []
+    assert hold(buffer, '#ops', 'disk full') == []
+    dropped_lines = hold(buffer, '#ci', 'build 3 OK')
+
+    assert [line.text for line in dropped_lines] == ['build 1 OK']
+    assert len(buffer) == 3
+    assert [line.text for line in buffer.release('#ci')] == [
+        'build 2 OK',
+        'build 3 OK',
+    ]
+
+
+def test_drop_oldest_beyond_size_limit(clock):
+    buffer = HoldingBuffer(60, max_bytes=20, clock=clock)
+
+    hold(buffer, '#ops', 'disk full')  # 9 bytes
+    clock.now = 1.0
+    hold(buffer, '#ci', 'build 1 OK')  # 10 bytes
+    clock.now = 2.0
+    dropped_lines = hold(buffer, '#ci', 'build 2 OK')
+
+    assert [line.text for line in dropped_lines] == ['disk full']
+    assert not buffer.is_holding('#ops')
+    assert len(buffer) == 2
+
+
+def test_remove_expired_lines(clock):
+    buffer = HoldingBuffer(30, clock=clock)
+
+    hold(buffer, '#ci', 'build 1 OK')
+    clock.now = 20.0
+    hold(buffer, '#ci', 'build 2 OK')
+
+    clock.now = 29.0
+    assert buffer.remove_expired_lines() == []
+
+    clock.now = 30.0
+    expired_lines = buffer.remove_expired_lines()
+    assert [line.text for line in expired_lines] == ['build 1 OK']
+    assert len(buffer) == 1
+    assert [line.text for line in buffer.release('#ci')] == ['build 2 OK']
+    assert not buffer
@@ -0,0 +1,191 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import asyncio
+
+import pytest
+
+from weitersager.config import (
+    ConfigurationError,
+    IrcChannel,
+    IrcConfig,
+    IrcNetwork,
+    IrcServer,
+)
+from weitersager.connection import ConnectionState
+from weitersager.irc import NotConnectedError
+from weitersager.irc_aio import (
+    AioDummyAnnouncer,
+    AioIrcAnnouncer,
+    create_async_announcer,
+)
+
+from .fake_ircd import FakeIrcServer
+
+
+def create_announcer(port, **server_kwargs):
+    server = IrcServer('127.0.0.1', port=port, **server_kwargs)
+    channels = {IrcChannel('#one'), IrcChannel('#two', password='secret')}
+    return AioIrcAnnouncer(server, 'Bot', 'Bot', ['MODE Bot +B'], channels)
+
+
+def test_announce_after_joins():
+    async def run():
+        fake_server = FakeIrcServer(channel_keys={'#two': 'secret'})
+        port = fake_server.start()
+
+        announcer = create_announcer(port)
+        announcer.start()
+
+        await asyncio.wait_for(announcer.wait_until_ready(), 1)
+        assert announcer.state == ConnectionState.CONNECTED
+
+        announcer.announce('#one', 'Hello!')
+        await asyncio.wait_for(announcer.wait_until_ready(), 1)
+        await asyncio.sleep(0.01)
+
+        await announcer.shutdown_async()
+        fake_server.close()
+
+        return fake_server.lines
+
+    lines = asyncio.run(run())
+
+    assert lines[:4] == [
+        'NICK Bot',
+        'USER Bot 0 * :Bot',
+        'MODE Bot +B',
+        # Channels with a key come first.
+        'JOIN #two,#one secret',
+    ]
+    assert 'PRIVMSG #one :Hello!' in lines
+
+
+def test_lines_kept_while_disconnected():
+    async def run():
+        fake_server = FakeIrcServer(channel_keys={'#two': 'secret'})
+        port = fake_server.start()
+
+        announcer = create_announcer(port, rate_limit=10.0)
+        announcer.recon.min_delay = announcer.recon.max_delay = 0.01
+        announcer.start()
+
+        await asyncio.wait_for(announcer.wait_until_ready(), 1)
+
+        # The first line is sent right away, the others wait for tokens.
+        for text in ['one', 'two', 'three']:
+            announcer.announce('#one', text)
+        await asyncio.sleep(0.01)
+        fake_server.disconnect_clients()
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(NotConnectedError):
+            announcer.announce('#one', 'four')
+
+        await asyncio.wait_for(announcer.wait_until_ready(), 1)
+        await asyncio.sleep(0.01)
+
+        await announcer.shutdown_async()
+        fake_server.close()
+
+        return fake_server.get_privmsgs(), announcer.stats.reconnects
+
+    privmsgs, reconnects = asyncio.run(run())
+
+    assert privmsgs == [
+        'PRIVMSG #one :one',
+        'PRIVMSG #one :two',
+        'PRIVMSG #one :three',
+    ]
+    assert reconnects == 1
+
+
+def test_line_that_cannot_be_sent_dropped():
+    async def run():
+        fake_server = FakeIrcServer(channel_keys={'#two': 'secret'})
+        port = fake_server.start()
+
+        announcer = create_announcer(port)
+        announcer.start()
+
+        await asyncio.wait_for(announcer.wait_until_ready(), 1)
+
+        announcer.announce('#one', 'evil\r\nQUIT')
+        announcer.announce('#one', 'Hello!')
+        await asyncio.wait_for(announcer.wait_until_ready(), 1)
+        await asyncio.sleep(0.01)
+
+        await announcer.shutdown_async()
+        fake_server.close()
+
+        return fake_server.get_privmsgs()
+
+    privmsgs = asyncio.run(run())
+
+    assert privmsgs == ['PRIVMSG #one :Hello!']
+
+
+def test_connected_after_join_timeout():
+    async def run():
+        fake_server = FakeIrcServer(join_replies={'#one': None, '#two': '477'})
+        port = fake_server.start()
+
+        announcer = create_announcer(port)
+        announcer.join_timeout_seconds = 0.2
+        announcer.start()
+
+        await asyncio.sleep(0.1)
+        state_before_timeout = announcer.state
+        await asyncio.wait_for(announcer.wait_until_ready(), 2)
+
+        await announcer.shutdown_async()
+        fake_server.close()
+
+        return state_before_timeout
+
+    state_before_timeout = asyncio.run(run())
+
+    assert state_before_timeout == ConnectionState.JOINING
+
+
+def test_create_async_announcer_without_server():
+    config = IrcConfig(
+        server=None,
+        nickname='Bot',
+        realname='Bot',
+        commands=[],
+        channels=set(),
+    )
+
+    assert isinstance(create_async_announcer(config), AioDummyAnnouncer)
+
+
+def test_create_async_announcer_with_multiple_connections():
+    config = IrcConfig(
+        server=IrcServer('irc.example.com', connections=2),
+        nickname='Bot',
+        realname='Bot',
+        commands=[],
+        channels=set(),
+    )
+
+    with pytest.raises(ConfigurationError):
+        create_async_announcer(config)
+
+
+def test_create_async_announcer_with_networks():
+    config = IrcConfig(
+        server=None,
+        nickname='Bot',
+        realname='Bot',
+        commands=[],
+        channels=set(),
+        networks=[
+            IrcNetwork('libera', IrcServer('irc.libera.chat'), set()),
+        ],
+    )
+
+    with pytest.raises(ConfigurationError):
+        create_async_announcer(config)
@@ -26,14 +26,19 @@ def config():
 
 
 @pytest.fixture
-def bot(config):
+def announcer(config):
     announcer = create_announcer(config)
 
-    yield announcer.bot
+    yield announcer
 
     announcer.shutdown()
 
 
+@pytest.fixture
+def bot(announcer):
+    return announcer.bot
+
+
 @pytest.fixture
 def nickmask(config):
     return NickMask(f'{config.nickname}!{config.nickname}@{config.server.host}')
@@ -43,7 +48,7 @@ def test_get_version(bot):
     assert bot.get_version() == 'Weitersager'
 
 
-def test_channel_joins(config, bot, nickmask, monkeypatch):
+def test_channel_joins(config, announcer, bot, nickmask, monkeypatch):
     class FakeSocket:
         def getpeername(self):
             return ('10.0.0.99', 6667)
@@ -55,9 +60,14 @@ def test_channel_joins(config, bot, nickmask, monkeypatch):
         type='welcome', source=config.server.host, target=config.nickname
     )
 
-    def join(self, channel, key=''):
-        join_event = Event(type='join', source=nickmask, target=channel)
-        bot.on_join(conn, join_event)
+    def send_raw(self, line):
+        command, channel_names = line.split(' ')
+        assert command == 'JOIN'
+        for channel_name in channel_names.split(','):
+            join_event = Event(
+                type='join', source=nickmask, target=channel_name
+            )
+            bot.on_join(conn, join_event)
 
     received_signal_data = []
 
@@ -67,8 +77,11 @@ def test_channel_joins(config, bot, nickmask, monkeypatch):
 
     with monkeypatch.context() as mpc:
         mpc.setattr(ServerConnection, 'socket', socket)
-        mpc.setattr(ServerConnection, 'join', join)
+        mpc.setattr(ServerConnection, 'send_raw', send_raw)
         bot.on_welcome(conn, welcome_event)
+        # Channels are joined once the server has advertised its limits.
+        assert received_signal_data == []
+        announcer._on_motd_end(conn, None)
 
     assert received_signal_data == [
         {'channel_name': '#one'},
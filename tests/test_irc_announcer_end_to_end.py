@@ -0,0 +1,230 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import time
+
+import pytest
+
+from weitersager.config import IrcChannel, IrcServer
+from weitersager.connection import ConnectionState
+from weitersager.irc import (
+    IrcAnnouncer,
+    JOIN_TIMEOUT_SECONDS,
+    NotConnectedError,
+)
+
+from .fake_ircd import FakeIrcServer
+
+
+CHANNELS = {IrcChannel('#one'), IrcChannel('#two', password='secret')}
+
+
+@pytest.fixture
+def make_announcer():
+    announcers = []
+
+    def _wrapper(
+        ircd,
+        *,
+        channels=CHANNELS,
+        first_channel_names=None,
+        join_timeout_seconds=JOIN_TIMEOUT_SECONDS,
+        **server_kwargs,
+    ):
+        server = IrcServer(*ircd.server_address, **server_kwargs)
+        announcer = IrcAnnouncer(
+            server,
+            'Bot',
+            'Bot',
+            ['MODE Bot +B'],
+            channels,
+            join_timeout_seconds=join_timeout_seconds,
+        )
+        announcer.bot.recon.min_delay = announcer.bot.recon.max_delay = 0.01
+        if first_channel_names is not None:
+            announcer.set_join_priority(lambda: first_channel_names)
+        announcers.append(announcer)
+        announcer.start()
+        assert announcer.wait_until_connected(2)
+        return announcer
+
+    yield _wrapper
+
+    for announcer in announcers:
+        announcer.shutdown()
+
+
+def wait_for(predicate, timeout_seconds=2):
+    deadline = time.monotonic() + timeout_seconds
+    while not predicate():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_join_and_announce(make_announcer):
+    with FakeIrcServer(channel_keys={'#two': 'secret'}) as ircd:
+        announcer = make_announcer(ircd)
+
+        announcer.announce('#one', 'Hello!')
+        announcer.announce_to_channels(['#one', '#two'], 'Hi!')
+
+        assert ircd.wait_for_privmsgs(3, timeout_seconds=2)
+        assert ircd.get_channel_names('Bot') == {'#one', '#two'}
+        assert ircd.lines[:4] == [
+            'NICK Bot',
+            'USER Bot 0 * :Bot',
+            'MODE Bot +B',
+            # Channels with a key come first.
+            'JOIN #two,#one secret',
+        ]
+        assert ircd.get_privmsgs() == [
+            'PRIVMSG #one :Hello!',
+            # No `TARGMAX` advertised, so one target per line
+            'PRIVMSG #one :Hi!',
+            'PRIVMSG #two :Hi!',
+        ]
+
+
+def test_reconnect_after_disconnect(make_announcer):
+    with FakeIrcServer(
+        channel_keys={'#two': 'secret'}, disconnect_after_privmsgs=[1]
+    ) as ircd:
+        announcer = make_announcer(ircd)
+
+        try:
+            announcer.announce('#one', 'one')
+        except NotConnectedError:
+            # The server might have dropped the connection already.
+            pass
+        wait_for(lambda: ircd.connection_count == 2)
+        assert announcer.wait_until_connected(2)
+
+        announcer.announce('#one', 'two')
+
+        assert ircd.wait_for_privmsgs(2, timeout_seconds=2)
+        assert ircd.get_privmsgs() == ['PRIVMSG #one :one', 'PRIVMSG #one :two']
+        assert ircd.get_channel_names('Bot') == {'#one', '#two'}
+        assert announcer.stats.reconnects == 1
+
+
+def test_flood_kill_without_rate_limit(make_announcer):
+    with FakeIrcServer(
+        channel_keys={'#two': 'secret'},
+        flood_penalty_seconds=0.02,
+        flood_limit_seconds=0.1,
+    ) as ircd:
+        announcer = make_announcer(ircd)
+
+        try:
+            for i in range(20):
+                announcer.announce('#one', str(i))
+        except NotConnectedError:
+            pass
+
+        wait_for(lambda: ircd.flood_kills == 1)
+        wait_for(lambda: announcer.state == ConnectionState.CONNECTED)
+        assert ircd.privmsg_count < 20
+
+
+def test_rate_limit_avoids_flood_kill(make_announcer):
+    with FakeIrcServer(
+        channel_keys={'#two': 'secret'},
+        flood_penalty_seconds=0.02,
+        flood_limit_seconds=0.1,
+    ) as ircd:
+        announcer = make_announcer(ircd, rate_limit=25)
+
+        for i in range(20):
+            announcer.announce('#one', str(i))
+
+        assert ircd.wait_for_privmsgs(20, timeout_seconds=5)
+        assert ircd.flood_kills == 0
+
+
+def test_update_channels_without_reconnect(make_announcer):
+    with FakeIrcServer(channel_keys={'#two': 'secret'}) as ircd:
+        announcer = make_announcer(ircd)
+        wait_for(lambda: ircd.get_channel_names('Bot') == {'#one', '#two'})
+
+        announcer.update_channels(
+            {IrcChannel('#two', password='secret'), IrcChannel('#three')}
+        )
+
+        wait_for(lambda: ircd.get_channel_names('Bot') == {'#two', '#three'})
+        assert 'JOIN #three' in ircd.lines
+        assert 'PART #one' in ircd.lines
+        assert ircd.connection_count == 1
+
+
+def test_join_and_part_on_demand(make_announcer):
+    with FakeIrcServer(channel_keys={'#two': 'secret'}) as ircd:
+        announcer = make_announcer(ircd, channels=set())
+        assert not any(line.startswith('JOIN') for line in ircd.lines)
+
+        announcer.join_channel(IrcChannel('#two', password='secret'))
+        wait_for(lambda: ircd.get_channel_names('Bot') == {'#two'})
+
+        announcer.join_channel(IrcChannel('#one'))
+        announcer.part_channel('#two')
+        wait_for(lambda: ircd.get_channel_names('Bot') == {'#one'})
+
+        assert announcer.channels == {IrcChannel('#one')}
+
+
+def test_connected_despite_unlisted_join_error(make_announcer):
+    # 477: needs a registered nickname
+    with FakeIrcServer(join_replies={'#two': '477'}) as ircd:
+        make_announcer(ircd)
+
+        assert ircd.get_channel_names('Bot') == {'#one'}
+
+
+def test_connected_after_join_timeout(make_announcer):
+    with FakeIrcServer(join_replies={'#two': None}) as ircd:
+        started = time.monotonic()
+        make_announcer(ircd, join_timeout_seconds=0.2)
+
+        assert time.monotonic() - started >= 0.2
+        assert ircd.get_channel_names('Bot') == {'#one'}
+
+
+def test_update_rate_limit(make_announcer):
+    with FakeIrcServer(
+        channel_keys={'#two': 'secret'},
+        flood_penalty_seconds=0.02,
+        flood_limit_seconds=0.1,
+    ) as ircd:
+        announcer = make_announcer(ircd)
+
+        announcer.update_rate_limit(
+            IrcServer(*ircd.server_address, rate_limit=25)
+        )
+
+        for i in range(20):
+            announcer.announce('#one', str(i))
+
+        assert ircd.wait_for_privmsgs(20, timeout_seconds=5)
+        assert ircd.flood_kills == 0
+        assert ircd.connection_count == 1
+
+
+def test_batched_joins_within_server_limits(make_announcer):
+    channels = {IrcChannel(f'#channel{i:03d}') for i in range(100)}
+
+    with FakeIrcServer(max_channels=90, isupport=['TARGMAX=JOIN:25']) as ircd:
+        announcer = make_announcer(
+            ircd,
+            channels=channels,
+            first_channel_names={'#channel099', '#other'},
+            rate_limit=10,
+        )
+
+        assert len(ircd.get_channel_names('Bot')) == 90
+
+        join_lines = [line for line in ircd.lines if line.startswith('JOIN ')]
+        assert len(join_lines) == 4
+        # Channels with queued messages are joined first.
+        assert join_lines[0].startswith('JOIN #channel099,#channel000,')
+        assert announcer.stats.join_seconds is not None
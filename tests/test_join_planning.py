@@ -0,0 +1,115 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from irc.features import FeatureSet
+import pytest
+
+from weitersager.irc import (
+    format_join,
+    group_joins,
+    IrcChannel,
+    limit_channels_to_join,
+    order_channels_to_join,
+    plan_joins,
+)
+
+
+CHANNELS = [IrcChannel(f'#channel{i}') for i in range(1, 6)]
+
+
+@pytest.mark.parametrize(
+    'max_targets, expected',
+    [
+        (
+            2,
+            [
+                'JOIN #channel1,#channel2',
+                'JOIN #channel3,#channel4',
+                'JOIN #channel5',
+            ],
+        ),
+        (None, ['JOIN #channel1,#channel2,#channel3,#channel4,#channel5']),
+    ],
+)
+def test_group_joins_by_max_targets(max_targets, expected):
+    assert group_joins(CHANNELS, max_targets) == expected
+
+
+def test_group_joins_by_line_length():
+    # Room for `JOIN ` plus three channel names, and CR-LF.
+    max_line_length = len('JOIN #channel1,#channel2,#channel3\r\n')
+
+    assert group_joins(CHANNELS, None, max_line_length) == [
+        'JOIN #channel1,#channel2,#channel3',
+        'JOIN #channel4,#channel5',
+    ]
+
+
+def test_group_joins_of_many_channels_fits_lines():
+    channels = [IrcChannel(f'#channel{i:04d}') for i in range(500)]
+
+    lines = group_joins(channels, None)
+
+    assert len(lines) == 14  # 38 channels per line
+    assert all(len(f'{line}\r\n'.encode()) <= 512 for line in lines)
+
+
+def test_format_join_puts_channels_with_keys_first():
+    channels = [
+        IrcChannel('#open'),
+        IrcChannel('#secret', password='s3cr3t'),
+        IrcChannel('#lab', password='l4b'),
+    ]
+
+    assert format_join(channels) == 'JOIN #secret,#lab,#open s3cr3t,l4b'
+
+
+def test_order_channels_to_join():
+    channels = {IrcChannel('#a'), IrcChannel('#b'), IrcChannel('#c')}
+
+    ordered = order_channels_to_join(channels, {'#c'})
+
+    assert [channel.name for channel in ordered] == ['#c', '#a', '#b']
+
+
+def test_limit_channels_to_join():
+    channels = [
+        IrcChannel('#one'),
+        IrcChannel('&local'),
+        IrcChannel('#two'),
+        IrcChannel('#three'),
+    ]
+
+    within, exceeding = limit_channels_to_join(channels, {'#': 2, '&': None})
+
+    assert within == [
+        IrcChannel('#one'),
+        IrcChannel('&local'),
+        IrcChannel('#two'),
+    ]
+    assert exceeding == [IrcChannel('#three')]
+
+
+def test_plan_joins_with_isupport():
+    features = FeatureSet()
+    features.load(['nick', 'CHANLIMIT=#:4', 'TARGMAX=JOIN:2,PRIVMSG:4', 'x'])
+
+    plan = plan_joins(CHANNELS, features, {'#channel5'})
+
+    assert plan.lines == [
+        'JOIN #channel5,#channel1',
+        'JOIN #channel2,#channel3',
+    ]
+    assert plan.channel_count == 4
+    assert plan.skipped_channels == [IrcChannel('#channel4')]
+
+
+def test_plan_joins_without_isupport():
+    plan = plan_joins(CHANNELS, FeatureSet())
+
+    assert plan.lines == [
+        'JOIN #channel1,#channel2,#channel3,#channel4,#channel5'
+    ]
+    assert plan.skipped_channels == []
@@ -0,0 +1,91 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from weitersager.config import IrcChannel, IrcConfig, IrcNetwork, IrcServer
+from weitersager.joining import ActiveChannels, get_channels_by_name
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_touch_new_and_known_channels():
+    active_channels = ActiveChannels()
+
+    assert active_channels.touch('#one')
+    assert active_channels.touch('#two')
+    assert not active_channels.touch('#one')
+
+    assert '#one' in active_channels
+    assert '#three' not in active_channels
+    assert len(active_channels) == 2
+
+
+def test_remove_idle_least_recently_used_first():
+    clock = FakeClock()
+    active_channels = ActiveChannels(60.0, clock=clock)
+
+    active_channels.touch('#one')
+    clock.now = 10.0
+    active_channels.touch('#two')
+    clock.now = 20.0
+    active_channels.touch('#three')
+    clock.now = 30.0
+    active_channels.touch('#one')  # used again
+
+    clock.now = 75.0
+    assert active_channels.remove_idle() == ['#two']
+    assert active_channels.get_seconds_until_idle() == 5.0
+
+    clock.now = 100.0
+    assert active_channels.remove_idle() == ['#three', '#one']
+    assert len(active_channels) == 0
+    assert active_channels.get_seconds_until_idle() is None
+
+
+def test_never_idle_without_idle_time():
+    clock = FakeClock()
+    active_channels = ActiveChannels(clock=clock)
+    active_channels.touch('#one')
+
+    clock.now = 1_000_000.0
+    assert active_channels.remove_idle() == []
+    assert active_channels.get_seconds_until_idle() is None
+
+
+def test_discard():
+    active_channels = ActiveChannels()
+    active_channels.touch('#one')
+
+    active_channels.discard('#one')
+    active_channels.discard('#unknown')
+
+    assert active_channels.touch('#one')
+
+
+def test_get_channels_by_name():
+    config = IrcConfig(
+        server=IrcServer('irc.homenet.test'),
+        nickname='Bot',
+        realname='Bot',
+        commands=[],
+        channels={IrcChannel('#lobby')},
+        networks=[
+            IrcNetwork(
+                name='libera',
+                server=IrcServer('irc.libera.test'),
+                channels={IrcChannel('#lobby', password='s3cr3t')},
+            ),
+        ],
+    )
+
+    assert get_channels_by_name(config) == {
+        '#lobby': IrcChannel('#lobby'),
+        'libera:#lobby': IrcChannel('libera:#lobby', password='s3cr3t'),
+    }
@@ -0,0 +1,111 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from threading import Thread
+
+from weitersager.journal import Journal
+
+
+def test_recover_undelivered_records(tmp_path):
+    journal = Journal(tmp_path)
+    seq1 = journal.append(b'one')
+    seq2 = journal.append(b'two')
+    seq3 = journal.append(b'three')
+    journal.ack(seq2)
+    journal.close()
+
+    reopened = Journal(tmp_path)
+
+    assert reopened.recovered_records == [(seq1, b'one'), (seq3, b'three')]
+
+    # Sequence numbers are not reused.
+    assert reopened.append(b'four') > seq3
+
+
+def test_ignore_incomplete_record(tmp_path):
+    journal = Journal(tmp_path)
+    seq1 = journal.append(b'one')
+    journal.append(b'two')
+    journal.close()
+
+    # Simulate a crash in the middle of writing the last record.
+    segment_path = get_segment_paths(tmp_path)[-1]
+    data = segment_path.read_bytes()
+    segment_path.write_bytes(data[:-2])
+
+    reopened = Journal(tmp_path)
+
+    assert reopened.recovered_records == [(seq1, b'one')]
+
+
+def test_remove_delivered_segments(tmp_path):
+    # Fit a single record into each segment.
+    journal = Journal(tmp_path, segment_size=64)
+    seqs = [journal.append(b'x' * 50) for _ in range(4)]
+
+    assert get_segment_names(tmp_path) == [
+        '0000000001.log',
+        '0000000002.log',
+        '0000000003.log',
+        '0000000004.log',
+    ]
+
+    journal.ack(seqs[1])
+
+    # The oldest segment still holds an undelivered message.
+    assert get_segment_names(tmp_path) == [
+        '0000000001.log',
+        '0000000002.log',
+        '0000000003.log',
+        '0000000004.log',
+        '0000000005.log',
+    ]
+
+    journal.ack(seqs[0])
+
+    assert get_segment_names(tmp_path) == [
+        '0000000003.log',
+        '0000000004.log',
+        '0000000005.log',
+    ]
+
+    journal.close()
+
+    reopened = Journal(tmp_path)
+
+    assert reopened.recovered_records == [
+        (seqs[2], b'x' * 50),
+        (seqs[3], b'x' * 50),
+    ]
+
+
+def test_concurrent_appends(tmp_path):
+    journal = Journal(tmp_path, segment_size=1024)
+
+    def append_and_sync():
+        for _ in range(50):
+            journal.append(b'message')
+            journal.sync()
+
+    threads = [Thread(target=append_and_sync) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    journal.close()
+
+    reopened = Journal(tmp_path)
+
+    seqs = [seq for seq, _ in reopened.recovered_records]
+    assert seqs == list(range(1, 201))
+
+
+def get_segment_paths(path):
+    return sorted(path.glob('*.log'))
+
+
+def get_segment_names(path):
+    return [segment_path.name for segment_path in get_segment_paths(path)]
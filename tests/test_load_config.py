@@ -4,13 +4,21 @@
 """
 
 from io import StringIO
+from pathlib import Path
+
+import pytest
 
 from weitersager.config import (
+    ConfigurationError,
     HttpConfig,
     IrcChannel,
     IrcConfig,
+    IrcNetwork,
     IrcServer,
     load_config,
+    LogConfig,
+    QueueConfig,
+    TokenStoreConfig,
 )
 
 
@@ -21,6 +29,7 @@ log_level = "warning"
 host = "0.0.0.0"
 port = 55555
 api_tokens = ["qsSUx9KM-DBuDndUhGNi9_kxNHd08TypiHYM05ZTxVc"]
+metrics = true
 
 [irc.server]
 host = "orion.astrochat.test"
@@ -57,6 +66,7 @@ def test_load_config():
         port=55555,
         api_tokens={'qsSUx9KM-DBuDndUhGNi9_kxNHd08TypiHYM05ZTxVc'},
         channel_tokens_to_channel_names={},
+        metrics=True,
     )
 
     assert config.irc == IrcConfig(
@@ -96,6 +106,9 @@ def test_load_config_with_defaults():
 
     assert config.log_level == 'DEBUG'
 
+    assert config.runtime == 'threaded'
+    assert config.log == LogConfig()
+
     assert config.http == HttpConfig(
         host='127.0.0.1',
         port=8080,
@@ -146,3 +159,293 @@ def test_load_config_without_irc_server_host():
     config = load_config(toml)
 
     assert config.irc.server is None
+
+
+TOML_CONFIG_WITH_QUEUE = """\
+[irc.bot]
+nickname = "Lokalrunde"
+
+[queue]
+capacity = 500
+scheduling = "fair"
+
+[[irc.channels]]
+name = "#ci"
+
+[[irc.channels]]
+name = "#alerts"
+weight = 3
+"""
+
+
+def test_load_config_with_queue():
+    toml = StringIO(TOML_CONFIG_WITH_QUEUE)
+
+    config = load_config(toml)
+
+    assert config.queue == QueueConfig(
+        capacity=500,
+        scheduling='fair',
+        channel_weights={'#alerts': 3},
+    )
+
+
+def test_load_config_without_queue():
+    toml = StringIO(TOML_CONFIG_WITHOUT_IRC_SERVER_TABLE)
+
+    config = load_config(toml)
+
+    assert config.queue == QueueConfig(capacity=None)
+
+
+TOML_CONFIG_WITH_PRIORITIES = """\
+[http]
+api_tokens = [
+  "d4N9sJ0b8UVXJmUK3ayQUJ5tlGv1ik5jI-8Tb7-iNuM",
+  { token = "M8WsXbHnf8U8sNnwfi3tBL-Ygb9Up4D2QNnoc0ZJdHw", priority = 5 },
+]
+
+[irc.bot]
+nickname = "Lokalrunde"
+
+[[irc.channels]]
+name = "#alerts"
+tokens = [
+  { token = "4ag4gqsYcDk5ZwvXXfjpa9kVHoYJ0l4Mx37FF5Jbh6w", priority = 10 },
+  { token = "bq1ymqIrOE7y5-_6RB0C3Vl2h8T7cLHtZH-2cV2cz3k" },
+]
+"""
+
+
+def test_load_config_with_priorities():
+    toml = StringIO(TOML_CONFIG_WITH_PRIORITIES)
+
+    config = load_config(toml)
+
+    assert config.http.api_tokens == {
+        'd4N9sJ0b8UVXJmUK3ayQUJ5tlGv1ik5jI-8Tb7-iNuM',
+        'M8WsXbHnf8U8sNnwfi3tBL-Ygb9Up4D2QNnoc0ZJdHw',
+    }
+    assert config.http.channel_tokens_to_channel_names == {
+        '4ag4gqsYcDk5ZwvXXfjpa9kVHoYJ0l4Mx37FF5Jbh6w': '#alerts',
+        'bq1ymqIrOE7y5-_6RB0C3Vl2h8T7cLHtZH-2cV2cz3k': '#alerts',
+    }
+    assert config.http.token_priorities == {
+        'M8WsXbHnf8U8sNnwfi3tBL-Ygb9Up4D2QNnoc0ZJdHw': 5,
+        '4ag4gqsYcDk5ZwvXXfjpa9kVHoYJ0l4Mx37FF5Jbh6w': 10,
+    }
+
+
+TOML_CONFIG_WITH_NETWORKS = """\
+[irc.bot]
+nickname = "Lokalrunde"
+
+[irc.server]
+host = "irc.homenet.test"
+
+[[irc.channels]]
+name = "#lobby"
+
+[[irc.servers]]
+name = "libera"
+host = "irc.libera.test"
+port = 6697
+ssl = true
+rate_limit = 2.0
+
+[[irc.servers.channels]]
+name = "#lobby"
+
+[[irc.servers.channels]]
+name = "#ops"
+tokens = [ "Va3WErsIjq4fExW7oWeqvA1E6jeVEsLfHx14g8cYb0U" ]
+weight = 2
+"""
+
+
+def test_load_config_with_networks():
+    toml = StringIO(TOML_CONFIG_WITH_NETWORKS)
+
+    config = load_config(toml)
+
+    assert config.irc.server == IrcServer('irc.homenet.test')
+    assert config.irc.channels == {IrcChannel('#lobby')}
+    assert config.irc.networks == [
+        IrcNetwork(
+            name='libera',
+            server=IrcServer(
+                'irc.libera.test', port=6697, ssl=True, rate_limit=2.0
+            ),
+            channels={IrcChannel('#lobby'), IrcChannel('#ops')},
+        ),
+    ]
+    assert config.http.channel_tokens_to_channel_names == {
+        'Va3WErsIjq4fExW7oWeqvA1E6jeVEsLfHx14g8cYb0U': 'libera:#ops',
+    }
+    assert config.queue.channel_weights == {'libera:#ops': 2}
+
+
+TOML_CONFIG_WITH_ASYNCIO_RUNTIME = """\
+runtime = "asyncio"
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_asyncio_runtime():
+    toml = StringIO(TOML_CONFIG_WITH_ASYNCIO_RUNTIME)
+
+    config = load_config(toml)
+
+    assert config.runtime == 'asyncio'
+
+
+TOML_CONFIG_WITH_LOG_SETTINGS = """\
+[log]
+format = "json"
+queue = true
+message_sample_rate = 0.1
+message_rate_limit = 20
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_log_settings():
+    toml = StringIO(TOML_CONFIG_WITH_LOG_SETTINGS)
+
+    config = load_config(toml)
+
+    assert config.log == LogConfig(
+        format='json',
+        queue=True,
+        message_sample_rate=0.1,
+        message_rate_limit=20.0,
+    )
+
+
+TOML_CONFIG_WITH_CHANNEL_STORE = """\
+[http.token_store]
+path = "/var/lib/weitersager/tokens.sqlite"
+refresh_interval = 2.5
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_token_store():
+    toml = StringIO(TOML_CONFIG_WITH_CHANNEL_STORE)
+
+    config = load_config(toml)
+
+    assert config.http.token_store == TokenStoreConfig(
+        path=Path('/var/lib/weitersager/tokens.sqlite'),
+        refresh_interval=2.5,
+    )
+
+
+TOML_CONFIG_WITH_JOIN_ON_DEMAND = """\
+[irc]
+join_on_demand = true
+part_idle_after = 3600
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_join_on_demand():
+    toml = StringIO(TOML_CONFIG_WITH_JOIN_ON_DEMAND)
+
+    config = load_config(toml)
+
+    assert config.irc.join_on_demand
+    assert config.irc.part_idle_after == 3600.0
+
+
+TOML_CONFIG_WITH_PART_IDLE_AFTER_ONLY = """\
+[irc]
+part_idle_after = 3600
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_part_idle_after_requires_join_on_demand():
+    toml = StringIO(TOML_CONFIG_WITH_PART_IDLE_AFTER_ONLY)
+
+    with pytest.raises(ConfigurationError):
+        load_config(toml)
+
+
+TOML_CONFIG_WITH_KEEP_ALIVE_AND_SINGLE_WORKER = """\
+[http]
+keep_alive_timeout = 5.0
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_keep_alive_requires_workers():
+    toml = StringIO(TOML_CONFIG_WITH_KEEP_ALIVE_AND_SINGLE_WORKER)
+
+    with pytest.raises(ConfigurationError):
+        load_config(toml)
+
+
+TOML_CONFIG_WITH_KEEP_ALIVE_AND_ASYNCIO_RUNTIME = """\
+runtime = "asyncio"
+
+[http]
+keep_alive_timeout = 5.0
+
+[irc.bot]
+nickname = "Lokalrunde"
+"""
+
+
+def test_load_config_with_keep_alive_and_asyncio_runtime():
+    toml = StringIO(TOML_CONFIG_WITH_KEEP_ALIVE_AND_ASYNCIO_RUNTIME)
+
+    config = load_config(toml)
+
+    assert config.http.keep_alive_timeout == 5.0
+
+
+TOML_CONFIG_WITH_QUEUE_PATH_AND_CONNECTIONS = """\
+[irc.bot]
+nickname = "Lokalrunde"
+
+[irc.server]
+host = "irc.homenet.test"
+connections = 2
+
+[queue]
+path = "/var/lib/weitersager/queue"
+"""
+
+
+def test_load_config_with_queue_path_and_connections():
+    toml = StringIO(TOML_CONFIG_WITH_QUEUE_PATH_AND_CONNECTIONS)
+
+    config = load_config(toml)
+
+    assert config.queue.path == Path('/var/lib/weitersager/queue')
+    assert config.irc.server.connections == 2
+
+
+def test_load_config_with_queue_path_and_networks():
+    toml = StringIO(
+        TOML_CONFIG_WITH_NETWORKS
+        + '\n[queue]\npath = "/var/lib/weitersager/queue"\n'
+    )
+
+    config = load_config(toml)
+
+    assert config.queue.path == Path('/var/lib/weitersager/queue')
+    assert config.irc.networks
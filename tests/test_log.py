@@ -0,0 +1,139 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import atexit
+from io import StringIO
+import json
+import logging
+
+import pytest
+
+from weitersager.config import LogConfig
+from weitersager.log import (
+    configure_logging,
+    get_message_logger,
+    JsonFormatter,
+    MessageLogFilter,
+    NonBlockingQueueHandler,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def restore_loggers():
+    pkg_logger = logging.getLogger('weitersager')
+    message_logger = get_message_logger()
+    handlers = list(pkg_logger.handlers)
+    level = pkg_logger.level
+
+    yield
+
+    pkg_logger.handlers = handlers
+    pkg_logger.setLevel(level)
+    message_logger.filters.clear()
+
+
+def create_record(message, *args):
+    return logging.LogRecord(
+        'weitersager.messages', logging.INFO, __file__, 1, message, args, None
+    )
+
+
+def test_json_formatter():
+    record = create_record('Received message for channel %s.', '#öne')
+    record.created = 1_700_000_000.25
+
+    line = JsonFormatter().format(record)
+
+    assert json.loads(line) == {
+        'time': '2023-11-14T22:13:20.250+00:00',
+        'level': 'INFO',
+        'logger': 'weitersager.messages',
+        'message': 'Received message for channel #öne.',
+    }
+
+
+def test_filter_sample():
+    random_values = iter([0.05, 0.5, 0.09, 0.1])
+    log_filter = MessageLogFilter(
+        sample_rate=0.1, random_func=lambda: next(random_values)
+    )
+
+    results = [log_filter.filter(create_record('x')) for _ in range(4)]
+
+    assert results == [True, False, True, False]
+    assert log_filter.suppressed == 2
+
+
+def test_filter_rate_limit():
+    clock = FakeClock()
+    log_filter = MessageLogFilter(rate_limit=2, clock=clock)
+
+    results = [log_filter.filter(create_record('x')) for _ in range(3)]
+    assert results == [True, True, False]
+
+    clock.now += 0.5
+    results = [log_filter.filter(create_record('x')) for _ in range(2)]
+    assert results == [True, False]
+
+
+def test_filter_reports_suppressed_records(caplog):
+    clock = FakeClock()
+    log_filter = MessageLogFilter(rate_limit=1, clock=clock)
+
+    with caplog.at_level(logging.INFO, logger='weitersager.log'):
+        for _ in range(3):
+            log_filter.filter(create_record('x'))
+        assert caplog.messages == []
+
+        clock.now += 60.0
+        log_filter.filter(create_record('x'))  # accepted
+        log_filter.filter(create_record('x'))  # suppressed, reported
+
+    assert caplog.messages == [
+        'Suppressed 3 per-message log record(s) in the last 60 seconds.',
+    ]
+    assert log_filter.suppressed == 0
+
+
+def test_configure_logging_with_queue(restore_loggers):
+    stream = StringIO()
+    config = LogConfig(format='json', queue=True, message_rate_limit=1)
+
+    listener = configure_logging('INFO', config, stream=stream)
+
+    handler = logging.getLogger('weitersager').handlers[-1]
+    assert isinstance(handler, NonBlockingQueueHandler)
+
+    message_logger = get_message_logger()
+    message_logger.info('Received message %d.', 1)
+    message_logger.info('Received message %d.', 2)  # over rate limit
+
+    atexit.unregister(listener.stop)
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)['message'] for line in lines] == [
+        'Received message 1.',
+    ]
+
+
+def test_configure_logging_without_queue(restore_loggers):
+    stream = StringIO()
+
+    listener = configure_logging('INFO', LogConfig(), stream=stream)
+
+    assert listener is None
+    assert get_message_logger().filters == []
+
+    get_message_logger().info('Received message.')
+    assert stream.getvalue().endswith('INFO     Received message.\n')
@@ -0,0 +1,65 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from threading import Thread
+
+from weitersager.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_summed_across_threads():
+    counter = Counter('requests_total', 'Requests.', ['status'])
+
+    def count():
+        for _ in range(1000):
+            counter.inc('202')
+        counter.inc('400', amount=2)
+
+    threads = [Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.get_value('202') == 4000
+    assert counter.get_value('400') == 8
+    assert counter.get_value('503') == 0
+
+
+def test_render():
+    registry = Registry()
+
+    counter = registry.register(
+        Counter('dropped_total', 'Messages dropped.', ['channel'])
+    )
+    counter.inc('#ops')
+    counter.inc('#ops')
+    counter.inc('#"quoted"')
+
+    registry.register(Gauge('queue_messages', 'Queued.', lambda: {(): 7}))
+
+    histogram = registry.register(
+        Histogram('latency_seconds', 'Latency.', buckets=[0.1, 1.0])
+    )
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    assert registry.render() == (
+        '# HELP dropped_total Messages dropped.\n'
+        '# TYPE dropped_total counter\n'
+        'dropped_total{channel="#\\"quoted\\""} 1\n'
+        'dropped_total{channel="#ops"} 2\n'
+        '# HELP queue_messages Queued.\n'
+        '# TYPE queue_messages gauge\n'
+        'queue_messages 7\n'
+        '# HELP latency_seconds Latency.\n'
+        '# TYPE latency_seconds histogram\n'
+        'latency_seconds_bucket{le="0.1"} 2\n'
+        'latency_seconds_bucket{le="1"} 3\n'
+        'latency_seconds_bucket{le="+Inf"} 4\n'
+        'latency_seconds_sum 3.65\n'
+        'latency_seconds_count 4\n'
+    )
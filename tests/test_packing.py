@@ -0,0 +1,100 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.irc import get_max_text_length
+from weitersager.message import Message
+from weitersager.packing import Packer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_join_texts_for_same_channel(clock):
+    packer = Packer(lambda channel_name: 100, clock=clock)
+
+    assert add(packer, '#ci', 'build 1 OK') == []
+    assert add(packer, '#ci', 'build 2 OK') == []
+    assert add(packer, '#ops', 'disk full') == []
+
+    lines = packer.pop_due_lines()
+
+    assert [(line.channel_name, line.join(' | ')) for line in lines] == [
+        ('#ci', 'build 1 OK | build 2 OK'),
+        ('#ops', 'disk full'),
+    ]
+    assert [len(line.messages) for line in lines] == [2, 1]
+
+
+def test_line_ready_once_next_text_does_not_fit(clock):
+    packer = Packer(lambda channel_name: 20, clock=clock, linger_seconds=10)
+
+    assert add(packer, '#ci', 'build 1 OK') == []
+
+    lines = add(packer, '#ci', 'build 2 OK')
+
+    assert [line.join(' | ') for line in lines] == ['build 1 OK']
+
+
+def test_line_ready_once_full(clock):
+    packer = Packer(lambda channel_name: 20, clock=clock, linger_seconds=10)
+
+    lines = add(packer, '#ci', 'a rather long text')
+
+    assert [line.join(' | ') for line in lines] == ['a rather long text']
+
+
+def test_linger(clock):
+    packer = Packer(lambda channel_name: 100, clock=clock, linger_seconds=2)
+
+    add(packer, '#ci', 'build 1 OK')
+
+    assert packer.get_seconds_until_due() == 2.0
+    assert packer.pop_due_lines() == []
+
+    clock.now = 1.5
+    add(packer, '#ci', 'build 2 OK')
+
+    assert packer.get_seconds_until_due() == 0.5
+    assert packer.pop_due_lines() == []
+
+    clock.now = 2.0
+    lines = packer.pop_due_lines()
+
+    assert [line.join(' | ') for line in lines] == ['build 1 OK | build 2 OK']
+    assert packer.get_seconds_until_due() is None
+
+
+def test_lines_kept_while_more_texts_to_come(clock):
+    packer = Packer(lambda channel_name: 100, clock=clock)
+
+    add(packer, '#ci', 'build 1 OK')
+    add(packer, '#ops', 'disk full')
+
+    lines = packer.pop_due_lines(lambda channel_name: channel_name == '#ci')
+
+    assert [line.channel_name for line in lines] == ['#ops']
+    assert packer.get_seconds_until_due() == 0.0
+
+
+def test_get_max_text_length():
+    # 512 bytes minus `:Weitersager!` plus 10 + 1 + 63 + 1 bytes
+    # reserved for user and host, and minus `PRIVMSG #party :\r\n`
+    assert get_max_text_length('Weitersager', '#party') == 406
+
+
+def add(packer, channel_name, text):
+    return packer.add(Message(channel_name, text), text)
@@ -0,0 +1,186 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from functools import partial
+from queue import Full
+
+from weitersager.journal import Journal
+from weitersager.message import Message
+from weitersager.queues import (
+    estimate_drain_seconds,
+    FairScheduler,
+    MessageQueue,
+    PriorityScheduler,
+)
+from weitersager.tracing import Trace
+
+
+@pytest.mark.parametrize(
+    'queue_size, rate_limit, expected',
+    [
+        (0, None, 1),
+        (100, None, 1),
+        (0, 0.5, 1),
+        (1, 0.5, 2),
+        (10, 0.5, 20),
+        (10, 3.0, 4),
+    ],
+)
+def test_estimate_drain_seconds(queue_size, rate_limit, expected):
+    assert estimate_drain_seconds(queue_size, rate_limit) == expected
+
+
+def test_journaled_queue_restores_unacknowledged_messages(tmp_path):
+    queue = MessageQueue(journal=Journal(tmp_path))
+    queue.put(Message('#one', 'first'))
+    queue.put(Message('#one', 'second'))
+    queue.put(Message('#two', 'third'))
+
+    message = queue.get()
+    assert message == Message('#one', 'first')
+    queue.ack(message)
+
+    # Taken from the queue, but not acknowledged
+    assert queue.get() == Message('#one', 'second')
+
+    queue.close()
+
+    restored_queue = MessageQueue(journal=Journal(tmp_path))
+
+    assert restored_queue.qsize() == 2
+    assert restored_queue.get_nowait() == Message('#one', 'second')
+    assert restored_queue.get_nowait() == Message('#two', 'third')
+
+
+def test_journaled_queue_restores_traces(tmp_path):
+    queue = MessageQueue(journal=Journal(tmp_path))
+    trace = Trace('0123456789abcdef', '10.0.0.1', 1700000000.0)
+    queue.put(Message('#one', 'traced', trace=trace))
+    queue.close()
+
+    assert trace.enqueued_at is not None
+
+    restored_queue = MessageQueue(journal=Journal(tmp_path))
+    restored_trace = restored_queue.get_nowait().trace
+
+    assert restored_trace.message_id == '0123456789abcdef'
+    assert restored_trace.source_ip_address == '10.0.0.1'
+    assert restored_trace.received_at == 1700000000.0
+    assert restored_trace.enqueued_at == trace.enqueued_at
+    assert restored_trace.dequeued_at is not None
+
+
+def test_fair_scheduling():
+    queue = create_fair_queue({'#noisy': 2})
+
+    for i in range(1, 5):
+        queue.put(Message('#noisy', f'noisy {i}'))
+    for i in range(1, 3):
+        queue.put(Message('#quiet', f'quiet {i}'))
+    queue.put(Message('#rare', 'rare 1'))
+
+    texts = [queue.get_nowait()[1] for _ in range(queue.qsize())]
+
+    assert texts == [
+        'noisy 1',
+        'noisy 2',
+        'quiet 1',
+        'rare 1',
+        'noisy 3',
+        'noisy 4',
+        'quiet 2',
+    ]
+
+
+def test_fair_scheduling_with_channel_added_later():
+    queue = create_fair_queue({})
+
+    queue.put(Message('#one', 'one 1'))
+    queue.put(Message('#one', 'one 2'))
+
+    assert queue.get_nowait() == Message('#one', 'one 1')
+
+    queue.put(Message('#two', 'two 1'))
+    queue.put(Message('#one', 'one 3'))
+
+    # A channel that gets entries queued joins the end of the line.
+    assert queue.get_nowait() == Message('#one', 'one 2')
+    assert queue.get_nowait() == Message('#two', 'two 1')
+    assert queue.get_nowait() == Message('#one', 'one 3')
+
+
+def test_priority_scheduling():
+    queue = MessageQueue()
+
+    queue.put(Message('#ci', 'build 1'))
+    queue.put(Message('#ci', 'build 2'))
+    queue.put(Message('#ops', 'disk full', priority=10))
+    queue.put(Message('#ci', 'build 3'))
+    queue.put(Message('#ops', 'host down', priority=10))
+    queue.put(Message('#ci', 'nightly', priority=-1))
+    queue.put(Message('#ops', 'load high', priority=5))
+
+    texts = [queue.get_nowait().text for _ in range(queue.qsize())]
+
+    assert texts == [
+        'disk full',
+        'host down',
+        'load high',
+        'build 1',
+        'build 2',
+        'build 3',
+        'nightly',
+    ]
+
+
+def create_fair_queue(weights):
+    scheduler = PriorityScheduler(partial(FairScheduler, weights))
+    return MessageQueue(scheduler=scheduler)
+
+
+def test_channel_names_of_queued_messages(tmp_path):
+    queue = MessageQueue(journal=Journal(tmp_path))
+    queue.put(Message('#one', 'first'))
+    queue.put(Message('#one', 'second'))
+    queue.put(Message('#two', 'third'))
+    queue.close()
+
+    # Restored from the journal
+    queue = MessageQueue(journal=Journal(tmp_path))
+    assert queue.get_channel_names() == {'#one', '#two'}
+
+    queue.put(Message('#three', 'fourth'))
+    queue.get()
+    queue.get()
+    assert queue.get_channel_names() == {'#two', '#three'}
+
+    queue.close()
+
+
+def test_put_all_or_nothing():
+    queue = MessageQueue(maxsize=3)
+    queue.put(Message('#one', 'first'))
+
+    with pytest.raises(Full):
+        queue.put_all_nowait([Message(f'#{i}', 'second') for i in range(3)])
+
+    assert queue.qsize() == 1
+
+    queue.put_all_nowait([Message(f'#{i}', 'third') for i in range(2)])
+
+    assert queue.qsize() == 3
+
+
+def test_journaled_queue_without_sync_on_put(tmp_path):
+    queue = MessageQueue(journal=Journal(tmp_path), sync_on_put=False)
+    queue.put(Message('#one', 'first'))
+    queue.sync()
+    queue.close()
+
+    restored_queue = MessageQueue(journal=Journal(tmp_path))
+
+    assert restored_queue.get_nowait() == Message('#one', 'first')
@@ -0,0 +1,122 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from statistics import mean
+
+import pytest
+
+from weitersager.ratelimit import get_line_cost, limit_rate, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket(0.5, 3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == 2.0
+    assert bucket.reserve() == 4.0
+
+
+def test_idle_time_banks_capacity_up_to_burst(clock):
+    bucket = TokenBucket(1.0, 2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now = 100.0
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_line_cost():
+    assert get_line_cost('PRIVMSG #ops :hi') == 1.0
+    assert get_line_cost('x' * 118, bytes_per_token=120) == 2.0
+
+
+def test_limit_rate_waits(clock):
+    sent = []
+    bucket = TokenBucket(1.0, 1, clock=clock)
+    send_raw = limit_rate(sent.append, bucket, sleep=clock.sleep)
+
+    send_raw('PRIVMSG #ops :one')
+    send_raw('PRIVMSG #ops :two')
+
+    assert sent == ['PRIVMSG #ops :one', 'PRIVMSG #ops :two']
+    assert clock.now == 1.0
+
+
+def simulate(bucket, clock, arrival_times):
+    """Send lines arriving at the given times one after another, return
+    the delivery latencies and times.
+    """
+    latencies = []
+    sent_at = []
+
+    for arrival_time in arrival_times:
+        clock.now = max(clock.now, arrival_time)
+        clock.sleep(bucket.reserve())
+        latencies.append(clock.now - arrival_time)
+        sent_at.append(clock.now)
+
+    return latencies, sent_at
+
+
+def create_bursty_arrivals():
+    """Return arrival times of bursts of 5 lines every 20 seconds."""
+    return [burst * 20.0 for burst in range(30) for _ in range(5)]
+
+
+def test_bursty_traffic_latency():
+    rate = 0.5
+    burst = 5
+    arrivals = create_bursty_arrivals()
+
+    # A burst of 1 is equivalent to a fixed spacing between lines.
+    fixed_clock = FakeClock()
+    fixed_bucket = TokenBucket(rate, 1, clock=fixed_clock)
+    fixed_latencies, _ = simulate(fixed_bucket, fixed_clock, arrivals)
+
+    bucket_clock = FakeClock()
+    bucket = TokenBucket(rate, burst, clock=bucket_clock)
+    bucket_latencies, sent_at = simulate(bucket, bucket_clock, arrivals)
+
+    # Fixed spacing: the n-th line of a burst waits n * 2 seconds.
+    assert mean(fixed_latencies) == pytest.approx(4.0)
+    assert max(fixed_latencies) == pytest.approx(8.0)
+
+    # Token bucket: bursts are sent at once as capacity has been banked.
+    assert mean(bucket_latencies) == 0.0
+
+    # Never more lines than the burst plus the refill in any window.
+    window = 20.0
+    for start in sent_at:
+        count = sum(1 for t in sent_at if start <= t < start + window)
+        assert count <= burst + rate * window
+
+
+def test_take_does_not_borrow(clock):
+    bucket = TokenBucket(1.0, 2, clock=clock)
+
+    assert bucket.take()
+    assert bucket.take()
+    assert not bucket.take()
+
+    clock.now += 1.0
+    assert bucket.take()
+    assert not bucket.take()
@@ -0,0 +1,142 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from dataclasses import replace
+
+from weitersager.config import (
+    Config,
+    HttpConfig,
+    IrcChannel,
+    IrcConfig,
+    IrcNetwork,
+    IrcServer,
+)
+from weitersager.reload import apply_reloadable_settings, diff_configs
+
+
+def test_diff_unchanged():
+    config = create_config()
+
+    changes = diff_configs(config, create_config())
+
+    assert changes.is_empty()
+
+
+def test_diff_tokens():
+    old = create_config()
+    new = create_config(api_tokens={'t0k3n', 'n3w'})
+
+    changes = diff_configs(old, new)
+
+    assert changes.tokens_changed
+    assert not changes.channels_changed
+    assert changes.restart_required == []
+
+
+def test_diff_channels():
+    old = create_config(channels={IrcChannel('#one'), IrcChannel('#two')})
+    new = create_config(
+        channels={IrcChannel('#two'), IrcChannel('#three', password='pw')}
+    )
+
+    changes = diff_configs(old, new)
+
+    assert changes.channels_changed
+    assert changes.channels_to_join == [IrcChannel('#three', password='pw')]
+    assert changes.channel_names_to_part == ['#one']
+    assert changes.restart_required == []
+
+
+def test_diff_rate_limit():
+    old = create_config(server=IrcServer('irc.example.org', rate_limit=1.0))
+    new = create_config(
+        server=IrcServer('irc.example.org', rate_limit=2.0, rate_limit_burst=5)
+    )
+
+    changes = diff_configs(old, new)
+
+    assert changes.rate_limit_changed
+    assert changes.restart_required == []
+
+
+def test_diff_settings_requiring_restart():
+    old = create_config(server=IrcServer('irc.example.org'))
+    new = create_config(server=IrcServer('irc.example.net'), nickname='Bot2')
+    new = replace(new, log_level='info', http=replace(new.http, port=9000))
+
+    changes = diff_configs(old, new)
+
+    assert not changes.is_empty()
+    assert changes.restart_required == [
+        'http',
+        'irc.bot',
+        'irc.server',
+        'log_level',
+    ]
+
+
+def test_diff_join_on_demand_requires_restart():
+    old = create_config()
+    new = replace(old, irc=replace(old.irc, join_on_demand=True))
+
+    changes = diff_configs(old, new)
+
+    assert changes.restart_required == ['irc.join_on_demand']
+
+
+def test_diff_channels_with_networks():
+    network = IrcNetwork('libera', IrcServer('irc.libera.chat'), set())
+    old = create_config(networks=[network])
+    new = create_config(channels={IrcChannel('#new')}, networks=[network])
+
+    changes = diff_configs(old, new)
+
+    assert not changes.channels_changed
+    assert changes.channels_to_join == []
+    assert changes.restart_required == ['irc.channels']
+
+
+def test_apply_reloadable_settings():
+    old = create_config(server=IrcServer('irc.example.org'))
+    new = create_config(
+        api_tokens={'n3w'},
+        channels={IrcChannel('#new')},
+        server=IrcServer('irc.example.net', rate_limit=0.5),
+        nickname='Bot2',
+    )
+
+    config = apply_reloadable_settings(old, new)
+
+    assert config.http.api_tokens == {'n3w'}
+    assert config.irc.channels == {IrcChannel('#new')}
+    assert config.irc.server == IrcServer('irc.example.org', rate_limit=0.5)
+    assert config.irc.nickname == 'Bot'
+
+
+def create_config(
+    *,
+    api_tokens=None,
+    channels=None,
+    server=None,
+    nickname='Bot',
+    networks=None,
+):
+    http_config = HttpConfig(
+        host='127.0.0.1',
+        port=8080,
+        api_tokens=api_tokens if api_tokens is not None else {'t0k3n'},
+        channel_tokens_to_channel_names={'ct': '#one'},
+    )
+
+    irc_config = IrcConfig(
+        server=server,
+        nickname=nickname,
+        realname='Bot',
+        commands=[],
+        channels=channels if channels is not None else {IrcChannel('#one')},
+        networks=networks if networks is not None else [],
+    )
+
+    return Config(log_level='debug', http=http_config, irc=irc_config)
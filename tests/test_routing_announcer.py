@@ -0,0 +1,194 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from irc.client import Event, NickMask, ServerConnection
+import pytest
+
+from weitersager.config import IrcNetwork
+from weitersager.irc import (
+    Announcer,
+    create_announcer,
+    IrcChannel,
+    IrcConfig,
+    IrcServer,
+    QueuedAnnouncer,
+    RoutingAnnouncer,
+)
+from weitersager.signals import irc_channel_joined
+
+
+class RecordingAnnouncer(Announcer):
+    def __init__(self, *, connected=True):
+        self.announced = []
+        self.joined_channels = []
+        self.connected = connected
+
+    def announce(self, channel_name, text):
+        self.announced.append((channel_name, text))
+
+    def wait_until_connected(self, timeout_seconds=None):
+        return self.connected
+
+    def join_channel(self, channel):
+        self.joined_channels.append(channel)
+
+
+@pytest.fixture
+def config():
+    return IrcConfig(
+        server=IrcServer('irc.homenet.test'),
+        nickname='Lokalrunde',
+        realname='Lokalrunde',
+        commands=[],
+        channels={IrcChannel('#lobby')},
+        networks=[
+            IrcNetwork(
+                name='libera',
+                server=IrcServer('irc.libera.test'),
+                channels={IrcChannel('#lobby'), IrcChannel('#ops')},
+            ),
+            IrcNetwork(
+                name='oftc',
+                server=IrcServer('irc.oftc.test'),
+                channels={IrcChannel('#dev')},
+            ),
+        ],
+    )
+
+
+@pytest.fixture
+def announcer(config):
+    announcer = create_announcer(config)
+
+    yield announcer
+
+    announcer.shutdown()
+
+
+def test_create_routing_announcer(announcer):
+    assert type(announcer) is RoutingAnnouncer
+    assert set(announcer.announcers_by_network_name) == {
+        None,
+        'libera',
+        'oftc',
+    }
+
+
+@pytest.mark.parametrize(
+    'channel_name, expected',
+    [
+        ('#lobby', '#lobby'),
+        ('libera:#lobby', 'libera:#lobby'),
+        ('#ops', 'libera:#ops'),
+        ('#dev', 'oftc:#dev'),
+        ('#unknown', '#unknown'),
+    ],
+)
+def test_resolve_channel_name(announcer, channel_name, expected):
+    assert announcer.resolve_channel_name(channel_name) == expected
+
+
+def test_announce_routed_by_network():
+    default_announcer = RecordingAnnouncer()
+    libera_announcer = RecordingAnnouncer()
+
+    announcer = RoutingAnnouncer(
+        {None: default_announcer, 'libera': libera_announcer},
+        routes={'#ops': 'libera:#ops'},
+    )
+
+    announcer.announce('#lobby', 'hello, home')
+    announcer.announce('libera:#lobby', 'hello, Libera')
+    announcer.announce('oftc:#dev', 'hello, nobody')
+
+    assert default_announcer.announced == [('#lobby', 'hello, home')]
+    assert libera_announcer.announced == [('#lobby', 'hello, Libera')]
+
+
+def test_report_sent_with_qualified_channel_names():
+    announcer = RoutingAnnouncer(
+        {
+            None: QueuedAnnouncer(RecordingAnnouncer()),
+            'libera': QueuedAnnouncer(RecordingAnnouncer()),
+        },
+        routes={},
+    )
+
+    reported = []
+
+    def on_sent(channel_names, sent):
+        reported.append((channel_names, sent))
+
+    announcer.start()
+    announcer.send(
+        ['#lobby', 'libera:#lobby', 'oftc:#dev'], 'hello, everyone', on_sent
+    )
+    announcer.shutdown()
+
+    assert sorted(reported) == [
+        (['#lobby'], True),
+        (['libera:#lobby'], True),
+        (['oftc:#dev'], False),
+    ]
+
+
+def test_wait_only_for_networks_with_full_queue():
+    libera_announcer = QueuedAnnouncer(
+        RecordingAnnouncer(connected=False), capacity=1
+    )
+
+    announcer = RoutingAnnouncer(
+        {
+            None: QueuedAnnouncer(RecordingAnnouncer()),
+            'libera': libera_announcer,
+        },
+        routes={},
+    )
+
+    # Messages for a network that is down are queued for it ...
+    assert announcer.wait_until_connected(0)
+
+    # ... until its queue is full.
+    announcer.announce('libera:#lobby', 'hello, Libera')
+    assert not announcer.wait_until_connected(0)
+
+    libera_announcer.announcer.connected = True
+    assert announcer.wait_until_connected(0)
+
+
+def test_join_channel_routed_by_network():
+    default_announcer = RecordingAnnouncer()
+    libera_announcer = RecordingAnnouncer()
+
+    announcer = RoutingAnnouncer(
+        {None: default_announcer, 'libera': libera_announcer}, routes={}
+    )
+
+    announcer.join_channel(IrcChannel('#lobby'))
+    announcer.join_channel(IrcChannel('libera:#ops', password='s3cr3t'))
+    announcer.join_channel(IrcChannel('oftc:#dev'))
+
+    assert default_announcer.joined_channels == [IrcChannel('#lobby')]
+    assert libera_announcer.joined_channels == [
+        IrcChannel('#ops', password='s3cr3t')
+    ]
+
+
+def test_joined_channel_qualified_with_network_name(announcer):
+    libera_announcer = announcer.announcers_by_network_name['libera']
+    bot = libera_announcer.announcer.bot
+
+    nickmask = NickMask('Lokalrunde!Lokalrunde@irc.libera.test')
+    join_event = Event(type='join', source=nickmask, target='#ops')
+
+    received_signal_data = []
+
+    @irc_channel_joined.connect
+    def handle_irc_channel_joined(sender, **data):
+        received_signal_data.append(data)
+
+    bot.on_join(ServerConnection(None), join_event)
+
+    assert received_signal_data == [{'channel_name': 'libera:#ops'}]
@@ -0,0 +1,165 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+from threading import Event, Thread
+
+import pytest
+
+from weitersager.irc import (
+    Announcer,
+    create_announcer,
+    IrcChannel,
+    IrcConfig,
+    IrcServer,
+    QueuedAnnouncer,
+    ShardedAnnouncer,
+)
+
+
+class RecordingAnnouncer(Announcer):
+    def __init__(self, announced, *, connected=True):
+        self.announced = announced
+        self.connected = connected
+
+    def announce(self, channel_name, text):
+        self.announced.append((channel_name, text))
+
+    def wait_until_connected(self, timeout_seconds=None):
+        return self.connected
+
+
+class BlockingAnnouncer(Announcer):
+    def __init__(self):
+        self.unblocked = Event()
+
+    def announce(self, channel_name, text):
+        self.unblocked.wait()
+
+
+@pytest.fixture
+def config():
+    server = IrcServer('irc.server.test', connections=3)
+
+    channels = {IrcChannel(f'#channel{i}') for i in range(30)}
+
+    return IrcConfig(
+        server=server,
+        nickname='Weitersager',
+        realname='Weitersager',
+        commands=[],
+        channels=channels,
+    )
+
+
+@pytest.fixture
+def announcer(config):
+    return create_announcer(config)
+
+
+def test_create_sharded_announcer(announcer):
+    assert type(announcer) is ShardedAnnouncer
+    assert set(announcer.shards) == {
+        'Weitersager',
+        'Weitersager2',
+        'Weitersager3',
+    }
+
+
+def test_channels_assigned_to_single_connection(config, announcer):
+    shard_channels = [
+        shard.announcer.channels for shard in announcer.shards.values()
+    ]
+
+    assert set().union(*shard_channels) == config.channels
+    assert sum(map(len, shard_channels)) == len(config.channels)
+    assert all(shard_channels)
+
+    for nickname, shard in announcer.shards.items():
+        for channel in shard.announcer.channels:
+            assert announcer.hash_ring.get_node(channel.name) == nickname
+
+
+def test_announce_in_order_per_channel(announcer):
+    announced_by_nickname = {}
+    for nickname, shard in announcer.shards.items():
+        announced = announced_by_nickname[nickname] = []
+        shard.announcer = RecordingAnnouncer(announced)
+
+    announcer.start()
+    for i in range(10):
+        for channel_name in ['#channel1', '#channel2', '#channel3']:
+            announcer.announce(channel_name, f'message {i}')
+    announcer.shutdown()
+
+    for channel_name in ['#channel1', '#channel2', '#channel3']:
+        nickname = announcer.hash_ring.get_node(channel_name)
+        texts = [
+            text
+            for name, text in announced_by_nickname[nickname]
+            if name == channel_name
+        ]
+        assert texts == [f'message {i}' for i in range(10)]
+
+    send_rates = announcer.get_send_rates()
+    total = sum(
+        shard.send_rate_meter.total for shard in announcer.shards.values()
+    )
+    assert set(send_rates) == set(announcer.shards)
+    assert total == 30
+
+
+def test_wait_until_all_connections_are_up(announcer):
+    shards = list(announcer.shards.values())
+    for shard in shards:
+        shard.announcer = RecordingAnnouncer([])
+
+    assert announcer.wait_until_connected(0)
+
+    shards[-1].announcer.connected = False
+
+    assert not announcer.wait_until_connected(0)
+
+
+def test_report_sent_once_sent(announcer):
+    for shard in announcer.shards.values():
+        shard.announcer = RecordingAnnouncer([])
+
+    reported = []
+
+    def on_sent(channel_names, sent):
+        reported.append((sorted(channel_names), sent))
+
+    channel_names = ['#channel1', '#channel2', '#channel3']
+
+    announcer.start()
+    announcer.send(channel_names, 'message', on_sent)
+    announcer.shutdown()
+
+    reported_channel_names = sorted(
+        name for names, _ in reported for name in names
+    )
+    assert reported_channel_names == channel_names
+    assert all(sent for _, sent in reported)
+
+
+def test_announce_blocks_while_queue_is_full():
+    inner_announcer = BlockingAnnouncer()
+    announcer = QueuedAnnouncer(inner_announcer, capacity=1)
+    announcer.start()
+
+    # The first message is being sent, the second one is queued.
+    announcer.announce('#channel1', 'message 1')
+    announcer.announce('#channel1', 'message 2')
+
+    thread = Thread(target=announcer.announce, args=('#channel1', 'message 3'))
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive()
+
+    inner_announcer.unblocked.set()
+    thread.join(1)
+    assert not thread.is_alive()
+
+    announcer.shutdown()
@@ -0,0 +1,66 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.sharding import HashRing, SendRateMeter
+
+
+CHANNEL_NAMES = [f'#channel{i}' for i in range(1000)]
+
+
+def test_keys_spread_across_nodes():
+    ring = HashRing(['a', 'b', 'c'])
+
+    counts = {'a': 0, 'b': 0, 'c': 0}
+    for channel_name in CHANNEL_NAMES:
+        counts[ring.get_node(channel_name)] += 1
+
+    for count in counts.values():
+        assert 200 < count < 500
+
+
+def test_assignment_is_stable():
+    ring1 = HashRing(['a', 'b', 'c'])
+    ring2 = HashRing(['c', 'a', 'b'])
+
+    for channel_name in CHANNEL_NAMES:
+        assert ring1.get_node(channel_name) == ring2.get_node(channel_name)
+
+
+def test_adding_node_only_moves_keys_to_it():
+    ring = HashRing(['a', 'b', 'c'])
+    before = {name: ring.get_node(name) for name in CHANNEL_NAMES}
+
+    ring.add_node('d')
+    after = {name: ring.get_node(name) for name in CHANNEL_NAMES}
+
+    moved = [name for name in CHANNEL_NAMES if before[name] != after[name]]
+    assert moved
+    assert all(after[name] == 'd' for name in moved)
+
+
+def test_get_node_without_nodes():
+    ring = HashRing([])
+
+    with pytest.raises(LookupError):
+        ring.get_node('#lobby')
+
+
+def test_send_rate_meter():
+    now = 0.0
+
+    def clock():
+        return now
+
+    meter = SendRateMeter(10.0, clock=clock)
+    for _ in range(5):
+        meter.record()
+
+    assert meter.get_rate() == 0.5
+
+    now = 10.0
+    assert meter.get_rate() == 0.0
+    assert meter.total == 5
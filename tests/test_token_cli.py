@@ -3,7 +3,10 @@
 :License: MIT, see LICENSE for details.
 """
 
-from weitersager.tokencli import generate_token
+import pytest
+
+from weitersager.tokencli import generate_token, main
+from weitersager.tokenstore import ChannelToken, open_token_index
 
 
 def test_generate_token():
@@ -17,3 +20,26 @@ def test_generate_token_produces_different_results():
     sample_count = 10
     tokens = [generate_token() for _ in range(sample_count)]
     assert len(set(tokens)) == sample_count
+
+
+def test_register_and_revoke_token(tmp_path, capsys):
+    store_path = tmp_path / 'tokens.sqlite'
+
+    main(['register', str(store_path), '#ci', '--priority', '3'])
+    token = capsys.readouterr().out.strip()
+
+    index = open_token_index(store_path)
+    assert index.lookup(token) == ChannelToken('#ci', 3)
+
+    main(['revoke', str(store_path), token])
+
+    index.refresh()
+    assert index.lookup(token) is None
+    index.store.close()
+
+
+def test_revoke_unknown_token(tmp_path):
+    with pytest.raises(SystemExit) as excinfo:
+        main(['revoke', str(tmp_path / 'tokens.sqlite'), 'unknown'])
+
+    assert excinfo.value.code == 1
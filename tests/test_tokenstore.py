@@ -0,0 +1,99 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import pytest
+
+from weitersager.tokenstore import (
+    ChannelToken,
+    ChannelTokenIndex,
+    hash_token,
+    open_token_index,
+    TokenStore,
+)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return tmp_path / 'tokens.sqlite'
+
+
+@pytest.fixture
+def store(store_path):
+    store = TokenStore(store_path)
+    yield store
+    store.close()
+
+
+def test_only_hashes_are_stored(store, store_path):
+    store.register('s3cr3t-t0k3n', '#ci')
+
+    assert b's3cr3t-t0k3n' not in store_path.read_bytes()
+    assert [change.token_hash for change in store.get_changes()] == [
+        hash_token('s3cr3t-t0k3n')
+    ]
+
+
+def test_lookup(store):
+    store.register('t0k3n-1', '#ci')
+    store.register('t0k3n-2', '#ops', priority=5)
+
+    index = ChannelTokenIndex(store)
+    assert index.refresh() == 2
+
+    assert index.lookup('t0k3n-1') == ChannelToken('#ci', None)
+    assert index.lookup('t0k3n-2') == ChannelToken('#ops', 5)
+    assert index.lookup('unknown') is None
+
+
+def test_refresh_applies_only_new_changes(store):
+    store.register('t0k3n-1', '#ci')
+    index = ChannelTokenIndex(store)
+    index.refresh()
+
+    assert index.refresh() == 0
+
+    store.register('t0k3n-2', '#ci')
+    store.revoke('t0k3n-1')
+
+    assert index.refresh() == 2
+    assert index.lookup('t0k3n-1') is None
+    assert index.lookup('t0k3n-2') == ChannelToken('#ci', None)
+    assert len(index) == 1
+
+
+def test_refresh_sees_changes_via_other_connection(store, store_path):
+    index = open_token_index(store_path)
+    assert len(index) == 0
+
+    store.register('t0k3n', '#ci')
+
+    assert index.refresh() == 1
+    assert index.lookup('t0k3n') == ChannelToken('#ci', None)
+
+    index.store.close()
+
+
+def test_reregister_revoked_token(store):
+    index = ChannelTokenIndex(store)
+
+    store.register('t0k3n', '#ci')
+    assert store.revoke('t0k3n')
+    assert not store.revoke('t0k3n')
+    store.register('t0k3n', '#ops')
+
+    index.refresh()
+    assert index.lookup('t0k3n') == ChannelToken('#ops', None)
+
+
+def test_channel_names_are_shared(store):
+    store.register('t0k3n-1', '#ci')
+    store.register('t0k3n-2', '#ci')
+
+    index = ChannelTokenIndex(store)
+    index.refresh()
+
+    channel_name1 = index.lookup('t0k3n-1').channel_name
+    channel_name2 = index.lookup('t0k3n-2').channel_name
+    assert channel_name1 is channel_name2
@@ -0,0 +1,57 @@
+"""
+:Copyright: 2007-2025 Jochen Kupperschmidt
+:License: MIT, see LICENSE for details.
+"""
+
+import logging
+
+from weitersager.tracing import Trace, Tracer
+
+
+def test_create_trace_samples():
+    random_values = iter([0.05, 0.5])
+    tracer = Tracer(0.1, random_func=lambda: next(random_values))
+
+    sampled_trace = tracer.create_trace('10.0.0.1', 1700000000.0)
+    other_trace = tracer.create_trace(None, None)
+
+    assert sampled_trace.sampled
+    assert sampled_trace.source_ip_address == '10.0.0.1'
+    assert sampled_trace.received_at == 1700000000.0
+    assert not other_trace.sampled
+    assert other_trace.received_at is not None
+    assert sampled_trace.message_id != other_trace.message_id
+
+
+def test_create_trace_without_sampling():
+    tracer = Tracer(random_func=lambda: 0.0)
+
+    assert not tracer.create_trace(None, None).sampled
+
+
+def test_log_sampled_trace(caplog):
+    tracer = Tracer(1.0)
+    trace = Trace('0123456789abcdef', '10.0.0.1', 100.0, sampled=True)
+    trace.enqueued_at = 100.002
+    trace.dequeued_at = 100.5
+    trace.sent_at = 101.0
+
+    with caplog.at_level(logging.INFO, logger='weitersager.tracing'):
+        tracer.log('#ops', trace)
+
+    assert caplog.messages == [
+        (
+            'Message 0123456789abcdef for channel #ops from 10.0.0.1: '
+            'receive 2.0 ms, queue 498.0 ms, deliver 500.0 ms, total 1000.0 ms'
+        )
+    ]
+
+
+def test_log_trace_not_sampled(caplog):
+    tracer = Tracer(1.0)
+    trace = Trace('0123456789abcdef', None, 100.0)
+
+    with caplog.at_level(logging.INFO, logger='weitersager.tracing'):
+        tracer.log('#ops', trace)
+
+    assert caplog.messages == []